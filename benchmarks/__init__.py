@@ -0,0 +1,4 @@
+"""Performance benchmarks for Writers Factory.
+
+Run with ``python -m benchmarks.run``; see benchmarks/run.py for options.
+"""
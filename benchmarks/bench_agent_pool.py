@@ -0,0 +1,60 @@
+"""AgentPool fan-out benchmarks.
+
+``execute_parallel_overhead`` uses in-process agents that return
+immediately, so it measures the pool's own cost per fan-out.
+``execute_parallel_http`` drives real agents against the offline mock
+provider (no simulated delays) to include client/HTTP overhead.
+"""
+
+from factory.agents.base_agent import AgentConfig
+from factory.agents.chinese.deepseek import DeepSeekAgent
+from factory.core.agent_pool import AgentPool
+from factory.tools.mock_provider import MockProviderConfig, MockProviderServer, ProviderProfile
+
+from benchmarks.harness import benchmark
+
+PROMPT = "Write the opening paragraph of a scene set in a harbor at dawn."
+
+
+class InstantAgent:
+    """Agent that answers without doing any work."""
+
+    async def generate(self, prompt, **kwargs):
+        return {
+            "output": "ok",
+            "tokens_input": 12,
+            "tokens_output": 1,
+            "cost": 0.0001,
+            "model_version": "instant",
+        }
+
+
+@benchmark(number=200, params={"agents": [1, 4, 16, 64]}, unit="fan-out")
+def execute_parallel_overhead(agents):
+    pool = AgentPool()
+    for i in range(agents):
+        pool.register_agent(f"agent-{i}", InstantAgent())
+
+    async def op():
+        await pool.execute_parallel(PROMPT)
+
+    return op
+
+
+@benchmark(number=20, repeat=3, params={"agents": [1, 4, 8]}, unit="fan-out")
+def execute_parallel_http(agents):
+    config = MockProviderConfig(default=ProviderProfile(max_output_tokens=64), time_scale=0.0)
+    with MockProviderServer(config) as server:
+        pool = AgentPool()
+        for i in range(agents):
+            pool.register_agent(f"deepseek-{i}", DeepSeekAgent(AgentConfig(
+                name=f"deepseek-{i}",
+                model="deepseek-chat",
+                api_key="offline",
+                base_url=server.url("/v1/chat/completions"),
+            )))
+
+        async def op():
+            await pool.execute_parallel(PROMPT)
+
+        yield op
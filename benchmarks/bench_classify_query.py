@@ -0,0 +1,85 @@
+"""Benchmark KnowledgeRouter.classify_query.
+
+Compares the precompiled QueryClassifier against the original chain of
+``any(word in query ...)`` scans over a mix of query types.
+
+Registered with the suite (``python -m benchmarks.run --filter classify``)
+and also runnable on its own for a quick side-by-side:
+
+Usage:
+    python benchmarks/bench_classify_query.py [--iterations 1000000]
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.harness import benchmark  # noqa: E402
+from factory.knowledge.router import KnowledgeRouter, QueryType  # noqa: E402
+
+QUERIES = [
+    "What is Sarah's age?",
+    "Why does Sarah betray John in the third act?",
+    "Show me the relationship between the two brothers",
+    "Tell me about the harbor town and its history",
+    "Compare the character arcs of Sarah and John",
+    "Provide context for: Sarah walks into the coffee shop and sees him",
+    "Where does the final confrontation take place?",
+    "Summary please",
+]
+
+
+def legacy_classify(query: str) -> QueryType:
+    """Original keyword-scan implementation, kept for comparison."""
+    query_lower = query.lower()
+    if any(word in query_lower for word in ["why ", "analyze", "compare", "explain why"]):
+        return QueryType.ANALYTICAL
+    if any(word in query_lower for word in ["what is", "who is", "when", "where"]):
+        return QueryType.FACTUAL
+    if any(word in query_lower for word in ["relationship", "connect", "related"]):
+        return QueryType.CONCEPTUAL
+    return QueryType.GENERAL
+
+
+@benchmark(number=len(QUERIES) * 5000, params={"implementation": ["legacy", "compiled"]}, unit="query")
+def classify(implementation):
+    func = legacy_classify if implementation == "legacy" else KnowledgeRouter().classify_query
+    queries = itertools.cycle(QUERIES)
+    return lambda: func(next(queries))
+
+
+def run(func, iterations: int) -> float:
+    """Run func over the query mix and return elapsed seconds."""
+    queries = QUERIES
+    n = len(queries)
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(queries[i % n])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    router = KnowledgeRouter()
+
+    # Sanity check: both implementations agree on the mix
+    for query in QUERIES:
+        assert router.classify_query(query) == legacy_classify(query), query
+
+    for name, func in [("legacy", legacy_classify), ("compiled", router.classify_query)]:
+        elapsed = run(func, args.iterations)
+        print(
+            f"{name:>9}: {args.iterations:,} classifications in {elapsed:.2f}s "
+            f"({args.iterations / elapsed:,.0f}/s, {elapsed / args.iterations * 1e9:.0f} ns/op)"
+        )
+
+
+if __name__ == "__main__":
+    main()
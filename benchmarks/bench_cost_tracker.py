@@ -0,0 +1,37 @@
+"""CostTracker.log_operation rate."""
+
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from factory.core.storage.cost_tracker import CostTracker
+from factory.core.storage.models import CostOperation
+
+from benchmarks.harness import benchmark
+
+
+def operation_kwargs() -> dict:
+    return {
+        "operation_type": "generation",
+        "model_name": "deepseek-chat",
+        "tokens_input": 1200,
+        "tokens_output": 800,
+        "cost": 0.0021,
+        "stage": "drafting",
+    }
+
+
+@benchmark(number=200, repeat=3, params={"existing": [0, 1000]}, unit="log")
+def log_operation(existing):
+    """Log one operation into a tracker already holding ``existing`` operations."""
+    tmpdir = Path(tempfile.mkdtemp())
+    tracker = CostTracker(tmpdir)
+    for _ in range(existing):
+        tracker.data.add_operation(CostOperation(timestamp=datetime.now(), **operation_kwargs()))
+
+    async def op():
+        await tracker.log_operation(**operation_kwargs())
+
+    yield op
+    shutil.rmtree(tmpdir)
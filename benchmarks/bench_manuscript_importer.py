@@ -0,0 +1,34 @@
+"""ManuscriptImporter throughput on a generated PART/scene tree."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from factory.tools.manuscript_importer import ManuscriptImporter
+
+from benchmarks.bench_manuscript_storage import PARAGRAPH
+from benchmarks.harness import benchmark
+
+
+def write_tree(root: Path, scenes: int, parts: int = 3, scenes_per_chapter: int = 8) -> None:
+    """Write numbered scene files ("1.2.3 Title.md") under PART directories."""
+    per_part = max(1, scenes // parts)
+    for i in range(scenes):
+        part = min(i // per_part, parts - 1) + 1
+        index = i - (part - 1) * per_part
+        chapter = index // scenes_per_chapter + 1
+        scene = index % scenes_per_chapter + 1
+        directory = root / f"PART {part}"
+        directory.mkdir(exist_ok=True)
+        (directory / f"{part}.{chapter}.{scene} Scene {i}.md").write_text(
+            f"# Scene {i}\n\n{PARAGRAPH}\n", encoding="utf-8"
+        )
+
+
+@benchmark(number=1, repeat=3, params={"scenes": [100, 1000]}, unit="import")
+def import_manuscript(scenes):
+    tmpdir = Path(tempfile.mkdtemp())
+    write_tree(tmpdir, scenes)
+    importer = ManuscriptImporter(tmpdir)
+    yield lambda: importer.import_manuscript("Benchmark")
+    shutil.rmtree(tmpdir)
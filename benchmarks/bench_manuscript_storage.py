@@ -0,0 +1,48 @@
+"""ManuscriptStorage save/load benchmarks at novel-series scale."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from factory.core.manuscript import Act, Chapter, Manuscript, Scene
+from factory.core.manuscript.storage import ManuscriptStorage
+
+from benchmarks.harness import benchmark
+
+PARAGRAPH = (
+    "She stood at the end of the pier long after the ferry had gone, counting "
+    "the lights along the far shore and wondering which of them was his. "
+) * 4
+
+
+def build_manuscript(scenes: int, scenes_per_chapter: int = 10, chapters_per_act: int = 25) -> Manuscript:
+    """Build a manuscript with ``scenes`` scenes of ~100 words each."""
+    manuscript = Manuscript(title="Benchmark", author="Bench")
+    chapter = act = None
+    for i in range(scenes):
+        if i % (scenes_per_chapter * chapters_per_act) == 0:
+            act = Act(id=f"act-{len(manuscript.acts) + 1}", title=f"Act {len(manuscript.acts) + 1}")
+            manuscript.acts.append(act)
+        if i % scenes_per_chapter == 0:
+            chapter = Chapter(id=f"ch-{i // scenes_per_chapter}", title=f"Chapter {i // scenes_per_chapter}")
+            act.chapters.append(chapter)
+        chapter.scenes.append(Scene(id=f"scene-{i}", title=f"Scene {i}", content=PARAGRAPH))
+    return manuscript
+
+
+@benchmark(number=1, repeat=3, params={"scenes": [1000, 10000]}, unit="save")
+def save(scenes):
+    tmpdir = Path(tempfile.mkdtemp())
+    storage = ManuscriptStorage(tmpdir)
+    manuscript = build_manuscript(scenes)
+    yield lambda: storage.save(manuscript)
+    shutil.rmtree(tmpdir)
+
+
+@benchmark(number=1, repeat=3, params={"scenes": [1000, 10000]}, unit="load")
+def load(scenes):
+    tmpdir = Path(tempfile.mkdtemp())
+    storage = ManuscriptStorage(tmpdir)
+    storage.save(build_manuscript(scenes))
+    yield storage.load
+    shutil.rmtree(tmpdir)
@@ -0,0 +1,51 @@
+"""QueryCache operation benchmarks (memory tier and persistent write-behind)."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from factory.knowledge.cache import QueryCache
+from factory.knowledge.persistent_cache import PersistentCacheStore
+
+from benchmarks.harness import benchmark
+
+PARAMS = {"source": "cognee", "max_results": 5}
+
+
+def filled_cache(size: int, **kwargs) -> QueryCache:
+    cache = QueryCache(max_size=size, **kwargs)
+    for i in range(size):
+        cache.set(f"Who is character {i}?", {"answer": i}, PARAMS)
+    return cache
+
+
+@benchmark(number=20000, params={"size": [100, 1000]})
+def get_hit(size):
+    cache = filled_cache(size)
+    return lambda: cache.get("Who is character 7?", PARAMS)
+
+
+@benchmark(number=20000, params={"size": [1000]})
+def get_miss(size):
+    cache = filled_cache(size)
+    return lambda: cache.get("Where is nowhere?", PARAMS)
+
+
+@benchmark(number=2000, params={"size": [100, 1000]})
+def set_with_eviction(size):
+    """Insert into a full cache so every set evicts the LRU entry."""
+    cache = filled_cache(size)
+    counter = iter(range(10**9))
+    return lambda: cache.set(f"new query {next(counter)}", {"answer": 0}, PARAMS)
+
+
+@benchmark(number=5000, params={"size": [1000]})
+def set_persistent(size):
+    """Hot-path cost of set() with the SQLite write-behind tier attached."""
+    tmpdir = Path(tempfile.mkdtemp())
+    store = PersistentCacheStore(tmpdir / "cache.db", max_entries=size * 10)
+    cache = QueryCache(max_size=size, store=store)
+    counter = iter(range(10**9))
+    yield lambda: cache.set(f"query {next(counter)}", {"answer": 0}, PARAMS, documents=["story_bible.md"])
+    cache.close()
+    shutil.rmtree(tmpdir)
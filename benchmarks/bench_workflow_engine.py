@@ -0,0 +1,41 @@
+"""WorkflowEngine.run_workflow overhead benchmarks.
+
+Steps are no-ops, so timings reflect validation, topological sorting,
+step bookkeeping and context handling.
+"""
+
+from factory.core.workflow_engine import Workflow, WorkflowEngine
+
+from benchmarks.harness import benchmark
+
+
+async def noop(context):
+    return None
+
+
+def chain(steps: int) -> Workflow:
+    """Linear workflow: each step depends on the previous one."""
+    workflow = Workflow("chain")
+    for i in range(steps):
+        workflow.add_step(f"step-{i}", noop, dependencies=[f"step-{i - 1}"] if i else [])
+    return workflow
+
+
+def fan_out(steps: int) -> Workflow:
+    """One root step with ``steps`` independent children."""
+    workflow = Workflow("fan-out")
+    workflow.add_step("root", noop)
+    for i in range(steps):
+        workflow.add_step(f"child-{i}", noop, dependencies=["root"])
+    return workflow
+
+
+@benchmark(number=50, params={"shape": ["chain", "fan_out"], "steps": [10, 100]}, unit="workflow")
+def run_workflow(shape, steps):
+    build = chain if shape == "chain" else fan_out
+    engine = WorkflowEngine()
+
+    async def op():
+        await engine.run_workflow(build(steps))
+
+    return op
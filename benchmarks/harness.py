@@ -0,0 +1,298 @@
+"""Minimal benchmark harness.
+
+Benchmarks are plain functions registered with @benchmark. Each one is a
+*factory*: it performs setup and returns (or yields, if teardown is needed)
+the operation to time. The operation may be sync or async; async operations
+are timed inside a single event loop so loop start-up is not measured.
+
+    @benchmark(number=1000, params={"size": [10, 100]})
+    def cache_get(size):
+        cache = build(size)
+        return lambda: cache.get("q")
+
+Results are written as JSON so runs on different commits can be compared
+with ``python -m benchmarks.run --compare old.json new.json``.
+"""
+
+import asyncio
+import inspect
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+REGISTRY: List["Benchmark"] = []
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark.
+
+    Attributes:
+        name: Benchmark name (module prefix + function name)
+        factory: Setup function returning/yielding the timed operation
+        number: Operation calls per timing sample
+        repeat: Number of timing samples
+        params: Parameter grid; one case runs per combination
+        unit: What one operation call represents (for ops/sec reporting)
+    """
+
+    name: str
+    factory: Callable
+    number: int = 100
+    repeat: int = 5
+    params: Dict[str, List[Any]] = field(default_factory=dict)
+    unit: str = "op"
+
+    def cases(self) -> Iterator[Dict[str, Any]]:
+        """Yield every parameter combination."""
+        keys = list(self.params)
+        for values in itertools.product(*(self.params[k] for k in keys)):
+            yield dict(zip(keys, values))
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one benchmark case."""
+
+    name: str
+    params: Dict[str, Any]
+    number: int
+    repeat: int
+    unit: str
+    samples: List[float]
+
+    @property
+    def key(self) -> str:
+        """Stable identifier used for comparisons."""
+        if not self.params:
+            return self.name
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary statistics (seconds per operation)."""
+        median = statistics.median(self.samples)
+        return {
+            "name": self.name,
+            "params": self.params,
+            "number": self.number,
+            "repeat": self.repeat,
+            "unit": self.unit,
+            "samples": self.samples,
+            "min": min(self.samples),
+            "median": median,
+            "mean": statistics.fmean(self.samples),
+            "stdev": statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0,
+            "ops_per_sec": 1.0 / median if median > 0 else float("inf"),
+        }
+
+
+def benchmark(
+    number: int = 100,
+    repeat: int = 5,
+    params: Optional[Dict[str, List[Any]]] = None,
+    unit: str = "op",
+    name: Optional[str] = None
+) -> Callable:
+    """Register a benchmark factory.
+
+    Args:
+        number: Operation calls per timing sample
+        repeat: Number of timing samples
+        params: Parameter grid passed to the factory as keyword arguments
+        unit: What one operation represents
+        name: Override the registered name
+
+    Returns:
+        Decorator
+    """
+    def decorator(factory: Callable) -> Callable:
+        module = factory.__module__.rsplit(".", 1)[-1].replace("bench_", "")
+        REGISTRY.append(Benchmark(
+            name=name or f"{module}.{factory.__name__}",
+            factory=factory,
+            number=number,
+            repeat=repeat,
+            params=params or {},
+            unit=unit,
+        ))
+        return factory
+    return decorator
+
+
+def _time_sync(op: Callable, number: int, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+async def _time_async(op: Callable, number: int, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await op()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def run_case(bench: Benchmark, params: Dict[str, Any], scale: float = 1.0) -> BenchmarkResult:
+    """Run one parameter combination of a benchmark.
+
+    Args:
+        bench: Benchmark to run
+        params: Parameter values for the factory
+        scale: Multiplier for ``number`` (quick runs use < 1)
+
+    Returns:
+        BenchmarkResult with per-operation timings
+    """
+    number = max(1, int(bench.number * scale))
+    produced = bench.factory(**params)
+    teardown = None
+    if inspect.isgenerator(produced):
+        teardown = produced
+        op = next(produced)
+    else:
+        op = produced
+
+    try:
+        if inspect.iscoroutinefunction(op):
+            samples = asyncio.run(_time_async(op, number, bench.repeat))
+        else:
+            samples = _time_sync(op, number, bench.repeat)
+    finally:
+        if teardown is not None:
+            next(teardown, None)
+
+    return BenchmarkResult(bench.name, params, number, bench.repeat, bench.unit, samples)
+
+
+def run_all(
+    name_filter: Optional[str] = None,
+    scale: float = 1.0,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None
+) -> List[BenchmarkResult]:
+    """Run registered benchmarks.
+
+    Args:
+        name_filter: Only run benchmarks whose name contains this string
+        scale: Multiplier for ``number``
+        progress: Called after each case completes
+
+    Returns:
+        List of results
+    """
+    results = []
+    for bench in REGISTRY:
+        if name_filter and name_filter not in bench.name:
+            continue
+        for params in bench.cases():
+            result = run_case(bench, params, scale)
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def _git_commit(root: Path) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def results_document(results: List[BenchmarkResult], root: Path) -> Dict[str, Any]:
+    """Build the JSON document for a run.
+
+    Args:
+        results: Benchmark results
+        root: Repository root (for the commit hash)
+
+    Returns:
+        Serializable dictionary
+    """
+    return {
+        "commit": _git_commit(root),
+        "created_at": datetime.now().isoformat(),
+        "machine": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "benchmarks": {r.key: r.to_dict() for r in results},
+    }
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """Load a results document."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass
+class Comparison:
+    """Change of one benchmark between two runs."""
+
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """current / baseline median time (> 1 is slower)."""
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10
+) -> Dict[str, List[Comparison]]:
+    """Compare two results documents by median time.
+
+    Args:
+        baseline: Older results document
+        current: Newer results document
+        threshold: Relative change treated as significant
+
+    Returns:
+        Dict with "regressions", "improvements" and "unchanged" lists
+    """
+    report: Dict[str, List[Comparison]] = {"regressions": [], "improvements": [], "unchanged": []}
+    old = baseline["benchmarks"]
+    for key, entry in current["benchmarks"].items():
+        if key not in old:
+            continue
+        item = Comparison(key, old[key]["median"], entry["median"])
+        if item.ratio > 1 + threshold:
+            report["regressions"].append(item)
+        elif item.ratio < 1 / (1 + threshold):
+            report["improvements"].append(item)
+        else:
+            report["unchanged"].append(item)
+    return report
+
+
+def format_time(seconds: float) -> str:
+    """Human-readable duration."""
+    for unit, factor in (("s", 1.0), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
@@ -0,0 +1,103 @@
+"""Run the benchmark suite and compare against earlier runs.
+
+Usage:
+    python -m benchmarks.run                      # run all, write results/<commit>.json
+    python -m benchmarks.run --filter storage     # subset
+    python -m benchmarks.run --quick              # 10% of iterations, smoke test
+    python -m benchmarks.run --compare benchmarks/results/abc123.json
+    python -m benchmarks.run --compare old.json new.json   # compare files only
+
+Exits with status 1 when --compare finds regressions beyond --threshold.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.harness import (  # noqa: E402
+    compare,
+    format_time,
+    load_results,
+    results_document,
+    run_all,
+)
+
+MODULES = [
+    "bench_agent_pool",
+    "bench_workflow_engine",
+    "bench_manuscript_storage",
+    "bench_manuscript_importer",
+    "bench_query_cache",
+    "bench_cost_tracker",
+    "bench_classify_query",
+]
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def print_comparison(report, threshold: float) -> None:
+    """Print a comparison report."""
+    for label in ("regressions", "improvements", "unchanged"):
+        items = report[label]
+        if not items:
+            continue
+        print(f"\n{label.capitalize()} (threshold {threshold:.0%}):")
+        for item in sorted(items, key=lambda c: -c.ratio):
+            print(
+                f"  {item.key:<60} {format_time(item.baseline):>10} -> "
+                f"{format_time(item.current):>10}  x{item.ratio:.2f}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Writers Factory benchmark suite")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Run 10%% of iterations")
+    parser.add_argument("--output", type=Path, help="Results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, nargs="+", metavar="RESULTS",
+                        help="Baseline file, or baseline and current files to compare without running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold (default 0.10)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.compare and len(args.compare) == 2:
+        report = compare(load_results(args.compare[0]), load_results(args.compare[1]), args.threshold)
+        print_comparison(report, args.threshold)
+        return 1 if report["regressions"] else 0
+
+    for module in MODULES:
+        importlib.import_module(f"benchmarks.{module}")
+
+    def progress(result):
+        summary = result.to_dict()
+        print(
+            f"{result.key:<60} {format_time(summary['median']):>10}/{result.unit}  "
+            f"({summary['ops_per_sec']:,.0f} {result.unit}/s, ±{format_time(summary['stdev'])})"
+        )
+
+    results = run_all(args.filter, scale=0.1 if args.quick else 1.0, progress=progress)
+    document = results_document(results, ROOT)
+
+    output = args.output or RESULTS_DIR / f"{document['commit'] or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+    if args.compare:
+        report = compare(load_results(args.compare[0]), document, args.threshold)
+        print_comparison(report, args.threshold)
+        return 1 if report["regressions"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
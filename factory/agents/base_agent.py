@@ -4,12 +4,17 @@ This module provides an abstract base class that all LLM agents must implement.
 It standardizes the interface for generation, cost tracking, and token counting.
 """
 
+import functools
 import logging
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from factory.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from factory.core.tokenizers import Tokenizer, get_tokenizer
+from factory.core.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,7 @@ class AgentConfig:
     max_output: int = 2048
     cost_per_1k_input: float = 0.0
     cost_per_1k_output: float = 0.0
+    cost_per_1k_cached_input: Optional[float] = None  # None = no cache discount
     timeout: int = 120
     retry_attempts: int = 3
     retry_delay: float = 1.0
@@ -57,8 +63,18 @@ class BaseAgent(ABC):
     All agent implementations must inherit from this class and implement
     the generate() method. The base class provides common functionality
     for cost tracking, token counting, and error handling.
+
+    Subclass generate() implementations are wrapped in an "agent.generate"
+    tracing span automatically.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        """Wrap the subclass's generate() in a tracing span."""
+        super().__init_subclass__(**kwargs)
+        generate = cls.__dict__.get("generate")
+        if generate is not None and not getattr(generate, "__isabstractmethod__", False):
+            cls.generate = _traced_generate(generate)
+
     def __init__(self, config: AgentConfig):
         """Initialize agent with configuration.
 
@@ -71,6 +87,8 @@ class BaseAgent(ABC):
         self._request_count = 0
         self._total_tokens = 0
         self._total_cost = 0.0
+        # Shared with AgentPool when registered; stops retries while open
+        self.circuit_breaker: Optional[CircuitBreaker] = None
 
         logger.info(f"Initialized agent '{self.name}' with model '{self.model}'")
 
@@ -111,34 +129,81 @@ class BaseAgent(ABC):
         """
         pass
 
+    @property
+    def tokenizer(self) -> Tokenizer:
+        """Tokenizer for this agent's model.
+
+        Resolved from the model name and ``config.metadata["provider"]``;
+        see factory.core.tokenizers for vocabularies and calibrations.
+        """
+        return get_tokenizer(self.model, self.config.metadata.get("provider"))
+
     def count_tokens(self, text: str) -> int:
-        """Estimate token count for text.
+        """Count tokens for text with the model's tokenizer.
 
-        This is a simple estimation. Subclasses should override this
-        with provider-specific tokenization if available.
+        Exact when a vocabulary is available for the model, otherwise a
+        per-provider calibrated estimate (CJK-aware).
 
         Args:
             text: Text to count tokens for
 
         Returns:
-            Estimated token count
+            Token count
         """
-        # Simple estimation: ~4 characters per token
-        return len(text) // 4
+        return self.tokenizer.count(text)
+
+    def count_tokens_many(self, texts: List[str]) -> List[int]:
+        """Count tokens for several texts at once.
+
+        Args:
+            texts: Texts to count tokens for
+
+        Returns:
+            Token counts in the same order
+        """
+        return self.tokenizer.count_many(texts)
+
+    def estimate_cost(self, prompt: str, max_tokens: Optional[int] = None) -> float:
+        """Estimate the worst-case cost of a request before sending it.
+
+        Args:
+            prompt: The input prompt
+            max_tokens: Output limit (None = use config default)
 
-    def calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
+        Returns:
+            Cost in USD if the full output budget is used
+        """
+        output_tokens = self.config.max_output if max_tokens is None else max_tokens
+        return self.calculate_cost(self.count_tokens(prompt), output_tokens)
+
+    def calculate_cost(self, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
         """Calculate cost for token usage.
 
         Args:
-            input_tokens: Number of input tokens
+            input_tokens: Number of input tokens (including cached ones)
             output_tokens: Number of output tokens
+            cached_tokens: Input tokens read from the provider's prompt cache
 
         Returns:
             Cost in USD
         """
         input_cost = (input_tokens / 1000) * self.config.cost_per_1k_input
         output_cost = (output_tokens / 1000) * self.config.cost_per_1k_output
-        return input_cost + output_cost
+        return input_cost + output_cost - self.cache_savings(cached_tokens)
+
+    def cache_savings(self, cached_tokens: int) -> float:
+        """Input cost saved by reading tokens from the prompt cache.
+
+        Args:
+            cached_tokens: Input tokens served from cache
+
+        Returns:
+            Savings in USD (0 when no cached-input price is configured)
+        """
+        cached_price = self.config.cost_per_1k_cached_input
+        if not cached_tokens or cached_price is None:
+            return 0.0
+        return (cached_tokens / 1000) * (self.config.cost_per_1k_input - cached_price)
 
     def update_stats(self, tokens_input: int, tokens_output: int, cost: float) -> None:
         """Update agent statistics.
@@ -206,8 +271,15 @@ class BaseAgent(ABC):
             Exception: If all retry attempts fail
         """
         last_error = None
+        breaker = self.circuit_breaker
 
         for attempt in range(self.config.retry_attempts):
+            if breaker is not None and not breaker.allow_request():
+                raise CircuitOpenError(
+                    f"Agent '{self.name}' circuit is open"
+                    + (f" (last error: {last_error})" if last_error else "")
+                )
+
             try:
                 start_time = time.time()
 
@@ -229,10 +301,14 @@ class BaseAgent(ABC):
                     result["cost"]
                 )
 
+                if breaker is not None:
+                    breaker.record_success()
                 return result
 
             except Exception as e:
                 last_error = e
+                if breaker is not None:
+                    breaker.record_failure()
                 logger.warning(
                     f"Agent '{self.name}' generation failed (attempt {attempt + 1}): {e}"
                 )
@@ -242,6 +318,11 @@ class BaseAgent(ABC):
                     import asyncio
                     await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
 
+            except BaseException:
+                if breaker is not None:
+                    breaker.release()
+                raise
+
         # All retries failed
         raise Exception(
             f"Agent '{self.name}' failed after {self.config.retry_attempts} attempts: {last_error}"
@@ -282,3 +363,29 @@ class BaseAgent(ABC):
             f"tokens={self._total_tokens} "
             f"cost=${self._total_cost:.4f}>"
         )
+
+
+def _traced_generate(generate):
+    """Wrap an agent's generate() in an "agent.generate" span."""
+    tracer = get_tracer()
+
+    @functools.wraps(generate)
+    async def wrapper(self, prompt, *args, **kwargs):
+        if not tracer.enabled:
+            return await generate(self, prompt, *args, **kwargs)
+        with tracer.span(
+            "agent.generate",
+            agent=self.name,
+            model=self.model,
+            prompt_chars=len(prompt)
+        ) as span:
+            result = await generate(self, prompt, *args, **kwargs)
+            if isinstance(result, dict):
+                span.set_attributes(
+                    tokens_input=result.get("tokens_input", 0),
+                    tokens_output=result.get("tokens_output", 0),
+                    cost=result.get("cost", 0.0)
+                )
+            return result
+
+    return wrapper
@@ -99,8 +99,8 @@ class BaichuanAgent(BaseAgent):
 
             # Extract usage info
             usage = data.get("usage", {})
-            tokens_input = usage.get("prompt_tokens", self.count_tokens(prompt))
-            tokens_output = usage.get("completion_tokens", self.count_tokens(output_text))
+            tokens_input = usage.get("prompt_tokens") or self.count_tokens(prompt)
+            tokens_output = usage.get("completion_tokens") or self.count_tokens(output_text)
 
             # Calculate cost
             cost = self.calculate_cost(tokens_input, tokens_output)
@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 import httpx
 
 from factory.agents.base_agent import BaseAgent, AgentConfig
+from factory.core.prompt_cache import CachedPrefix, cached_tokens_from_usage, get_prefix_registry
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,13 @@ class DoubaoAgent(BaseAgent):
     """Doubao (豆包) agent for text generation.
 
     ByteDance's LLM accessible via Volcengine API.
+
+    With ``context_cache_ttl`` (seconds) in the config metadata, prompts that
+    start with a prefix registered in the PrefixRegistry are sent through
+    Volcengine context caching: the prefix is uploaded once per agent as a
+    common-prefix context and later requests only send the remainder. If a
+    context request fails (e.g. the provider expired the context early),
+    the context is forgotten and the full prompt is sent instead.
     """
 
     def __init__(self, config: AgentConfig):
@@ -32,6 +40,8 @@ class DoubaoAgent(BaseAgent):
 
         self.api_key = config.api_key
         self.base_url = config.base_url or "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
+        self.api_root = self.base_url.rsplit("/chat/completions", 1)[0]
+        self.context_cache_ttl = config.metadata.get("context_cache_ttl")
 
         logger.info(f"Initialized Doubao agent with model '{self.model}'")
 
@@ -77,12 +87,35 @@ class DoubaoAgent(BaseAgent):
 
         # Make API call
         async with httpx.AsyncClient(timeout=self.config.timeout) as client:
+            url = self.base_url
+            context_id = None
+            prefix = None
+            if self.context_cache_ttl:
+                prefix, rest = get_prefix_registry().split(prompt)
+                if prefix is not None and rest:
+                    context_id = await self._context_id(client, prefix, headers)
+                if context_id:
+                    url = f"{self.api_root}/context/chat/completions"
+                    payload["context_id"] = context_id
+                    payload["messages"] = [{"role": "user", "content": rest}]
+
             response = await client.post(
-                self.base_url,
+                url,
                 json=payload,
                 headers=headers
             )
 
+            if response.status_code != 200 and context_id:
+                logger.warning(
+                    f"Doubao context {context_id} request failed ({response.status_code}), "
+                    "sending full prompt"
+                )
+                get_prefix_registry().clear_handle(self.name, prefix)
+                context_id = None
+                del payload["context_id"]
+                payload["messages"] = [{"role": "user", "content": prompt}]
+                response = await client.post(self.base_url, json=payload, headers=headers)
+
             if response.status_code != 200:
                 raise Exception(
                     f"Doubao API error: {response.status_code} - {response.text}"
@@ -99,11 +132,12 @@ class DoubaoAgent(BaseAgent):
 
             # Extract usage info
             usage = data.get("usage", {})
-            tokens_input = usage.get("prompt_tokens", self.count_tokens(prompt))
-            tokens_output = usage.get("completion_tokens", self.count_tokens(output_text))
+            tokens_input = usage.get("prompt_tokens") or self.count_tokens(prompt)
+            tokens_output = usage.get("completion_tokens") or self.count_tokens(output_text)
+            cached_tokens = cached_tokens_from_usage(usage)
 
             # Calculate cost
-            cost = self.calculate_cost(tokens_input, tokens_output)
+            cost = self.calculate_cost(tokens_input, tokens_output, cached_tokens)
 
             return {
                 "output": output_text,
@@ -112,7 +146,53 @@ class DoubaoAgent(BaseAgent):
                 "cost": cost,
                 "model_version": data.get("model", self.model),
                 "metadata": {
+                    "cached_tokens": cached_tokens,
+                    "context_id": context_id,
                     "finish_reason": choices[0].get("finish_reason", ""),
                     "request_id": data.get("id", ""),
                 }
             }
+
+    async def _context_id(
+        self,
+        client: httpx.AsyncClient,
+        prefix: CachedPrefix,
+        headers: Dict[str, str]
+    ) -> Optional[str]:
+        """Get (or create) the context cache holding a prefix.
+
+        Args:
+            client: HTTP client for the request
+            prefix: Registered prompt prefix
+            headers: Request headers
+
+        Returns:
+            Context ID, or None if the cache could not be created
+        """
+        registry = get_prefix_registry()
+        context_id = registry.get_handle(self.name, prefix)
+        if context_id:
+            return context_id
+
+        response = await client.post(
+            f"{self.api_root}/context/create",
+            json={
+                "model": self.model,
+                "mode": "common_prefix",
+                "messages": [{"role": "system", "content": prefix.text}],
+                "ttl": int(self.context_cache_ttl),
+            },
+            headers=headers
+        )
+        if response.status_code != 200:
+            logger.warning(
+                f"Doubao context cache creation failed ({response.status_code}), sending full prompt"
+            )
+            return None
+
+        context_id = response.json().get("id")
+        if context_id:
+            # Expire our handle a little before the provider does
+            registry.set_handle(self.name, prefix, context_id, self.context_cache_ttl * 0.9)
+            logger.info(f"Created Doubao context cache {context_id} for '{prefix.name}'")
+        return context_id
@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 import httpx
 
 from factory.agents.base_agent import BaseAgent, AgentConfig
+from factory.core.prompt_cache import cached_tokens_from_usage
 
 logger = logging.getLogger(__name__)
 
@@ -99,11 +100,12 @@ class KimiAgent(BaseAgent):
 
             # Extract usage info
             usage = data.get("usage", {})
-            tokens_input = usage.get("prompt_tokens", self.count_tokens(prompt))
-            tokens_output = usage.get("completion_tokens", self.count_tokens(output_text))
+            tokens_input = usage.get("prompt_tokens") or self.count_tokens(prompt)
+            tokens_output = usage.get("completion_tokens") or self.count_tokens(output_text)
+            cached_tokens = cached_tokens_from_usage(usage)
 
             # Calculate cost
-            cost = self.calculate_cost(tokens_input, tokens_output)
+            cost = self.calculate_cost(tokens_input, tokens_output, cached_tokens)
 
             return {
                 "output": output_text,
@@ -112,6 +114,7 @@ class KimiAgent(BaseAgent):
                 "cost": cost,
                 "model_version": data.get("model", self.model),
                 "metadata": {
+                    "cached_tokens": cached_tokens,
                     "finish_reason": choices[0].get("finish_reason", ""),
                     "request_id": data.get("id", ""),
                 }
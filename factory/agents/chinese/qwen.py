@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 import httpx
 
 from factory.agents.base_agent import BaseAgent, AgentConfig
+from factory.core.prompt_cache import cached_tokens_from_usage
 
 logger = logging.getLogger(__name__)
 
@@ -104,11 +105,12 @@ class QwenAgent(BaseAgent):
 
             # Extract usage info
             usage = data.get("usage", {})
-            tokens_input = usage.get("input_tokens", self.count_tokens(prompt))
-            tokens_output = usage.get("output_tokens", self.count_tokens(output_text))
+            tokens_input = usage.get("input_tokens") or self.count_tokens(prompt)
+            tokens_output = usage.get("output_tokens") or self.count_tokens(output_text)
+            cached_tokens = cached_tokens_from_usage(usage)
 
             # Calculate cost
-            cost = self.calculate_cost(tokens_input, tokens_output)
+            cost = self.calculate_cost(tokens_input, tokens_output, cached_tokens)
 
             return {
                 "output": output_text,
@@ -117,6 +119,7 @@ class QwenAgent(BaseAgent):
                 "cost": cost,
                 "model_version": self.model,
                 "metadata": {
+                    "cached_tokens": cached_tokens,
                     "finish_reason": output_data.get("finish_reason", ""),
                     "request_id": data.get("request_id", ""),
                 }
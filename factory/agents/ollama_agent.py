@@ -2,85 +2,265 @@
 
 Provides integration with locally-running Ollama models for cost-free
 inference on creative writing tasks.
+
+Generation is async and uses Ollama's native streaming chat API over one
+pooled HTTP client per endpoint, so concurrent requests reuse connections
+and never block the event loop. ``keep_alive`` keeps the model resident
+between requests to avoid reload latency.
 """
 
-import requests
-from typing import Dict, Any, List, Optional
+import asyncio
+import json
 import logging
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+import requests
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ENDPOINT = "http://localhost:11434"
+DEFAULT_KEEP_ALIVE = "30m"
+
+# One client per event loop and endpoint: httpx clients are bound to the
+# loop they were first used on
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_client(endpoint: str, timeout: float) -> httpx.AsyncClient:
+    """Get the pooled client for an endpoint on the running loop."""
+    per_loop = _clients.setdefault(asyncio.get_running_loop(), {})
+    client = per_loop.get(endpoint)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+        per_loop[endpoint] = client
+    return client
+
 
-class OllamaAgent:
+async def close_shared_clients() -> None:
+    """Close the pooled clients of the running loop."""
+    per_loop = _clients.pop(asyncio.get_running_loop(), {})
+    for client in per_loop.values():
+        await client.aclose()
+
+
+class OllamaAgent(BaseAgent):
     """Agent for local Ollama models."""
 
     def __init__(
         self,
-        model_name: str,
-        endpoint: str = "http://localhost:11434",
+        config: Union[AgentConfig, str],
+        endpoint: Optional[str] = None,
+        keep_alive: Optional[Union[str, int]] = None,
+        client: Optional[httpx.AsyncClient] = None,
         **kwargs
     ):
         """Initialize Ollama agent.
 
         Args:
-            model_name: Name of the Ollama model (e.g., "llama3.2:3b")
-            endpoint: Ollama API endpoint (default: localhost:11434)
-            **kwargs: Additional configuration options
+            config: Agent configuration, or just an Ollama model name
+                (e.g., "llama3.2:3b")
+            endpoint: Ollama API endpoint (default: config.base_url or localhost:11434)
+            keep_alive: How long Ollama keeps the model loaded after a request
+                ("30m", seconds, or -1 for forever; default from
+                config.metadata["keep_alive"] or 30m)
+            client: HTTP client to use instead of the shared pool
+            **kwargs: Extra AgentConfig fields when config is a model name
         """
-        self.model_name = model_name
-        self.endpoint = endpoint
+        if isinstance(config, str):
+            config = AgentConfig(name=f"ollama-{config}", model=config, **kwargs)
+        super().__init__(config)
+
+        self.model_name = config.model
+        self.endpoint = (endpoint or config.base_url or DEFAULT_ENDPOINT).rstrip("/")
+        self.keep_alive = (
+            keep_alive if keep_alive is not None
+            else config.metadata.get("keep_alive", DEFAULT_KEEP_ALIVE)
+        )
         self.is_local = True
         self.cost_per_1k_input = 0.0
         self.cost_per_1k_output = 0.0
+        self._client = client
+
+    @classmethod
+    def from_agent_config(cls, name: str, entry: Dict[str, Any], **kwargs) -> "OllamaAgent":
+        """Create an agent from an agents.yaml entry.
+
+        Args:
+            name: Agent name (e.g. "ollama-llama3")
+            entry: The agent's agents.yaml mapping
+            **kwargs: Passed to the constructor
+
+        Returns:
+            OllamaAgent
+        """
+        config = AgentConfig(
+            name=name,
+            model=entry["model"],
+            base_url=entry.get("endpoint", DEFAULT_ENDPOINT),
+            context_window=entry.get("context_window", 4096),
+            metadata={k: entry[k] for k in ("keep_alive", "provider") if k in entry},
+        )
+        return cls(config, **kwargs)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client (the shared pool unless one was injected)."""
+        if self._client is not None:
+            return self._client
+        return _shared_client(self.endpoint, self.config.timeout)
+
+    def _payload(
+        self,
+        prompt: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        keep_alive: Optional[Union[str, int]],
+        **kwargs
+    ) -> Dict[str, Any]:
+        messages = []
+        if kwargs.get("system"):
+            messages.append({"role": "system", "content": kwargs["system"]})
+        messages.append({"role": "user", "content": prompt})
+
+        options = {"temperature": temperature, "num_predict": max_tokens or self.config.max_output}
+        for key in ("top_p", "top_k", "seed", "stop", "num_ctx", "repeat_penalty"):
+            if key in kwargs:
+                options[key] = kwargs[key]
+
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": True,
+            "options": options,
+            "keep_alive": self.keep_alive if keep_alive is None else keep_alive,
+        }
+
+    async def _chat_lines(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """POST /api/chat and yield the parsed NDJSON messages."""
+        try:
+            async with self.client.stream("POST", f"{self.endpoint}/api/chat", json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode(errors="replace")
+                    raise RuntimeError(f"Ollama API error: {response.status_code} - {body}")
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(f"Ollama error: {data['error']}")
+                    yield data
+        except httpx.ConnectError:
+            logger.error(f"Failed to connect to Ollama at {self.endpoint}")
+            raise RuntimeError(
+                f"Ollama is not running. Start it with: brew services start ollama"
+            )
+
+    async def stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        keep_alive: Optional[Union[str, int]] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream generated text chunks as Ollama produces them.
 
-    def generate(
+        Args:
+            prompt: The text prompt
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens to generate
+            keep_alive: Override the agent's keep_alive for this request
+            **kwargs: Ollama options (top_p, top_k, seed, stop, num_ctx,
+                repeat_penalty) and an optional system prompt
+
+        Yields:
+            Text chunks
+        """
+        payload = self._payload(prompt, temperature, max_tokens, keep_alive, **kwargs)
+        async for data in self._chat_lines(payload):
+            text = data.get("message", {}).get("content", "")
+            if text:
+                yield text
+
+    async def generate(
         self,
         prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 1000,
+        max_tokens: Optional[int] = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+        keep_alive: Optional[Union[str, int]] = None,
         **kwargs
-    ) -> str:
+    ) -> Dict[str, Any]:
         """Generate text using local Ollama model.
 
+        The response is always streamed from Ollama so time to first token
+        can be measured; pass on_token to see chunks as they arrive.
+
         Args:
             prompt: The text prompt
             temperature: Sampling temperature (0.0 to 2.0)
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional generation options
+            on_token: Called with each text chunk (may be async)
+            keep_alive: Override the agent's keep_alive for this request
+            **kwargs: Ollama options (see stream)
 
         Returns:
-            Generated text
+            Dictionary with output, token counts, cost (always 0), model
+            version and metadata (ttft_ms, load_ms, tokens_per_sec, done_reason)
 
         Raises:
-            requests.exceptions.RequestException: If Ollama is not running
+            RuntimeError: If Ollama is not running or returns an error
         """
-        try:
-            response = requests.post(
-                f"{self.endpoint}/v1/chat/completions",
-                json={
-                    "model": self.model_name,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": temperature,
-                    "max_tokens": max_tokens,
-                    "stream": False
-                },
-                timeout=60
-            )
-            response.raise_for_status()
+        payload = self._payload(prompt, temperature, max_tokens, keep_alive, **kwargs)
+        start = time.perf_counter()
+        ttft_ms = None
+        chunks: List[str] = []
+        final: Dict[str, Any] = {}
+
+        async for data in self._chat_lines(payload):
+            text = data.get("message", {}).get("content", "")
+            if text:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - start) * 1000
+                chunks.append(text)
+                if on_token is not None:
+                    result = on_token(text)
+                    if asyncio.iscoroutine(result):
+                        await result
+            if data.get("done"):
+                final = data
+
+        output = "".join(chunks)
+        tokens_input = final.get("prompt_eval_count") or self.count_tokens(prompt)
+        tokens_output = final.get("eval_count") or self.count_tokens(output)
+        eval_seconds = final.get("eval_duration", 0) / 1e9
 
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
-
-        except requests.exceptions.ConnectionError:
-            logger.error(f"Failed to connect to Ollama at {self.endpoint}")
-            raise RuntimeError(
-                f"Ollama is not running. Start it with: brew services start ollama"
-            )
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Ollama generation failed: {e}")
-            raise
+        return {
+            "output": output,
+            "tokens_input": tokens_input,
+            "tokens_output": tokens_output,
+            "cost": 0.0,
+            "model_version": final.get("model", self.model_name),
+            "metadata": {
+                "ttft_ms": ttft_ms if ttft_ms is not None else (time.perf_counter() - start) * 1000,
+                "load_ms": final.get("load_duration", 0) / 1e6,
+                "tokens_per_sec": tokens_output / eval_seconds if eval_seconds > 0 else None,
+                "done_reason": final.get("done_reason", ""),
+                "is_local": True,
+            },
+        }
 
-    def generate_with_metadata(
+    async def generate_with_metadata(
         self,
         prompt: str,
         **kwargs
@@ -93,31 +273,46 @@ class OllamaAgent:
         - model: Model name
         - tokens: Token counts
         """
-        import time
         start_time = time.time()
-
-        output = self.generate(prompt, **kwargs)
+        result = await self.generate(prompt, **kwargs)
         elapsed = time.time() - start_time
 
-        # Estimate token counts (rough approximation)
-        input_tokens = len(prompt.split()) * 1.3
-        output_tokens = len(output.split()) * 1.3
-
         return {
-            "output": output,
+            "output": result["output"],
             "cost": 0.0,
             "model": self.model_name,
             "is_local": True,
             "tokens": {
-                "input": int(input_tokens),
-                "output": int(output_tokens),
-                "total": int(input_tokens + output_tokens)
+                "input": result["tokens_input"],
+                "output": result["tokens_output"],
+                "total": result["tokens_input"] + result["tokens_output"]
             },
             "timing": {
-                "elapsed_seconds": round(elapsed, 2)
+                "elapsed_seconds": round(elapsed, 2),
+                "ttft_ms": result["metadata"]["ttft_ms"],
             }
         }
 
+    async def preload(self, keep_alive: Optional[Union[str, int]] = None) -> None:
+        """Load the model into memory ahead of the first request.
+
+        Args:
+            keep_alive: How long to keep it loaded (default: the agent's keep_alive)
+        """
+        response = await self.client.post(
+            f"{self.endpoint}/api/generate",
+            json={
+                "model": self.model_name,
+                "keep_alive": self.keep_alive if keep_alive is None else keep_alive,
+                "stream": False,
+            },
+        )
+        response.raise_for_status()
+
+    async def unload(self) -> None:
+        """Ask Ollama to unload the model now."""
+        await self.preload(keep_alive=0)
+
     @staticmethod
     def is_available() -> bool:
         """Check if Ollama is running and accessible.
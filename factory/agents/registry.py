@@ -0,0 +1,118 @@
+"""Create agents from agents.yaml entries.
+
+Maps each entry's provider to its agent class, so the webapp, TUI and
+scripts can fill an AgentPool from configuration instead of registering
+agents by hand. Entries whose provider has no implementation here, or
+whose API key is missing, are skipped with a log message.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.config.loader import get_api_key, get_enabled_agents
+
+logger = logging.getLogger(__name__)
+
+# AgentConfig fields copied verbatim from an agents.yaml entry
+_CONFIG_FIELDS = (
+    "context_window", "max_output", "cost_per_1k_input", "cost_per_1k_output",
+    "cost_per_1k_cached_input", "timeout", "retry_attempts", "retry_delay",
+)
+# Entry keys passed to the agent as config metadata
+_METADATA_FIELDS = ("provider", "context_cache_ttl")
+
+
+def _agent_classes() -> Dict[str, type]:
+    """Provider name -> agent class (imported lazily)."""
+    from factory.agents.chinese.baichuan import BaichuanAgent
+    from factory.agents.chinese.deepseek import DeepSeekAgent
+    from factory.agents.chinese.doubao import DoubaoAgent
+    from factory.agents.chinese.kimi import KimiAgent
+    from factory.agents.chinese.qwen import QwenAgent
+
+    return {
+        "deepseek": DeepSeekAgent,
+        "qwen": QwenAgent,
+        "kimi": KimiAgent,
+        "baichuan": BaichuanAgent,
+        "doubao": DoubaoAgent,
+    }
+
+
+def _lookup_api_key(provider: str) -> Optional[str]:
+    """API key from config/credentials.json, or None if not configured."""
+    try:
+        return get_api_key(provider) or None
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def create_agent(
+    name: str,
+    entry: Dict[str, Any],
+    api_key_lookup: Callable[[str], Optional[str]] = _lookup_api_key
+) -> BaseAgent:
+    """Create the agent an agents.yaml entry describes.
+
+    Args:
+        name: Agent name (the entry's key)
+        entry: The agent's agents.yaml mapping
+        api_key_lookup: Returns the API key for a provider, or None
+
+    Returns:
+        Agent instance
+
+    Raises:
+        ValueError: If the provider is unsupported or its API key is missing
+    """
+    provider = entry.get("provider", "")
+    if provider == "ollama":
+        from factory.agents.ollama_agent import OllamaAgent
+        return OllamaAgent.from_agent_config(name, entry)
+
+    agent_class = _agent_classes().get(provider)
+    if agent_class is None:
+        raise ValueError(f"No agent implementation for provider '{provider}'")
+
+    api_key = api_key_lookup(provider)
+    if not api_key:
+        raise ValueError(f"No API key configured for provider '{provider}'")
+
+    config = AgentConfig(
+        name=name,
+        model=entry["model"],
+        api_key=api_key,
+        base_url=entry.get("base_url"),
+        metadata={key: entry[key] for key in _METADATA_FIELDS if key in entry},
+        **{key: entry[key] for key in _CONFIG_FIELDS if key in entry},
+    )
+    return agent_class(config)
+
+
+def create_configured_agents(
+    entries: Optional[Dict[str, Dict[str, Any]]] = None,
+    api_key_lookup: Callable[[str], Optional[str]] = _lookup_api_key
+) -> Tuple[Dict[str, BaseAgent], Dict[str, str]]:
+    """Create every enabled agent in agents.yaml that can be created.
+
+    Args:
+        entries: Agent name -> entry (default: enabled agents in agents.yaml)
+        api_key_lookup: Returns the API key for a provider, or None
+
+    Returns:
+        (name -> agent, name -> reason it was skipped)
+    """
+    if entries is None:
+        entries = get_enabled_agents()
+
+    agents: Dict[str, BaseAgent] = {}
+    skipped: Dict[str, str] = {}
+    for name, entry in entries.items():
+        try:
+            agents[name] = create_agent(name, entry, api_key_lookup)
+        except Exception as e:
+            skipped[name] = str(e)
+            logger.info(f"Skipping agent {name}: {e}")
+    return agents, skipped
+
@@ -10,11 +10,20 @@ This module provides a centralized pool for managing multiple LLM agents:
 
 import asyncio
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
+from factory.core.circuit_breaker import CircuitBreaker, CircuitState
+from factory.core.config.loader import get_agent_group
+from factory.core.histogram import LogHistogram, WindowedHistogram
+from factory.core.prompt_cache import PrefixRegistry, PromptCacheUsage, get_prefix_registry
+from factory.core.routing import RouteCandidate, RoutingPolicy, choose_agent
+from factory.core.tokenizers import get_tokenizer
+from factory.core.tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +64,7 @@ class ParallelResult:
     completed_at: datetime
     total_cost: float
     total_tokens: int
+    cancelled_agents: List[str] = field(default_factory=list)
 
     @property
     def duration_ms(self) -> int:
@@ -72,6 +82,112 @@ class ParallelResult:
         return [r for r in self.responses if not r.success]
 
 
+class AgentMetrics:
+    """Latency and throughput distributions for one agent.
+
+    Histograms cover successful generations: end-to-end latency, output
+    tokens per second, time to first token (when the agent reports
+    ``ttft_ms`` in its metadata) and time spent waiting for a concurrency
+    slot. Each keeps lifetime totals plus a sliding window.
+
+    Exponentially weighted moving averages of latency, error rate and cost
+    per 1k tokens track recent behaviour cheaply for routing decisions. The
+    error rate also decays with time, so an agent that failed and then got
+    no traffic isn't avoided forever.
+    """
+
+    HISTOGRAMS = ("latency_ms", "tokens_per_sec", "ttft_ms", "queue_wait_ms")
+    EWMA_ALPHA = 0.2
+    ERROR_HALF_LIFE_SECONDS = 60.0
+
+    def __init__(self, window_seconds: float = 300.0, max_concurrency: Optional[int] = None):
+        """Initialize metrics.
+
+        Args:
+            window_seconds: Sliding window length for recent percentiles
+            max_concurrency: Concurrent generations allowed (None = unlimited)
+        """
+        self.window_seconds = window_seconds
+        self.histograms: Dict[str, WindowedHistogram] = {}
+        self.reset()
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.queued = 0
+
+    def reset(self) -> None:
+        """Clear histograms and averages (in-flight and queue counts are live state and kept)."""
+        self.histograms = {
+            name: WindowedHistogram(window_seconds=self.window_seconds, slice_seconds=min(60.0, self.window_seconds))
+            for name in self.HISTOGRAMS
+        }
+        self.ewma_latency_ms: Optional[float] = None
+        self.ewma_cost_per_1k: Optional[float] = None
+        self._error_rate = 0.0
+        self._error_rate_at = time.monotonic()
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.EWMA_ALPHA * (value - current)
+
+    @property
+    def ewma_error_rate(self) -> float:
+        """Recent error rate, halved every ERROR_HALF_LIFE_SECONDS without requests."""
+        idle = time.monotonic() - self._error_rate_at
+        return self._error_rate * 0.5 ** (idle / self.ERROR_HALF_LIFE_SECONDS)
+
+    def _record_outcome(self, failed: bool) -> None:
+        """Fold one request outcome into the (time-decayed) error rate."""
+        self._error_rate = self._ewma(self.ewma_error_rate, 1.0 if failed else 0.0)
+        self._error_rate_at = time.monotonic()
+
+    def record_success(self, response: "AgentResponse", elapsed_ms: float, queue_wait_ms: float) -> None:
+        """Record a successful generation."""
+        now = time.monotonic()
+        h = self.histograms
+        h["latency_ms"].record(elapsed_ms, now)
+        h["queue_wait_ms"].record(queue_wait_ms, now)
+        if response.tokens_output and elapsed_ms > 0:
+            h["tokens_per_sec"].record(response.tokens_output / (elapsed_ms / 1000), now)
+        ttft = response.metadata.get("ttft_ms") if response.metadata else None
+        if ttft is not None:
+            h["ttft_ms"].record(float(ttft), now)
+
+        self.ewma_latency_ms = self._ewma(self.ewma_latency_ms, elapsed_ms)
+        self._record_outcome(failed=False)
+        if response.total_tokens:
+            cost_per_1k = response.cost * 1000 / response.total_tokens
+            self.ewma_cost_per_1k = self._ewma(self.ewma_cost_per_1k, cost_per_1k)
+
+    def record_failure(self) -> None:
+        """Record a failed generation."""
+        self._record_outcome(failed=True)
+
+    def lifetime(self, name: str) -> LogHistogram:
+        """Lifetime histogram by name."""
+        return self.histograms[name].lifetime
+
+    def window(self, name: str, seconds: Optional[float] = None) -> LogHistogram:
+        """Windowed histogram by name."""
+        return self.histograms[name].window(seconds)
+
+    def snapshot(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Percentile summaries for lifetime and the sliding window."""
+        window = window_seconds or self.window_seconds
+        return {
+            **{name: self.lifetime(name).summary() for name in self.HISTOGRAMS},
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "ewma_latency_ms": self.ewma_latency_ms,
+            "ewma_error_rate": self.ewma_error_rate,
+            "window": {
+                "seconds": min(window, self.window_seconds),
+                **{name: self.window(name, window).summary() for name in self.HISTOGRAMS},
+            },
+        }
+
+
 class AgentPool:
     """Manage a pool of LLM agents for multi-model generation.
 
@@ -80,23 +196,87 @@ class AgentPool:
     - Enable/disable per session
     - Parallel execution
     - Cost tracking
-    - Load balancing
+    - Load balancing (latency-aware routing within agent groups)
     """
 
-    def __init__(self):
-        """Initialize agent pool."""
+    def __init__(
+        self,
+        metrics_window_seconds: float = 300.0,
+        agent_groups: Optional[Dict[str, List[str]]] = None,
+        max_error_rate: float = 0.5,
+        circuit_breaker: Optional[Dict[str, Any]] = None,
+        probe_prompt: Optional[str] = None,
+        prefix_registry: Optional[PrefixRegistry] = None,
+        default_latency_ms: float = 0.0
+    ):
+        """Initialize agent pool.
+
+        Args:
+            metrics_window_seconds: Sliding window for recent latency percentiles
+            agent_groups: Group name -> agent names for execute_routed (groups
+                not listed here are looked up in agents.yaml)
+            max_error_rate: Routing skips agents whose recent error rate is
+                above this while healthier group members exist
+            circuit_breaker: CircuitBreaker settings applied to every agent
+                ({"enabled": False} turns breakers off)
+            probe_prompt: If set, open circuits are probed in the background
+                with this prompt instead of waiting for real traffic
+            prefix_registry: Registered prompt prefixes used to estimate cache
+                reuse for agents that don't report it (default: process-wide)
+            default_latency_ms: Latency routing assumes for agents without
+                successes when no candidate has any (otherwise the median of
+                those that do is used)
+        """
         self._agents: Dict[str, Any] = {}  # name -> agent instance
         self._enabled: Set[str] = set()
         self._stats: Dict[str, Dict[str, Any]] = {}  # agent -> stats
-        self._lock = asyncio.Lock()
+        self._metrics: Dict[str, AgentMetrics] = {}  # agent -> histograms
+        self._agent_groups: Dict[str, List[str]] = dict(agent_groups or {})
+        self.metrics_window_seconds = metrics_window_seconds
+        self.max_error_rate = max_error_rate
+        self.default_latency_ms = default_latency_ms
+        breaker_settings = dict(circuit_breaker or {})
+        self._breakers_enabled = breaker_settings.pop("enabled", True)
+        self._breaker_settings = breaker_settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._probe_tasks: Dict[str, asyncio.Task] = {}
+        self.probe_prompt = probe_prompt
+        self.prefix_registry = prefix_registry or get_prefix_registry()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        """Zeroed counters for one agent."""
+        return {
+            "total_requests": 0,
+            "successful_requests": 0,
+            "failed_requests": 0,
+            "total_tokens": 0,
+            "total_cost": 0.0,
+            "total_response_time_ms": 0,
+            "rejected_requests": 0,
+            # Provider-reported prompt cache hits
+            "cached_tokens": 0,
+            "cache_savings_usd": 0.0,
+            # Client-side estimates for providers that don't report hits
+            "estimated_cached_tokens": 0,
+            "estimated_cache_savings_usd": 0.0,
+        }
 
-    def register_agent(self, name: str, agent: Any, enabled: bool = True) -> None:
+    def register_agent(
+        self,
+        name: str,
+        agent: Any,
+        enabled: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> None:
         """Register an agent with the pool.
 
         Args:
             name: Unique agent identifier
             agent: Agent instance (must have generate() method)
             enabled: Whether agent is enabled by default
+            max_concurrency: Concurrent generations allowed for this agent;
+                extra requests queue (None = unlimited)
         """
         if not hasattr(agent, "generate"):
             raise ValueError(f"Agent '{name}' must have a generate() method")
@@ -106,17 +286,43 @@ class AgentPool:
             self._enabled.add(name)
 
         # Initialize stats
-        self._stats[name] = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "total_tokens": 0,
-            "total_cost": 0.0,
-            "total_response_time_ms": 0,
-        }
+        self._stats[name] = self._new_stats()
+        self._metrics[name] = AgentMetrics(self.metrics_window_seconds, max_concurrency)
+        if self._breakers_enabled:
+            breaker = CircuitBreaker(name, **self._breaker_settings)
+            self._breakers[name] = breaker
+            # Let BaseAgent.generate_with_retry stop retrying while the circuit is open
+            if getattr(agent, "circuit_breaker", False) is None:
+                agent.circuit_breaker = breaker
 
         logger.info(f"Registered agent '{name}' (enabled={enabled})")
 
+    def register_configured_agents(
+        self,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+        **kwargs
+    ) -> Dict[str, str]:
+        """Register the enabled agents from agents.yaml.
+
+        Agents already registered under the same name are left alone.
+
+        Args:
+            entries: Agent name -> agents.yaml entry (default: agents.yaml)
+            **kwargs: Passed to create_configured_agents (e.g. api_key_lookup)
+
+        Returns:
+            Agent name -> reason, for agents that could not be created
+        """
+        from factory.agents.registry import create_configured_agents
+
+        if entries is not None:
+            entries = {n: e for n, e in entries.items() if n not in self._agents}
+        agents, skipped = create_configured_agents(entries, **kwargs)
+        for name, agent in agents.items():
+            if name not in self._agents:
+                self.register_agent(name, agent)
+        return skipped
+
     def unregister_agent(self, name: str) -> None:
         """Remove an agent from the pool.
 
@@ -210,6 +416,22 @@ class AgentPool:
         Raises:
             ValueError: If agent not found or not enabled
         """
+        with get_tracer().span("agent_pool.execute_single", agent=agent_name) as span:
+            response = await self._execute_single(agent_name, prompt, **kwargs)
+            span.set_attributes(
+                success=response.success,
+                response_time_ms=response.response_time_ms,
+                tokens=response.total_tokens
+            )
+            return response
+
+    async def _execute_single(
+        self,
+        agent_name: str,
+        prompt: str,
+        **kwargs
+    ) -> AgentResponse:
+        """Run one agent and record stats (see execute_single)."""
         if agent_name not in self._agents:
             raise ValueError(f"Unknown agent '{agent_name}'")
 
@@ -217,70 +439,220 @@ class AgentPool:
             raise ValueError(f"Agent '{agent_name}' is not enabled")
 
         agent = self._agents[agent_name]
-        start_time = datetime.now()
+        metrics = self._metrics[agent_name]
+        breaker = self._breakers.get(agent_name)
+
+        # Fail fast while the provider's circuit is open
+        if breaker is not None and not breaker.allow_request():
+            return self._reject(agent_name, breaker)
 
+        settled = False
         try:
-            # Execute generation
-            result = await agent.generate(prompt, **kwargs)
-
-            # Calculate response time
-            response_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-
-            # Create response
-            response = AgentResponse(
-                agent_name=agent_name,
-                output=result.get("output", ""),
-                tokens_input=result.get("tokens_input", 0),
-                tokens_output=result.get("tokens_output", 0),
-                cost=result.get("cost", 0.0),
-                response_time_ms=response_time_ms,
-                model_version=result.get("model_version", "unknown"),
-                metadata=result.get("metadata", {}),
-            )
+            # Wait for a concurrency slot if the agent is limited
+            queued_at = time.perf_counter()
+            if metrics.semaphore is not None:
+                metrics.queued += 1
+                try:
+                    await metrics.semaphore.acquire()
+                finally:
+                    metrics.queued -= 1
+            queue_wait_ms = (time.perf_counter() - queued_at) * 1000
+
+            metrics.in_flight += 1
+            start = time.perf_counter()
+
+            try:
+                # Execute generation
+                result = await agent.generate(prompt, **kwargs)
+
+                # Calculate response time
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                response_time_ms = int(elapsed_ms)
+
+                # Create response
+                response = AgentResponse(
+                    agent_name=agent_name,
+                    output=result.get("output", ""),
+                    tokens_input=result.get("tokens_input", 0),
+                    tokens_output=result.get("tokens_output", 0),
+                    cost=result.get("cost", 0.0),
+                    response_time_ms=response_time_ms,
+                    model_version=result.get("model_version", "unknown"),
+                    metadata=result.get("metadata", {}),
+                )
+                cache_usage = self._prompt_cache_usage(agent_name, agent, prompt, response)
+                if cache_usage is not None:
+                    response.metadata["prompt_cache"] = cache_usage.to_dict()
+
+                # Update stats
+                metrics.record_success(response, elapsed_ms, queue_wait_ms)
+                self._update_stats(agent_name, response)
+                if breaker is not None:
+                    breaker.record_success()
+                settled = True
+
+                return response
+
+            except Exception as e:
+                logger.error(f"Agent '{agent_name}' failed: {e}")
+
+                # Calculate response time
+                response_time_ms = int((time.perf_counter() - start) * 1000)
+
+                # Create error response
+                response = AgentResponse(
+                    agent_name=agent_name,
+                    output="",
+                    tokens_input=0,
+                    tokens_output=0,
+                    cost=0.0,
+                    response_time_ms=response_time_ms,
+                    model_version="unknown",
+                    error=str(e),
+                )
+
+                # Update stats
+                metrics.record_failure()
+                self._update_stats(agent_name, response)
+                if breaker is not None:
+                    self._record_breaker_failure(agent_name, breaker)
+                settled = True
+
+                return response
+
+            finally:
+                metrics.in_flight -= 1
+                if metrics.semaphore is not None:
+                    metrics.semaphore.release()
+
+        finally:
+            # Cancelled before an outcome: hand back a half-open probe slot
+            if breaker is not None and not settled:
+                breaker.release()
+
+    def _prompt_cache_usage(
+        self,
+        agent_name: str,
+        agent: Any,
+        prompt: str,
+        response: AgentResponse
+    ) -> Optional[PromptCacheUsage]:
+        """Prefix-cache reuse for a successful response.
 
-            # Update stats
-            await self._update_stats(agent_name, response)
+        Uses the cached tokens the provider reported when the agent passes
+        them through; otherwise, if the prompt starts with a registered
+        prefix this agent was sent recently, estimates the prefix as cached.
 
-            return response
+        Returns:
+            PromptCacheUsage, or None if nothing was (or could be) cached
+        """
+        prefix = self.prefix_registry.match(prompt)
+        reported = response.metadata.get("cached_tokens")
+
+        if reported is not None:
+            usage = PromptCacheUsage(int(reported), "provider", prefix.name if prefix else None)
+        elif prefix is not None and self.prefix_registry.is_warm(agent_name, prefix):
+            if hasattr(agent, "count_tokens"):
+                tokens = agent.count_tokens(prefix.text)
+            else:
+                tokens = get_tokenizer(getattr(agent, "model", "")).count(prefix.text)
+            usage = PromptCacheUsage(min(tokens, response.tokens_input or tokens), "client", prefix.name)
+        else:
+            usage = None
+
+        if prefix is not None:
+            self.prefix_registry.mark_sent(agent_name, prefix)
+        if usage is None or not usage.cached_tokens:
+            return usage
+        if hasattr(agent, "cache_savings"):
+            usage.saved_usd = agent.cache_savings(usage.cached_tokens)
+        return usage
+
+    def _reject(self, agent_name: str, breaker: CircuitBreaker) -> AgentResponse:
+        """Error response for a request refused by an open circuit."""
+        self._stats[agent_name]["rejected_requests"] += 1
+        return AgentResponse(
+            agent_name=agent_name,
+            output="",
+            tokens_input=0,
+            tokens_output=0,
+            cost=0.0,
+            response_time_ms=0,
+            model_version="unknown",
+            metadata={"circuit": breaker.state.value},
+            error=f"Circuit open for agent '{agent_name}'",
+        )
 
-        except Exception as e:
-            logger.error(f"Agent '{agent_name}' failed: {e}")
-
-            # Calculate response time
-            response_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-
-            # Create error response
-            response = AgentResponse(
-                agent_name=agent_name,
-                output="",
-                tokens_input=0,
-                tokens_output=0,
-                cost=0.0,
-                response_time_ms=response_time_ms,
-                model_version="unknown",
-                error=str(e),
-            )
+    def _record_breaker_failure(self, agent_name: str, breaker: CircuitBreaker) -> None:
+        """Record a failure and start background probing if the circuit opened."""
+        breaker.record_failure()
+        if breaker.state is CircuitState.OPEN and self.probe_prompt is not None:
+            task = self._probe_tasks.get(agent_name)
+            if task is None or task.done():
+                self._probe_tasks[agent_name] = asyncio.create_task(self._probe(agent_name))
 
-            # Update stats
-            await self._update_stats(agent_name, response)
+    async def _probe(self, agent_name: str) -> None:
+        """Probe an open agent in the background until its circuit closes.
 
-            return response
+        Each probe runs once the cool-down has passed, using probe_prompt
+        through execute_single so it counts as a half-open probe.
+        """
+        breaker = self._breakers[agent_name]
+        while agent_name in self._agents:
+            state = breaker.state
+            if state is CircuitState.CLOSED:
+                return
+            if state is CircuitState.OPEN:
+                await asyncio.sleep(breaker.seconds_until_retry())
+                continue
+            response = await self._execute_single(agent_name, self.probe_prompt, max_tokens=1)
+            if response.metadata.get("circuit"):
+                # A real request holds the probe slot; check again shortly
+                await asyncio.sleep(min(1.0, breaker.open_seconds))
+            logger.info(f"Background probe of '{agent_name}': {'ok' if response.success else response.error}")
+
+    def get_circuit(self, agent_name: str) -> Optional[CircuitBreaker]:
+        """Get an agent's circuit breaker (None if breakers are disabled)."""
+        if agent_name not in self._agents:
+            raise ValueError(f"Unknown agent '{agent_name}'")
+        return self._breakers.get(agent_name)
+
+    async def close(self) -> None:
+        """Cancel background probes."""
+        tasks = [t for t in self._probe_tasks.values() if not t.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._probe_tasks.clear()
 
     async def execute_parallel(
         self,
         prompt: str,
         agents: Optional[List[str]] = None,
+        first_k: Optional[int] = None,
+        timeout: Optional[float] = None,
+        on_response: Optional[Callable[[AgentResponse], None]] = None,
         **kwargs
     ) -> ParallelResult:
         """Execute generation across multiple agents in parallel.
 
+        By default waits for every agent. With ``first_k``, returns as soon as
+        that many agents have succeeded and cancels the rest, so one stalled
+        provider cannot hold up a quick draft. With ``timeout``, agents still
+        running at the deadline are cancelled and the responses so far are
+        returned.
+
         Args:
             prompt: Generation prompt
             agents: List of agent names (None = all enabled agents)
+            first_k: Return after this many successful responses
+            timeout: Seconds to wait for agents (None = no limit)
+            on_response: Called with each response as its agent finishes
             **kwargs: Additional parameters for agents
 
         Returns:
-            ParallelResult with all agent responses
+            ParallelResult with the completed agent responses (in agent order,
+            or completion order with first_k) and the cancelled agents
         """
         session_id = str(uuid4())
         started_at = datetime.now()
@@ -293,16 +665,29 @@ class AgentPool:
 
         if not agent_names:
             raise ValueError("No enabled agents available")
+        if first_k is not None and first_k < 1:
+            raise ValueError("first_k must be at least 1")
 
         logger.info(f"Starting parallel execution with {len(agent_names)} agents")
 
         # Execute all agents concurrently
-        tasks = [
-            self.execute_single(agent_name, prompt, **kwargs)
-            for agent_name in agent_names
-        ]
-
-        responses = await asyncio.gather(*tasks, return_exceptions=False)
+        if first_k is None or first_k >= len(agent_names):
+            if timeout is None and on_response is None:
+                tasks = [
+                    self.execute_single(agent_name, prompt, **kwargs)
+                    for agent_name in agent_names
+                ]
+                responses = await asyncio.gather(*tasks, return_exceptions=False)
+                cancelled: List[str] = []
+            else:
+                responses, cancelled = await self._first_k(
+                    agent_names, prompt, len(agent_names), timeout, on_response, **kwargs
+                )
+                responses.sort(key=lambda r: agent_names.index(r.agent_name))
+        else:
+            responses, cancelled = await self._first_k(
+                agent_names, prompt, first_k, timeout, on_response, **kwargs
+            )
 
         completed_at = datetime.now()
 
@@ -318,6 +703,7 @@ class AgentPool:
             completed_at=completed_at,
             total_cost=total_cost,
             total_tokens=total_tokens,
+            cancelled_agents=cancelled,
         )
 
         logger.info(
@@ -327,30 +713,293 @@ class AgentPool:
 
         return result
 
-    async def _update_stats(self, agent_name: str, response: AgentResponse) -> None:
+    async def _first_k(
+        self,
+        agent_names: List[str],
+        prompt: str,
+        k: int,
+        timeout: Optional[float] = None,
+        on_response: Optional[Callable[[AgentResponse], None]] = None,
+        **kwargs
+    ) -> Tuple[List[AgentResponse], List[str]]:
+        """Run agents until k succeed or the timeout passes, then cancel the stragglers.
+
+        Returns:
+            (completed responses in completion order, cancelled agent names)
+        """
+        tasks = {
+            asyncio.create_task(self.execute_single(name, prompt, **kwargs)): name
+            for name in agent_names
+        }
+        pending = set(tasks)
+        responses: List[AgentResponse] = []
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while pending and sum(r.success for r in responses) < k:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.warning(f"Parallel execution timed out after {timeout}s")
+                    break
+                # Keep agent order among tasks finishing in the same tick
+                for task in sorted(done, key=lambda t: agent_names.index(tasks[t])):
+                    responses.append(task.result())
+                    if on_response is not None:
+                        on_response(responses[-1])
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return responses, [tasks[t] for t in pending]
+
+    def set_agent_group(self, group: str, agent_names: List[str]) -> None:
+        """Define (or replace) an agent group for routing.
+
+        Args:
+            group: Group name
+            agent_names: Equivalent agents to route between
+        """
+        self._agent_groups[group] = list(agent_names)
+
+    def get_group_members(self, group: str) -> List[str]:
+        """Get the enabled, registered agents of a group.
+
+        Groups defined on the pool take precedence over agents.yaml.
+
+        Args:
+            group: Group name
+
+        Returns:
+            Agent names in group order
+        """
+        names = self._agent_groups.get(group)
+        if names is None:
+            names = get_agent_group(group)
+            self._agent_groups[group] = list(names)
+        return [name for name in names if name in self._enabled]
+
+    def route_candidates(self, agent_names: List[str]) -> List[RouteCandidate]:
+        """Build routing candidates from live metrics.
+
+        Cost is the observed average cost per 1k tokens, or the agent
+        config's blended input/output price before any success.
+
+        Args:
+            agent_names: Agents to describe
+
+        Returns:
+            One RouteCandidate per agent
+        """
+        candidates = []
+        for name in agent_names:
+            metrics = self._metrics[name]
+            cost = metrics.ewma_cost_per_1k
+            if cost is None:
+                config = getattr(self._agents[name], "config", None)
+                cost = (
+                    getattr(config, "cost_per_1k_input", 0.0) + getattr(config, "cost_per_1k_output", 0.0)
+                ) / 2
+            candidates.append(RouteCandidate(
+                name=name,
+                latency_ms=metrics.ewma_latency_ms,
+                error_rate=metrics.ewma_error_rate,
+                in_flight=metrics.in_flight,
+                queued=metrics.queued,
+                max_concurrency=metrics.max_concurrency,
+                cost_per_1k=cost,
+            ))
+        return candidates
+
+    def _routable(self, group: Optional[str], agents: Optional[List[str]]) -> List[str]:
+        """Enabled agents from an explicit list, a group, or the whole pool."""
+        if agents is not None:
+            names = [a for a in agents if a in self._enabled]
+        elif group is not None:
+            names = self.get_group_members(group)
+        else:
+            names = self.get_enabled_agents()
+
+        if not names:
+            raise ValueError(f"No enabled agents available{f' in group {group!r}' if group else ''}")
+
+        # Skip open circuits unless nothing else is left (those fail fast anyway)
+        closed = [
+            n for n in names
+            if n not in self._breakers or self._breakers[n].state is not CircuitState.OPEN
+        ]
+        return closed or names
+
+    def route(
+        self,
+        group: Optional[str] = None,
+        agents: Optional[List[str]] = None,
+        policy: Any = RoutingPolicy.FASTEST,
+        sla_ms: Optional[float] = None
+    ) -> str:
+        """Pick one agent without executing.
+
+        Args:
+            group: Agent group name (see get_group_members)
+            agents: Explicit agent names instead of a group
+            policy: RoutingPolicy or its value ("fastest", "cheapest_under_sla",
+                "power_of_two")
+            sla_ms: Latency target for cheapest_under_sla
+
+        Returns:
+            Chosen agent name
+        """
+        chosen = choose_agent(
+            self.route_candidates(self._routable(group, agents)),
+            policy=RoutingPolicy(policy),
+            sla_ms=sla_ms,
+            max_error_rate=self.max_error_rate,
+            default_latency_ms=self.default_latency_ms,
+        )
+        return chosen.name
+
+    async def execute_routed(
+        self,
+        prompt: str,
+        group: Optional[str] = None,
+        agents: Optional[List[str]] = None,
+        policy: Any = RoutingPolicy.FASTEST,
+        sla_ms: Optional[float] = None,
+        **kwargs
+    ) -> AgentResponse:
+        """Execute generation on one agent chosen by live latency, errors, load and cost.
+
+        Use this for single drafts where any agent of a group will do; use
+        execute_parallel to compare agents.
+
+        Args:
+            prompt: Generation prompt
+            group: Agent group name from agents.yaml (or set_agent_group)
+            agents: Explicit agent names instead of a group
+            policy: Routing policy (see route)
+            sla_ms: Latency target for cheapest_under_sla
+            **kwargs: Additional parameters for the agent
+
+        Returns:
+            AgentResponse from the chosen agent
+        """
+        agent_name = self.route(group=group, agents=agents, policy=policy, sla_ms=sla_ms)
+        logger.debug(f"Routed to '{agent_name}' (group={group}, policy={RoutingPolicy(policy).value})")
+        return await self.execute_single(agent_name, prompt, **kwargs)
+
+    async def execute_hedged(
+        self,
+        prompt: str,
+        group: Optional[str] = None,
+        agents: Optional[List[str]] = None,
+        policy: Any = RoutingPolicy.FASTEST,
+        hedge_after_ms: Optional[float] = None,
+        hedge_percentile: float = 95.0,
+        **kwargs
+    ) -> AgentResponse:
+        """Execute on a routed primary agent, with a backup if it runs long.
+
+        The backup (the next-best agent of the same group) is started when
+        the primary exceeds its recent ``hedge_percentile`` latency, or
+        immediately if the primary fails. The first success wins and the
+        other request is cancelled.
+
+        Args:
+            prompt: Generation prompt
+            group: Agent group name (see get_group_members)
+            agents: Explicit agent names instead of a group
+            policy: Routing policy for picking primary and backup
+            hedge_after_ms: Hedge delay used while the primary has no
+                latency history (None = don't hedge until it has)
+            hedge_percentile: Percentile of the primary's windowed latency
+                after which to hedge
+            **kwargs: Additional parameters for agents
+
+        Returns:
+            The winning AgentResponse (or the last failure if all failed)
+        """
+        names = self._routable(group, agents)
+        primary = self.route(agents=names, policy=policy)
+        others = [n for n in names if n != primary]
+
+        window = self._metrics[primary].window("latency_ms")
+        delay_ms = window.percentile(hedge_percentile) if window.count else hedge_after_ms
+
+        primary_task = asyncio.create_task(self.execute_single(primary, prompt, **kwargs))
+        if not others or delay_ms is None:
+            return await primary_task
+
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay_ms / 1000)
+            if done and primary_task.result().success:
+                return primary_task.result()
+
+            backup = self.route(agents=others, policy=policy)
+            reason = "failed" if done else f"exceeded {delay_ms:.0f}ms"
+            logger.info(f"Hedging '{primary}' with '{backup}' (primary {reason})")
+            tasks.append(asyncio.create_task(self.execute_single(backup, prompt, **kwargs)))
+
+            pending = {t for t in tasks if not t.done()}
+            last = primary_task.result() if done else None
+            while pending:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    last = task.result()
+                    if last.success:
+                        return last
+            return last
+        finally:
+            losers = [t for t in tasks if not t.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def _update_stats(self, agent_name: str, response: AgentResponse) -> None:
         """Update agent statistics.
 
+        Runs without awaiting, so no other task can interleave and no lock
+        is needed on the generation path.
+
         Args:
             agent_name: Agent identifier
             response: Response to record
         """
-        async with self._lock:
-            stats = self._stats[agent_name]
-            stats["total_requests"] += 1
-
-            if response.success:
-                stats["successful_requests"] += 1
-                stats["total_tokens"] += response.total_tokens
-                stats["total_cost"] += response.cost
-                stats["total_response_time_ms"] += response.response_time_ms
-            else:
-                stats["failed_requests"] += 1
+        stats = self._stats[agent_name]
+        stats["total_requests"] += 1
+
+        if response.success:
+            stats["successful_requests"] += 1
+            stats["total_tokens"] += response.total_tokens
+            stats["total_cost"] += response.cost
+            stats["total_response_time_ms"] += response.response_time_ms
+            cache = response.metadata.get("prompt_cache")
+            if cache:
+                kind = "" if cache["source"] == "provider" else "estimated_"
+                stats[f"{kind}cached_tokens"] += cache["cached_tokens"]
+                stats[f"{kind}cache_savings_usd"] += cache["saved_usd"]
+        else:
+            stats["failed_requests"] += 1
 
-    def get_stats(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
+    def get_stats(
+        self,
+        agent_name: Optional[str] = None,
+        window_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Get agent statistics.
 
+        Besides counters, each agent's stats include lifetime and windowed
+        summaries (count, mean, min, max, p50/p90/p95/p99) for latency_ms,
+        tokens_per_sec, ttft_ms and queue_wait_ms.
+
         Args:
             agent_name: Specific agent name, or None for all agents
+            window_seconds: Window for the "window" summaries (defaults to,
+                and is capped at, the pool's metrics window)
 
         Returns:
             Dictionary of statistics
@@ -358,9 +1007,33 @@ class AgentPool:
         if agent_name:
             if agent_name not in self._stats:
                 raise ValueError(f"Unknown agent '{agent_name}'")
-            return self._stats[agent_name].copy()
+            return self._agent_stats(agent_name, window_seconds)
+
+        return {name: self._agent_stats(name, window_seconds) for name in self._stats}
+
+    def _agent_stats(self, agent_name: str, window_seconds: Optional[float]) -> Dict[str, Any]:
+        """Counters plus histogram summaries for one agent."""
+        stats = self._stats[agent_name].copy()
+        metrics = self._metrics.get(agent_name)
+        if metrics is not None:
+            stats.update(metrics.snapshot(window_seconds))
+        breaker = self._breakers.get(agent_name)
+        if breaker is not None:
+            stats["circuit"] = breaker.snapshot()
+        return stats
+
+    def get_metrics(self, agent_name: str) -> AgentMetrics:
+        """Get the histogram metrics for an agent.
+
+        Args:
+            agent_name: Agent identifier
 
-        return {name: stats.copy() for name, stats in self._stats.items()}
+        Returns:
+            AgentMetrics for the agent
+        """
+        if agent_name not in self._metrics:
+            raise ValueError(f"Unknown agent '{agent_name}'")
+        return self._metrics[agent_name]
 
     def reset_stats(self, agent_name: Optional[str] = None) -> None:
         """Reset agent statistics.
@@ -371,23 +1044,25 @@ class AgentPool:
         if agent_name:
             if agent_name not in self._stats:
                 raise ValueError(f"Unknown agent '{agent_name}'")
-            self._stats[agent_name] = {
-                "total_requests": 0,
-                "successful_requests": 0,
-                "failed_requests": 0,
-                "total_tokens": 0,
-                "total_cost": 0.0,
-                "total_response_time_ms": 0,
-            }
+            self._stats[agent_name] = self._new_stats()
+            self._metrics[agent_name].reset()
+            if agent_name in self._breakers:
+                self._breakers[agent_name].reset()
             logger.info(f"Reset stats for agent '{agent_name}'")
         else:
             for name in self._stats:
                 self.reset_stats(name)
             logger.info("Reset stats for all agents")
 
-    def get_summary(self) -> Dict[str, Any]:
+    def get_summary(self, window_seconds: Optional[float] = None) -> Dict[str, Any]:
         """Get summary statistics across all agents.
 
+        Latency percentiles are computed over the merged histograms of all
+        agents, both lifetime and for the sliding window.
+
+        Args:
+            window_seconds: Window for the recent percentiles
+
         Returns:
             Dictionary with aggregate statistics
         """
@@ -397,6 +1072,10 @@ class AgentPool:
         total_tokens = sum(s["total_tokens"] for s in self._stats.values())
         total_cost = sum(s["total_cost"] for s in self._stats.values())
         total_response_time = sum(s["total_response_time_ms"] for s in self._stats.values())
+        cached_tokens = sum(s["cached_tokens"] for s in self._stats.values())
+        cache_savings = sum(s["cache_savings_usd"] for s in self._stats.values())
+        estimated_cached = sum(s["estimated_cached_tokens"] for s in self._stats.values())
+        estimated_savings = sum(s["estimated_cache_savings_usd"] for s in self._stats.values())
 
         return {
             "total_agents": len(self._agents),
@@ -407,7 +1086,28 @@ class AgentPool:
             "success_rate": successful_requests / total_requests if total_requests > 0 else 0,
             "total_tokens": total_tokens,
             "total_cost": total_cost,
+            "cached_tokens": cached_tokens,
+            "cache_savings_usd": cache_savings,
+            "estimated_cached_tokens": estimated_cached,
+            "estimated_cache_savings_usd": estimated_savings,
             "avg_response_time_ms": (
                 total_response_time / successful_requests if successful_requests > 0 else 0
             ),
+            "latency_ms": self._merged("latency_ms").summary(),
+            "window": {
+                "seconds": min(window_seconds or self.metrics_window_seconds, self.metrics_window_seconds),
+                "latency_ms": self._merged("latency_ms", window_seconds, windowed=True).summary(),
+            },
         }
+
+    def _merged(
+        self,
+        name: str,
+        window_seconds: Optional[float] = None,
+        windowed: bool = False
+    ) -> LogHistogram:
+        """Merge one histogram across all agents."""
+        merged = LogHistogram()
+        for metrics in self._metrics.values():
+            merged.merge(metrics.window(name, window_seconds) if windowed else metrics.lifetime(name))
+        return merged
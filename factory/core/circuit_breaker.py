@@ -0,0 +1,176 @@
+"""Circuit breakers for failing LLM providers.
+
+A breaker watches the outcomes of recent requests to one agent:
+
+- closed: requests flow; once enough of the last ``window`` requests have
+  failed (``failure_threshold`` of at least ``min_requests``), it opens
+- open: requests are rejected instantly for ``open_seconds``
+- half-open: after the cool-down, up to ``half_open_probes`` requests are
+  let through as probes; a success closes the breaker, a failure reopens it
+  with the cool-down doubled (up to ``max_open_seconds``)
+
+Breakers don't do I/O themselves; AgentPool consults them before calling an
+agent and may send background probes while one is open.
+"""
+
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for one agent."""
+
+    def __init__(
+        self,
+        name: str = "",
+        failure_threshold: float = 0.5,
+        min_requests: int = 5,
+        window: int = 20,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize breaker.
+
+        Args:
+            name: Agent name (for logs)
+            failure_threshold: Failure fraction of the window that opens the breaker
+            min_requests: Outcomes needed before the breaker can open
+            window: Number of recent outcomes considered
+            open_seconds: Initial cool-down before probing
+            max_open_seconds: Cap for the doubling cool-down
+            half_open_probes: Concurrent probe requests allowed when half-open
+            clock: Time source
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failure
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._cooldown = open_seconds
+        self._probes_in_flight = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state (an expired open breaker reports half-open)."""
+        if self._state is CircuitState.OPEN and self._clock() >= self.retry_at:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"Circuit for '{self.name}' half-open, probing")
+        return self._state
+
+    @property
+    def retry_at(self) -> float:
+        """Clock time at which an open breaker starts probing."""
+        return self._opened_at + self._cooldown
+
+    def seconds_until_retry(self) -> float:
+        """Seconds until an open breaker starts probing (0 if not open)."""
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.retry_at - self._clock())
+
+    @property
+    def failure_rate(self) -> float:
+        """Failure fraction of the recent window."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def allow_request(self) -> bool:
+        """Check whether a request may go through, reserving a probe slot if half-open.
+
+        Every allowed request must be followed by record_success,
+        record_failure or release.
+
+        Returns:
+            True if the request may proceed
+        """
+        state = self.state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful request."""
+        if self._state is CircuitState.HALF_OPEN:
+            logger.info(f"Circuit for '{self.name}' closed after successful probe")
+            self._state = CircuitState.CLOSED
+            self._cooldown = self.open_seconds
+            self._probes_in_flight = 0
+            self._outcomes.clear()
+            return
+        self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        if self._state is CircuitState.HALF_OPEN:
+            self._cooldown = min(self._cooldown * 2, self.max_open_seconds)
+            self._open()
+            return
+        if self._state is CircuitState.OPEN:
+            return
+        self._outcomes.append(True)
+        if len(self._outcomes) >= self.min_requests and self.failure_rate >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Give back an allowed request that finished without an outcome (e.g. cancelled)."""
+        if self._state is CircuitState.HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+
+    def reset(self) -> None:
+        """Close the breaker and forget history."""
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._cooldown = self.open_seconds
+        self._probes_in_flight = 0
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self.times_opened += 1
+        logger.warning(
+            f"Circuit for '{self.name}' opened "
+            f"(failure rate {self.failure_rate:.0%}, retry in {self._cooldown:.0f}s)"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State summary for stats."""
+        return {
+            "state": self.state.value,
+            "failure_rate": self.failure_rate,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": self.seconds_until_retry(),
+        }
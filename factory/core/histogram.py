@@ -0,0 +1,208 @@
+"""Log-bucketed histograms for latency and throughput percentiles.
+
+Values are counted in buckets whose bounds grow geometrically, so every
+recorded value is known to within a fixed relative error (about 4% with
+the default growth factor) regardless of magnitude, and recording is a
+single log and list increment. A WindowedHistogram keeps one histogram per
+time slice to answer "p95 over the last N minutes".
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0)
+
+
+class LogHistogram:
+    """Histogram with geometrically growing bucket bounds.
+
+    Values below ``min_value`` land in the first bucket and values above
+    ``max_value`` in the last, but min/max/sum are tracked exactly.
+    """
+
+    __slots__ = ("min_value", "max_value", "growth", "_log_min", "_log_growth",
+                 "_counts", "count", "total", "min", "max")
+
+    def __init__(self, min_value: float = 0.01, max_value: float = 1e7, growth: float = 1.08):
+        """Initialize histogram.
+
+        Args:
+            min_value: Smallest value resolved (must be > 0)
+            max_value: Largest value resolved
+            growth: Ratio between successive bucket bounds
+        """
+        if min_value <= 0 or max_value <= min_value or growth <= 1:
+            raise ValueError("Require 0 < min_value < max_value and growth > 1")
+        self.min_value = min_value
+        self.max_value = max_value
+        self.growth = growth
+        self._log_min = math.log(min_value)
+        self._log_growth = math.log(growth)
+        buckets = int(math.ceil((math.log(max_value) - self._log_min) / self._log_growth)) + 1
+        self._counts: List[int] = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = int((math.log(value) - self._log_min) / self._log_growth) + 1
+        return min(index, len(self._counts) - 1)
+
+    def _bucket_value(self, index: int) -> float:
+        """Representative value of a bucket (geometric midpoint)."""
+        if index == 0:
+            return self.min_value
+        lower = self.min_value * self.growth ** (index - 1)
+        return lower * math.sqrt(self.growth)
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record a value.
+
+        Args:
+            value: Observed value (negative values count as 0)
+            count: Number of occurrences
+        """
+        value = max(value, 0.0)
+        self._counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Add another histogram with the same bucket layout into this one."""
+        if len(other._counts) != len(self._counts) or other.growth != self.growth:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        for i, c in enumerate(other._counts):
+            if c:
+                self._counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy_empty(self) -> "LogHistogram":
+        """New empty histogram with the same layout."""
+        return LogHistogram(self.min_value, self.max_value, self.growth)
+
+    @property
+    def mean(self) -> float:
+        """Exact mean of recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Value at percentile q (0-100), within one bucket's relative error.
+
+        Args:
+            q: Percentile
+
+        Returns:
+            Estimated value (0.0 if empty)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100.0 * self.count))
+        seen = 0
+        for i, c in enumerate(self._counts):
+            seen += c
+            if seen >= rank:
+                return min(max(self._bucket_value(i), self.min), self.max)
+        return self.max
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, float]:
+        """Count, mean, min, max and percentiles.
+
+        Args:
+            percentiles: Percentiles to include (keys like "p95")
+
+        Returns:
+            Summary dictionary
+        """
+        result = {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+        for q in percentiles:
+            result[f"p{q:g}"] = self.percentile(q)
+        return result
+
+    def buckets(self) -> List[tuple]:
+        """Non-empty buckets as (upper bound, count) pairs, ascending."""
+        return [
+            (self.min_value * self.growth ** i, c)
+            for i, c in enumerate(self._counts) if c
+        ]
+
+
+class WindowedHistogram:
+    """Lifetime histogram plus a sliding window of recent values.
+
+    The window is divided into fixed time slices; a slice is recycled once
+    it falls out of the window, so memory stays constant.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = 300.0,
+        slice_seconds: float = 60.0,
+        **histogram_kwargs
+    ):
+        """Initialize windowed histogram.
+
+        Args:
+            window_seconds: Length of the sliding window
+            slice_seconds: Granularity of the window
+            **histogram_kwargs: LogHistogram layout arguments
+        """
+        self.window_seconds = window_seconds
+        self.slice_seconds = slice_seconds
+        self.lifetime = LogHistogram(**histogram_kwargs)
+        slices = max(1, int(math.ceil(window_seconds / slice_seconds)))
+        self._slices: List[LogHistogram] = [self.lifetime.copy_empty() for _ in range(slices)]
+        self._slice_ids: List[int] = [-1] * slices
+
+    def _slice_for(self, now: float) -> LogHistogram:
+        slice_id = int(now // self.slice_seconds)
+        index = slice_id % len(self._slices)
+        if self._slice_ids[index] != slice_id:
+            self._slices[index] = self.lifetime.copy_empty()
+            self._slice_ids[index] = slice_id
+        return self._slices[index]
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        """Record a value.
+
+        Args:
+            value: Observed value
+            now: Timestamp (defaults to time.monotonic())
+        """
+        self.lifetime.record(value)
+        self._slice_for(time.monotonic() if now is None else now).record(value)
+
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None) -> LogHistogram:
+        """Merge the slices covering the last ``seconds``.
+
+        Args:
+            seconds: Window length (defaults to, and is capped at, window_seconds)
+            now: Timestamp (defaults to time.monotonic())
+
+        Returns:
+            Histogram of recent values
+        """
+        now = time.monotonic() if now is None else now
+        seconds = min(seconds or self.window_seconds, self.window_seconds)
+        current = int(now // self.slice_seconds)
+        oldest = current - int(math.ceil(seconds / self.slice_seconds)) + 1
+        merged = self.lifetime.copy_empty()
+        for slice_id, histogram in zip(self._slice_ids, self._slices):
+            if oldest <= slice_id <= current:
+                merged.merge(histogram)
+        return merged
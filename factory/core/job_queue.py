@@ -0,0 +1,930 @@
+"""Local background job queue.
+
+Long-running operations (scene generation, model comparison) are submitted
+as jobs and executed by a fixed number of asyncio workers, so callers get a
+job ID immediately and throughput is governed by the worker count:
+
+- Jobs are persisted in SQLite; queued and interrupted jobs are picked up
+  again when the queue starts
+- Several processes can share one store: workers claim jobs atomically,
+  running jobs hold a heartbeat lease (jobs of a crashed process are
+  requeued once it expires), and cancellation and progress travel
+  through the database
+- Handlers report progress, which is stored and published to watchers
+  (the webapp forwards it over a websocket)
+- Queued jobs can be cancelled before they start, running jobs mid-flight
+- Duplicate submissions (double clicks, retries, a scene open in two tabs)
+  can be coalesced: they attach to the queued or running job with the
+  same normalized payload, or reuse one that completed moments ago
+
+    queue = JobQueue(JobStore.for_project(project_path), workers=2)
+    queue.register("scene.generate", generate_scene)
+    await queue.start()
+    job = await queue.submit("scene.generate", {"outline": "..."}, coalesce=True)
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    request_key TEXT,
+    callers INTEGER NOT NULL DEFAULT 1,
+    owner TEXT,
+    heartbeat_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+"""
+
+# Columns added after the first release of the table
+_MIGRATIONS = {
+    "request_key": "ALTER TABLE jobs ADD COLUMN request_key TEXT",
+    "callers": "ALTER TABLE jobs ADD COLUMN callers INTEGER NOT NULL DEFAULT 1",
+    "owner": "ALTER TABLE jobs ADD COLUMN owner TEXT",
+    "heartbeat_at": "ALTER TABLE jobs ADD COLUMN heartbeat_at REAL",
+    "cancel_requested": "ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER NOT NULL DEFAULT 0",
+    "updated_at": "ALTER TABLE jobs ADD COLUMN updated_at REAL NOT NULL DEFAULT 0",
+}
+
+_COLUMNS = (
+    "id", "kind", "status", "payload", "result", "error", "progress", "message",
+    "created_at", "started_at", "finished_at", "request_key", "callers",
+)
+
+
+class JobStatus(Enum):
+    """Background job status."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a final state."""
+        return self in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class Job:
+    """One background job.
+
+    Attributes:
+        id: Job identifier
+        kind: Handler name (e.g. "scene.generate")
+        payload: Handler arguments (JSON-serializable)
+        status: Job status
+        result: Handler return value once completed
+        error: Error message if the job failed
+        progress: Fraction done, 0.0 to 1.0
+        message: Latest progress message
+        created_at: Submission time (ISO format)
+        started_at: When a worker picked the job up (ISO format)
+        finished_at: When the job reached a final state (ISO format)
+        request_key: Normalized kind+payload hash used for coalescing
+        callers: Submissions attached to this job
+    """
+
+    id: str
+    kind: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    progress: float = 0.0
+    message: str = ""
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    request_key: Optional[str] = None
+    callers: int = 1
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        """Convert to dictionary for API responses.
+
+        Args:
+            include_result: Include the (possibly large) result
+        """
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "callers": self.callers,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+async def _wait_briefly(awaitable: Awaitable, timeout: float) -> None:
+    """Await something for at most timeout seconds.
+
+    Unlike asyncio.wait_for, a cancellation arriving as the awaitable
+    completes is never swallowed, so idle loops stay stoppable.
+    """
+    waiter = asyncio.ensure_future(awaitable)
+    try:
+        await asyncio.wait({waiter}, timeout=timeout)
+    finally:
+        waiter.cancel()
+
+
+async def _uninterrupted(awaitable: Awaitable) -> Any:
+    """Await something to completion even if the caller is cancelled.
+
+    The cancellation is re-raised once the awaitable is done, so a final
+    write isn't lost when a worker stops halfway through it.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        await task
+        raise
+
+
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+
+# Handler: (payload, report) -> JSON-serializable result.
+# report(progress, message="") records progress between 0.0 and 1.0.
+ProgressReporter = Callable[..., None]
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Any]]
+
+
+def _normalize(value: Any) -> Any:
+    """Drop None values and insignificant whitespace, recursively."""
+    if isinstance(value, str):
+        return value.replace("\r\n", "\n").strip()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Coalescing key for a submission.
+
+    Payloads that differ only in key order, surrounding whitespace, line
+    endings or explicit None values share a key.
+
+    Args:
+        kind: Job kind
+        payload: Job payload
+
+    Returns:
+        Hex digest identifying the request
+    """
+    text = json.dumps([kind, _normalize(payload)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    """SQLite persistence for jobs, shareable between processes.
+
+    Besides the Job fields, each row tracks its owner (the queue running
+    it), a heartbeat timestamp, a cancellation request flag and when it
+    last changed. Those are only touched through the claim/lease methods.
+    """
+
+    DEFAULT_FILENAME = "jobs.db"
+
+    def __init__(self, db_path: Path, busy_timeout: float = 30.0):
+        """Initialize job store.
+
+        Args:
+            db_path: SQLite file path (parent directories are created)
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; claims open their own transaction
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, statement in _MIGRATIONS.items():
+            if column not in existing:
+                self._conn.execute(statement)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_request_key ON jobs(request_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs(updated_at)")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, project_path: Path) -> "JobStore":
+        """Open the store at <project>/.factory/jobs.db."""
+        return cls(Path(project_path) / ".factory" / cls.DEFAULT_FILENAME)
+
+    def save(self, job: Job, owner: Optional[str] = None) -> bool:
+        """Insert or update a job.
+
+        The caller count of an existing job is left alone; it only changes
+        through attach_duplicate/detach_caller, so a worker saving progress
+        can't undo a concurrent attach.
+
+        Args:
+            job: Job to write
+            owner: Only update the job while this queue still owns it (a
+                worker whose lease expired must not overwrite the job)
+
+        Returns:
+            False if the update was skipped because of owner
+        """
+        updates = ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c not in ("id", "callers"))
+        query = (
+            f"INSERT INTO jobs ({', '.join(_COLUMNS)}, updated_at) "
+            f"VALUES ({', '.join('?' * len(_COLUMNS))}, ?) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}, updated_at = excluded.updated_at"
+        )
+        params = [
+            job.id, job.kind, job.status.value, json.dumps(job.payload),
+            None if job.result is None else json.dumps(job.result),
+            job.error, job.progress, job.message,
+            job.created_at, job.started_at, job.finished_at,
+            job.request_key, job.callers, time.time(),
+        ]
+        if owner is not None:
+            query += " WHERE jobs.owner = ?"
+            params.append(owner)
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Load a job, or None if it doesn't exist."""
+        with self._lock:
+            row = self._conn.execute(f"{_SELECT} WHERE id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def attach_duplicate(self, key: str, completed_since: str) -> Optional[Job]:
+        """Attach a duplicate submission to the newest reusable job.
+
+        Finding the job and counting the extra caller happen in one
+        transaction, and the count is only incremented while the job is
+        still reusable, so a duplicate never attaches to a job that was
+        cancelled (or deleted) in the meantime.
+
+        Args:
+            key: Request key (see request_key)
+            completed_since: Completed jobs finished before this (ISO
+                format) are too old to reuse
+
+        Returns:
+            The queued, running or recently completed job, with callers
+            incremented, or None if there is none to attach to
+        """
+        reusable = "request_key = ? AND (status IN (?, ?) OR (status = ? AND finished_at >= ?))"
+        params = (key, JobStatus.QUEUED.value, JobStatus.RUNNING.value, JobStatus.COMPLETED.value, completed_since)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT id FROM jobs WHERE {reusable} ORDER BY created_at DESC LIMIT 1", params
+                ).fetchone()
+                attached = row is not None and self._conn.execute(
+                    f"UPDATE jobs SET callers = callers + 1, updated_at = ? WHERE id = ? AND {reusable}",
+                    (time.time(), row[0], *params)
+                ).rowcount > 0
+                job_row = self._conn.execute(f"{_SELECT} WHERE id = ?", (row[0],)).fetchone() if attached else None
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._from_row(job_row) if job_row else None
+
+    def detach_caller(self, job_id: str) -> bool:
+        """Remove one caller from a shared job.
+
+        Returns:
+            False if the job has a single caller (nothing detached)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET callers = callers - 1, updated_at = ? WHERE id = ? AND callers > 1",
+                (time.time(), job_id)
+            )
+        return cursor.rowcount > 0
+
+    def claim(self, kinds: List[str], owner: str) -> Optional[Job]:
+        """Atomically take the oldest queued job of the given kinds.
+
+        Args:
+            kinds: Job kinds the caller can run
+            owner: Identifier of the claiming queue
+
+        Returns:
+            The job, now RUNNING and owned by owner, or None if none is queued
+        """
+        if not kinds:
+            return None
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"""
+                    SELECT id FROM jobs
+                    WHERE status = ? AND kind IN ({', '.join('?' * len(kinds))})
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (JobStatus.QUEUED.value, *kinds)
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        """
+                        UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ?,
+                            cancel_requested = 0, updated_at = ?
+                        WHERE id = ?
+                        """,
+                        (JobStatus.RUNNING.value, datetime.now().isoformat(), owner, now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row else None
+
+    def heartbeat(self, job_ids: List[str], owner: str) -> List[str]:
+        """Renew the lease on running jobs.
+
+        Args:
+            job_ids: Jobs the caller is running
+            owner: Identifier of the calling queue
+
+        Returns:
+            Jobs among job_ids with a pending cancellation request
+        """
+        if not job_ids:
+            return []
+        marks = ", ".join("?" * len(job_ids))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND id IN ({marks})",
+                (time.time(), owner, *job_ids)
+            )
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({marks})", job_ids
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def cancel_queued(self, job_id: str) -> bool:
+        """Cancel a job if it is still queued (so no worker can claim it)."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.CANCELLED.value, now, time.time(), job_id, JobStatus.QUEUED.value)
+            )
+        return cursor.rowcount > 0
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Ask the owner of a running job to cancel it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, JobStatus.RUNNING.value)
+            )
+        return cursor.rowcount > 0
+
+    def release(self, job_ids: List[str], owner: str, message: str = "") -> int:
+        """Return running jobs to the queue.
+
+        Jobs with a pending cancellation request are cancelled instead.
+
+        Args:
+            job_ids: Jobs to release (None/empty = nothing)
+            owner: Only jobs still owned by this queue are released
+            message: Progress message explaining the requeue
+
+        Returns:
+            Number of jobs requeued
+        """
+        if not job_ids:
+            return 0
+        marks = ", ".join("?" * len(job_ids))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"""
+                UPDATE jobs SET status = ?, finished_at = ?, updated_at = ?
+                WHERE status = ? AND owner = ? AND cancel_requested = 1 AND id IN ({marks})
+                """,
+                (JobStatus.CANCELLED.value, datetime.now().isoformat(), now,
+                 JobStatus.RUNNING.value, owner, *job_ids)
+            )
+            cursor = self._conn.execute(
+                f"""
+                UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, progress = 0,
+                    message = ?, updated_at = ?
+                WHERE status = ? AND owner = ? AND id IN ({marks})
+                """,
+                (JobStatus.QUEUED.value, message, now, JobStatus.RUNNING.value, owner, *job_ids)
+            )
+        return cursor.rowcount
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """Requeue running jobs whose owner stopped heartbeating.
+
+        Args:
+            lease_seconds: Heartbeat age after which the owner is presumed dead
+
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, progress = 0,
+                    message = 'Requeued after its worker stopped', updated_at = ?
+                WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+                """,
+                (JobStatus.QUEUED.value, now, JobStatus.RUNNING.value, now - lease_seconds)
+            )
+        return cursor.rowcount
+
+    def changed_since(self, since: float, job_id: Optional[str] = None) -> Tuple[float, List[Job]]:
+        """Jobs updated at or after a time, oldest change first.
+
+        Args:
+            since: time.time() value to start from
+            job_id: Only this job
+
+        Returns:
+            (latest update time seen, jobs)
+        """
+        query, params = f"SELECT {', '.join(_COLUMNS)}, updated_at FROM jobs WHERE updated_at >= ?", [since]
+        if job_id:
+            query += " AND id = ?"
+            params.append(job_id)
+        query += " ORDER BY updated_at"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        latest = max((row[-1] for row in rows), default=since)
+        return latest, [self._from_row(row[:-1]) for row in rows]
+
+    def list(
+        self,
+        statuses: Optional[List[JobStatus]] = None,
+        kind: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        """Jobs, newest first.
+
+        Args:
+            statuses: Only jobs in these states
+            kind: Only jobs of this kind
+            limit: Maximum jobs returned
+        """
+        query, params = f"{_SELECT} WHERE 1=1", []
+        if statuses:
+            query += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params += [s.value for s in statuses]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _from_row(row: tuple) -> Job:
+        (job_id, kind, status, payload, result, error, progress, message,
+         created_at, started_at, finished_at, key, callers) = row
+        return Job(
+            id=job_id,
+            kind=kind,
+            payload=json.loads(payload),
+            status=JobStatus(status),
+            result=None if result is None else json.loads(result),
+            error=error,
+            progress=progress,
+            message=message,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+            request_key=key,
+            callers=callers,
+        )
+
+
+class JobQueue:
+    """Runs submitted jobs on a fixed pool of asyncio workers.
+
+    Every process opens its own JobQueue on the shared store. Workers
+    claim jobs from the store, so a job submitted in one process may run
+    in another; watch() and wait() follow jobs wherever they run.
+
+    Store calls run in worker threads (asyncio.to_thread), so waiting for
+    another process's SQLite write lock never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 2,
+        reuse_seconds: float = 30.0,
+        poll_interval: float = 0.5,
+        heartbeat_interval: float = 5.0,
+        lease_seconds: float = 30.0
+    ):
+        """Initialize job queue.
+
+        Args:
+            store: Job persistence
+            workers: Jobs executed at the same time by this queue
+            reuse_seconds: How long a completed job still answers coalesced
+                duplicates of its request
+            poll_interval: Seconds between store checks for work and changes
+                made by other processes
+            heartbeat_interval: Seconds between lease renewals of running jobs
+            lease_seconds: Running jobs without a heartbeat for this long are
+                requeued (their process is presumed dead)
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.store = store
+        self.workers = workers
+        self.reuse_seconds = reuse_seconds
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        # Set once a running job's final state is stored
+        self._settled: Dict[str, asyncio.Event] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the handler for a job kind.
+
+        Args:
+            kind: Job kind
+            handler: async (payload, report) -> result
+        """
+        self._handlers[kind] = handler
+
+    @property
+    def kinds(self) -> List[str]:
+        """Registered job kinds."""
+        return list(self._handlers)
+
+    @property
+    def started(self) -> bool:
+        """Whether workers are running."""
+        return bool(self._worker_tasks)
+
+    async def start(self) -> None:
+        """Start workers.
+
+        Jobs left queued are picked up; jobs left running by a process that
+        stopped heartbeating are requeued first.
+        """
+        if self.started:
+            return
+        for job in await asyncio.to_thread(self.store.list, [JobStatus.QUEUED], limit=-1):
+            if job.kind not in self._handlers:
+                await self._finish(job, JobStatus.FAILED, error=f"No handler for job kind '{job.kind}'")
+        requeued = await asyncio.to_thread(self.store.requeue_stale, self.lease_seconds)
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs from stopped workers")
+
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._worker_tasks.append(asyncio.create_task(self._maintain(), name="job-heartbeat"))
+
+    async def stop(self) -> None:
+        """Stop workers.
+
+        Running jobs are interrupted and returned to the queue, where
+        another process (or the next start()) picks them up.
+        """
+        running = list(self._running)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._running.clear()
+        if await asyncio.to_thread(self.store.release, running, self.owner, "Requeued after shutdown"):
+            logger.info(f"Returned {len(running)} interrupted jobs to the queue")
+
+    async def submit(
+        self,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        coalesce: bool = False
+    ) -> Job:
+        """Queue a job.
+
+        With coalesce, a submission identical to a queued or running job
+        (after normalization, see request_key) attaches to that job instead
+        of starting another one, as does a duplicate of a job that completed
+        within reuse_seconds. Attached submissions increment job.callers.
+
+        Args:
+            kind: Registered job kind
+            payload: Handler arguments (JSON-serializable)
+            coalesce: Attach duplicates to an existing job
+
+        Returns:
+            The queued job, or the existing job a duplicate attached to
+
+        Raises:
+            ValueError: If no handler is registered for kind
+            RuntimeError: If the queue hasn't been started
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if not self.started:
+            raise RuntimeError("Job queue is not running")
+
+        payload = dict(payload or {})
+        key = request_key(kind, payload) if coalesce else None
+        if key:
+            cutoff = (datetime.now() - timedelta(seconds=self.reuse_seconds)).isoformat()
+            existing = await asyncio.to_thread(self.store.attach_duplicate, key, cutoff)
+            if existing is not None:
+                logger.info(f"Coalesced {kind} request into job {existing.id} ({existing.status.value})")
+                return existing
+
+        job = Job(id=str(uuid.uuid4()), kind=kind, payload=payload, request_key=key)
+        await asyncio.to_thread(self.store.save, job)
+        self._wakeup.set()
+        self._publish(job)
+        logger.info(f"Queued job {job.id} ({kind})")
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Current state of a job."""
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def list(self, **kwargs) -> List[Job]:
+        """Jobs, newest first (see JobStore.list)."""
+        return await asyncio.to_thread(functools.partial(self.store.list, **kwargs))
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.
+
+        A coalesced job shared by several callers only detaches one of
+        them; it is cancelled when its last caller cancels. A job running
+        in another process is cancelled by that process at its next
+        heartbeat.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            True if the caller was detached or the job cancelled, False if
+            the job is unknown or already finished
+        """
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job.status.finished:
+            return False
+        if await asyncio.to_thread(self.store.detach_caller, job_id):
+            return True
+
+        task = self._running.get(job_id)
+        if task is not None:
+            settled = self._settled[job_id]
+            task.cancel()
+            await settled.wait()
+            return True
+
+        if await asyncio.to_thread(self.store.cancel_queued, job_id):
+            self._publish(await asyncio.to_thread(self.store.get, job_id))
+            return True
+        return await asyncio.to_thread(self.store.request_cancel, job_id)
+
+    async def watch(self, job_id: Optional[str] = None) -> AsyncIterator[Job]:
+        """Follow job changes made by any process.
+
+        With job_id, yields the job's current state, then each change,
+        and stops once it finishes. Without, yields every job that changes
+        from now on. Changes landing between two polls may be merged.
+
+        Args:
+            job_id: Job to follow (None = all jobs)
+
+        Raises:
+            ValueError: If job_id doesn't exist
+        """
+        wakeups = self.subscribe()
+        try:
+            since = 0.0 if job_id else time.time()
+            if job_id and await asyncio.to_thread(self.store.get, job_id) is None:
+                raise ValueError(f"Unknown job '{job_id}'")
+
+            seen: Dict[str, Tuple] = {}
+            while True:
+                since, jobs = await asyncio.to_thread(self.store.changed_since, since, job_id)
+                for job in jobs:
+                    state = (job.status, job.progress, job.message, job.callers)
+                    if seen.get(job.id) == state:
+                        continue
+                    seen[job.id] = state
+                    yield job
+                    if job_id and job.status.finished:
+                        return
+                await _wait_briefly(wakeups.get(), self.poll_interval)
+                while not wakeups.empty():
+                    wakeups.get_nowait()
+        finally:
+            self.unsubscribe(wakeups)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Wait for a job to finish, wherever it runs.
+
+        Args:
+            job_id: Job to wait for
+            timeout: Seconds to wait (None = forever)
+
+        Returns:
+            The finished job
+
+        Raises:
+            ValueError: If the job doesn't exist
+            asyncio.TimeoutError: If the timeout expires first
+        """
+        async def finished() -> Job:
+            async for job in self.watch(job_id):
+                if job.status.finished:
+                    return job
+
+        return await asyncio.wait_for(finished(), timeout)
+
+    def subscribe(self, max_events: int = 1000) -> asyncio.Queue:
+        """Receive changes made by this process as Job.to_dict() events.
+
+        Use watch() to also see changes made by other processes. Events
+        are dropped for subscribers that fall max_events behind.
+        """
+        events: asyncio.Queue = asyncio.Queue(max_events)
+        self._subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events: asyncio.Queue) -> None:
+        """Stop receiving job events."""
+        self._subscribers.discard(events)
+
+    def _publish(self, job: Job) -> None:
+        event = job.to_dict()
+        for events in list(self._subscribers):
+            try:
+                events.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.debug(f"Dropping job event for slow subscriber ({job.id})")
+
+    async def _finish(
+        self,
+        job: Job,
+        status: JobStatus,
+        result: Any = None,
+        error: Optional[str] = None,
+        owner: Optional[str] = None
+    ) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.now().isoformat()
+        if status is JobStatus.COMPLETED:
+            job.progress = 1.0
+        if await asyncio.to_thread(self.store.save, job, owner):
+            self._publish(job)
+        else:
+            logger.warning(f"Job {job.id} was taken over by another worker; dropping its {status.value} state")
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            claim = asyncio.ensure_future(asyncio.to_thread(self.store.claim, self.kinds, self.owner))
+            try:
+                job = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                # Stopping mid-claim: hand back a job claimed in the meantime
+                job = await claim
+                if job is not None:
+                    await asyncio.to_thread(self.store.release, [job.id], self.owner, "Requeued after shutdown")
+                raise
+            if job is None:
+                await _wait_briefly(self._wakeup.wait(), self.poll_interval)
+                continue
+            await self._execute(job)
+
+    async def _maintain(self) -> None:
+        """Renew leases, honour cross-process cancels, requeue dead workers' jobs."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                cancelled = await asyncio.to_thread(self.store.heartbeat, list(self._running), self.owner)
+                for job_id in cancelled:
+                    task = self._running.get(job_id)
+                    if task is not None:
+                        task.cancel()
+                await asyncio.to_thread(self.store.requeue_stale, self.lease_seconds)
+            except sqlite3.Error as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+
+    async def _execute(self, job: Job) -> None:
+        self._publish(job)
+        # Progress is saved in the background; reports arriving while a
+        # save is in flight are folded into one follow-up save
+        unsaved = False
+        saver: Optional[asyncio.Task] = None
+
+        async def save_progress() -> None:
+            nonlocal unsaved
+            while unsaved:
+                unsaved = False
+                try:
+                    if await asyncio.to_thread(self.store.save, job, self.owner):
+                        self._publish(job)
+                except sqlite3.Error as e:
+                    logger.warning(f"Saving progress of job {job.id} failed: {e}")
+
+        def report(progress: float, message: str = "") -> None:
+            nonlocal unsaved, saver
+            job.progress = min(1.0, max(0.0, float(progress)))
+            job.message = message
+            unsaved = True
+            if saver is None or saver.done():
+                saver = asyncio.create_task(save_progress())
+
+        task = asyncio.create_task(self._handlers[job.kind](job.payload, report))
+        self._running[job.id] = task
+        self._settled[job.id] = asyncio.Event()
+        try:
+            try:
+                result = await asyncio.shield(task)
+            finally:
+                # Don't let a progress save land after the final state
+                unsaved = False
+                if saver is not None:
+                    await asyncio.gather(saver, return_exceptions=True)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # The worker itself is stopping; stop() requeues the job
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise
+            await _uninterrupted(self._finish(job, JobStatus.CANCELLED, owner=self.owner))
+            logger.info(f"Cancelled job {job.id}")
+        except Exception as e:
+            logger.warning(f"Job {job.id} ({job.kind}) failed: {e}")
+            await _uninterrupted(self._finish(job, JobStatus.FAILED, error=str(e), owner=self.owner))
+        else:
+            await _uninterrupted(self._finish(job, JobStatus.COMPLETED, result=result, owner=self.owner))
+            logger.info(f"Completed job {job.id} ({job.kind})")
+        finally:
+            self._running.pop(job.id, None)
+            self._settled.pop(job.id).set()
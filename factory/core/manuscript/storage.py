@@ -6,11 +6,13 @@ with support for backup and atomic writes.
 
 import json
 import shutil
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 from datetime import datetime
 
-from factory.core.manuscript.structure import Manuscript
+from factory.core.manuscript.structure import Manuscript, Scene
+from factory.core.tracing import traced
 
 
 class ManuscriptStorage:
@@ -39,7 +41,9 @@ class ManuscriptStorage:
         """
         self.storage_path = Path(storage_path)
         self.backup_enabled = backup_enabled
+        self._update_lock = threading.Lock()
 
+    @traced("storage.manuscript.save")
     def save(self, manuscript: Manuscript) -> bool:
         """Save manuscript to JSON file.
 
@@ -84,6 +88,36 @@ class ManuscriptStorage:
             print(f"Error saving manuscript: {e}")
             return False
 
+    def update_scene(
+        self,
+        chapter_id: str,
+        scene_id: str,
+        fn: Callable[[Scene], None]
+    ) -> Optional[Manuscript]:
+        """Change one scene in the stored manuscript and save it.
+
+        The manuscript is reloaded from disk, so edits made elsewhere since
+        the caller loaded its copy are kept. Updates through this storage
+        object are serialized (safe to call from several threads).
+
+        Args:
+            chapter_id: Chapter containing the scene
+            scene_id: Scene to change
+            fn: Modifies the freshly loaded scene in place
+
+        Returns:
+            The saved manuscript, or None if the scene no longer exists or
+            saving failed
+        """
+        with self._update_lock:
+            manuscript = self.load()
+            chapter = manuscript.get_chapter(chapter_id) if manuscript else None
+            scene = chapter.get_scene(scene_id) if chapter else None
+            if scene is None:
+                return None
+            fn(scene)
+            return manuscript if self.save(manuscript) else None
+
     def load(self) -> Optional[Manuscript]:
         """Load manuscript from JSON file.
 
@@ -0,0 +1,445 @@
+"""Process-wide metrics in Prometheus text format.
+
+Counters, gauges and fixed-bucket histograms for code that wants to be
+scraped, plus collectors that turn existing stats (AgentPool, QueryCache)
+into samples at scrape time so those hot paths carry no extra bookkeeping.
+
+Recording takes no locks: a labelled child is looked up with one dict get
+and updated with plain arithmetic. Under asyncio everything runs on one
+thread, so updates are exact; observations made concurrently from other
+threads may very rarely be lost, which is acceptable for monitoring.
+
+    from factory.core.metrics import get_registry
+
+    saves = get_registry().histogram(
+        "factory_session_save_seconds", "Session save duration", ["trigger"]
+    )
+    saves.labels("auto").observe(0.004)
+
+    get_registry().render()  # text exposition format 0.0.4
+"""
+
+import bisect
+import logging
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# A sample is (suffix, labels, value); a family is (name, type, help, samples)
+Sample = Tuple[str, Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    """Base for labelled metrics."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._unlabelled = self._new_child()
+            self._children[()] = self._unlabelled
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """Get the child for a set of label values (created on first use).
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            Child with the metric's update methods
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            # setdefault keeps the first child if two threads race here
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        """Reset the metric, dropping all labelled children."""
+        self._children = {}
+        if not self.labelnames:
+            self._unlabelled = self._new_child()
+            self._children[()] = self._unlabelled
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        """Current samples of this metric."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment an unlabelled counter."""
+        self._unlabelled.value += amount
+
+    def samples(self) -> List[Sample]:
+        return [
+            ("_total", self._label_dict(key), child.value)
+            for key, child in list(self._children.items())
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """Set an unlabelled gauge."""
+        self._unlabelled.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment an unlabelled gauge."""
+        self._unlabelled.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement an unlabelled gauge."""
+        self._unlabelled.value -= amount
+
+    def samples(self) -> List[Sample]:
+        return [
+            ("", self._label_dict(key), child.value)
+            for key, child in list(self._children.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Observations counted in fixed cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Observe a value on an unlabelled histogram."""
+        self._unlabelled.observe(value)
+
+    def samples(self) -> List[Sample]:
+        samples: List[Sample] = []
+        for key, child in list(self._children.items()):
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, child.sum))
+            samples.append(("_count", labels, child.count))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metrics and scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def _get_or_create(self, cls: type, name: str, *args, **kwargs) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics.setdefault(name, cls(name, *args, **kwargs))
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' already registered as {metric.type_name}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter (name without the _total suffix)."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Add a callable producing metric families at scrape time.
+
+        Args:
+            collector: Returns (name, type, help, samples) tuples; adding
+                the same collector again has no effect
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Remove a collector added with register_collector."""
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def collect(self) -> List[Family]:
+        """All metric families, registered metrics first."""
+        families: List[Family] = [
+            (m.name, m.type_name, m.documentation, m.samples())
+            for m in list(self._metrics.values())
+        ]
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        return render_families(self.collect())
+
+
+def render_families(families: Iterable[Family]) -> str:
+    """Render metric families in Prometheus text exposition format."""
+    lines: List[str] = []
+    for name, type_name, documentation, samples in families:
+        lines.append(f"# HELP {name} {documentation.replace(chr(10), ' ')}")
+        lines.append(f"# TYPE {name} {type_name}")
+        for suffix, labels, value in samples:
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def merge_process_families(
+    snapshots: Dict[str, Iterable[Family]],
+    label: str = "worker"
+) -> List[Family]:
+    """Combine the metric families of several processes.
+
+    Each process's samples keep their values and gain a label naming the
+    process, so counters stay monotonic per series and Prometheus can sum
+    them. HELP and TYPE are emitted once per family.
+
+    Args:
+        snapshots: Process ID -> families from that process's collect()
+            (lists instead of tuples are fine, e.g. after a JSON round trip)
+        label: Label holding the process ID
+
+    Returns:
+        Families in first-seen order
+    """
+    merged: Dict[str, Family] = {}
+    for process, families in snapshots.items():
+        for name, type_name, documentation, samples in families:
+            family = merged.setdefault(name, (name, type_name, documentation, []))
+            family[3].extend(
+                (suffix, {**labels, label: process}, value) for suffix, labels, value in samples
+            )
+    return list(merged.values())
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+def agent_pool_collector(pool: Any, prefix: str = "factory_agent") -> Callable[[], List[Family]]:
+    """Collector exposing an AgentPool's counters and latency percentiles.
+
+    Reads the pool's existing stats at scrape time, so execution pays
+    nothing extra for being scraped.
+
+    Args:
+        pool: AgentPool instance
+        prefix: Metric name prefix
+
+    Returns:
+        Collector for MetricsRegistry.register_collector
+    """
+    def collect() -> List[Family]:
+        requests: List[Sample] = []
+        failures: List[Sample] = []
+        tokens: List[Sample] = []
+        cost: List[Sample] = []
+        cached_tokens: List[Sample] = []
+        cache_savings: List[Sample] = []
+        estimated_cached: List[Sample] = []
+        in_flight: List[Sample] = []
+        queued: List[Sample] = []
+        circuit_open: List[Sample] = []
+        rejected: List[Sample] = []
+        latency: List[Sample] = []
+
+        for name, stats in pool.get_stats().items():
+            labels = {"agent": name}
+            requests.append(("_total", labels, stats["total_requests"]))
+            failures.append(("_total", labels, stats["failed_requests"]))
+            tokens.append(("_total", labels, stats["total_tokens"]))
+            cost.append(("_total", labels, stats["total_cost"]))
+            cached_tokens.append(("_total", labels, stats.get("cached_tokens", 0)))
+            cache_savings.append(("_total", labels, stats.get("cache_savings_usd", 0.0)))
+            estimated_cached.append(("_total", labels, stats.get("estimated_cached_tokens", 0)))
+            in_flight.append(("", labels, stats.get("in_flight", 0)))
+            queued.append(("", labels, stats.get("queued", 0)))
+            rejected.append(("_total", labels, stats.get("rejected_requests", 0)))
+            circuit = stats.get("circuit")
+            if circuit:
+                circuit_open.append(("", labels, 1 if circuit["state"] == "open" else 0))
+
+            summary = stats.get("latency_ms")
+            if summary:
+                for q in ("p50", "p90", "p95", "p99"):
+                    quantile = _format_value(float(q[1:]) / 100)
+                    latency.append(("", {**labels, "quantile": quantile}, summary[q] / 1000))
+                latency.append(("_sum", labels, summary["mean"] * summary["count"] / 1000))
+                latency.append(("_count", labels, summary["count"]))
+
+        return [
+            (f"{prefix}_requests", "counter", "Agent generation requests", requests),
+            (f"{prefix}_failures", "counter", "Failed agent generation requests", failures),
+            (f"{prefix}_tokens", "counter", "Tokens used by successful requests", tokens),
+            (f"{prefix}_cost_usd", "counter", "Cost of successful requests in USD", cost),
+            (f"{prefix}_cached_tokens", "counter", "Input tokens providers reported as cache hits", cached_tokens),
+            (f"{prefix}_estimated_cached_tokens", "counter", "Input tokens estimated as cached by the client", estimated_cached),
+            (f"{prefix}_cache_savings_usd", "counter", "Input cost saved by prompt caching in USD", cache_savings),
+            (f"{prefix}_in_flight", "gauge", "Generations currently running", in_flight),
+            (f"{prefix}_queued", "gauge", "Generations waiting for a concurrency slot", queued),
+            (f"{prefix}_rejected", "counter", "Requests refused by an open circuit", rejected),
+            (f"{prefix}_circuit_open", "gauge", "1 while the agent's circuit breaker is open", circuit_open),
+            (f"{prefix}_latency_seconds", "summary", "Successful generation latency", latency),
+        ]
+
+    return collect
+
+
+def query_cache_collector(
+    get_cache: Callable[[], Optional[Any]],
+    prefix: str = "factory_knowledge_cache"
+) -> Callable[[], List[Family]]:
+    """Collector exposing QueryCache hits, misses and size.
+
+    Args:
+        get_cache: Returns the current QueryCache (or None if there is none yet)
+        prefix: Metric name prefix
+
+    Returns:
+        Collector for MetricsRegistry.register_collector
+    """
+    def collect() -> List[Family]:
+        cache = get_cache()
+        if cache is None:
+            return []
+        stats = cache.get_stats()
+        return [
+            (f"{prefix}_hits", "counter", "Knowledge query cache hits",
+             [("_total", {}, stats["hits"])]),
+            (f"{prefix}_misses", "counter", "Knowledge query cache misses",
+             [("_total", {}, stats["misses"])]),
+            (f"{prefix}_hit_ratio", "gauge", "Lifetime cache hit ratio",
+             [("", {}, stats["hit_rate"])]),
+            (f"{prefix}_entries", "gauge", "Entries in the cache",
+             [("", {}, stats["size"])]),
+        ]
+
+    return collect
@@ -0,0 +1,357 @@
+"""Context-window-aware prompt assembly.
+
+Scene prompts combine pieces of very different value: the instructions and
+outline are essential, voice guides and knowledge answers matter, excerpts
+from earlier scenes are nice to have. PromptBuilder packs them into the
+input budget of a target model (context window minus the output budget and
+a safety margin). When they don't fit, the lowest-priority sections are
+truncated first, and dropped once they would shrink below their minimum.
+
+Packing depends only on the tokenizer and the budget, so a fan-out across
+several agents packs once per distinct (tokenizer, budget) pair and section
+token counts are computed once per tokenizer.
+
+    builder = PromptBuilder()
+    builder.add("task", "Generate a scene based on this outline:", required=True)
+    builder.add("outline", outline, priority=90)
+    builder.add("previous", last_scene, priority=40, header="Previous scene:\\n", keep="end")
+
+    packs = builder.pack_for_agents({name: pool.get_agent(name) for name in names})
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from factory.core.config.loader import get_agent_config
+from factory.core.tokenizers import Tokenizer, get_tokenizer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_WINDOW = 4096
+DEFAULT_MAX_OUTPUT = 2048
+
+
+@dataclass
+class PromptSection:
+    """One piece of a prompt.
+
+    Attributes:
+        name: Section identifier (reported in PackedPrompt)
+        text: Section body
+        priority: Higher priorities are truncated last
+        header: Text rendered before the body (kept whole)
+        keep: Which part survives truncation, "start" or "end"
+        min_tokens: Drop the section rather than keep fewer body tokens
+        required: Never truncated or dropped
+        cacheable: Stable across requests (story bible, voice guide); a
+            leading run of cacheable sections forms the prompt's cache prefix
+    """
+
+    name: str
+    text: str
+    priority: int = 50
+    header: str = ""
+    keep: str = "start"
+    min_tokens: int = 0
+    required: bool = False
+    cacheable: bool = False
+
+    def render(self, text: Optional[str] = None) -> str:
+        """Header plus body (or a replacement body)."""
+        return self.header + (self.text if text is None else text)
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """Input token budget for one model.
+
+    Attributes:
+        context_window: Model context window in tokens
+        max_output: Tokens reserved for the response
+        reserve: Safety margin for tokenizer estimation error and chat framing
+    """
+
+    context_window: int
+    max_output: int
+    reserve: int = 0
+
+    @property
+    def input_tokens(self) -> int:
+        """Tokens available for the prompt."""
+        return max(0, self.context_window - self.max_output - self.reserve)
+
+    @classmethod
+    def create(
+        cls,
+        context_window: int,
+        max_output: int,
+        reserve_ratio: float = 0.02,
+        min_reserve: int = 32
+    ) -> "TokenBudget":
+        """Budget with a reserve proportional to the context window."""
+        reserve = max(min_reserve, int(context_window * reserve_ratio))
+        return cls(context_window, max_output, reserve)
+
+
+@dataclass
+class PackedPrompt:
+    """Result of packing sections into a budget."""
+
+    text: str
+    tokens: int
+    budget: int
+    tokenizer: str
+    sections: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    cache_prefix: str = ""
+
+    @property
+    def fits(self) -> bool:
+        """Whether the prompt is within budget (only fails if required sections overflow)."""
+        return self.tokens <= self.budget
+
+    def summary(self) -> Dict[str, Any]:
+        """Packing summary for workflow metadata."""
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "tokenizer": self.tokenizer,
+            "truncated": list(self.truncated),
+            "dropped": list(self.dropped),
+        }
+
+
+class PromptBuilder:
+    """Packs prioritized sections into per-model token budgets."""
+
+    def __init__(self, separator: str = "\n\n"):
+        """Initialize builder.
+
+        Args:
+            separator: Text placed between sections
+        """
+        self.separator = separator
+        self.sections: List[PromptSection] = []
+        self._counts: Dict[Tokenizer, List[int]] = {}
+        self._packs: Dict[Tuple[Tokenizer, int], PackedPrompt] = {}
+
+    def add(
+        self,
+        name: str,
+        text: Optional[str],
+        priority: int = 50,
+        header: str = "",
+        keep: str = "start",
+        min_tokens: int = 0,
+        required: bool = False,
+        cacheable: bool = False
+    ) -> "PromptBuilder":
+        """Append a section (empty text is skipped).
+
+        Args:
+            name: Section identifier
+            text: Section body
+            priority: Higher priorities are truncated last
+            header: Text rendered before the body
+            keep: "start" or "end", the part kept when truncating
+            min_tokens: Drop instead of truncating below this many body tokens
+            required: Never truncate or drop
+            cacheable: Text is stable across requests (see PackedPrompt.cache_prefix)
+
+        Returns:
+            self, for chaining
+        """
+        if keep not in ("start", "end"):
+            raise ValueError(f"keep must be 'start' or 'end', not {keep!r}")
+        if text:
+            self.sections.append(PromptSection(
+                name, text, priority, header, keep, min_tokens, required, cacheable
+            ))
+            self._counts.clear()
+            self._packs.clear()
+        return self
+
+    def render(self) -> str:
+        """All sections, untruncated."""
+        return self.separator.join(s.render() for s in self.sections)
+
+    def _section_counts(self, tokenizer: Tokenizer) -> List[int]:
+        counts = self._counts.get(tokenizer)
+        if counts is None:
+            counts = tokenizer.count_many([s.render() for s in self.sections])
+            self._counts[tokenizer] = counts
+        return counts
+
+    def pack(self, budget: int, tokenizer: Tokenizer) -> PackedPrompt:
+        """Fit the sections into a token budget.
+
+        Args:
+            budget: Input tokens available
+            tokenizer: Tokenizer of the target model
+
+        Returns:
+            PackedPrompt (memoized per tokenizer and budget)
+        """
+        key = (tokenizer, budget)
+        packed = self._packs.get(key)
+        if packed is None:
+            packed = self._pack(budget, tokenizer)
+            self._packs[key] = packed
+        return packed
+
+    def _pack(self, budget: int, tokenizer: Tokenizer) -> PackedPrompt:
+        sections = self.sections
+        counts = list(self._section_counts(tokenizer))
+        bodies: List[Optional[str]] = [s.text for s in sections]
+        separator_tokens = tokenizer.count(self.separator) if len(sections) > 1 else 0
+        truncated: List[str] = []
+
+        # Lowest priority first; among equals, later sections go first
+        order = sorted(
+            (i for i, s in enumerate(sections) if not s.required),
+            key=lambda i: (sections[i].priority, -i)
+        )
+
+        def estimate() -> int:
+            kept = [c for c, b in zip(counts, bodies) if b is not None]
+            return sum(kept) + separator_tokens * max(0, len(kept) - 1)
+
+        over = estimate() - budget
+        while True:
+            while over > 0 and order:
+                i = order[0]
+                section = sections[i]
+                header_tokens = tokenizer.count(section.header) if section.header else 0
+                target = counts[i] - header_tokens - over
+                if target < max(section.min_tokens, 1):
+                    bodies[i] = None
+                    order.pop(0)
+                else:
+                    body = tokenizer.truncate(bodies[i], target, keep=section.keep)
+                    count = tokenizer.count(section.render(body))
+                    if count >= counts[i]:
+                        # No progress possible; give the section up
+                        bodies[i] = None
+                        order.pop(0)
+                    else:
+                        counts[i], bodies[i] = count, body
+                        if section.name not in truncated:
+                            truncated.append(section.name)
+                over = estimate() - budget
+
+            text = self.separator.join(s.render(b) for s, b in zip(sections, bodies) if b is not None)
+            tokens = tokenizer.count(text)
+            # Sums of per-section counts can undercount at section boundaries
+            if tokens <= budget or not order:
+                break
+            over = tokens - budget
+
+        dropped = [s.name for s, b in zip(sections, bodies) if b is None]
+        packed = PackedPrompt(
+            cache_prefix=self._cache_prefix(bodies),
+            text=text,
+            tokens=tokens,
+            budget=budget,
+            tokenizer=tokenizer.name,
+            sections={s.name: c for s, c, b in zip(sections, counts, bodies) if b is not None},
+            truncated=[n for n in truncated if n not in dropped],
+            dropped=dropped,
+        )
+        if not packed.fits:
+            logger.warning(f"Required prompt sections exceed budget: {tokens} > {budget} tokens")
+        elif dropped or truncated:
+            logger.info(
+                f"Packed prompt into {budget} tokens ({tokenizer.name}): "
+                f"truncated {packed.truncated}, dropped {dropped}"
+            )
+        return packed
+
+    def _cache_prefix(self, bodies: List[Optional[str]]) -> str:
+        """Leading untruncated cacheable sections, with the following separator."""
+        kept = [(s, b) for s, b in zip(self.sections, bodies) if b is not None]
+        stable = []
+        for section, body in kept:
+            if not section.cacheable or body != section.text:
+                break
+            stable.append(section.render())
+        if not stable or len(stable) == len(kept):
+            return ""
+        return self.separator.join(stable) + self.separator
+
+    def pack_for(self, agent: Any, max_output: Optional[int] = None) -> PackedPrompt:
+        """Pack for an agent using its context window and tokenizer.
+
+        Args:
+            agent: Agent (BaseAgent or anything with config/model attributes)
+            max_output: Response token budget (None = agent's max_output)
+
+        Returns:
+            PackedPrompt for the agent
+        """
+        budget, tokenizer = agent_budget(agent, max_output)
+        return self.pack(budget.input_tokens, tokenizer)
+
+    def pack_for_agents(
+        self,
+        agents: Dict[str, Any],
+        max_output: Optional[int] = None
+    ) -> Dict[str, PackedPrompt]:
+        """Pack for each agent of a fan-out.
+
+        Agents sharing a tokenizer and budget share one PackedPrompt.
+
+        Args:
+            agents: Agent name -> agent
+            max_output: Response token budget (None = each agent's max_output)
+
+        Returns:
+            Agent name -> PackedPrompt
+        """
+        return {name: self.pack_for(agent, max_output) for name, agent in agents.items()}
+
+    def pack_for_model(self, model_name: str, max_output: Optional[int] = None) -> PackedPrompt:
+        """Pack for a model configured in agents.yaml (defaults if unknown).
+
+        Args:
+            model_name: Agent name in agents.yaml (e.g. "claude-sonnet-4.5")
+            max_output: Response token budget
+
+        Returns:
+            PackedPrompt for the model
+        """
+        try:
+            entry = get_agent_config(model_name)
+        except (ValueError, OSError):
+            entry = {}
+        budget = TokenBudget.create(
+            entry.get("context_window", DEFAULT_CONTEXT_WINDOW),
+            max_output if max_output is not None else entry.get("max_output", DEFAULT_MAX_OUTPUT),
+        )
+        tokenizer = get_tokenizer(entry.get("model", model_name), entry.get("provider"))
+        return self.pack(budget.input_tokens, tokenizer)
+
+
+def agent_budget(agent: Any, max_output: Optional[int] = None) -> Tuple[TokenBudget, Tokenizer]:
+    """Token budget and tokenizer for an agent.
+
+    Args:
+        agent: Agent (BaseAgent or anything with config/model attributes)
+        max_output: Response token budget (None = agent's max_output)
+
+    Returns:
+        (TokenBudget, Tokenizer)
+    """
+    config = getattr(agent, "config", None)
+    context_window = getattr(config, "context_window", DEFAULT_CONTEXT_WINDOW)
+    if max_output is None:
+        max_output = getattr(config, "max_output", DEFAULT_MAX_OUTPUT)
+
+    tokenizer = getattr(agent, "tokenizer", None)
+    if not isinstance(tokenizer, Tokenizer):
+        metadata = getattr(config, "metadata", None) or {}
+        model = getattr(agent, "model", None) or getattr(config, "model", "")
+        tokenizer = get_tokenizer(model, metadata.get("provider"))
+
+    return TokenBudget.create(context_window, max_output), tokenizer
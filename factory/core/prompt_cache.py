@@ -0,0 +1,217 @@
+"""Prompt-prefix caching support.
+
+Scene prompts repeat large stable prefixes (voice guides, story bible,
+character sheets). Providers reuse them in different ways:
+
+- implicit caching reported in usage (DeepSeek ``prompt_cache_hit_tokens``,
+  OpenAI-compatible ``prompt_tokens_details.cached_tokens`` from Qwen and
+  Doubao, Kimi ``cached_tokens``, Anthropic ``cache_read_input_tokens``)
+- explicit context caches referenced by ID (Doubao context API)
+- nothing at all
+
+PrefixRegistry holds the stable prefixes prompts are built from, the
+provider cache IDs created for them, and which agents have recently been
+sent each prefix. AgentPool uses it to estimate reuse for providers that
+don't report cached tokens, so savings are visible for every agent.
+
+    registry = get_prefix_registry()
+    registry.register(voice_guide, name="voice:Sarah")
+    prefix = registry.match(prompt)
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedPrefix:
+    """A registered stable prompt prefix."""
+
+    id: str
+    name: str
+    text: str
+
+
+@dataclass
+class PromptCacheUsage:
+    """Prefix reuse for one response.
+
+    Attributes:
+        cached_tokens: Input tokens served from a cache
+        source: "provider" (reported by the API) or "client" (estimated
+            from the prefix registry)
+        prefix: Name of the matched registered prefix, if any
+        saved_usd: Input cost saved versus the uncached price
+    """
+
+    cached_tokens: int
+    source: str
+    prefix: Optional[str] = None
+    saved_usd: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for response metadata."""
+        return {
+            "cached_tokens": self.cached_tokens,
+            "source": self.source,
+            "prefix": self.prefix,
+            "saved_usd": self.saved_usd,
+        }
+
+
+def cached_tokens_from_usage(usage: Dict[str, Any]) -> int:
+    """Cached input tokens from a provider usage block (0 if not reported).
+
+    Args:
+        usage: The API response's usage object
+
+    Returns:
+        Number of input tokens read from the provider's cache
+    """
+    if not usage:
+        return 0
+    details = usage.get("prompt_tokens_details") or {}
+    for value in (
+        usage.get("prompt_cache_hit_tokens"),    # DeepSeek
+        details.get("cached_tokens"),            # OpenAI-compatible (Qwen, Doubao)
+        usage.get("cached_tokens"),              # Kimi
+        usage.get("cache_read_input_tokens"),    # Anthropic
+    ):
+        if value:
+            return int(value)
+    return 0
+
+
+def prefix_id(text: str) -> str:
+    """Stable identifier for prefix text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class PrefixRegistry:
+    """Registered prompt prefixes, provider cache IDs and per-agent warmth."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_prefixes: int = 64,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize registry.
+
+        Args:
+            ttl_seconds: How long a prefix sent to an agent counts as cached
+                when the provider doesn't say (Anthropic's default is 5 min)
+            max_prefixes: Registered prefixes kept (least recently used go)
+            clock: Time source
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_prefixes = max_prefixes
+        self._clock = clock
+        self._prefixes: Dict[str, CachedPrefix] = {}
+        self._last_used: Dict[str, float] = {}
+        self._sent: Dict[Tuple[str, str], float] = {}  # (agent, prefix id) -> last sent
+        self._handles: Dict[Tuple[str, str], Tuple[str, float]] = {}  # -> (cache id, expires)
+
+    def register(self, text: str, name: Optional[str] = None) -> CachedPrefix:
+        """Register a stable prefix (idempotent for the same text).
+
+        Args:
+            text: Prefix text, exactly as it starts prompts
+            name: Label for reports (default: derived from the text hash)
+
+        Returns:
+            The registered prefix
+        """
+        pid = prefix_id(text)
+        prefix = self._prefixes.get(pid)
+        if prefix is None:
+            prefix = CachedPrefix(pid, name or f"prefix-{pid[:8]}", text)
+            self._prefixes[pid] = prefix
+            if len(self._prefixes) > self.max_prefixes:
+                self._evict(min(self._last_used, key=self._last_used.get))
+        self._last_used[pid] = self._clock()
+        return prefix
+
+    def unregister(self, prefix: CachedPrefix) -> None:
+        """Forget a prefix and its cache IDs."""
+        self._evict(prefix.id)
+
+    def _evict(self, pid: str) -> None:
+        self._prefixes.pop(pid, None)
+        self._last_used.pop(pid, None)
+        for key in [k for k in self._sent if k[1] == pid]:
+            del self._sent[key]
+        for key in [k for k in self._handles if k[1] == pid]:
+            del self._handles[key]
+
+    def match(self, prompt: str) -> Optional[CachedPrefix]:
+        """Longest registered prefix the prompt starts with."""
+        best = None
+        for prefix in self._prefixes.values():
+            if prompt.startswith(prefix.text) and (best is None or len(prefix.text) > len(best.text)):
+                best = prefix
+        if best is not None:
+            self._last_used[best.id] = self._clock()
+        return best
+
+    def split(self, prompt: str) -> Tuple[Optional[CachedPrefix], str]:
+        """Split a prompt into its registered prefix and the remainder."""
+        prefix = self.match(prompt)
+        if prefix is None:
+            return None, prompt
+        return prefix, prompt[len(prefix.text):]
+
+    def is_warm(self, agent_name: str, prefix: CachedPrefix) -> bool:
+        """Whether the prefix was sent to the agent within the TTL."""
+        sent = self._sent.get((agent_name, prefix.id))
+        return sent is not None and self._clock() - sent < self.ttl_seconds
+
+    def mark_sent(self, agent_name: str, prefix: CachedPrefix) -> None:
+        """Record that the agent has just been sent the prefix."""
+        self._sent[(agent_name, prefix.id)] = self._clock()
+
+    def get_handle(self, agent_name: str, prefix: CachedPrefix) -> Optional[str]:
+        """Unexpired provider cache ID for the prefix on this agent."""
+        entry = self._handles.get((agent_name, prefix.id))
+        if entry is None:
+            return None
+        handle, expires_at = entry
+        if self._clock() >= expires_at:
+            del self._handles[(agent_name, prefix.id)]
+            return None
+        return handle
+
+    def set_handle(self, agent_name: str, prefix: CachedPrefix, handle: str, ttl_seconds: float) -> None:
+        """Store a provider cache ID created for the prefix.
+
+        Args:
+            agent_name: Agent that owns the cache
+            prefix: Cached prefix
+            handle: Provider cache/context ID
+            ttl_seconds: Provider-side lifetime of the cache
+        """
+        self._handles[(agent_name, prefix.id)] = (handle, self._clock() + ttl_seconds)
+
+    def clear_handle(self, agent_name: str, prefix: CachedPrefix) -> None:
+        """Forget a provider cache ID (e.g. the provider no longer has it)."""
+        self._handles.pop((agent_name, prefix.id), None)
+
+    def clear(self) -> None:
+        """Forget all prefixes and cache IDs."""
+        self._prefixes.clear()
+        self._last_used.clear()
+        self._sent.clear()
+        self._handles.clear()
+
+
+_registry = PrefixRegistry()
+
+
+def get_prefix_registry() -> PrefixRegistry:
+    """Get the process-wide prefix registry."""
+    return _registry
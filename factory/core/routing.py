@@ -0,0 +1,136 @@
+"""Latency-aware selection of one agent from a group of equivalent agents.
+
+Used by AgentPool.execute_routed. Each candidate is described by live
+signals from the pool (EWMA latency, EWMA error rate, in-flight and queued
+requests, cost per 1k tokens) and a policy picks one:
+
+- fastest: lowest expected latency
+- cheapest_under_sla: lowest cost among agents expected to meet a latency
+  SLA, falling back to fastest if none do
+- power_of_two: sample two candidates at random and keep the one with the
+  lower expected latency, which spreads load without herding onto one agent
+
+Agents whose error rate is above a threshold are skipped unless no healthy
+agent is left. Agents without latency data yet are assumed to be as fast as
+the median of the candidates that have data (or default_latency_ms if none
+do), and win ties, so new or recovered agents get tried without being
+mistaken for instant ones.
+"""
+
+import random
+import statistics
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import List, Optional
+
+# Error rates are capped here when inflating latency, so a flaky agent
+# costs at most 20x its latency instead of infinity
+_MAX_PENALIZED_ERROR_RATE = 0.95
+
+
+class RoutingPolicy(Enum):
+    """Policy for picking one agent from a group."""
+
+    FASTEST = "fastest"
+    CHEAPEST_UNDER_SLA = "cheapest_under_sla"
+    POWER_OF_TWO = "power_of_two"
+
+
+@dataclass
+class RouteCandidate:
+    """Live routing signals for one agent."""
+
+    name: str
+    latency_ms: Optional[float] = None
+    error_rate: float = 0.0
+    in_flight: int = 0
+    queued: int = 0
+    max_concurrency: Optional[int] = None
+    cost_per_1k: float = 0.0
+
+    @property
+    def expected_latency_ms(self) -> float:
+        """Latency adjusted for queueing and expected retries.
+
+        With a concurrency limit, a request waits for the queue ahead of it
+        to drain in batches of max_concurrency; without one, queued work is
+        assumed to slow the provider proportionally.
+        """
+        base = self.latency_ms or 0.0
+        if self.max_concurrency:
+            load = 1 + (self.in_flight + self.queued) // self.max_concurrency
+        else:
+            load = 1 + self.queued
+        success_rate = 1 - min(self.error_rate, _MAX_PENALIZED_ERROR_RATE)
+        return base * load / success_rate
+
+
+def _with_latency_prior(
+    candidates: List[RouteCandidate],
+    default_latency_ms: float = 0.0
+) -> List[RouteCandidate]:
+    """Fill in latency for candidates that have none yet.
+
+    Args:
+        candidates: Candidates, some possibly without latency_ms
+        default_latency_ms: Latency assumed when no candidate has data
+
+    Returns:
+        Candidates (copies where filled in), in the same order
+    """
+    known = [c.latency_ms for c in candidates if c.latency_ms is not None]
+    prior = statistics.median(known) if known else default_latency_ms
+    return [c if c.latency_ms is not None else replace(c, latency_ms=prior) for c in candidates]
+
+
+def choose_agent(
+    candidates: List[RouteCandidate],
+    policy: RoutingPolicy = RoutingPolicy.FASTEST,
+    sla_ms: Optional[float] = None,
+    max_error_rate: float = 0.5,
+    rng: Optional[random.Random] = None,
+    default_latency_ms: float = 0.0
+) -> RouteCandidate:
+    """Pick one candidate according to a policy.
+
+    Args:
+        candidates: Candidates to choose from (non-empty)
+        policy: Selection policy
+        sla_ms: Latency target for cheapest_under_sla
+        max_error_rate: Candidates above this error rate are skipped while
+            healthier ones exist
+        rng: Random source for power_of_two
+        default_latency_ms: Latency assumed for candidates without data
+            when none of the candidates has any
+
+    Returns:
+        Chosen candidate
+    """
+    if not candidates:
+        raise ValueError("No candidates to route to")
+
+    untried = {c.name for c in candidates if c.latency_ms is None}
+    healthy = [c for c in candidates if c.error_rate <= max_error_rate] or list(candidates)
+    healthy = _with_latency_prior(healthy, default_latency_ms)
+
+    def fastest(pool: List[RouteCandidate]) -> RouteCandidate:
+        # Untried agents win ties, so they get explored
+        return min(pool, key=lambda c: (c.expected_latency_ms, c.cost_per_1k, c.name not in untried))
+
+    if policy is RoutingPolicy.FASTEST:
+        return fastest(healthy)
+
+    if policy is RoutingPolicy.CHEAPEST_UNDER_SLA:
+        if sla_ms is None:
+            raise ValueError("cheapest_under_sla requires sla_ms")
+        within = [c for c in healthy if c.expected_latency_ms <= sla_ms]
+        if not within:
+            return fastest(healthy)
+        return min(within, key=lambda c: (c.cost_per_1k, c.expected_latency_ms))
+
+    if policy is RoutingPolicy.POWER_OF_TWO:
+        if len(healthy) == 1:
+            return healthy[0]
+        return fastest((rng or random).sample(healthy, 2))
+
+    raise ValueError(f"Unknown routing policy: {policy}")
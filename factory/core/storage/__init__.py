@@ -4,6 +4,7 @@ from .session import Session
 from .cost_tracker import CostTracker
 from .preferences import PreferencesManager
 from .history import HistoryManager
+from .state_store import StateStore
 
 from .models import (
     SessionData,
@@ -17,6 +18,7 @@ __all__ = [
     "CostTracker",
     "PreferencesManager",
     "HistoryManager",
+    "StateStore",
     "SessionData",
     "CostData",
     "Preferences",
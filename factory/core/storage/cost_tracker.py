@@ -9,6 +9,8 @@ from typing import Optional
 
 import aiofiles
 
+from factory.core.tracing import traced
+
 from .models import CostData, CostOperation
 
 logger = logging.getLogger(__name__)
@@ -64,6 +66,7 @@ class CostTracker:
 
         return CostData()
 
+    @traced("storage.costs.save")
     async def save(self) -> bool:
         """Save cost data to disk."""
         try:
@@ -84,7 +87,9 @@ class CostTracker:
         tokens_output: int,
         cost: float,
         stage: str,
-        context: Optional[dict] = None
+        context: Optional[dict] = None,
+        tokens_cached: int = 0,
+        cache_savings: float = 0.0
     ) -> bool:
         """Log a cost operation.
 
@@ -96,6 +101,8 @@ class CostTracker:
             cost: Total cost in USD
             stage: Stage where operation occurred
             context: Additional context
+            tokens_cached: Input tokens served from a prompt cache
+            cache_savings: Input cost saved by prompt caching in USD
 
         Returns:
             True if logged successfully
@@ -108,6 +115,8 @@ class CostTracker:
             tokens_output=tokens_output,
             cost=cost,
             stage=stage,
+            tokens_cached=tokens_cached,
+            cache_savings=cache_savings,
             context=context or {}
         )
 
@@ -128,6 +137,13 @@ class CostTracker:
         """Get total cost for today."""
         return self.data.get_today_cost()
 
+    def get_cache_savings(self) -> dict:
+        """Get prompt-cache reuse for the session."""
+        return {
+            "cached_tokens": self.data.session_cached_tokens,
+            "saved_usd": self.data.session_cache_savings,
+        }
+
     def get_budget_status(self) -> dict:
         """Get budget status."""
         return {
@@ -139,5 +155,6 @@ class CostTracker:
             },
             "session": {
                 "spent": self.get_session_cost(),
+                "cache_savings": self.data.session_cache_savings,
             }
         }
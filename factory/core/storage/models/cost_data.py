@@ -15,6 +15,8 @@ class CostOperation(BaseModel):
     tokens_output: int
     cost: float
     stage: str  # Which stage this operation was performed in
+    tokens_cached: int = 0  # Input tokens served from a prompt cache
+    cache_savings: float = 0.0  # Input cost saved by prompt caching
     context: Dict[str, str] = Field(default_factory=dict)  # Additional context
 
 
@@ -25,6 +27,8 @@ class DailyCost(BaseModel):
     total_cost: float = 0.0
     total_tokens: int = 0
     operations_count: int = 0
+    cached_tokens: int = 0
+    cache_savings: float = 0.0
     by_model: Dict[str, float] = Field(default_factory=dict)
     by_stage: Dict[str, float] = Field(default_factory=dict)
 
@@ -35,6 +39,8 @@ class CostData(BaseModel):
     # Current session costs
     session_cost: float = 0.0
     session_tokens: int = 0
+    session_cached_tokens: int = 0
+    session_cache_savings: float = 0.0
 
     # Operation history (kept for current session + last 1000)
     operations: List[CostOperation] = Field(default_factory=list)
@@ -62,6 +68,8 @@ class CostData(BaseModel):
         self.operations.append(operation)
         self.session_cost += operation.cost
         self.session_tokens += operation.tokens_input + operation.tokens_output
+        self.session_cached_tokens += operation.tokens_cached
+        self.session_cache_savings += operation.cache_savings
 
         # Update daily summary
         day_key = operation.timestamp.date().isoformat()
@@ -72,6 +80,8 @@ class CostData(BaseModel):
         daily.total_cost += operation.cost
         daily.total_tokens += operation.tokens_input + operation.tokens_output
         daily.operations_count += 1
+        daily.cached_tokens += operation.tokens_cached
+        daily.cache_savings += operation.cache_savings
 
         # Update by model
         if operation.model_name not in daily.by_model:
@@ -3,16 +3,26 @@
 import asyncio
 import logging
 import json
+import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
 import aiofiles
 
+from factory.core.metrics import get_registry
+from factory.core.tracing import traced
+
 from .models import SessionData, CurrentState, OpenFile, RecentQuery
 
 logger = logging.getLogger(__name__)
 
+SAVE_DURATION = get_registry().histogram(
+    "factory_session_save_duration_seconds",
+    "Time spent writing the session file",
+    ["trigger", "result"],
+)
+
 
 class Session:
     """Manages session state with auto-save and crash recovery.
@@ -39,6 +49,7 @@ class Session:
         self.auto_save_interval = auto_save_interval
         self._auto_save_task: Optional[asyncio.Task] = None
         self._saving = False  # Prevent concurrent saves
+        self._open_file_listeners: List[Callable[[str], None]] = []
 
         # Load or create session
         self.data = self._load_or_create()
@@ -119,9 +130,13 @@ class Session:
 
         return False
 
-    async def save(self) -> bool:
+    @traced("storage.session.save")
+    async def save(self, trigger: str = "manual") -> bool:
         """Save session to disk (atomic write).
 
+        Args:
+            trigger: What caused the save ("manual" or "auto"), for metrics
+
         Returns:
             True if saved successfully, False otherwise
         """
@@ -134,12 +149,15 @@ class Session:
             return True  # Don't queue up multiple saves
 
         self._saving = True
+        start = time.perf_counter()
+        result = "error"
         try:
             await self._atomic_write(
                 self.session_path / "current.json",
                 self.data.model_dump_json(indent=2)
             )
             self.data.mark_clean()
+            result = "ok"
             logger.debug(f"Session saved (total saves: {self.data.total_saves})")
             return True
         except Exception as e:
@@ -147,6 +165,7 @@ class Session:
             return False
         finally:
             self._saving = False
+            SAVE_DURATION.labels(trigger, result).observe(time.perf_counter() - start)
 
     async def _atomic_write(self, file_path: Path, content: str):
         """Write to temp file, then rename (atomic on POSIX).
@@ -184,7 +203,7 @@ class Session:
         try:
             while True:
                 await asyncio.sleep(self.auto_save_interval)
-                await self.save()
+                await self.save(trigger="auto")
         except asyncio.CancelledError:
             logger.debug("Auto-save worker cancelled")
             raise
@@ -220,7 +239,9 @@ class Session:
         self.data.mark_dirty()
 
     def add_open_file(self, path: str, cursor_line: int = 0, cursor_col: int = 0):
-        """Add an open file."""
+        """Add an open file (or focus one that is already open)."""
+        self._notify_open_file(path)
+
         # Check if already open
         for file in self.data.open_files:
             if file.path == path:
@@ -235,6 +256,18 @@ class Session:
         )
         self.data.mark_dirty()
 
+    def add_open_file_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked with the path of each opened file."""
+        self._open_file_listeners.append(callback)
+
+    def _notify_open_file(self, path: str):
+        """Notify listeners that a file was opened or focused."""
+        for callback in self._open_file_listeners:
+            try:
+                callback(path)
+            except Exception as e:
+                logger.warning(f"Open-file listener failed: {e}")
+
     def remove_open_file(self, path: str):
         """Remove an open file."""
         self.data.open_files = [
@@ -0,0 +1,144 @@
+"""Shared key-value state for multi-process servers.
+
+The webapp can run several worker processes behind one port, so state that
+must survive between requests (a user's wizard progress, per-project
+settings) can't live in module globals. StateStore keeps JSON values in a
+SQLite file that every process opens:
+
+- Values are grouped by namespace (e.g. "wizard") and key (e.g. a client ID)
+- update() is an atomic read-modify-write across processes
+- WAL mode lets readers proceed while another process writes
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+class StateStore:
+    """JSON values in SQLite, safe to share between processes."""
+
+    DEFAULT_FILENAME = "state.db"
+
+    def __init__(self, db_path: Path, busy_timeout: float = 30.0):
+        """Initialize state store.
+
+        Args:
+            db_path: SQLite file path (parent directories are created)
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; update() opens its own transaction
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_project(cls, project_path: Path, **kwargs) -> "StateStore":
+        """Open the store at <project>/.factory/state.db."""
+        return cls(Path(project_path) / ".factory" / cls.DEFAULT_FILENAME, **kwargs)
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Value for a key, or default if unset."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        with self._lock:
+            self._write(namespace, key, value)
+
+    def update(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        default: Any = None
+    ) -> Any:
+        """Atomically replace a value with fn(current value).
+
+        The write lock is held from the read to the write, so concurrent
+        updates from other processes are serialized rather than lost.
+
+        Args:
+            namespace: Value namespace
+            key: Value key
+            fn: Receives the current value (or default) and returns the new
+                one; returning None deletes the key
+            default: Passed to fn when the key is unset
+
+        Returns:
+            The new value
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                value = fn(json.loads(row[0]) if row else default)
+                if value is None:
+                    self._conn.execute(
+                        "DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+                    )
+                else:
+                    self._write(namespace, key, value)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def delete(self, namespace: str, key: str) -> bool:
+        """Remove a key.
+
+        Returns:
+            True if the key existed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+        return cursor.rowcount > 0
+
+    def keys(self, namespace: str) -> List[str]:
+        """Keys in a namespace, most recently updated first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM state WHERE namespace = ? ORDER BY updated_at DESC", (namespace,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, namespace: str, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), time.time())
+        )
@@ -0,0 +1,409 @@
+"""Stylometric voice profiles and scoring.
+
+Scores how closely text matches a character's established voice, offline
+and without a model call:
+
+- Texts become fixed-length feature vectors: function-word rates,
+  sentence-length distribution, punctuation rates, lexical richness and
+  hashed character trigrams (extracted with NumPy)
+- A character's profile is the mean and spread of those features over
+  chunks of their manuscript scenes
+- Profiles keep per-scene sums, so re-profiling after edits only
+  re-extracts the scenes that changed, and persist to JSON
+- Candidates are scored in one vectorized pass: weighted distance from the
+  profile, in profile standard deviations, mapped to 0-100
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FUNCTION_WORDS = (
+    "a", "about", "after", "all", "an", "and", "any", "as", "at", "be", "because", "been",
+    "but", "by", "can", "could", "did", "do", "for", "from", "had", "has", "have", "he",
+    "her", "him", "his", "i", "if", "in", "into", "is", "it", "just", "like", "me", "my",
+    "no", "not", "now", "of", "on", "one", "or", "she", "so", "some", "than", "that",
+    "the", "their", "them", "then", "there", "they", "this", "to", "up", "was", "we",
+    "were", "what", "when", "which", "who", "will", "with", "would", "you", "your",
+)
+PUNCTUATION = (",", ";", ":", "!", "?", "—", "-", "\"", "'", "(", "…", ".")
+# Upper bounds (in words) of the sentence-length histogram bins
+SENTENCE_BINS = (5, 10, 15, 20, 30, 45)
+NGRAM_BUCKETS = 128
+
+_WORD_PATTERN = re.compile(r"[A-Za-zÀ-ɏ]+(?:['’][A-Za-z]+)*")
+_SENTENCE_END = re.compile(r"[.!?…]+")
+_FUNCTION_INDEX = {word: i for i, word in enumerate(FUNCTION_WORDS)}
+
+# Feature groups in vector order; each group weighs the same in distances
+FEATURE_GROUPS: Tuple[Tuple[str, int], ...] = (
+    ("function_words", len(FUNCTION_WORDS)),
+    ("sentence_length", len(SENTENCE_BINS) + 3),  # histogram bins + mean + std
+    ("punctuation", len(PUNCTUATION)),
+    ("lexical", 3),  # type-token ratio, mean word length, dialogue share
+    ("char_ngrams", NGRAM_BUCKETS),
+)
+FEATURE_COUNT = sum(size for _, size in FEATURE_GROUPS)
+
+
+def _group_slices() -> Dict[str, slice]:
+    slices, start = {}, 0
+    for name, size in FEATURE_GROUPS:
+        slices[name] = slice(start, start + size)
+        start += size
+    return slices
+
+
+GROUP_SLICES = _group_slices()
+_WEIGHTS = np.concatenate([np.full(size, 1.0 / (size * len(FEATURE_GROUPS))) for _, size in FEATURE_GROUPS])
+
+
+def _type_token_ratio(words: List[str], window: int = 100) -> float:
+    """Moving-average type-token ratio, so long and short texts compare."""
+    if not words:
+        return 0.0
+    if len(words) <= window:
+        return len(set(words)) / len(words)
+    ids = np.unique(np.array(words), return_inverse=True)[1]
+    ratios = [len(np.unique(ids[i:i + window])) for i in range(0, len(ids) - window + 1, window // 2)]
+    return float(np.mean(ratios)) / window
+
+
+def extract_features(text: str) -> np.ndarray:
+    """Stylometric feature vector of one text.
+
+    Args:
+        text: Prose to describe
+
+    Returns:
+        float64 array of FEATURE_COUNT values (all zeros for empty text)
+    """
+    vector = np.zeros(FEATURE_COUNT)
+    words = [w.lower() for w in _WORD_PATTERN.findall(text)]
+    if not words:
+        return vector
+    n_words = len(words)
+
+    ids = np.fromiter((_FUNCTION_INDEX.get(w, -1) for w in words), dtype=np.int64, count=n_words)
+    ids = ids[ids >= 0]
+    vector[GROUP_SLICES["function_words"]] = np.bincount(ids, minlength=len(FUNCTION_WORDS)) / n_words
+
+    lengths = np.array([
+        len(_WORD_PATTERN.findall(sentence)) for sentence in _SENTENCE_END.split(text)
+    ])
+    lengths = lengths[lengths > 0]
+    bins = np.searchsorted(SENTENCE_BINS, lengths, side="left")
+    histogram = np.bincount(bins, minlength=len(SENTENCE_BINS) + 1) / len(lengths)
+    vector[GROUP_SLICES["sentence_length"]] = np.concatenate(
+        [histogram, [lengths.mean() / 30, lengths.std() / 30]]
+    )
+
+    chars = np.frombuffer(text.lower().encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    punctuation = np.frombuffer("".join(PUNCTUATION).encode("utf-32-le"), dtype=np.uint32)
+    counts = (chars[:, None] == punctuation[None, :]).sum(axis=0)
+    vector[GROUP_SLICES["punctuation"]] = counts / n_words
+
+    quoted = sum(len(q) for q in re.findall(r"[\"“][^\"”]*[\"”]", text))
+    vector[GROUP_SLICES["lexical"]] = [
+        _type_token_ratio(words),
+        np.mean([len(w) for w in words]) / 10,
+        quoted / max(1, len(text)),
+    ]
+
+    if len(chars) >= 3:
+        trigrams = (chars[:-2] * np.uint64(961) + chars[1:-1] * np.uint64(31) + chars[2:]) % np.uint64(NGRAM_BUCKETS)
+        vector[GROUP_SLICES["char_ngrams"]] = np.bincount(
+            trigrams.astype(np.int64), minlength=NGRAM_BUCKETS
+        ) / len(trigrams)
+    return vector
+
+
+def extract_batch(texts: Sequence[str]) -> np.ndarray:
+    """Feature matrix of shape (len(texts), FEATURE_COUNT)."""
+    if not texts:
+        return np.zeros((0, FEATURE_COUNT))
+    return np.vstack([extract_features(text) for text in texts])
+
+
+def chunk_words(text: str, size: int = 250) -> List[str]:
+    """Split text into consecutive chunks of about `size` words.
+
+    A short trailing remainder is merged into the previous chunk.
+    """
+    words = text.split()
+    if len(words) <= size:
+        return [text] if words else []
+    chunks = [" ".join(words[i:i + size]) for i in range(0, len(words), size)]
+    if len(chunks) > 1 and len(chunks[-1].split()) < size // 2:
+        tail = chunks.pop()
+        chunks[-1] = f"{chunks[-1]} {tail}"
+    return chunks
+
+
+@dataclass
+class VoiceProfile:
+    """A character's feature statistics, kept as per-source running sums.
+
+    Each source (usually a scene) contributes the count, sum and sum of
+    squares of its chunks' feature vectors, so one source can be replaced
+    or removed without touching the others.
+    """
+
+    character: str
+    sources: Dict[str, Dict] = field(default_factory=dict)  # id -> {"hash", "count", "sum", "sumsq"}
+
+    @property
+    def count(self) -> int:
+        """Chunks profiled."""
+        return sum(s["count"] for s in self.sources.values())
+
+    def add(self, source_id: str, features: np.ndarray, content_hash: str = "") -> None:
+        """Set a source's contribution from its chunk feature matrix."""
+        self.sources[source_id] = {
+            "hash": content_hash,
+            "count": int(len(features)),
+            "sum": np.asarray(features.sum(axis=0)),
+            "sumsq": np.asarray((features ** 2).sum(axis=0)),
+        }
+
+    def remove(self, source_id: str) -> bool:
+        """Drop a source's contribution."""
+        return self.sources.pop(source_id, None) is not None
+
+    def stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(mean, variance) over all profiled chunks."""
+        count = self.count
+        if not count:
+            raise ValueError(f"Voice profile for '{self.character}' is empty")
+        total = sum(s["sum"] for s in self.sources.values())
+        total_sq = sum(s["sumsq"] for s in self.sources.values())
+        mean = total / count
+        return mean, np.maximum(total_sq / count - mean ** 2, 0.0)
+
+    def to_dict(self) -> Dict:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "character": self.character,
+            "sources": {
+                source_id: {**s, "sum": s["sum"].tolist(), "sumsq": s["sumsq"].tolist()}
+                for source_id, s in self.sources.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VoiceProfile":
+        """Restore a profile saved with to_dict()."""
+        sources = {
+            source_id: {**s, "sum": np.array(s["sum"]), "sumsq": np.array(s["sumsq"])}
+            for source_id, s in data.get("sources", {}).items()
+        }
+        return cls(character=data["character"], sources=sources)
+
+
+class VoiceScorer:
+    """Builds character voice profiles and scores text against them."""
+
+    DEFAULT_FILENAME = "voice_profiles.json"
+
+    def __init__(
+        self,
+        cache_path: Optional[Path] = None,
+        chunk_size: int = 250,
+        relative_spread: float = 0.25,
+        scale: float = 2.0
+    ):
+        """Initialize voice scorer.
+
+        Args:
+            cache_path: JSON file persisting profiles (None = memory only)
+            chunk_size: Words per reference chunk
+            relative_spread: Minimum spread as a fraction of each feature's
+                mean, so profiles built from one or two chunks aren't
+                impossibly strict
+            scale: Distance (in weighted standard deviations) at which the
+                score falls to about 37
+        """
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.chunk_size = chunk_size
+        self.relative_spread = relative_spread
+        self.scale = scale
+        self.profiles: Dict[str, VoiceProfile] = {}
+        if self.cache_path and self.cache_path.exists():
+            self._load()
+
+    @classmethod
+    def for_project(cls, project_path: Path, **kwargs) -> "VoiceScorer":
+        """Scorer caching profiles at <project>/.factory/voice_profiles.json."""
+        return cls(Path(project_path) / ".factory" / cls.DEFAULT_FILENAME, **kwargs)
+
+    def has_profile(self, character: str) -> bool:
+        """Whether a non-empty profile exists for a character."""
+        profile = self.profiles.get(character)
+        return profile is not None and profile.count > 0
+
+    def add_reference(self, character: str, source_id: str, text: str) -> bool:
+        """Add or refresh one reference text (e.g. a scene) in a profile.
+
+        Args:
+            character: Character whose voice the text shows
+            source_id: Stable id of the text; re-adding it replaces it
+            text: Reference prose
+
+        Returns:
+            False if the source was already profiled with identical text
+        """
+        profile = self.profiles.setdefault(character, VoiceProfile(character))
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        existing = profile.sources.get(source_id)
+        if existing is not None and existing["hash"] == content_hash:
+            return False
+        chunks = chunk_words(text, self.chunk_size)
+        if not chunks:
+            return profile.remove(source_id)
+        profile.add(source_id, extract_batch(chunks), content_hash)
+        return True
+
+    def build_profile(self, character: str, references: Dict[str, str]) -> int:
+        """Make a profile match a set of reference texts.
+
+        Unchanged texts are reused from the cache; sources no longer in
+        references are dropped. Saves the cache if anything changed.
+
+        Args:
+            character: Character name
+            references: Source id -> text
+
+        Returns:
+            Number of texts (re-)extracted
+        """
+        profile = self.profiles.setdefault(character, VoiceProfile(character))
+        stale = [source_id for source_id in profile.sources if source_id not in references]
+        for source_id in stale:
+            profile.remove(source_id)
+        extracted = sum(self.add_reference(character, sid, text) for sid, text in references.items())
+        if extracted or stale:
+            logger.info(f"Voice profile '{character}': {extracted} texts extracted, {len(stale)} dropped")
+            self.save()
+        return extracted
+
+    def build_from_manuscript(self, manuscript, character: str) -> int:
+        """Profile a character from the manuscript scenes that carry their voice.
+
+        Scenes count when their metadata names the character as "pov" or
+        lists them in "characters"; if no scene is tagged, scenes whose
+        text mentions the character are used.
+
+        Args:
+            manuscript: Manuscript to read
+            character: Character name
+
+        Returns:
+            Number of scenes (re-)extracted
+        """
+        scenes = [
+            scene
+            for act in manuscript.acts
+            for chapter in act.chapters
+            for scene in chapter.scenes
+            if scene.content
+        ]
+        tagged = [
+            s for s in scenes
+            if s.metadata.get("pov") == character or character in s.metadata.get("characters", [])
+        ]
+        if not tagged:
+            pattern = re.compile(rf"\b{re.escape(character)}\b", re.IGNORECASE)
+            tagged = [s for s in scenes if pattern.search(s.content)]
+        return self.build_profile(character, {s.id: s.content for s in tagged})
+
+    def profile_from_texts(self, texts: Sequence[str], name: str = "<references>") -> VoiceProfile:
+        """Ad-hoc profile of reference texts (not cached).
+
+        Raises:
+            ValueError: If the texts contain no words
+        """
+        chunks = [chunk for text in texts for chunk in chunk_words(text, self.chunk_size)]
+        if not chunks:
+            raise ValueError("Reference texts contain no words")
+        profile = VoiceProfile(name)
+        profile.add("references", extract_batch(chunks))
+        return profile
+
+    def score(self, profile: Union[str, VoiceProfile], texts: Sequence[str]) -> np.ndarray:
+        """Voice-consistency scores (0-100) of texts against a profile.
+
+        Args:
+            profile: Profiled character name, or a VoiceProfile
+            texts: Candidate texts, scored together
+
+        Returns:
+            float array, one score per text
+
+        Raises:
+            KeyError: If the character has no profile
+        """
+        return self._score(self._resolve(profile), extract_batch(texts))
+
+    def deviations(self, profile: Union[str, VoiceProfile], text: str) -> Dict[str, float]:
+        """How far each feature group of a text is from a profile.
+
+        Returns:
+            Group name -> RMS distance in standard deviations
+        """
+        z = self._z(self._resolve(profile), extract_batch([text]))[0]
+        return {
+            name: float(np.sqrt(np.mean(z[GROUP_SLICES[name]] ** 2)))
+            for name, _ in FEATURE_GROUPS
+        }
+
+    def _resolve(self, profile: Union[str, VoiceProfile]) -> VoiceProfile:
+        if isinstance(profile, VoiceProfile):
+            return profile
+        if not self.has_profile(profile):
+            raise KeyError(f"No voice profile for '{profile}'")
+        return self.profiles[profile]
+
+    def _z(self, profile: VoiceProfile, features: np.ndarray) -> np.ndarray:
+        mean, variance = profile.stats()
+        spread = np.sqrt(variance + (self.relative_spread * mean) ** 2 + 1e-6)
+        return np.clip((features - mean) / spread, -6.0, 6.0)
+
+    def _score(self, profile: VoiceProfile, features: np.ndarray) -> np.ndarray:
+        z = self._z(profile, features)
+        distance = np.sqrt((z ** 2) @ _WEIGHTS)
+        return 100.0 * np.exp(-distance / self.scale)
+
+    def save(self) -> None:
+        """Write profiles to the cache file (atomic), if one is set."""
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"profiles": {name: p.to_dict() for name, p in self.profiles.items()}}
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.cache_path.read_text())
+            self.profiles = {
+                name: VoiceProfile.from_dict(p) for name, p in data.get("profiles", {}).items()
+            }
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable voice profile cache {self.cache_path}: {e}")
+            self.profiles = {}
@@ -0,0 +1,417 @@
+"""Lightweight in-process tracing.
+
+Nested spans with monotonic timing, attributes and parent/child links,
+propagated across asyncio tasks with contextvars. Finished spans are handed
+to exporters; no external collector is needed:
+- JsonlExporter: one JSON object per span, appended to a local file
+- ChromeTraceExporter: trace-viewer JSON (chrome://tracing, Perfetto)
+- InMemoryExporter: keeps spans in a list (tests, ad-hoc analysis)
+
+Tracing is off until configured, and a disabled tracer hands out a shared
+no-op span, so instrumented hot paths cost one attribute check.
+
+    from factory.core.tracing import configure_tracing, get_tracer
+
+    configure_tracing(chrome_path="trace.json")
+    with get_tracer().span("scene.generate", scene_id=scene.id) as span:
+        ...
+        span.set_attribute("tokens", 812)
+
+Setting FACTORY_TRACE=<path> enables tracing at import time; paths ending
+in .jsonl use the JSONL exporter, anything else the Chrome exporter.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "factory_current_span", default=None
+)
+
+# Wall-clock anchor so exported monotonic timestamps can be placed in time
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+
+@dataclass
+class Span:
+    """A timed operation.
+
+    Attributes:
+        name: Operation name (dotted, e.g. "agent_pool.execute_single")
+        trace_id: ID shared by all spans of one top-level operation
+        span_id: Unique span ID
+        parent_id: Enclosing span's ID, if any
+        start_ns: perf_counter_ns() at start
+        end_ns: perf_counter_ns() at end (None while running)
+        attributes: Key/value annotations
+        error: Exception description if the span failed
+        thread_id: Thread the span started on
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    thread_id: int = 0
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Span duration in milliseconds."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Annotate the span."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """Annotate the span with several attributes."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for export."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_unix_ns": _EPOCH_NS + self.start_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+            "thread_id": self.thread_id,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    """Context manager that starts, activates and finishes a span."""
+
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self._span
+        span.end_ns = time.perf_counter_ns()
+        if exc is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self._tracer._finish(span)
+
+
+class Exporter:
+    """Receives finished spans."""
+
+    def export(self, span: Span) -> None:
+        """Handle a finished span."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write buffered spans."""
+
+    def close(self) -> None:
+        """Flush and release resources."""
+        self.flush()
+
+
+class InMemoryExporter(Exporter):
+    """Keep finished spans in memory."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def by_name(self, name: str) -> List[Span]:
+        """Finished spans with the given name."""
+        return [s for s in self.spans if s.name == name]
+
+
+class JsonlExporter(Exporter):
+    """Append spans to a JSON-lines file, one object per span."""
+
+    def __init__(self, path: Path, buffer_size: int = 256):
+        """Initialize exporter.
+
+        Args:
+            path: Output file (appended to)
+            buffer_size: Spans buffered before writing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) < self.buffer_size:
+                return
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+    def _write(self, lines: List[str]) -> None:
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+class ChromeTraceExporter(Exporter):
+    """Collect spans as trace-viewer "complete" events.
+
+    The file is rewritten on every flush, so it is always a valid trace
+    that chrome://tracing or ui.perfetto.dev can open. Events are held in
+    a ring buffer, so a long-running process keeps only the most recent
+    max_events.
+    """
+
+    DEFAULT_MAX_EVENTS = 100_000
+
+    def __init__(self, path: Path, max_events: int = DEFAULT_MAX_EVENTS):
+        """Initialize exporter.
+
+        Args:
+            path: Output JSON file
+            max_events: Events kept in memory; the oldest are dropped first
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def export(self, span: Span) -> None:
+        args = dict(span.attributes)
+        args["span_id"] = span.span_id
+        if span.parent_id:
+            args["parent_id"] = span.parent_id
+        if span.error:
+            args["error"] = span.error
+        event = {
+            "name": span.name,
+            "cat": span.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (_EPOCH_NS + span.start_ns) / 1000,
+            "dur": (span.end_ns - span.start_ns) / 1000,
+            "pid": self._pid,
+            # One row per trace keeps concurrent async operations readable
+            "tid": span.trace_id[:8],
+            "args": args,
+        }
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+
+    def flush(self) -> None:
+        with self._lock:
+            document = {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+            if self.dropped:
+                document["otherData"] = {"dropped_events": self.dropped}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(document, f, default=str)
+        tmp.replace(self.path)
+
+
+class Tracer:
+    """Creates spans and dispatches finished ones to exporters."""
+
+    def __init__(self, exporters: Optional[List[Exporter]] = None):
+        """Initialize tracer.
+
+        Args:
+            exporters: Span exporters (tracing is enabled if any are given)
+        """
+        self.exporters: List[Exporter] = list(exporters or [])
+        self.enabled = bool(self.exporters)
+
+    def add_exporter(self, exporter: Exporter) -> None:
+        """Add an exporter and enable tracing."""
+        self.exporters.append(exporter)
+        self.enabled = True
+
+    def span(self, name: str, **attributes: Any):
+        """Start a span as a context manager.
+
+        Args:
+            name: Operation name
+            **attributes: Initial attributes
+
+        Returns:
+            Context manager yielding the Span (or a no-op span when disabled)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid4().hex,
+            span_id=uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.perf_counter_ns(),
+            attributes=attributes,
+            thread_id=threading.get_ident(),
+        )
+        return _ActiveSpan(self, span)
+
+    def _finish(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.debug(f"Span export failed: {e}")
+
+    def flush(self) -> None:
+        """Flush all exporters."""
+        for exporter in self.exporters:
+            exporter.flush()
+
+    def shutdown(self) -> None:
+        """Close all exporters and disable tracing."""
+        self.enabled = False
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    return _tracer
+
+
+def current_span() -> Optional[Span]:
+    """Get the active span in this context, if any."""
+    return _current_span.get()
+
+
+def configure_tracing(
+    jsonl_path: Optional[Path] = None,
+    chrome_path: Optional[Path] = None,
+    exporters: Optional[List[Exporter]] = None
+) -> Tracer:
+    """Enable tracing on the process-wide tracer.
+
+    Replaces any previously configured exporters. Exporters are flushed at
+    interpreter exit.
+
+    Args:
+        jsonl_path: Write spans as JSON lines to this file
+        chrome_path: Write a Chrome trace-viewer file here
+        exporters: Additional exporters
+
+    Returns:
+        The configured tracer
+    """
+    _tracer.shutdown()
+    if jsonl_path is not None:
+        _tracer.add_exporter(JsonlExporter(jsonl_path))
+    if chrome_path is not None:
+        _tracer.add_exporter(ChromeTraceExporter(chrome_path))
+    for exporter in exporters or []:
+        _tracer.add_exporter(exporter)
+    logger.info(f"Tracing enabled with {len(_tracer.exporters)} exporters")
+    return _tracer
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator wrapping a sync or async function in a span.
+
+    Args:
+        name: Span name (defaults to module.qualname)
+        **attributes: Static attributes for every span
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _tracer.enabled:
+                    return await func(*args, **kwargs)
+                with _tracer.span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _tracer.span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+atexit.register(_tracer.flush)
+
+_env_path = os.environ.get("FACTORY_TRACE")
+if _env_path:
+    if _env_path.endswith(".jsonl"):
+        configure_tracing(jsonl_path=Path(_env_path))
+    else:
+        configure_tracing(chrome_path=Path(_env_path))
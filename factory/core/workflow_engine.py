@@ -10,14 +10,24 @@ This module provides a flexible workflow execution system with:
 
 import asyncio
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Set
 from uuid import uuid4
 
+from factory.core.metrics import get_registry
+from factory.core.tracing import get_tracer
+
 logger = logging.getLogger(__name__)
 
+STEP_DURATION = get_registry().histogram(
+    "factory_workflow_step_duration_seconds",
+    "Workflow step duration including retries",
+    ["step", "status"],
+)
+
 
 class WorkflowStatus(Enum):
     """Workflow execution status."""
@@ -103,6 +113,18 @@ class WorkflowStep:
         Raises:
             Exception: If step execution fails after all retries
         """
+        start = time.perf_counter()
+        with get_tracer().span("workflow.step", step=self.name) as span:
+            try:
+                return await self._execute(context)
+            finally:
+                span.set_attributes(status=self.status.value, attempts=self.attempts)
+                STEP_DURATION.labels(self.name, self.status.value).observe(
+                    time.perf_counter() - start
+                )
+
+    async def _execute(self, context: Dict[str, Any]) -> Any:
+        """Run the step with retries (see execute)."""
         self.status = StepStatus.RUNNING
         self.started_at = datetime.now()
         last_error = None
@@ -262,6 +284,13 @@ class WorkflowEngine:
         Returns:
             WorkflowResult containing execution details
         """
+        with get_tracer().span("workflow.run", workflow=workflow.name, parallel=parallel) as span:
+            result = await self._run_workflow(workflow, parallel)
+            span.set_attributes(status=result.status.value, steps=result.steps_total)
+            return result
+
+    async def _run_workflow(self, workflow: Workflow, parallel: bool) -> WorkflowResult:
+        """Execute a workflow (see run_workflow)."""
         self.current_workflow = workflow
         workflow.status = WorkflowStatus.RUNNING
 
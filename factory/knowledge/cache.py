@@ -4,29 +4,63 @@ import hashlib
 import json
 import logging
 import time
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from factory.knowledge.persistent_cache import PersistentCacheStore
 
 logger = logging.getLogger(__name__)
 
 
 class QueryCache:
-    """LRU cache for knowledge query results."""
-
-    def __init__(self, max_size: int = 1000, ttl: int = 3600):
+    """LRU cache for knowledge query results.
+
+    Optionally backed by a PersistentCacheStore. The store is read once to
+    warm memory at startup; afterwards lookups only touch memory and writes
+    are handed to the store's background writer.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: int = 3600,
+        store: Optional["PersistentCacheStore"] = None
+    ):
         """Initialize query cache.
 
         Args:
             max_size: Maximum cache entries
             ttl: Time-to-live in seconds
+            store: Persistent second tier (memory-only if None)
         """
         self.max_size = max_size
         self.ttl = ttl
+        self.store = store
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._access_times: Dict[str, float] = {}
+        self._documents: Dict[str, Tuple[str, ...]] = {}
         self._hits = 0
         self._misses = 0
+
+        if store is not None:
+            self._warm_from_store()
+
         logger.info(f"Initialized query cache (max_size={max_size}, ttl={ttl}s)")
 
+    def _warm_from_store(self) -> None:
+        """Load the store's live entries into memory.
+
+        The store has already purged entries past its own TTL and those
+        invalidated by document changes. Loaded entries start a fresh
+        memory TTL, so results written long before a restart still serve.
+        """
+        now = time.time()
+        for key, value, written_at, documents in self.store.load(self.max_size):
+            self._cache[key] = value
+            self._access_times[key] = now
+            if documents:
+                self._documents[key] = documents
+
     def _hash_query(self, query: str, params: Optional[Dict] = None) -> str:
         """Generate hash key for query.
 
@@ -70,22 +104,50 @@ class QueryCache:
         logger.debug(f"Cache hit for query: {query[:50]}...")
         return self._cache[key]
 
-    def set(self, query: str, result: Any, params: Optional[Dict] = None) -> None:
+    def contains(self, query: str, params: Optional[Dict] = None) -> bool:
+        """Check for a fresh entry without touching hit/miss stats.
+
+        Args:
+            query: Query text
+            params: Additional parameters
+
+        Returns:
+            True if a non-expired entry exists
+        """
+        key = self._hash_query(query, params)
+        return key in self._cache and time.time() - self._access_times[key] <= self.ttl
+
+    def set(
+        self,
+        query: str,
+        result: Any,
+        params: Optional[Dict] = None,
+        documents: Optional[Iterable[str]] = None
+    ) -> None:
         """Cache a query result.
 
         Args:
             query: Query text
             result: Result to cache
             params: Additional parameters
+            documents: Source document IDs the result was derived from
         """
         key = self._hash_query(query, params)
 
         # Evict oldest if at max size
-        if len(self._cache) >= self.max_size:
+        if key not in self._cache and len(self._cache) >= self.max_size:
             self._evict_lru()
 
         self._cache[key] = result
         self._access_times[key] = time.time()
+        documents = tuple(documents or ())
+        if documents:
+            self._documents[key] = documents
+        else:
+            self._documents.pop(key, None)
+
+        if self.store is not None:
+            self.store.put(key, result, documents)
 
         logger.debug(f"Cached result for query: {query[:50]}...")
 
@@ -94,6 +156,7 @@ class QueryCache:
         if key in self._cache:
             del self._cache[key]
             del self._access_times[key]
+            self._documents.pop(key, None)
 
     def _evict_lru(self) -> None:
         """Evict least recently used entry."""
@@ -104,12 +167,46 @@ class QueryCache:
         self._evict(lru_key)
         logger.debug(f"Evicted LRU cache entry: {lru_key[:16]}...")
 
+    def invalidate_documents(self, doc_ids: Iterable[str]) -> int:
+        """Drop entries derived from any of the given source documents.
+
+        Args:
+            doc_ids: Changed or removed document IDs
+
+        Returns:
+            Number of in-memory entries evicted
+        """
+        changed = set(doc_ids)
+        if not changed:
+            return 0
+
+        stale: List[str] = [
+            key for key, documents in self._documents.items()
+            if changed.intersection(documents)
+        ]
+        for key in stale:
+            self._evict(key)
+
+        if self.store is not None:
+            self.store.invalidate_documents(changed)
+
+        logger.info(f"Invalidated {len(stale)} cached queries for {len(changed)} documents")
+        return len(stale)
+
     def clear(self) -> None:
         """Clear all cache entries."""
         self._cache.clear()
         self._access_times.clear()
+        self._documents.clear()
+        if self.store is not None:
+            self.store.clear()
         logger.info("Cleared query cache")
 
+    def close(self) -> None:
+        """Flush and close the persistent store, if any."""
+        if self.store is not None:
+            self.store.close()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         total_requests = self._hits + self._misses
@@ -122,4 +219,5 @@ class QueryCache:
             "misses": self._misses,
             "hit_rate": hit_rate,
             "ttl": self.ttl,
+            "persistent": self.store is not None,
         }
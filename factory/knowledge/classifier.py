@@ -0,0 +1,174 @@
+"""Precompiled keyword classifier for knowledge queries.
+
+Keyword rules are compiled into one regular expression per weight tier,
+so a query is classified with at most one search per tier instead of one
+substring search per keyword. Each rule carries a weight; the
+highest-weight rule that matches anywhere in the query decides the query
+type.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from factory.knowledge.router import QueryType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ClassificationRule:
+    """A weighted keyword rule.
+
+    Attributes:
+        pattern: Lowercase phrase (or regex if regex=True) to look for
+        query_type: Type assigned when the rule matches
+        weight: Priority of the rule; higher weights win
+        regex: Treat pattern as a regular expression instead of a literal
+    """
+
+    pattern: str
+    query_type: QueryType
+    weight: float = 1.0
+    regex: bool = False
+
+
+# Weights reproduce the original precedence: analytical > factual > conceptual
+DEFAULT_RULES: Tuple[ClassificationRule, ...] = (
+    ClassificationRule("why ", QueryType.ANALYTICAL, 3.0),
+    ClassificationRule("analyze", QueryType.ANALYTICAL, 3.0),
+    ClassificationRule("compare", QueryType.ANALYTICAL, 3.0),
+    ClassificationRule("explain why", QueryType.ANALYTICAL, 3.0),
+    ClassificationRule("what is", QueryType.FACTUAL, 2.0),
+    ClassificationRule("who is", QueryType.FACTUAL, 2.0),
+    ClassificationRule("when", QueryType.FACTUAL, 2.0),
+    ClassificationRule("where", QueryType.FACTUAL, 2.0),
+    ClassificationRule("relationship", QueryType.CONCEPTUAL, 1.0),
+    ClassificationRule("connect", QueryType.CONCEPTUAL, 1.0),
+    ClassificationRule("related", QueryType.CONCEPTUAL, 1.0),
+)
+
+
+class QueryClassifier:
+    """Classify queries with one precompiled pattern per weight tier.
+
+    Rules of equal weight are joined into a single alternation. Tiers are
+    searched from the highest weight down and the first tier that matches
+    decides, so each tier is scanned at most once. Only tiers mixing
+    several query types put their rules in named groups, to map a match
+    back to its rule.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Iterable[ClassificationRule]] = None,
+        default: QueryType = QueryType.GENERAL
+    ):
+        """Initialize classifier.
+
+        Args:
+            rules: Weighted rules (defaults to DEFAULT_RULES)
+            default: Type returned when no rule matches
+        """
+        self.rules: List[ClassificationRule] = list(rules if rules is not None else DEFAULT_RULES)
+        self.default = default
+        self._compile()
+
+    def _compile(self) -> None:
+        """Build one pattern per weight tier, highest weight first.
+
+        Each tier is (pattern, query_type, group_types): a tier whose rules
+        share a query type has no groups and group_types is None; otherwise
+        group_types maps each rule's group name to its query type.
+        """
+        tiers: Dict[float, List[ClassificationRule]] = {}
+        for rule in self.rules:
+            tiers.setdefault(rule.weight, []).append(rule)
+
+        self._tiers: List[Tuple[re.Pattern, QueryType, Optional[Dict[str, QueryType]]]] = []
+        for index, weight in enumerate(sorted(tiers, reverse=True)):
+            # Longer patterns first so they win when rules match at the same position
+            rules = sorted(tiers[weight], key=lambda r: -len(r.pattern))
+            bodies = [r.pattern if r.regex else re.escape(r.pattern.lower()) for r in rules]
+            if len({r.query_type for r in rules}) == 1:
+                pattern = re.compile("|".join(f"(?:{body})" for body in bodies))
+                self._tiers.append((pattern, rules[0].query_type, None))
+                continue
+            group_types = {}
+            alternatives = []
+            for number, (rule, body) in enumerate(zip(rules, bodies)):
+                name = f"_tier{index}_rule{number}"
+                group_types[name] = rule.query_type
+                alternatives.append(f"(?P<{name}>{body})")
+            self._tiers.append((re.compile("|".join(alternatives)), rules[0].query_type, group_types))
+
+        logger.debug(f"Compiled query classifier with {len(self.rules)} rules in {len(self._tiers)} tiers")
+
+    def add_rule(self, rule: ClassificationRule) -> None:
+        """Add a rule and recompile.
+
+        Args:
+            rule: Rule to add
+        """
+        self.rules.append(rule)
+        self._compile()
+
+    def classify(self, query: str) -> QueryType:
+        """Classify a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            QueryType of the highest-weight matching rule, or the default
+        """
+        text = query.lower()
+        for pattern, query_type, group_types in self._tiers:
+            match = pattern.search(text)
+            if match is not None:
+                if group_types is None:
+                    return query_type
+                # The rule's group wraps any groups inside it, so it closes last
+                return group_types[match.lastgroup]
+        return self.default
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "QueryClassifier":
+        """Create classifier from a settings block.
+
+        Expected shape (all keys optional)::
+
+            query_classifier:
+              include_defaults: true
+              default: general
+              rules:
+                - pattern: "motivation"
+                  type: analytical
+                  weight: 3.0
+                - pattern: "\\\\bhow many\\\\b"
+                  type: factual
+                  weight: 2.5
+                  regex: true
+
+        Args:
+            config: Classifier settings dictionary
+
+        Returns:
+            Configured QueryClassifier
+
+        Raises:
+            ValueError: If a rule names an unknown query type
+        """
+        config = config or {}
+        rules = list(DEFAULT_RULES) if config.get("include_defaults", True) else []
+
+        for entry in config.get("rules", []):
+            rules.append(ClassificationRule(
+                pattern=entry["pattern"],
+                query_type=QueryType(entry["type"]),
+                weight=float(entry.get("weight", 1.0)),
+                regex=bool(entry.get("regex", False)),
+            ))
+
+        return cls(rules, default=QueryType(config.get("default", QueryType.GENERAL.value)))
@@ -0,0 +1,369 @@
+"""SQLite-backed second tier for the knowledge query cache.
+
+Keeps knowledge query results across restarts of the webapp and TUI:
+- Entries persisted under .factory/knowledge/ in a single SQLite file
+- TTL expiry plus entry-count and byte-size caps (least recently written first)
+- Invalidation of entries whose referenced source documents changed
+- Write-behind on a background thread so callers never wait on disk
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    written_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_documents (
+    key TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    PRIMARY KEY (key, doc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_entry_documents_doc ON entry_documents(doc_id);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    doc_hash TEXT NOT NULL
+);
+"""
+
+_STOP = object()
+
+
+def hash_documents(
+    root: Path,
+    patterns: Sequence[str] = ("*.md", "*.txt")
+) -> Dict[str, str]:
+    """Hash project documents for cache invalidation.
+
+    Args:
+        root: Project directory to scan recursively
+        patterns: Glob patterns for source documents
+
+    Returns:
+        Mapping of relative POSIX path to SHA-256 hex digest
+    """
+    root = Path(root)
+    hashes: Dict[str, str] = {}
+    for pattern in patterns:
+        for path in root.rglob(pattern):
+            rel = path.relative_to(root)
+            if not path.is_file() or any(part.startswith(".") for part in rel.parts):
+                continue
+            try:
+                hashes[rel.as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError as e:
+                logger.debug(f"Cannot hash {path}: {e}")
+    return hashes
+
+
+class PersistentCacheStore:
+    """Disk tier for QueryCache.
+
+    Reads happen once, when the in-memory cache warms itself at startup.
+    Writes are queued and applied in batches by a background thread, so
+    QueryCache.set() only touches memory.
+    """
+
+    DEFAULT_FILENAME = "query_cache.db"
+
+    def __init__(
+        self,
+        db_path: Path,
+        ttl: int = 7 * 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = 50 * 1024 * 1024,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads,
+        flush_interval: float = 0.5
+    ):
+        """Initialize persistent store.
+
+        Args:
+            db_path: SQLite file path (parent directories are created)
+            ttl: Seconds an entry stays valid on disk
+            max_entries: Maximum entries kept on disk
+            max_bytes: Maximum total size of serialized values
+            encode: Serialize a cached value to text
+            decode: Deserialize text back to a cached value
+            flush_interval: Seconds the writer waits to batch more writes
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.encode = encode
+        self.decode = decode
+        self.flush_interval = flush_interval
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            name="knowledge-cache-writer",
+            daemon=True
+        )
+        self._writer.start()
+
+        logger.info(f"Opened persistent query cache at {self.db_path}")
+
+    @classmethod
+    def for_project(cls, project_path: Path, **kwargs) -> "PersistentCacheStore":
+        """Open the store at <project>/.factory/knowledge/query_cache.db.
+
+        Args:
+            project_path: Project root
+            **kwargs: Passed to the constructor
+
+        Returns:
+            PersistentCacheStore for the project
+        """
+        return cls(Path(project_path) / ".factory" / "knowledge" / cls.DEFAULT_FILENAME, **kwargs)
+
+    # Startup (synchronous, called before the hot path starts)
+
+    def load(self, limit: int) -> List[Tuple[str, Any, float, Tuple[str, ...]]]:
+        """Load the most recently written valid entries.
+
+        Expired entries are purged first.
+
+        Args:
+            limit: Maximum entries to load
+
+        Returns:
+            List of (key, value, written_at, referenced doc ids)
+        """
+        self._purge_expired()
+
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT key, value, written_at FROM entries ORDER BY written_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+            doc_rows = self._conn.execute("SELECT key, doc_id FROM entry_documents").fetchall()
+
+        documents: Dict[str, List[str]] = {}
+        for key, doc_id in doc_rows:
+            documents.setdefault(key, []).append(doc_id)
+
+        loaded = []
+        for key, value, written_at in rows:
+            try:
+                loaded.append((key, self.decode(value), written_at, tuple(documents.get(key, ()))))
+            except Exception as e:
+                logger.warning(f"Dropping undecodable cache entry {key[:16]}: {e}")
+                self.delete(key)
+
+        logger.info(f"Loaded {len(loaded)} persisted knowledge query results")
+        return loaded
+
+    def sync_documents(self, current: Dict[str, str]) -> List[str]:
+        """Record current document hashes and drop entries for changed ones.
+
+        Args:
+            current: Mapping of doc id to content hash for all source documents
+
+        Returns:
+            IDs of documents that changed or disappeared since last sync
+        """
+        with self._db_lock:
+            previous = dict(self._conn.execute("SELECT doc_id, doc_hash FROM documents").fetchall())
+
+        changed = [
+            doc_id for doc_id, doc_hash in previous.items()
+            if current.get(doc_id) != doc_hash
+        ]
+
+        with self._db_lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.executemany(
+                "INSERT INTO documents (doc_id, doc_hash) VALUES (?, ?)",
+                list(current.items())
+            )
+        if changed:
+            self._delete_for_documents(changed)
+            logger.info(f"Invalidated cached queries for {len(changed)} changed documents")
+        return changed
+
+    # Write-behind (non-blocking)
+
+    def put(self, key: str, value: Any, documents: Iterable[str] = ()) -> None:
+        """Queue an entry to be written.
+
+        Args:
+            key: Cache key
+            value: Value to persist (must be encodable)
+            documents: Source document IDs the value depends on
+        """
+        if not self._closed:
+            self._queue.put(("put", key, value, tuple(documents), time.time()))
+
+    def delete(self, key: str) -> None:
+        """Queue an entry for deletion.
+
+        Args:
+            key: Cache key
+        """
+        if not self._closed:
+            self._queue.put(("delete", key))
+
+    def invalidate_documents(self, doc_ids: Iterable[str]) -> None:
+        """Queue deletion of entries that reference any of the documents.
+
+        Args:
+            doc_ids: Changed document IDs
+        """
+        if not self._closed:
+            self._queue.put(("invalidate", tuple(doc_ids)))
+
+    def clear(self) -> None:
+        """Queue deletion of all entries."""
+        if not self._closed:
+            self._queue.put(("clear",))
+
+    def flush(self) -> None:
+        """Block until all queued writes have been applied."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        with self._db_lock:
+            self._conn.close()
+        logger.info("Closed persistent query cache")
+
+    def count(self) -> int:
+        """Number of entries on disk (after applying queued writes)."""
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # Writer thread
+
+    def _write_loop(self) -> None:
+        """Apply queued operations in batches until stopped."""
+        while True:
+            op = self._queue.get()
+            batch = [op]
+            # Give bursts of writes a moment to accumulate into one transaction
+            deadline = time.monotonic() + self.flush_interval
+            while op is not _STOP:
+                try:
+                    op = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                batch.append(op)
+
+            try:
+                self._apply(op for op in batch if op is not _STOP)
+            except Exception as e:
+                logger.error(f"Persistent cache write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def _apply(self, ops: Iterable[tuple]) -> None:
+        """Apply a batch of operations in one transaction."""
+        with self._db_lock, self._conn:
+            for op in ops:
+                kind = op[0]
+                if kind == "put":
+                    _, key, value, documents, written_at = op
+                    try:
+                        encoded = self.encode(value)
+                    except Exception as e:
+                        logger.debug(f"Not persisting unencodable value for {key[:16]}: {e}")
+                        continue
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, value, written_at, size) VALUES (?, ?, ?, ?)",
+                        (key, encoded, written_at, len(encoded))
+                    )
+                    self._conn.execute("DELETE FROM entry_documents WHERE key = ?", (key,))
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO entry_documents (key, doc_id) VALUES (?, ?)",
+                        [(key, doc_id) for doc_id in documents]
+                    )
+                elif kind == "delete":
+                    self._delete_keys([op[1]])
+                elif kind == "invalidate":
+                    self._delete_for_documents_locked(op[1])
+                elif kind == "clear":
+                    self._conn.execute("DELETE FROM entries")
+                    self._conn.execute("DELETE FROM entry_documents")
+            self._enforce_caps()
+
+    def _enforce_caps(self) -> None:
+        """Drop the oldest entries beyond the count and byte caps (lock held)."""
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        excess: List[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY written_at ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            excess.append(key)
+            count -= 1
+            total -= size
+        self._delete_keys(excess)
+        logger.debug(f"Evicted {len(excess)} persisted cache entries over size cap")
+
+    def _delete_keys(self, keys: List[str]) -> None:
+        """Delete entries and their document links (lock held)."""
+        rows = [(key,) for key in keys]
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", rows)
+        self._conn.executemany("DELETE FROM entry_documents WHERE key = ?", rows)
+
+    def _delete_for_documents(self, doc_ids: Sequence[str]) -> None:
+        """Delete entries referencing documents (acquires lock)."""
+        with self._db_lock, self._conn:
+            self._delete_for_documents_locked(doc_ids)
+
+    def _delete_for_documents_locked(self, doc_ids: Sequence[str]) -> None:
+        """Delete entries referencing documents (lock held)."""
+        keys = set()
+        for doc_id in doc_ids:
+            keys.update(
+                row[0] for row in self._conn.execute(
+                    "SELECT key FROM entry_documents WHERE doc_id = ?", (doc_id,)
+                )
+            )
+        self._delete_keys(list(keys))
+
+    def _purge_expired(self) -> None:
+        """Delete entries older than the TTL."""
+        cutoff = time.time() - self.ttl
+        with self._db_lock, self._conn:
+            keys = [
+                row[0] for row in self._conn.execute(
+                    "SELECT key FROM entries WHERE written_at < ?", (cutoff,)
+                )
+            ]
+            self._delete_keys(keys)
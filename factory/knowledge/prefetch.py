@@ -0,0 +1,309 @@
+"""Predictive knowledge-context prefetch for scene workflows.
+
+When a writer opens a scene, the knowledge queries the scene workflows
+will issue (characters, voice requirements, location, outline context)
+are predictable. The prefetcher extracts those entities from the scene
+text and warms the router's cache in the background so that generation
+and enhancement don't wait on retrieval.
+
+SceneGenerationWorkflow builds its queries with the same function,
+scene_context_queries(), so prefetched queries and workflow queries are
+identical strings (and cache keys) for the same outline and characters.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_FIELD_PATTERN = re.compile(
+    r"^\s*(pov|location|setting|characters?)\s*:\s*(.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE
+)
+_NAME_PATTERN = re.compile(r"\b[A-Z][a-z]{2,}\b")
+
+# Capitalized words that are almost never character names
+_NOT_NAMES = {
+    "The", "And", "But", "She", "Her", "Hers", "His", "Him", "They", "Them", "Their",
+    "This", "That", "These", "Those", "Then", "There", "When", "Where", "What", "Who",
+    "Why", "How", "Its", "Our", "Your", "You", "Yes", "Not", "For", "With", "From",
+    "After", "Before", "Scene", "Chapter", "Act", "Location", "Setting", "Characters",
+    "Character", "Pov", "Notes", "Outline", "Generate", "Mon", "Monday", "Tuesday",
+    "Wednesday", "Thursday", "Friday", "Saturday", "Sunday", "January", "February",
+    "March", "April", "May", "June", "July", "August", "September", "October",
+    "November", "December",
+}
+
+SCENE_SUFFIXES = (".md", ".txt")
+
+# Outline context, lead character profile + voice, location, next character
+DEFAULT_MAX_CONTEXT_QUERIES = 6
+
+
+@dataclass
+class SceneEntities:
+    """Entities extracted from a scene or outline."""
+
+    characters: List[str] = field(default_factory=list)
+    pov: Optional[str] = None
+    location: Optional[str] = None
+
+
+def voice_requirements_query(character: str) -> str:
+    """Query used to fetch a character's voice requirements."""
+    return f"What are the voice requirements for {character}?"
+
+
+def character_query(character: str) -> str:
+    """Query used to fetch a character profile."""
+    return f"Who is {character}?"
+
+
+def location_query(location: str) -> str:
+    """Query used to fetch setting details."""
+    return f"What is {location} like?"
+
+
+def outline_context_query(outline: str) -> str:
+    """Query used to fetch general context for an outline."""
+    return f"Provide context for: {outline[:100]}"
+
+
+def extract_scene_entities(
+    text: str,
+    known_characters: Optional[Iterable[str]] = None,
+    max_characters: int = 5
+) -> SceneEntities:
+    """Extract characters, POV and location from scene or outline text.
+
+    Explicit ``POV:``, ``Location:``/``Setting:`` and ``Characters:`` lines
+    take precedence. Otherwise known character names are matched, falling
+    back to frequently capitalized words.
+
+    Args:
+        text: Scene or outline text
+        known_characters: Character names from the story bible, if known
+        max_characters: Maximum characters to return
+
+    Returns:
+        SceneEntities with characters ordered by relevance
+    """
+    entities = SceneEntities()
+    characters: List[str] = []
+
+    for match in _FIELD_PATTERN.finditer(text):
+        key, value = match.group(1).lower(), match.group(2)
+        if key == "pov":
+            entities.pov = value
+            characters.insert(0, value)
+        elif key in ("location", "setting"):
+            entities.location = entities.location or value
+        else:
+            characters.extend(name.strip() for name in value.split(",") if name.strip())
+
+    if known_characters:
+        lowered = text.lower()
+        characters.extend(name for name in known_characters if name.lower() in lowered)
+    else:
+        counts: dict = {}
+        for name in _NAME_PATTERN.findall(text):
+            if name not in _NOT_NAMES:
+                counts[name] = counts.get(name, 0) + 1
+        characters.extend(sorted(counts, key=lambda n: -counts[n]))
+
+    entities.characters = list(dict.fromkeys(characters))[:max_characters]
+    return entities
+
+
+def build_context_queries(
+    entities: SceneEntities,
+    outline: Optional[str] = None,
+    max_queries: Optional[int] = None
+) -> List[str]:
+    """Build the knowledge queries a scene workflow will issue.
+
+    Queries are ordered by usefulness so a cap drops the least important:
+    outline context, the lead character's profile and voice, the location,
+    then the remaining characters.
+
+    Args:
+        entities: Extracted scene entities
+        outline: Outline text for the general context query
+        max_queries: Maximum queries to return (None = all)
+
+    Returns:
+        Ordered, de-duplicated list of queries
+    """
+    queries: List[str] = []
+    if outline:
+        queries.append(outline_context_query(outline))
+    for index, character in enumerate(entities.characters):
+        queries.append(character_query(character))
+        queries.append(voice_requirements_query(character))
+        if index == 0 and entities.location:
+            queries.append(location_query(entities.location))
+    if entities.location and not entities.characters:
+        queries.append(location_query(entities.location))
+    queries = list(dict.fromkeys(queries))
+    return queries if max_queries is None else queries[:max_queries]
+
+
+def scene_context_queries(
+    outline: str,
+    known_characters: Optional[Iterable[str]] = None,
+    max_queries: Optional[int] = DEFAULT_MAX_CONTEXT_QUERIES
+) -> List[str]:
+    """Knowledge queries for generating a scene from an outline.
+
+    SceneGenerationWorkflow and KnowledgePrefetcher both call this, so given
+    the same outline and character list they produce the same queries (and
+    therefore the same cache keys).
+
+    Args:
+        outline: Scene outline or scaffold text
+        known_characters: Character names from the story bible, if known
+        max_queries: Maximum queries to return (None = all)
+
+    Returns:
+        Ordered list of queries
+    """
+    entities = extract_scene_entities(outline, list(known_characters or []) or None)
+    return build_context_queries(entities, outline=outline, max_queries=max_queries)
+
+
+class KnowledgePrefetcher:
+    """Warm the knowledge cache for the scene a writer is working on.
+
+    Only one scene is prefetched at a time: opening another scene cancels
+    the previous prefetch. Queries run through the router's background
+    path, which uses low concurrency and waits for foreground queries to
+    finish before dispatching each lookup.
+    """
+
+    def __init__(
+        self,
+        knowledge_router: Any,
+        max_concurrency: int = 2,
+        known_characters: Optional[Iterable[str]] = None,
+        max_queries: Optional[int] = DEFAULT_MAX_CONTEXT_QUERIES
+    ):
+        """Initialize prefetcher.
+
+        Args:
+            knowledge_router: KnowledgeRouter whose cache to warm
+            max_concurrency: Maximum prefetch queries in flight
+            known_characters: Character names to look for; pass the same
+                list to SceneGenerationWorkflow so the queries match
+            max_queries: Query cap; must match the workflow's
+                max_context_queries
+        """
+        self.knowledge_router = knowledge_router
+        self.max_concurrency = max_concurrency
+        self.known_characters = list(known_characters or [])
+        self.max_queries = max_queries
+        self.current_scene: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._project_path: Optional[Path] = None
+
+    def attach(self, session: Any) -> None:
+        """Prefetch whenever the session opens a scene file.
+
+        Args:
+            session: Session to listen to
+        """
+        self._project_path = session.project_path
+        session.add_open_file_listener(self._on_file_opened)
+
+    def _on_file_opened(self, path: str) -> None:
+        """Session listener: schedule prefetch for an opened scene file."""
+        if not path.lower().endswith(SCENE_SUFFIXES) or path == self.current_scene:
+            return
+
+        file_path = Path(path)
+        if not file_path.is_absolute() and self._project_path is not None:
+            file_path = self._project_path / file_path
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("No running event loop; skipping prefetch")
+            return
+
+        self._start(path, self._read_and_prefetch(file_path))
+
+    async def _read_and_prefetch(self, file_path: Path) -> List[str]:
+        """Read a scene file off the event loop and prefetch its context.
+
+        The file content is treated as the outline that will be generated
+        from.
+        """
+        try:
+            text = await asyncio.to_thread(file_path.read_text, encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            logger.debug(f"Cannot read scene for prefetch {file_path}: {e}")
+            return []
+        return await self._prefetch(text)
+
+    def prefetch_scene(self, scene_id: str, outline: str) -> asyncio.Task:
+        """Start prefetching context for a scene, cancelling any previous one.
+
+        Args:
+            scene_id: Identifier of the scene (path or Scene.id)
+            outline: Outline that will be passed to SceneGenerationWorkflow
+
+        Returns:
+            Background task resolving to the list of warmed queries
+        """
+        return self._start(scene_id, self._prefetch(outline))
+
+    def _start(self, scene_id: str, coro: Any) -> asyncio.Task:
+        """Cancel the running prefetch and start a new one."""
+        self.cancel()
+        self.current_scene = scene_id
+        self._task = asyncio.create_task(coro)
+        self._task.add_done_callback(self._finished)
+        logger.debug(f"Prefetching knowledge context for {scene_id}")
+        return self._task
+
+    async def _prefetch(self, outline: str) -> List[str]:
+        """Warm the cache with the queries predicted for a scene."""
+        queries = [
+            q for q in scene_context_queries(outline, self.known_characters, self.max_queries)
+            if not self.knowledge_router.is_cached(q)
+        ]
+        if not queries:
+            return []
+
+        await self.knowledge_router.query_many(
+            queries,
+            max_concurrency=self.max_concurrency,
+            return_exceptions=True,
+            background=True
+        )
+        logger.info(f"Prefetched {len(queries)} knowledge queries for {self.current_scene}")
+        return queries
+
+    def cancel(self) -> None:
+        """Cancel the in-flight prefetch, if any."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            logger.debug(f"Cancelled prefetch for {self.current_scene}")
+        self._task = None
+        self.current_scene = None
+
+    def _finished(self, task: asyncio.Task) -> None:
+        """Forget a finished prefetch and log unexpected failures.
+
+        Clearing current_scene lets a reopened scene (edited since, or
+        whose cached context expired) be prefetched again; only a scene
+        whose prefetch is still running is skipped.
+        """
+        if task is self._task:
+            self._task = None
+            self.current_scene = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Knowledge prefetch failed: {task.exception()}")
@@ -9,11 +9,19 @@ not a user-facing option. Users just "ask questions" and the system
 routes intelligently.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from factory.core.tracing import get_tracer
+
+if TYPE_CHECKING:
+    from factory.knowledge.cache import QueryCache
+    from factory.knowledge.classifier import QueryClassifier
+    from factory.knowledge.vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +49,27 @@ class QueryResult:
     references: List[str]
     metadata: Dict[str, Any]
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "source": self.source.value,
+            "answer": self.answer,
+            "confidence": self.confidence,
+            "references": list(self.references),
+            "metadata": self.metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryResult":
+        """Create from dictionary."""
+        return cls(
+            source=KnowledgeSource(data["source"]),
+            answer=data["answer"],
+            confidence=data["confidence"],
+            references=list(data.get("references", [])),
+            metadata=data.get("metadata", {}),
+        )
+
 
 class KnowledgeRouter:
     """Routes knowledge queries to appropriate system.
@@ -57,7 +86,11 @@ class KnowledgeRouter:
         project_path: Optional[Path] = None,
         notebooklm_enabled: bool = False,
         notebooklm_notebook_id: Optional[str] = None,
-        enable_caching: bool = True
+        enable_caching: bool = True,
+        vector_index: Optional["VectorIndex"] = None,
+        classifier: Optional["QueryClassifier"] = None,
+        cache: Optional["QueryCache"] = None,
+        persistent_cache: Optional[Dict[str, Any]] = None
     ):
         """Initialize knowledge router.
 
@@ -66,40 +99,111 @@ class KnowledgeRouter:
             notebooklm_enabled: Whether NotebookLM is configured
             notebooklm_notebook_id: NotebookLM notebook ID if enabled
             enable_caching: Enable query result caching
+            vector_index: Local vector index for conceptual queries
+            classifier: Query classifier (defaults to built-in keyword rules)
+            cache: Query result cache (created when caching is enabled)
+            persistent_cache: Settings for the on-disk cache tier under
+                <project>/.factory/knowledge/ (memory-only if None or no project)
         """
+        from factory.knowledge.cache import QueryCache
+        from factory.knowledge.classifier import QueryClassifier
+
         self.project_path = project_path
         self.notebooklm_enabled = notebooklm_enabled
         self.notebooklm_notebook_id = notebooklm_notebook_id
         self.enable_caching = enable_caching
+        self.vector_index = vector_index
+        self.classifier = classifier or QueryClassifier()
+        if cache is None and enable_caching:
+            if persistent_cache is not None and persistent_cache.get("enabled", True) and project_path:
+                cache = self._open_persistent_cache(persistent_cache)
+            else:
+                cache = QueryCache()
+        self.cache = cache
+
+        # Foreground queries in flight; background work waits for zero
+        self._foreground = 0
+        self._idle: Optional[asyncio.Event] = None
 
         # Initialize systems (mock for now - real integrations in future)
         self._systems = {}
         logger.info(f"Initialized knowledge router (NotebookLM: {notebooklm_enabled})")
 
-    def classify_query(self, query: str) -> QueryType:
-        """Classify query type.
+    def _open_persistent_cache(self, settings: Dict[str, Any]) -> "QueryCache":
+        """Create a QueryCache backed by the project's on-disk store.
+
+        Entries whose source documents changed since the last run are
+        invalidated before memory is warmed.
 
         Args:
-            query: Query text
+            settings: Persistent cache settings block
 
         Returns:
-            QueryType classification
+            Warmed QueryCache
         """
-        query_lower = query.lower()
+        import json
+
+        from factory.knowledge.cache import QueryCache
+        from factory.knowledge.persistent_cache import PersistentCacheStore
+
+        store = PersistentCacheStore.for_project(
+            self.project_path,
+            ttl=settings.get("ttl", 7 * 24 * 3600),
+            max_entries=settings.get("max_entries", 10000),
+            max_bytes=settings.get("max_bytes", 50 * 1024 * 1024),
+            encode=lambda result: json.dumps(result.to_dict()),
+            decode=lambda text: QueryResult.from_dict(json.loads(text)),
+        )
+        store.sync_documents(self.document_hashes())
+        return QueryCache(
+            max_size=settings.get("memory_entries", 1000),
+            ttl=settings.get("memory_ttl", 3600),
+            store=store
+        )
 
-        # Analytical queries (check first - most specific)
-        if any(word in query_lower for word in ["why ", "analyze", "compare", "explain why"]):
-            return QueryType.ANALYTICAL
+    def document_hashes(self) -> Dict[str, str]:
+        """Content hashes of the project's source documents.
 
-        # Factual queries
-        if any(word in query_lower for word in ["what is", "who is", "when", "where"]):
-            return QueryType.FACTUAL
+        Returns:
+            Mapping of document ID to SHA-256 digest
+        """
+        from factory.knowledge.persistent_cache import hash_documents
+
+        hashes = hash_documents(self.project_path) if self.project_path else {}
+        if self.vector_index is not None:
+            for doc_id in self.vector_index.documents:
+                hashes[doc_id] = self.vector_index.document_hash(doc_id)
+        return hashes
 
-        # Conceptual queries
-        if any(word in query_lower for word in ["relationship", "connect", "related"]):
-            return QueryType.CONCEPTUAL
+    def sync_documents(self) -> List[str]:
+        """Invalidate cached results whose source documents changed.
 
-        return QueryType.GENERAL
+        Call after editing or re-indexing project documents.
+
+        Returns:
+            IDs of documents that changed since the last sync
+        """
+        if self.cache is None or self.cache.store is None:
+            return []
+        changed = self.cache.store.sync_documents(self.document_hashes())
+        self.cache.invalidate_documents(changed)
+        return changed
+
+    def close(self) -> None:
+        """Flush and close the persistent cache, if any."""
+        if self.cache is not None:
+            self.cache.close()
+
+    def classify_query(self, query: str) -> QueryType:
+        """Classify query type in a single precompiled pass.
+
+        Args:
+            query: Query text
+
+        Returns:
+            QueryType classification
+        """
+        return self.classifier.classify(query)
 
     def route_query(self, query: str) -> KnowledgeSource:
         """Determine which knowledge source to use.
@@ -111,16 +215,26 @@ class KnowledgeRouter:
             Recommended knowledge source
         """
         query_type = self.classify_query(query)
+        source = self._source_for_type(query_type)
+        logger.debug(f"Routing {query_type.value} query to {source.value}: {query[:50]}")
+        return source
+
+    def _source_for_type(self, query_type: QueryType) -> KnowledgeSource:
+        """Map a query type to its knowledge source.
 
+        Args:
+            query_type: Classified query type
+
+        Returns:
+            Knowledge source to use
+        """
         # Analytical queries go to NotebookLM if enabled
         if query_type == QueryType.ANALYTICAL and self.notebooklm_enabled:
-            logger.debug(f"Routing analytical query to NotebookLM: {query[:50]}")
             return KnowledgeSource.NOTEBOOKLM
 
         # All other queries go to Cognee (local semantic graph)
         # Note: Cognee may use Gemini File Search internally, but that's
         # an implementation detail hidden from users
-        logger.debug(f"Routing {query_type.value} query to Cognee: {query[:50]}")
         return KnowledgeSource.COGNEE
 
     async def query(
@@ -139,18 +253,221 @@ class KnowledgeRouter:
         Returns:
             QueryResult with answer and metadata
         """
-        # Determine source
-        if force_source:
-            source = KnowledgeSource(force_source)
-        else:
-            source = self.route_query(query)
+        with get_tracer().span("knowledge.query", query_chars=len(query)) as span:
+            # Determine source
+            if force_source:
+                source = KnowledgeSource(force_source)
+            else:
+                source = self.route_query(query)
+            span.set_attribute("source", source.value)
+
+            cached = self._cache_get(query, source, max_results)
+            span.set_attribute("cached", cached is not None)
+            if cached is not None:
+                return cached
+
+            logger.info(f"Routing query to {source.value}: {query[:50]}...")
+
+            self._begin_foreground()
+            try:
+                result = await self._query_with_fallback(source, query, max_results)
+            finally:
+                self._end_foreground()
+
+            self._cache_set(query, source, max_results, result)
+            return result
 
-        logger.info(f"Routing query to {source.value}: {query[:50]}...")
+    async def query_many(
+        self,
+        queries: List[str],
+        max_results: int = 5,
+        max_concurrency: int = 4,
+        return_exceptions: bool = False,
+        background: bool = False
+    ) -> List[Any]:
+        """Execute several knowledge queries concurrently.
+
+        Queries are classified once, duplicates are executed only once,
+        and conceptual queries answered by the local vector index are
+        scored together in a single batched search. Remaining queries are
+        dispatched in parallel with bounded concurrency.
+
+        Args:
+            queries: Query texts
+            max_results: Maximum results per query
+            max_concurrency: Maximum queries in flight at once
+            return_exceptions: Return failures in place instead of raising
+            background: Run at low priority, yielding to foreground queries
+
+        Returns:
+            One QueryResult (or exception) per query, in input order
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
 
-        # Execute query (mock implementation)
+        if not background:
+            self._begin_foreground()
         try:
-            result = await self._execute_query(source, query, max_results)
-            return result
+            results = await self._query_many(queries, max_results, max_concurrency, background)
+        finally:
+            if not background:
+                self._end_foreground()
+
+        ordered = [results[query] for query in queries]
+        if not return_exceptions:
+            for outcome in ordered:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+        return ordered
+
+    async def _query_many(
+        self,
+        queries: List[str],
+        max_results: int,
+        max_concurrency: int,
+        background: bool
+    ) -> Dict[str, Any]:
+        """Resolve unique queries from cache, vector batch and sources.
+
+        Returns:
+            Mapping of query text to QueryResult or exception
+        """
+        unique = list(dict.fromkeys(queries))
+        results: Dict[str, Any] = {}
+
+        # Batch conceptual queries into one vector index call
+        dispatch: List[tuple] = []
+        vector_batch: List[str] = []
+        use_vectors = self.vector_index is not None and len(self.vector_index) > 0
+        for query in unique:
+            query_type = self.classify_query(query)
+            source = self._source_for_type(query_type)
+            cached = self._cache_get(query, source, max_results)
+            if cached is not None:
+                results[query] = cached
+            elif use_vectors and source == KnowledgeSource.COGNEE and query_type == QueryType.CONCEPTUAL:
+                vector_batch.append(query)
+            else:
+                dispatch.append((query, source))
+
+        if vector_batch:
+            logger.debug(f"Batching {len(vector_batch)} queries into one vector search")
+            try:
+                hits = self.vector_index.search_many(vector_batch, top_k=max_results)
+                for query, query_hits in zip(vector_batch, hits):
+                    results[query] = self._vector_hits_to_result(query, query_hits)
+                    self._cache_set(query, KnowledgeSource.COGNEE, max_results, results[query])
+            except Exception as e:
+                logger.error(f"Batched vector search failed: {e}")
+                dispatch.extend((query, KnowledgeSource.COGNEE) for query in vector_batch)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(query: str, source: KnowledgeSource) -> QueryResult:
+            async with semaphore:
+                if background:
+                    await self.wait_until_idle()
+                result = await self._query_with_fallback(source, query, max_results)
+                self._cache_set(query, source, max_results, result)
+                return result
+
+        outcomes = await asyncio.gather(
+            *(run(query, source) for query, source in dispatch),
+            return_exceptions=True
+        )
+        for (query, _), outcome in zip(dispatch, outcomes):
+            results[query] = outcome
+
+        logger.info(
+            f"Executed {len(queries)} queries ({len(unique)} unique, "
+            f"{len(unique) - len(dispatch) - len(vector_batch)} cached, "
+            f"{len(vector_batch)} batched)"
+        )
+        return results
+
+    def is_cached(self, query: str, max_results: int = 5) -> bool:
+        """Check whether a query's result is already cached.
+
+        Args:
+            query: Query text
+            max_results: Maximum results the query would request
+
+        Returns:
+            True if a fresh cached result exists
+        """
+        if self.cache is None:
+            return False
+        return self.cache.contains(query, self._cache_params(self.route_query(query), max_results))
+
+    async def wait_until_idle(self) -> None:
+        """Wait until no foreground queries are in flight."""
+        if self._foreground == 0:
+            return
+        if self._idle is None:
+            self._idle = asyncio.Event()
+        await self._idle.wait()
+
+    def _begin_foreground(self) -> None:
+        """Mark a foreground query as started."""
+        self._foreground += 1
+        if self._idle is not None:
+            self._idle.clear()
+
+    def _end_foreground(self) -> None:
+        """Mark a foreground query as finished."""
+        self._foreground -= 1
+        if self._foreground == 0 and self._idle is not None:
+            self._idle.set()
+
+    def _cache_params(self, source: KnowledgeSource, max_results: int) -> Dict[str, Any]:
+        """Build cache key parameters for a query."""
+        return {"source": source.value, "max_results": max_results}
+
+    def _cache_get(
+        self,
+        query: str,
+        source: KnowledgeSource,
+        max_results: int
+    ) -> Optional[QueryResult]:
+        """Look up a cached result."""
+        if self.cache is None:
+            return None
+        return self.cache.get(query, self._cache_params(source, max_results))
+
+    def _cache_set(
+        self,
+        query: str,
+        source: KnowledgeSource,
+        max_results: int,
+        result: QueryResult
+    ) -> None:
+        """Store a result in the cache."""
+        if self.cache is not None:
+            self.cache.set(
+                query,
+                result,
+                self._cache_params(source, max_results),
+                documents=result.references
+            )
+
+    async def _query_with_fallback(
+        self,
+        source: KnowledgeSource,
+        query: str,
+        max_results: int
+    ) -> QueryResult:
+        """Execute query on a source, falling back if it fails.
+
+        Args:
+            source: Knowledge source to query first
+            query: Query text
+            max_results: Maximum results
+
+        Returns:
+            QueryResult from the source or its fallback
+        """
+        try:
+            return await self._execute_query(source, query, max_results)
         except Exception as e:
             logger.error(f"Query failed on {source.value}: {e}")
             # Try fallback chain
@@ -194,6 +511,14 @@ class KnowledgeRouter:
         Returns:
             QueryResult from Cognee
         """
+        # Conceptual queries are answered from the local vector index when built
+        if (
+            self.vector_index is not None
+            and len(self.vector_index) > 0
+            and self.classify_query(query) == QueryType.CONCEPTUAL
+        ):
+            return self._query_vector_index(query, max_results)
+
         # Mock implementation - replace with real Cognee integration
         logger.debug(f"Querying Cognee: {query[:50]}")
 
@@ -218,6 +543,53 @@ class KnowledgeRouter:
             }
         )
 
+    def _query_vector_index(self, query: str, max_results: int) -> QueryResult:
+        """Answer a query from the local vector index.
+
+        Args:
+            query: Query text
+            max_results: Maximum passages to return
+
+        Returns:
+            QueryResult whose references are the matching documents
+        """
+        logger.debug(f"Querying vector index: {query[:50]}")
+        hits = self.vector_index.search(query, top_k=max_results)
+        return self._vector_hits_to_result(query, hits)
+
+    def _vector_hits_to_result(self, query: str, hits: List[Any]) -> QueryResult:
+        """Build a QueryResult from vector search hits.
+
+        Args:
+            query: Query text
+            hits: SearchHit list, best first
+
+        Returns:
+            QueryResult with passages, confidence and references
+        """
+        references: List[str] = []
+        for hit in hits:
+            if hit.doc_id not in references:
+                references.append(hit.doc_id)
+
+        if hits:
+            answer = "\n\n".join(f"[{hit.doc_id}] {hit.text}" for hit in hits)
+        else:
+            answer = "No relevant passages found in your story knowledge base."
+
+        return QueryResult(
+            source=KnowledgeSource.COGNEE,
+            answer=answer,
+            confidence=max(0.0, min(1.0, hits[0].score)) if hits else 0.0,
+            references=references,
+            metadata={
+                "source": "cognee",
+                "query": query,
+                "search_type": "vector_index",
+                "scores": [round(hit.score, 4) for hit in hits],
+            }
+        )
+
     async def _query_notebooklm(self, query: str, max_results: int) -> QueryResult:
         """Query NotebookLM (external analysis).
 
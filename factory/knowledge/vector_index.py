@@ -0,0 +1,464 @@
+"""Local dense-vector index for semantic knowledge queries.
+
+Provides a small, dependency-light retrieval engine used by the
+knowledge router for conceptual queries:
+- Chunking of project documents into overlapping word windows
+- Pluggable embedders (deterministic hashing embedder as offline default)
+- Contiguous float32 vector matrix with batched top-k via matrix multiply
+- Incremental add/remove of documents
+- Persistence via np.save with memory-mapped loading
+"""
+
+import hashlib
+import json
+import logging
+import re
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# CJK ideographs are tokenized one character at a time; everything else by word
+_TOKEN_PATTERN = re.compile(r"[\u4e00-\u9fff]|\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase tokens for embedding.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def chunk_text(text: str, chunk_size: int = 200, overlap: int = 40) -> List[str]:
+    """Split text into overlapping word windows.
+
+    Args:
+        text: Document text
+        chunk_size: Words per chunk
+        overlap: Words shared between consecutive chunks
+
+    Returns:
+        List of chunk strings (empty if text has no words)
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be in [0, chunk_size)")
+
+    words = text.split()
+    if not words:
+        return []
+
+    step = chunk_size - overlap
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_size]))
+        if start + chunk_size >= len(words):
+            break
+    return chunks
+
+
+class Embedder(ABC):
+    """Abstract base class for text embedders.
+
+    Embedders map a batch of texts to a (n, dim) float32 matrix of
+    L2-normalized vectors, so that dot products are cosine similarities.
+    """
+
+    name: str = "embedder"
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dim), rows L2-normalized
+        """
+        pass
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic feature-hashing embedder.
+
+    Hashes unigrams and bigrams into a fixed number of buckets with a
+    signed CRC32 hash. Requires no model files or network access and
+    produces identical vectors across processes and machines.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512, use_bigrams: bool = True):
+        """Initialize hashing embedder.
+
+        Args:
+            dim: Embedding dimension (number of hash buckets)
+            use_bigrams: Also hash adjacent token pairs
+        """
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+        self.use_bigrams = use_bigrams
+
+    def _features(self, text: str) -> List[str]:
+        """Extract hashed features from text."""
+        tokens = tokenize(text)
+        if self.use_bigrams:
+            tokens = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return tokens
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed a batch of texts."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+
+        rows: List[int] = []
+        cols: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+
+        if rows:
+            np.add.at(matrix, (np.array(rows), np.array(cols)), np.array(signs, dtype=np.float32))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+@dataclass
+class SearchHit:
+    """A single chunk returned from a vector search."""
+
+    doc_id: str
+    chunk_index: int
+    text: str
+    score: float
+
+
+class VectorIndex:
+    """Dense-vector index over chunked project documents.
+
+    Vectors live in one contiguous float32 matrix with spare capacity so
+    incremental adds are amortized O(1) per chunk. Removal compacts the
+    matrix. Queries are answered with a single matrix multiply per batch.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    MANIFEST_FILE = "index.json"
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        chunk_size: int = 200,
+        chunk_overlap: int = 40
+    ):
+        """Initialize vector index.
+
+        Args:
+            embedder: Embedder to use (defaults to HashingEmbedder)
+            chunk_size: Words per chunk
+            chunk_overlap: Words shared between consecutive chunks
+        """
+        self.embedder = embedder or HashingEmbedder()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._size = 0
+        self._doc_ids: List[str] = []
+        self._chunk_indices: List[int] = []
+        self._texts: List[str] = []
+        self._doc_hashes: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Number of indexed chunks."""
+        return self._size
+
+    @property
+    def documents(self) -> List[str]:
+        """IDs of indexed documents."""
+        return sorted(self._doc_hashes)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the populated rows of the vector matrix."""
+        return self._matrix[:self._size]
+
+    def document_hash(self, doc_id: str) -> Optional[str]:
+        """Get content hash of an indexed document.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            SHA-256 hex digest, or None if not indexed
+        """
+        return self._doc_hashes.get(doc_id)
+
+    def add_document(self, doc_id: str, text: str) -> int:
+        """Add or replace a document in the index.
+
+        Unchanged documents (same content hash) are skipped.
+
+        Args:
+            doc_id: Document identifier (usually a relative path)
+            text: Document text
+
+        Returns:
+            Number of chunks added
+        """
+        doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self._doc_hashes.get(doc_id) == doc_hash:
+            return 0
+
+        if doc_id in self._doc_hashes:
+            self.remove_document(doc_id)
+
+        chunks = chunk_text(text, self.chunk_size, self.chunk_overlap)
+        self._doc_hashes[doc_id] = doc_hash
+        if not chunks:
+            return 0
+
+        self._append(self.embedder.embed(chunks))
+        self._doc_ids.extend([doc_id] * len(chunks))
+        self._chunk_indices.extend(range(len(chunks)))
+        self._texts.extend(chunks)
+
+        logger.debug(f"Indexed '{doc_id}' ({len(chunks)} chunks)")
+        return len(chunks)
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Remove a document from the index.
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if removed, False if not found
+        """
+        return self.remove_documents([doc_id]) > 0
+
+    def remove_documents(self, doc_ids: Iterable[str]) -> int:
+        """Remove several documents with a single compaction.
+
+        Args:
+            doc_ids: Document identifiers
+
+        Returns:
+            Number of documents removed
+        """
+        targets = {d for d in doc_ids if d in self._doc_hashes}
+        if not targets:
+            return 0
+
+        keep = np.array([d not in targets for d in self._doc_ids], dtype=bool)
+        kept_rows = np.flatnonzero(keep)
+
+        self._matrix = np.ascontiguousarray(self.vectors[kept_rows])
+        self._size = len(kept_rows)
+        self._doc_ids = [self._doc_ids[i] for i in kept_rows]
+        self._chunk_indices = [self._chunk_indices[i] for i in kept_rows]
+        self._texts = [self._texts[i] for i in kept_rows]
+        for doc_id in targets:
+            del self._doc_hashes[doc_id]
+
+        logger.debug(f"Removed {len(targets)} documents from vector index")
+        return len(targets)
+
+    def index_directory(
+        self,
+        root: Path,
+        patterns: Sequence[str] = ("*.md", "*.txt"),
+        prune: bool = True
+    ) -> int:
+        """Index all matching files under a directory.
+
+        Args:
+            root: Directory to scan recursively
+            patterns: Glob patterns for files to index
+            prune: Remove indexed documents whose files no longer exist
+
+        Returns:
+            Number of chunks added
+        """
+        root = Path(root)
+        seen = set()
+        added = 0
+
+        for pattern in patterns:
+            for path in sorted(root.rglob(pattern)):
+                if not path.is_file() or any(part.startswith(".") for part in path.relative_to(root).parts):
+                    continue
+                doc_id = path.relative_to(root).as_posix()
+                seen.add(doc_id)
+                try:
+                    added += self.add_document(doc_id, path.read_text(encoding="utf-8"))
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Skipping unreadable document {path}: {e}")
+
+        if prune:
+            self.remove_documents([d for d in self._doc_hashes if d not in seen])
+
+        logger.info(f"Indexed {root}: {len(self._doc_hashes)} documents, {self._size} chunks")
+        return added
+
+    def search(self, query: str, top_k: int = 5) -> List[SearchHit]:
+        """Find the chunks most similar to a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum hits to return
+
+        Returns:
+            Hits sorted by descending similarity
+        """
+        return self.search_many([query], top_k)[0]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 5) -> List[List[SearchHit]]:
+        """Find the most similar chunks for a batch of queries.
+
+        All queries are scored in one matrix multiply.
+
+        Args:
+            queries: Query texts
+            top_k: Maximum hits per query
+
+        Returns:
+            One list of hits per query, in input order
+        """
+        if not queries:
+            return []
+        if self._size == 0 or top_k <= 0:
+            return [[] for _ in queries]
+
+        scores = self.embedder.embed(queries) @ self.vectors.T
+        k = min(top_k, self._size)
+
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(self._size), (len(queries), 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        results = []
+        for q, rows in enumerate(top):
+            results.append([
+                SearchHit(
+                    doc_id=self._doc_ids[row],
+                    chunk_index=self._chunk_indices[row],
+                    text=self._texts[row],
+                    score=float(scores[q, row]),
+                )
+                for row in rows
+            ])
+        return results
+
+    def save(self, path: Path) -> None:
+        """Persist index to a directory.
+
+        Args:
+            path: Target directory (created if missing)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        # The loaded matrix may be memory-mapped from this very file, so
+        # write beside it and swap rather than overwrite it in place
+        vectors_temp = path / f"{self.VECTORS_FILE}.tmp"
+        with open(vectors_temp, "wb") as f:
+            np.save(f, self.vectors)
+        vectors_temp.replace(path / self.VECTORS_FILE)
+
+        manifest = {
+            "version": 1,
+            "embedder": self.embedder.name,
+            "dim": self.embedder.dim,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "doc_hashes": self._doc_hashes,
+            "doc_ids": self._doc_ids,
+            "chunk_indices": self._chunk_indices,
+            "texts": self._texts,
+        }
+        temp_path = path / f"{self.MANIFEST_FILE}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        temp_path.replace(path / self.MANIFEST_FILE)
+
+        logger.info(f"Saved vector index to {path} ({self._size} chunks)")
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        embedder: Optional[Embedder] = None,
+        mmap: bool = True
+    ) -> "VectorIndex":
+        """Load a persisted index.
+
+        Args:
+            path: Directory written by save()
+            embedder: Embedder matching the one used to build the index
+            mmap: Memory-map the vector matrix instead of reading it
+
+        Returns:
+            Loaded VectorIndex
+
+        Raises:
+            FileNotFoundError: If the index files are missing
+            ValueError: If the embedder dimension does not match
+        """
+        path = Path(path)
+        with open(path / cls.MANIFEST_FILE, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        index = cls(
+            embedder=embedder,
+            chunk_size=manifest["chunk_size"],
+            chunk_overlap=manifest["chunk_overlap"],
+        )
+        if index.embedder.dim != manifest["dim"]:
+            raise ValueError(
+                f"Embedder dimension {index.embedder.dim} does not match index ({manifest['dim']})"
+            )
+
+        index._matrix = np.load(path / cls.VECTORS_FILE, mmap_mode="r" if mmap else None)
+        index._size = index._matrix.shape[0]
+        index._doc_hashes = manifest["doc_hashes"]
+        index._doc_ids = manifest["doc_ids"]
+        index._chunk_indices = manifest["chunk_indices"]
+        index._texts = manifest["texts"]
+        return index
+
+    def _append(self, vectors: np.ndarray) -> None:
+        """Append rows to the matrix, growing capacity geometrically."""
+        needed = self._size + len(vectors)
+        capacity = self._matrix.shape[0]
+
+        if needed > capacity or not self._matrix.flags.writeable:
+            new_capacity = max(needed, capacity * 2, 64)
+            grown = np.zeros((new_capacity, self.embedder.dim), dtype=np.float32)
+            grown[:self._size] = self.vectors
+            self._matrix = grown
+
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
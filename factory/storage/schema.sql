@@ -15,9 +15,9 @@ CREATE TABLE IF NOT EXISTS sessions (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_sessions_workflow ON sessions(workflow_name);
-CREATE INDEX idx_sessions_status ON sessions(status);
-CREATE INDEX idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_workflow ON sessions(workflow_name);
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
 
 -- ============================================================================
 -- RESULTS
@@ -39,9 +39,9 @@ CREATE TABLE IF NOT EXISTS results (
     FOREIGN KEY (session_id) REFERENCES sessions(id)
 );
 
-CREATE INDEX idx_results_session ON results(session_id);
-CREATE INDEX idx_results_agent ON results(agent_name);
-CREATE INDEX idx_results_created ON results(created_at);
+CREATE INDEX IF NOT EXISTS idx_results_session ON results(session_id);
+CREATE INDEX IF NOT EXISTS idx_results_agent ON results(agent_name);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results(created_at);
 
 -- ============================================================================
 -- SCORES
@@ -58,8 +58,8 @@ CREATE TABLE IF NOT EXISTS scores (
     FOREIGN KEY (result_id) REFERENCES results(id)
 );
 
-CREATE INDEX idx_scores_result ON scores(result_id);
-CREATE INDEX idx_scores_dimension ON scores(dimension);
+CREATE INDEX IF NOT EXISTS idx_scores_result ON scores(result_id);
+CREATE INDEX IF NOT EXISTS idx_scores_dimension ON scores(dimension);
 
 -- ============================================================================
 -- WINNERS
@@ -75,8 +75,8 @@ CREATE TABLE IF NOT EXISTS winners (
     FOREIGN KEY (result_id) REFERENCES results(id)
 );
 
-CREATE INDEX idx_winners_session ON winners(session_id);
-CREATE INDEX idx_winners_result ON winners(result_id);
+CREATE INDEX IF NOT EXISTS idx_winners_session ON winners(session_id);
+CREATE INDEX IF NOT EXISTS idx_winners_result ON winners(result_id);
 
 -- ============================================================================
 -- AGENT_STATS
@@ -109,9 +109,9 @@ CREATE TABLE IF NOT EXISTS cost_tracking (
     FOREIGN KEY (session_id) REFERENCES sessions(id)
 );
 
-CREATE INDEX idx_cost_session ON cost_tracking(session_id);
-CREATE INDEX idx_cost_agent ON cost_tracking(agent_name);
-CREATE INDEX idx_cost_created ON cost_tracking(created_at);
+CREATE INDEX IF NOT EXISTS idx_cost_session ON cost_tracking(session_id);
+CREATE INDEX IF NOT EXISTS idx_cost_agent ON cost_tracking(agent_name);
+CREATE INDEX IF NOT EXISTS idx_cost_created ON cost_tracking(created_at);
 
 -- ============================================================================
 -- ANALYTICS VIEWS
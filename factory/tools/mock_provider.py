@@ -0,0 +1,653 @@
+"""Offline mock LLM provider server for load testing.
+
+Stands in for the cloud and local endpoints the agents talk to, so that
+throughput and latency can be measured without network access or API keys:
+- DashScope text-generation (QwenAgent)
+- OpenAI-compatible chat completions (DeepSeek, Kimi, Doubao, Baichuan,
+  and Ollama's /v1 compatibility API)
+- Ollama native API (/api/generate, /api/chat, /api/tags) used by OllamaAgent
+
+Each model can have its own profile: first-token latency distribution,
+output token rate, error rate, rate limits that answer 429, and a
+concurrency cap. All endpoints support streaming in the provider's format.
+
+Usage:
+    python -m factory.tools.mock_provider --port 8765 [--config mock.yaml]
+
+Then point agents at it, e.g. ``base_url: http://127.0.0.1:8765/v1/chat/completions``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+_WORDS = (
+    "the harbor light fell across her face as she turned toward the water "
+    "and remembered every promise he had broken since the winter storms "
+    "came through the valley quiet voices carried over the docks while "
+    "gulls circled above the old boat she had sworn never to sell"
+).split()
+
+
+@dataclass
+class LatencyDistribution:
+    """Distribution of time-to-first-token, in seconds.
+
+    Attributes:
+        kind: constant, uniform, normal, lognormal or exponential
+        mean: Mean (median for lognormal) latency
+        spread: Half-width (uniform), stddev (normal) or sigma (lognormal)
+        max_seconds: Upper clip for sampled values
+    """
+
+    kind: str = "constant"
+    mean: float = 0.2
+    spread: float = 0.0
+    max_seconds: float = 30.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency value."""
+        if self.kind == "constant":
+            value = self.mean
+        elif self.kind == "uniform":
+            value = rng.uniform(self.mean - self.spread, self.mean + self.spread)
+        elif self.kind == "normal":
+            value = rng.gauss(self.mean, self.spread)
+        elif self.kind == "lognormal":
+            value = self.mean * rng.lognormvariate(0.0, self.spread)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+        return min(max(value, 0.0), self.max_seconds)
+
+
+@dataclass
+class ProviderProfile:
+    """Simulated behaviour of one model endpoint.
+
+    Attributes:
+        latency: Time-to-first-token distribution
+        tokens_per_second: Output token generation rate (0 = instant)
+        output_tokens: Fixed completion length (None = use max_tokens)
+        max_output_tokens: Cap when the request has no max_tokens
+        error_rate: Probability of answering 500
+        requests_per_second: Token-bucket rate limit (None = unlimited)
+        burst: Token-bucket capacity
+        max_concurrency: Concurrent requests before 429 (None = unlimited)
+        retry_after: Seconds advertised in Retry-After on 429
+        stream_chunk_tokens: Tokens per streamed chunk
+    """
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    tokens_per_second: float = 50.0
+    output_tokens: Optional[int] = None
+    max_output_tokens: int = 512
+    error_rate: float = 0.0
+    requests_per_second: Optional[float] = None
+    burst: int = 10
+    max_concurrency: Optional[int] = None
+    retry_after: float = 1.0
+    stream_chunk_tokens: int = 4
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProviderProfile":
+        """Create from dictionary (unknown keys are rejected)."""
+        data = dict(data)
+        latency = data.pop("latency", None)
+        known = {f.name for f in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown mock provider settings: {sorted(unknown)}")
+        profile = cls(**data)
+        if latency is not None:
+            profile.latency = LatencyDistribution(**latency)
+        return profile
+
+
+@dataclass
+class MockProviderConfig:
+    """Mock server configuration.
+
+    Attributes:
+        default: Profile for models without an override
+        models: Per-model profile overrides
+        time_scale: Multiplier for all simulated delays (0 disables sleeping)
+        seed: Random seed for reproducible runs
+    """
+
+    default: ProviderProfile = field(default_factory=ProviderProfile)
+    models: Dict[str, ProviderProfile] = field(default_factory=dict)
+    time_scale: float = 1.0
+    seed: Optional[int] = None
+
+    def profile_for(self, model: str) -> ProviderProfile:
+        """Get the profile for a model."""
+        return self.models.get(model, self.default)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MockProviderConfig":
+        """Create from a settings dictionary.
+
+        Expected shape::
+
+            time_scale: 1.0
+            seed: 42
+            default:
+              latency: {kind: lognormal, mean: 0.4, spread: 0.5}
+              tokens_per_second: 40
+            models:
+              deepseek-chat:
+                error_rate: 0.02
+                requests_per_second: 5
+        """
+        return cls(
+            default=ProviderProfile.from_dict(data.get("default", {})),
+            models={
+                name: ProviderProfile.from_dict(profile)
+                for name, profile in data.get("models", {}).items()
+            },
+            time_scale=float(data.get("time_scale", 1.0)),
+            seed=data.get("seed"),
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "MockProviderConfig":
+        """Load configuration from a YAML file."""
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(yaml.safe_load(f) or {})
+
+
+class _TokenBucket:
+    """Request rate limiter."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+@dataclass
+class _Plan:
+    """Outcome decided for one request before any work is simulated."""
+
+    status: int
+    latency: float = 0.0
+    output_tokens: int = 0
+    token_interval: float = 0.0
+
+
+class MockProviderState:
+    """Per-model limiter state and request counters."""
+
+    def __init__(self, config: MockProviderConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._in_flight: Dict[str, int] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero all counters."""
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "completed": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "tokens_output": 0,
+            "max_in_flight": 0,
+            "by_model": {},
+        }
+
+    def admit(self, model: str, max_tokens: Optional[int]) -> _Plan:
+        """Decide whether a request succeeds, errors or is rate limited."""
+        profile = self.config.profile_for(model)
+        self.stats["requests"] += 1
+        model_stats = self.stats["by_model"].setdefault(
+            model, {"requests": 0, "errors": 0, "rate_limited": 0}
+        )
+        model_stats["requests"] += 1
+
+        in_flight = self._in_flight.get(model, 0)
+        limited = profile.max_concurrency is not None and in_flight >= profile.max_concurrency
+        if not limited and profile.requests_per_second is not None:
+            bucket = self._buckets.get(model)
+            if bucket is None:
+                bucket = self._buckets[model] = _TokenBucket(profile.requests_per_second, profile.burst)
+            limited = not bucket.try_acquire()
+        if limited:
+            self.stats["rate_limited"] += 1
+            model_stats["rate_limited"] += 1
+            return _Plan(status=429)
+
+        if profile.error_rate and self.rng.random() < profile.error_rate:
+            self.stats["errors"] += 1
+            model_stats["errors"] += 1
+            return _Plan(status=500, latency=profile.latency.sample(self.rng) * self.config.time_scale)
+
+        output_tokens = profile.output_tokens or min(max_tokens or profile.max_output_tokens, profile.max_output_tokens)
+        interval = 1.0 / profile.tokens_per_second if profile.tokens_per_second > 0 else 0.0
+        return _Plan(
+            status=200,
+            latency=profile.latency.sample(self.rng) * self.config.time_scale,
+            output_tokens=output_tokens,
+            token_interval=interval * self.config.time_scale,
+        )
+
+    def enter(self, model: str) -> None:
+        """Mark a request as in flight."""
+        self._in_flight[model] = self._in_flight.get(model, 0) + 1
+        total = sum(self._in_flight.values())
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], total)
+
+    def leave(self, model: str, output_tokens: int) -> None:
+        """Mark a request as finished."""
+        self._in_flight[model] -= 1
+        self.stats["completed"] += 1
+        self.stats["tokens_output"] += output_tokens
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count used for usage reporting (~4 chars per token)."""
+    return max(1, len(text) // 4)
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    """Concatenate message contents."""
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def _token_pieces(count: int) -> List[str]:
+    """Generate ``count`` word tokens of filler prose."""
+    return [(" " if i else "") + _WORDS[i % len(_WORDS)] for i in range(count)]
+
+
+def _chunks(pieces: List[str], size: int) -> List[str]:
+    """Group tokens into stream chunks."""
+    size = max(1, size)
+    return ["".join(pieces[i:i + size]) for i in range(0, len(pieces), size)]
+
+
+async def _generate_stream(plan: _Plan, chunk_tokens: int) -> AsyncIterator[Tuple[str, int]]:
+    """Yield (text, tokens) chunks paced at the profile's token rate."""
+    await asyncio.sleep(plan.latency)
+    pieces = _token_pieces(plan.output_tokens)
+    for chunk in _chunks(pieces, chunk_tokens):
+        tokens = len(chunk.split())
+        if plan.token_interval:
+            await asyncio.sleep(plan.token_interval * tokens)
+        yield chunk, tokens
+
+
+async def _generate_text(plan: _Plan) -> str:
+    """Sleep for the full simulated generation time and return the text."""
+    await asyncio.sleep(plan.latency + plan.token_interval * plan.output_tokens)
+    return "".join(_token_pieces(plan.output_tokens))
+
+
+def _openai_error(status: int, retry_after: float) -> JSONResponse:
+    """OpenAI-compatible error body."""
+    if status == 429:
+        body = {"error": {"message": "Rate limit reached", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+        return JSONResponse(body, status_code=429, headers={"Retry-After": f"{retry_after:g}"})
+    body = {"error": {"message": "The server had an error", "type": "server_error", "code": "internal_error"}}
+    return JSONResponse(body, status_code=status)
+
+
+def _dashscope_error(status: int, retry_after: float, request_id: str) -> JSONResponse:
+    """DashScope error body."""
+    if status == 429:
+        body = {"code": "Throttling.RateQuota", "message": "Requests rate limit exceeded", "request_id": request_id}
+        return JSONResponse(body, status_code=429, headers={"Retry-After": f"{retry_after:g}"})
+    body = {"code": "InternalError", "message": "An internal error has occured", "request_id": request_id}
+    return JSONResponse(body, status_code=status)
+
+
+def _ollama_error(status: int, retry_after: float) -> JSONResponse:
+    """Ollama error body."""
+    headers = {"Retry-After": f"{retry_after:g}"} if status == 429 else None
+    message = "server busy, please try again" if status == 429 else "model runner has unexpectedly stopped"
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+
+def create_mock_provider_app(config: Optional[MockProviderConfig] = None) -> FastAPI:
+    """Create the mock provider ASGI app.
+
+    Args:
+        config: Server configuration (defaults apply if None)
+
+    Returns:
+        FastAPI application
+    """
+    state = MockProviderState(config or MockProviderConfig())
+    app = FastAPI(title="Writers Factory mock LLM provider")
+    app.state.mock = state
+
+    async def _run(model: str, plan: _Plan, body_fn, stream_fn, stream: bool, media_type: str):
+        """Run a planned request, tracking in-flight counts."""
+        profile = state.config.profile_for(model)
+        if not stream:
+            state.enter(model)
+            try:
+                text = await _generate_text(plan)
+            finally:
+                state.leave(model, plan.output_tokens)
+            return JSONResponse(body_fn(text, plan.output_tokens))
+
+        async def _body():
+            # Entered here, not before returning the response: if the client
+            # disconnects before the body starts, the generator never runs
+            # and a slot taken outside it would never be released
+            state.enter(model)
+            try:
+                async for line in stream_fn(_generate_stream(plan, profile.stream_chunk_tokens)):
+                    yield line
+            finally:
+                state.leave(model, plan.output_tokens)
+
+        return StreamingResponse(_body(), media_type=media_type)
+
+    async def _openai_chat(request: Request):
+        payload = await request.json()
+        model = payload.get("model", "mock")
+        profile = state.config.profile_for(model)
+        plan = state.admit(model, payload.get("max_tokens"))
+        if plan.status != 200:
+            await asyncio.sleep(plan.latency)
+            return _openai_error(plan.status, profile.retry_after)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        prompt_tokens = count_tokens(_prompt_text(payload.get("messages", [])))
+
+        def body(text: str, tokens: int) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "length" if tokens >= (payload.get("max_tokens") or tokens + 1) else "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": tokens,
+                    "total_tokens": prompt_tokens + tokens,
+                },
+                "system_fingerprint": "fp_mock",
+            }
+
+        async def stream(chunks):
+            async for text, _ in chunks:
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": plan.output_tokens,
+                    "total_tokens": prompt_tokens + plan.output_tokens,
+                },
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return await _run(model, plan, body, stream, bool(payload.get("stream")), "text/event-stream")
+
+    # DeepSeek, Kimi, Baichuan and Ollama's compatibility API share the v1 path;
+    # Doubao (Volcengine Ark) uses v3
+    app.post("/v1/chat/completions")(_openai_chat)
+    app.post("/api/v3/chat/completions")(_openai_chat)
+
+    @app.post("/api/v1/services/aigc/text-generation/generation")
+    async def dashscope_generation(request: Request):
+        payload = await request.json()
+        model = payload.get("model", "qwen-mock")
+        parameters = payload.get("parameters", {})
+        request_id = str(uuid.uuid4())
+        profile = state.config.profile_for(model)
+        plan = state.admit(model, parameters.get("max_tokens"))
+        if plan.status != 200:
+            await asyncio.sleep(plan.latency)
+            return _dashscope_error(plan.status, profile.retry_after, request_id)
+
+        prompt_tokens = count_tokens(_prompt_text(payload.get("input", {}).get("messages", [])))
+        stream = request.headers.get("X-DashScope-SSE", "").lower() == "enable" or parameters.get("stream", False)
+        incremental = parameters.get("incremental_output", False)
+
+        def body(text: str, tokens: int) -> Dict[str, Any]:
+            return {
+                "output": {"text": text, "finish_reason": "stop"},
+                "usage": {"input_tokens": prompt_tokens, "output_tokens": tokens, "total_tokens": prompt_tokens + tokens},
+                "request_id": request_id,
+            }
+
+        async def sse(chunks):
+            emitted = ""
+            produced = 0
+            event_id = 0
+            async for text, tokens in chunks:
+                emitted += text
+                produced += tokens
+                event_id += 1
+                data = {
+                    "output": {"text": text if incremental else emitted, "finish_reason": "null"},
+                    "usage": {"input_tokens": prompt_tokens, "output_tokens": produced, "total_tokens": prompt_tokens + produced},
+                    "request_id": request_id,
+                }
+                yield f"id:{event_id}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(data)}\n\n"
+            final = body("" if incremental else emitted, produced)
+            yield f"id:{event_id + 1}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(final)}\n\n"
+
+        return await _run(model, plan, body, sse, stream, "text/event-stream")
+
+    def _ollama_done(model: str, prompt_tokens: int, tokens: int, started: float, plan: _Plan) -> Dict[str, Any]:
+        """Timing/usage fields Ollama reports on the final message."""
+        total_ns = int((time.monotonic() - started) * 1e9)
+        return {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": total_ns,
+            "load_duration": 0,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(plan.latency * 1e9),
+            "eval_count": tokens,
+            "eval_duration": int(plan.token_interval * tokens * 1e9),
+        }
+
+    async def _ollama(request: Request, chat: bool):
+        payload = await request.json()
+        model = payload.get("model", "llama-mock")
+        options = payload.get("options", {})
+        profile = state.config.profile_for(model)
+        plan = state.admit(model, options.get("num_predict"))
+        if plan.status != 200:
+            await asyncio.sleep(plan.latency)
+            return _ollama_error(plan.status, profile.retry_after)
+
+        prompt = _prompt_text(payload.get("messages", [])) if chat else payload.get("prompt", "")
+        prompt_tokens = count_tokens(prompt)
+        started = time.monotonic()
+
+        def content(text: str) -> Dict[str, Any]:
+            if chat:
+                return {"message": {"role": "assistant", "content": text}}
+            return {"response": text}
+
+        def body(text: str, tokens: int) -> Dict[str, Any]:
+            return {**_ollama_done(model, prompt_tokens, tokens, started, plan), **content(text)}
+
+        async def ndjson(chunks):
+            async for text, _ in chunks:
+                line = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "done": False}
+                line.update(content(text))
+                yield json.dumps(line) + "\n"
+            yield json.dumps(body("", plan.output_tokens)) + "\n"
+
+        # Ollama streams unless told otherwise
+        return await _run(model, plan, body, ndjson, payload.get("stream", True), "application/x-ndjson")
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        return await _ollama(request, chat=False)
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        return await _ollama(request, chat=True)
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        names = list(state.config.models) or ["llama3.2:3b"]
+        return {
+            "models": [
+                {"name": name, "model": name, "size": 2_000_000_000, "modified_at": "2024-01-01T00:00:00Z"}
+                for name in names
+            ]
+        }
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return state.stats
+
+    @app.post("/mock/reset")
+    async def mock_reset():
+        state.reset_stats()
+        return {"status": "reset"}
+
+    return app
+
+
+class MockProviderServer:
+    """Run the mock provider on a background thread.
+
+    Intended for benchmarks and integration tests::
+
+        with MockProviderServer(config) as server:
+            agent_config.base_url = server.url("/v1/chat/completions")
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockProviderConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """Initialize server.
+
+        Args:
+            config: Mock provider configuration
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.app = create_mock_provider_app(config)
+        self.host = host
+        self.port = port or self._free_port(host)
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def state(self) -> MockProviderState:
+        """Limiter state and counters."""
+        return self.app.state.mock
+
+    def url(self, path: str = "") -> str:
+        """Absolute URL for a path on the server."""
+        return f"http://{self.host}:{self.port}{path}"
+
+    def start(self, timeout: float = 10.0) -> None:
+        """Start serving and wait until the socket accepts requests."""
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="mock-llm-provider", daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Mock provider failed to start on {self.url()}")
+            time.sleep(0.01)
+        logger.info(f"Mock LLM provider listening on {self.url()}")
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+    def __enter__(self) -> "MockProviderServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Offline mock LLM provider server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", type=Path, help="YAML profile configuration")
+    parser.add_argument("--time-scale", type=float, help="Multiply all simulated delays")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockProviderConfig.from_file(args.config) if args.config else MockProviderConfig()
+    if args.time_scale is not None:
+        config.time_scale = args.time_scale
+    if args.seed is not None:
+        config.seed = args.seed
+
+    uvicorn.run(create_mock_provider_app(config), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
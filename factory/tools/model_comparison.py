@@ -1,18 +1,25 @@
 """Model comparison tool wrapping tournament system."""
 
-import difflib
+import asyncio
 import logging
+import sqlite3
+import threading
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Any
+from uuid import uuid4
 
+import numpy as np
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich.columns import Columns
 
+from .text_diff import PairwiseDiffs, similarity_matrix
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +32,17 @@ class ModelOutput:
     tokens_input: int
     tokens_output: int
     generation_time: float
+    error: Optional[str] = None  # failed or timed out; text is empty
+    result_id: Optional[str] = None  # analytics database row, when recorded
+
+    @property
+    def success(self) -> bool:
+        """Whether the model produced output."""
+        return self.error is None
+
+
+# Called with each model's output as soon as that model finishes
+ProgressCallback = Callable[[ModelOutput], None]
 
 
 @dataclass
@@ -32,10 +50,14 @@ class ComparisonResult:
     """Result of model comparison."""
     prompt: str
     outputs: List[ModelOutput]
-    diffs: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+    diffs: Mapping[Tuple[str, str], List[str]] = field(default_factory=dict)
+    similarity: Optional[np.ndarray] = None  # outputs x outputs, shingle Jaccard estimate; NaN for failed outputs
     winner: Optional[str] = None
     user_notes: str = ""
     timestamp: datetime = field(default_factory=datetime.now)
+    comparison_id: str = field(default_factory=lambda: str(uuid4()))
+    duration_ms: int = 0  # wall time for all models together
+    demo: bool = False  # canned demo outputs; no agents were run
 
     @property
     def total_cost(self) -> float:
@@ -47,6 +69,22 @@ class ComparisonResult:
         """List of model names compared."""
         return [o.model_name for o in self.outputs]
 
+    @property
+    def failed_models(self) -> List[str]:
+        """Models that failed or timed out."""
+        return [o.model_name for o in self.outputs if not o.success]
+
+    def similarity_between(self, model1: str, model2: str) -> Optional[float]:
+        """Estimated similarity (0-1) of two models' outputs.
+
+        None if not computed or if either model failed.
+        """
+        if self.similarity is None:
+            return None
+        names = self.models_compared
+        value = float(self.similarity[names.index(model1), names.index(model2)])
+        return None if np.isnan(value) else value
+
 
 class ModelComparisonTool:
     """Side-by-side model comparison tool.
@@ -56,13 +94,21 @@ class ModelComparisonTool:
     - Diff highlighting
     - Preference tracking
     - Accessible via 'C' keyboard shortcut
+
+    With an agent pool, models are agent names and run concurrently through
+    AgentPool.execute_parallel, so a comparison takes as long as its
+    slowest model. Without one (or with no agents registered), canned demo
+    outputs are returned.
     """
 
     def __init__(
         self,
         agent_pool: Optional[Any] = None,
         preferences_manager: Optional[Any] = None,
-        console: Optional[Console] = None
+        console: Optional[Console] = None,
+        diff_granularity: str = "word",
+        database: Optional[Any] = None,
+        timeout: Optional[float] = 120.0
     ):
         """Initialize model comparison tool.
 
@@ -70,27 +116,42 @@ class ModelComparisonTool:
             agent_pool: Agent pool for multi-model generation
             preferences_manager: Preferences manager for tracking winners
             console: Rich console for output
+            diff_granularity: Diff outputs by "word" or "sentence"
+            database: Analytics Database recording each comparison's
+                timing, cost and winner
+            timeout: Seconds to wait for models; slower ones are cancelled
+                and reported as failed (None = no limit)
         """
         self.agent_pool = agent_pool
         self.preferences_manager = preferences_manager
         self.console = console or Console()
+        self.diff_granularity = diff_granularity
+        self.database = database
+        self.timeout = timeout
         self.comparison_history: List[ComparisonResult] = []
+        # Recordings run in worker threads and share the database connection
+        self._record_lock = threading.Lock()
 
     async def compare_models(
         self,
         prompt: str,
         models: List[str],
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None
     ) -> ComparisonResult:
         """Run side-by-side model comparison.
 
+        Models that fail or time out are kept in the result with an error
+        (partial results), and left out of the diffs.
+
         Args:
             prompt: Prompt to test across models
             models: List of 2-4 model names
             context: Optional context to include
+            on_progress: Called with each model's output as it finishes
 
         Returns:
-            ComparisonResult with outputs and diffs
+            ComparisonResult with outputs, diffs and similarity matrix
         """
         if len(models) < 2:
             raise ValueError("Need at least 2 models for comparison")
@@ -99,38 +160,123 @@ class ModelComparisonTool:
 
         logger.info(f"Comparing {len(models)} models: {', '.join(models)}")
 
-        # Generate outputs from all models (mock for now)
-        outputs = await self._generate_all_models(prompt, models, context)
+        demo = self.demo_mode
+        if demo:
+            logger.warning("No agents registered; returning demo outputs")
 
-        # Compute visual diffs between all pairs
-        diffs = self._compute_diffs(outputs)
+        # Generate outputs from all models concurrently
+        started = time.perf_counter()
+        outputs = await self._generate_all_models(prompt, models, context, on_progress)
+        duration_ms = int((time.perf_counter() - started) * 1000)
 
-        # Create comparison result
+        # Create comparison result; pair diffs are computed when first viewed
         result = ComparisonResult(
             prompt=prompt,
             outputs=outputs,
-            diffs=diffs
+            diffs=self._compute_diffs([o for o in outputs if o.success]),
+            similarity=self._similarity(outputs),
+            duration_ms=duration_ms,
+            demo=demo
         )
+        if result.failed_models:
+            logger.warning(f"Comparison finished without: {', '.join(result.failed_models)}")
 
         # Add to history
         self.comparison_history.append(result)
+        # SQLite writes run in a thread so they don't block the event loop
+        await asyncio.to_thread(self._record_comparison, result)
 
         return result
 
+    @property
+    def demo_mode(self) -> bool:
+        """Whether comparisons return demo outputs (no enabled agents)."""
+        return self.agent_pool is None or not self.agent_pool.list_agents(enabled_only=True)
+
+    @staticmethod
+    def _similarity(outputs: List[ModelOutput]) -> np.ndarray:
+        """Similarity matrix over successful outputs, NaN for failed ones.
+
+        A failed model's empty text would otherwise look identical to
+        every other failed model's.
+        """
+        matrix = np.full((len(outputs), len(outputs)), np.nan)
+        ok = [i for i, o in enumerate(outputs) if o.success]
+        if ok:
+            matrix[np.ix_(ok, ok)] = similarity_matrix([outputs[i].text for i in ok])
+        return matrix
+
     async def _generate_all_models(
         self,
         prompt: str,
         models: List[str],
-        context: Optional[str]
+        context: Optional[str],
+        on_progress: Optional[ProgressCallback] = None
     ) -> List[ModelOutput]:
-        """Generate outputs from all models.
+        """Generate outputs from all models, in the order given.
 
-        In production, this would use the agent_pool and
-        MultiModelGenerationWorkflow from Phase 1.
+        Runs every model at once through the agent pool; without a
+        configured pool, returns demo outputs.
         """
+        if self.demo_mode:
+            return self._mock_outputs(prompt, models, on_progress)
+
+        full_prompt = f"{context}\n\n{prompt}" if context else prompt
+        available = [m for m in models if self.agent_pool.is_enabled(m)]
+        outputs: Dict[str, ModelOutput] = {}
+
+        def finished(response) -> None:
+            output = self._to_output(response)
+            outputs[output.model_name] = output
+            if on_progress:
+                on_progress(output)
+
+        if available:
+            result = await self.agent_pool.execute_parallel(
+                full_prompt, agents=available, timeout=self.timeout, on_response=finished
+            )
+            for name in result.cancelled_agents:
+                outputs[name] = self._failed_output(name, f"Timed out after {self.timeout}s")
+
+        for name in models:
+            if name not in outputs:
+                outputs[name] = self._failed_output(name, f"Agent '{name}' is not available")
+        return [outputs[name] for name in models]
+
+    @staticmethod
+    def _to_output(response) -> ModelOutput:
+        """ModelOutput from an AgentResponse."""
+        return ModelOutput(
+            model_name=response.agent_name,
+            text=response.output,
+            cost=response.cost,
+            tokens_input=response.tokens_input,
+            tokens_output=response.tokens_output,
+            generation_time=response.response_time_ms / 1000,
+            error=response.error
+        )
+
+    @staticmethod
+    def _failed_output(model: str, error: str) -> ModelOutput:
+        return ModelOutput(
+            model_name=model,
+            text="",
+            cost=0.0,
+            tokens_input=0,
+            tokens_output=0,
+            generation_time=0.0,
+            error=error
+        )
+
+    def _mock_outputs(
+        self,
+        prompt: str,
+        models: List[str],
+        on_progress: Optional[ProgressCallback] = None
+    ) -> List[ModelOutput]:
+        """Demo outputs for when no agents are configured."""
         outputs = []
 
-        # Mock generation for now
         for model in models:
             # Simulate different outputs
             if "claude" in model.lower():
@@ -150,42 +296,72 @@ class ModelComparisonTool:
                 tokens_output=200,
                 generation_time=1.5
             ))
+            if on_progress:
+                on_progress(outputs[-1])
 
         return outputs
 
+    def _record_comparison(self, result: ComparisonResult) -> None:
+        """Store a comparison and its outputs in the analytics database.
+
+        Analytics are best-effort: database errors are logged, not raised.
+        """
+        if self.database is None:
+            return
+
+        try:
+            with self._record_lock:
+                self._insert_comparison(result)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to record comparison {result.comparison_id}: {e}")
+
+    def _insert_comparison(self, result: ComparisonResult) -> None:
+        """Write a comparison's session and result rows."""
+        self.database.insert_session(
+            result.comparison_id,
+            "model_comparison",
+            "completed" if not result.failed_models else "partial",
+            context={
+                "models": result.models_compared,
+                "failed": result.failed_models,
+                "duration_ms": result.duration_ms,
+                "total_cost": result.total_cost
+            }
+        )
+        for output in result.outputs:
+            output.result_id = str(uuid4())
+            self.database.insert_result(
+                result_id=output.result_id,
+                session_id=result.comparison_id,
+                agent_name=output.model_name,
+                prompt=result.prompt,
+                output=output.text,
+                tokens_input=output.tokens_input,
+                tokens_output=output.tokens_output,
+                cost=output.cost,
+                response_time_ms=int(output.generation_time * 1000),
+                model_version="unknown",
+                metadata={"error": output.error} if output.error else None
+            )
+        self.database.update_session(result.comparison_id, completed_at=datetime.now())
+
     def _compute_diffs(
         self,
         outputs: List[ModelOutput]
-    ) -> Dict[Tuple[str, str], List[str]]:
-        """Compute diffs between all pairs of outputs.
+    ) -> Mapping[Tuple[str, str], List[str]]:
+        """Word-level diffs between all pairs of outputs.
 
         Args:
             outputs: List of model outputs
 
         Returns:
-            Dictionary mapping (model1, model2) -> list of diff lines
+            Mapping (model1, model2) -> diff lines; each pair is diffed
+            on first lookup
         """
-        diffs = {}
-
-        for i in range(len(outputs)):
-            for j in range(i + 1, len(outputs)):
-                model1 = outputs[i].model_name
-                model2 = outputs[j].model_name
-                text1 = outputs[i].text.splitlines()
-                text2 = outputs[j].text.splitlines()
-
-                # Compute unified diff
-                diff = list(difflib.unified_diff(
-                    text1,
-                    text2,
-                    fromfile=model1,
-                    tofile=model2,
-                    lineterm=''
-                ))
-
-                diffs[(model1, model2)] = diff
-
-        return diffs
+        return PairwiseDiffs(
+            {o.model_name: o.text for o in outputs},
+            granularity=self.diff_granularity
+        )
 
     def render_comparison(
         self,
@@ -227,6 +403,21 @@ class ModelComparisonTool:
         summary.append(f"\nTotal Models: {len(result.outputs)} | ", style="bold")
         summary.append(f"Total Cost: ${result.total_cost:.3f}\n", style="yellow")
 
+        if result.similarity is not None:
+            # Most alike pair of successful outputs, off the diagonal
+            masked = result.similarity.copy()
+            np.fill_diagonal(masked, np.nan)
+            if not np.isnan(masked).all():
+                i, j = np.unravel_index(np.nanargmax(masked), masked.shape)
+                summary.append(
+                    f"Most similar: {result.outputs[i].model_name} / {result.outputs[j].model_name} "
+                    f"({result.similarity[i, j]:.0%})\n",
+                    style="dim"
+                )
+
+        if result.demo:
+            summary.append("Demo outputs: no agents are registered\n", style="bold red")
+
         if result.winner:
             summary.append(f"Winner: {result.winner}\n", style="bold green")
 
@@ -296,6 +487,17 @@ class ModelComparisonTool:
         result.winner = winner
         result.user_notes = notes
 
+        winning = next(o for o in result.outputs if o.model_name == winner)
+        if self.database is not None and winning.result_id:
+            def insert_winner() -> None:
+                with self._record_lock:
+                    self.database.insert_winner(result.comparison_id, winning.result_id, notes or None)
+
+            try:
+                await asyncio.to_thread(insert_winner)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to record winner for {result.comparison_id}: {e}")
+
         # Save to preferences manager if available
         if self.preferences_manager:
             # Track model preference
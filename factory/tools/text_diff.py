@@ -0,0 +1,471 @@
+"""Word- and sentence-level diffing and similarity for prose.
+
+Model outputs are a few long paragraphs, so line diffs (difflib) show
+every paragraph as replaced. This module diffs token sequences instead:
+
+- Texts split into words or sentences (whitespace kept for display, but
+  ignored when matching)
+- Patience diff anchors on tokens unique to both sides; the gaps between
+  anchors are diffed with linear-space Myers (middle snake bisection)
+- An edit budget caps Myers on unrelated regions, which are reported as
+  one replacement instead of a quadratic search
+- MinHash signatures over word shingles give an all-pairs similarity
+  matrix in a few NumPy operations
+"""
+
+import re
+import zlib
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"\S+\s*")
+_SENTENCE_PATTERN = re.compile(r"\S.*?(?:[.!?]+[\"'”’)\]]*(?=\s|$)|$)\s*", re.DOTALL)
+
+# Mersenne prime for the MinHash universal hash family
+_MINHASH_PRIME = (1 << 31) - 1
+_MAX_HASH = np.uint64(_MINHASH_PRIME)
+
+
+def tokenize(text: str, granularity: str = "word") -> List[str]:
+    """Split text into diff tokens.
+
+    Each token keeps its trailing whitespace, so "".join(tokens) restores
+    the text (minus leading whitespace).
+
+    Args:
+        text: Text to split
+        granularity: "word" or "sentence"
+
+    Returns:
+        List of tokens
+    """
+    if granularity == "word":
+        return _WORD_PATTERN.findall(text)
+    if granularity == "sentence":
+        return _SENTENCE_PATTERN.findall(text)
+    raise ValueError(f"Unknown granularity '{granularity}' (expected 'word' or 'sentence')")
+
+
+@dataclass(frozen=True)
+class DiffOp:
+    """One run of a token diff, as in difflib.SequenceMatcher.get_opcodes()."""
+    tag: str  # "equal", "delete", "insert" or "replace"
+    a_start: int
+    a_end: int
+    b_start: int
+    b_end: int
+
+
+def diff_sequences(
+    a: Sequence,
+    b: Sequence,
+    algorithm: str = "patience",
+    max_edits: int = 500
+) -> List[DiffOp]:
+    """Diff two sequences of hashable items.
+
+    Args:
+        a: Old sequence
+        b: New sequence
+        algorithm: "patience" (anchored on unique items, then Myers) or "myers"
+        max_edits: Edit distance after which Myers stops searching a region
+            and reports it as replaced
+
+    Returns:
+        Opcodes covering both sequences in order
+    """
+    if algorithm not in ("patience", "myers"):
+        raise ValueError(f"Unknown algorithm '{algorithm}' (expected 'patience' or 'myers')")
+
+    # Compare small ints rather than strings
+    ids: Dict = {}
+    a_ids = [ids.setdefault(item, len(ids)) for item in a]
+    b_ids = [ids.setdefault(item, len(ids)) for item in b]
+
+    matches: List[Tuple[int, int, int]] = []
+    differ = _Differ(a_ids, b_ids, max_edits)
+    if algorithm == "patience":
+        differ.patience(0, len(a_ids), 0, len(b_ids), matches)
+    else:
+        differ.myers(0, len(a_ids), 0, len(b_ids), matches)
+    return _opcodes(matches, len(a_ids), len(b_ids))
+
+
+class _Differ:
+    """Collects matching runs (a_index, b_index, length) between two id lists."""
+
+    def __init__(self, a: List[int], b: List[int], max_edits: int):
+        self.a = a
+        self.b = b
+        self.max_edits = max_edits
+
+    def _trim(self, a_lo: int, a_hi: int, b_lo: int, b_hi: int, matches: list) -> Tuple[int, int, int, int, int]:
+        """Match the common prefix; return the remaining bounds and suffix length."""
+        a, b = self.a, self.b
+        start = a_lo
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            a_lo += 1
+            b_lo += 1
+        if a_lo > start:
+            matches.append((start, b_lo - (a_lo - start), a_lo - start))
+        suffix = 0
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            suffix += 1
+        return a_lo, a_hi, b_lo, b_hi, suffix
+
+    def patience(self, a_lo: int, a_hi: int, b_lo: int, b_hi: int, matches: list) -> None:
+        a_lo, a_hi, b_lo, b_hi, suffix = self._trim(a_lo, a_hi, b_lo, b_hi, matches)
+        if a_lo < a_hi and b_lo < b_hi:
+            anchors = self._unique_anchors(a_lo, a_hi, b_lo, b_hi)
+            if not anchors:
+                self.myers(a_lo, a_hi, b_lo, b_hi, matches)
+            else:
+                for i, j in anchors:
+                    self.patience(a_lo, i, b_lo, j, matches)
+                    matches.append((i, j, 1))
+                    a_lo, b_lo = i + 1, j + 1
+                self.patience(a_lo, a_hi, b_lo, b_hi, matches)
+        if suffix:
+            matches.append((a_hi, b_hi, suffix))
+
+    def _unique_anchors(self, a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> List[Tuple[int, int]]:
+        """Longest increasing run of items occurring exactly once on each side."""
+        a_pos: Dict[int, int] = {}
+        for i in range(a_lo, a_hi):
+            item = self.a[i]
+            a_pos[item] = -1 if item in a_pos else i
+        b_pos: Dict[int, int] = {}
+        for j in range(b_lo, b_hi):
+            item = self.b[j]
+            if a_pos.get(item, -1) >= 0:
+                b_pos[item] = -1 if item in b_pos else j
+
+        pairs = sorted((a_pos[item], j) for item, j in b_pos.items() if j >= 0)
+        if not pairs:
+            return []
+
+        # Patience sorting: longest increasing subsequence of b positions
+        tails: List[int] = []  # index into pairs of the smallest tail per length
+        previous: List[int] = [-1] * len(pairs)
+        tail_values: List[int] = []
+        for index, (_, j) in enumerate(pairs):
+            lo, hi = 0, len(tail_values)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if tail_values[mid] < j:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo:
+                previous[index] = tails[lo - 1]
+            if lo == len(tails):
+                tails.append(index)
+                tail_values.append(j)
+            else:
+                tails[lo] = index
+                tail_values[lo] = j
+
+        anchors = []
+        index = tails[-1]
+        while index >= 0:
+            anchors.append(pairs[index])
+            index = previous[index]
+        anchors.reverse()
+        return anchors
+
+    def myers(self, a_lo: int, a_hi: int, b_lo: int, b_hi: int, matches: list) -> None:
+        a_lo, a_hi, b_lo, b_hi, suffix = self._trim(a_lo, a_hi, b_lo, b_hi, matches)
+        if a_lo < a_hi and b_lo < b_hi:
+            split = self._middle_snake(a_lo, a_hi, b_lo, b_hi)
+            if split is not None:
+                x, y = split
+                self.myers(a_lo, x, b_lo, y, matches)
+                self.myers(x, a_hi, y, b_hi, matches)
+        if suffix:
+            matches.append((a_hi, b_hi, suffix))
+
+    def _middle_snake(self, a_lo: int, a_hi: int, b_lo: int, b_hi: int) -> Optional[Tuple[int, int]]:
+        """Find where an optimal edit path crosses its middle (Myers 1986, 4b).
+
+        Searches forward from the start and backward from the end at once,
+        keeping only one diagonal array per direction (linear space).
+
+        Returns:
+            Absolute (a, b) split point, or None if the regions share nothing
+            or need more than max_edits edits
+        """
+        a, b = self.a, self.b
+        n, m = a_hi - a_lo, b_hi - b_lo
+        max_d = (n + m + 1) // 2
+        offset = max_d
+        size = 2 * max_d + 2
+        forward = [-1] * size
+        backward = [-1] * size
+        forward[offset + 1] = 0
+        backward[offset + 1] = 0
+        delta = n - m
+        odd = delta % 2 != 0
+        # Diagonals that ran off the grid and needn't be extended again
+        k1_start = k1_end = k2_start = k2_end = 0
+
+        for d in range(min(max_d, self.max_edits + 1)):
+            for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+                k1_offset = offset + k1
+                if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                    x1 = forward[k1_offset + 1]
+                else:
+                    x1 = forward[k1_offset - 1] + 1
+                y1 = x1 - k1
+                while x1 < n and y1 < m and a[a_lo + x1] == b[b_lo + y1]:
+                    x1 += 1
+                    y1 += 1
+                forward[k1_offset] = x1
+                if x1 > n:
+                    k1_end += 2
+                elif y1 > m:
+                    k1_start += 2
+                elif odd:
+                    k2_offset = offset + delta - k1
+                    if 0 <= k2_offset < size and backward[k2_offset] != -1:
+                        if x1 >= n - backward[k2_offset]:
+                            return a_lo + x1, b_lo + y1
+
+            for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+                k2_offset = offset + k2
+                if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                    x2 = backward[k2_offset + 1]
+                else:
+                    x2 = backward[k2_offset - 1] + 1
+                y2 = x2 - k2
+                while x2 < n and y2 < m and a[a_hi - x2 - 1] == b[b_hi - y2 - 1]:
+                    x2 += 1
+                    y2 += 1
+                backward[k2_offset] = x2
+                if x2 > n:
+                    k2_end += 2
+                elif y2 > m:
+                    k2_start += 2
+                elif not odd:
+                    k1_offset = offset + delta - k2
+                    if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                        x1 = forward[k1_offset]
+                        y1 = x1 - (k1_offset - offset)
+                        if x1 >= n - x2:
+                            return a_lo + x1, b_lo + y1
+        return None
+
+
+def _opcodes(matches: List[Tuple[int, int, int]], n: int, m: int) -> List[DiffOp]:
+    ops: List[DiffOp] = []
+    i = j = 0
+    for a_start, b_start, size in sorted(matches) + [(n, m, 0)]:
+        if i < a_start and j < b_start:
+            ops.append(DiffOp("replace", i, a_start, j, b_start))
+        elif i < a_start:
+            ops.append(DiffOp("delete", i, a_start, j, j))
+        elif j < b_start:
+            ops.append(DiffOp("insert", i, i, j, b_start))
+        if size:
+            last = ops[-1] if ops else None
+            if last and last.tag == "equal" and last.a_end == a_start:
+                ops[-1] = DiffOp("equal", last.a_start, a_start + size, last.b_start, b_start + size)
+            else:
+                ops.append(DiffOp("equal", a_start, a_start + size, b_start, b_start + size))
+        i, j = a_start + size, b_start + size
+    return ops
+
+
+@dataclass
+class TextDiff:
+    """Token diff between two texts."""
+    a_tokens: List[str]
+    b_tokens: List[str]
+    ops: List[DiffOp]
+
+    @property
+    def changes(self) -> int:
+        """Number of changed runs."""
+        return sum(1 for op in self.ops if op.tag != "equal")
+
+    def lines(self, from_name: str = "a", to_name: str = "b", context: int = 8) -> List[str]:
+        """Unified-diff style lines, one hunk per change.
+
+        Hunk headers give token offsets ("@@ -12,3 +12,5 @@"); context lines
+        show up to `context` surrounding tokens.
+        """
+        def join(tokens: List[str]) -> str:
+            return " ".join(t.strip() for t in tokens)
+
+        lines = [f"--- {from_name}", f"+++ {to_name}"]
+        for index, op in enumerate(self.ops):
+            if op.tag == "equal":
+                continue
+            before = self.ops[index - 1] if index else None
+            after = self.ops[index + 1] if index + 1 < len(self.ops) else None
+            lines.append(
+                f"@@ -{op.a_start + 1},{op.a_end - op.a_start} +{op.b_start + 1},{op.b_end - op.b_start} @@"
+            )
+            if before is not None and context:
+                lines.append(" " + join(self.a_tokens[max(before.a_start, op.a_start - context):op.a_start]))
+            if op.a_end > op.a_start:
+                lines.append("-" + join(self.a_tokens[op.a_start:op.a_end]))
+            if op.b_end > op.b_start:
+                lines.append("+" + join(self.b_tokens[op.b_start:op.b_end]))
+            if after is not None and context:
+                lines.append(" " + join(self.a_tokens[op.a_end:min(after.a_end, op.a_end + context)]))
+        return lines
+
+
+def diff_texts(
+    a: str,
+    b: str,
+    granularity: str = "word",
+    algorithm: str = "patience",
+    max_edits: int = 500
+) -> TextDiff:
+    """Diff two texts by word or sentence.
+
+    Args:
+        a: Old text
+        b: New text
+        granularity: "word" or "sentence"
+        algorithm: "patience" or "myers"
+        max_edits: See diff_sequences
+
+    Returns:
+        TextDiff with tokens and opcodes
+    """
+    a_tokens = tokenize(a, granularity)
+    b_tokens = tokenize(b, granularity)
+    ops = diff_sequences(
+        [t.strip() for t in a_tokens], [t.strip() for t in b_tokens], algorithm, max_edits
+    )
+    return TextDiff(a_tokens, b_tokens, ops)
+
+
+class PairwiseDiffs(Mapping):
+    """Read-only mapping (name1, name2) -> diff lines, computed on first access.
+
+    Every pair (in input order) is a key, but a pair is only diffed when
+    looked up, so comparisons whose diffs are never viewed cost nothing.
+    """
+
+    def __init__(
+        self,
+        texts: Dict[str, str],
+        granularity: str = "word",
+        algorithm: str = "patience",
+        context: int = 8
+    ):
+        """Initialize pairwise diffs.
+
+        Args:
+            texts: Name -> text, in display order
+            granularity: "word" or "sentence"
+            algorithm: "patience" or "myers"
+            context: Context tokens around each change
+        """
+        self.texts = dict(texts)
+        self.granularity = granularity
+        self.algorithm = algorithm
+        self.context = context
+        names = list(self.texts)
+        self._pairs = [(x, y) for i, x in enumerate(names) for y in names[i + 1:]]
+        self._diffs: Dict[Tuple[str, str], TextDiff] = {}
+
+    def diff(self, name1: str, name2: str) -> TextDiff:
+        """Token diff for a pair (either order), computed once."""
+        key = (name1, name2)
+        if key not in self._diffs:
+            if name1 not in self.texts or name2 not in self.texts:
+                raise KeyError(key)
+            self._diffs[key] = diff_texts(
+                self.texts[name1], self.texts[name2], self.granularity, self.algorithm
+            )
+        return self._diffs[key]
+
+    def __getitem__(self, key: Tuple[str, str]) -> List[str]:
+        if key not in self._pairs:
+            raise KeyError(key)
+        return self.diff(*key).lines(key[0], key[1], self.context)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self._pairs)
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pairs
+
+
+def _token_hashes(text: str) -> np.ndarray:
+    words = [w.lower() for w in re.findall(r"\w+", text)]
+    return np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+
+
+def _shingles(hashes: np.ndarray, size: int) -> np.ndarray:
+    """Hash each run of `size` consecutive words to a value below the prime."""
+    if len(hashes) == 0:
+        return hashes
+    size = min(size, len(hashes))
+    count = len(hashes) - size + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        # Wrapping uint64 polynomial hash of the window
+        combined = combined * np.uint64(1000003) + hashes[offset:offset + count]
+    return (combined ^ (combined >> np.uint64(31))) % _MAX_HASH
+
+
+def minhash_signatures(
+    texts: Sequence[str],
+    num_perm: int = 128,
+    shingle_size: int = 3,
+    seed: int = 1
+) -> np.ndarray:
+    """MinHash signatures of each text's word shingles.
+
+    Args:
+        texts: Texts to sign
+        num_perm: Hash functions per signature (accuracy ~ 1/sqrt(num_perm))
+        shingle_size: Words per shingle
+        seed: Seed for the hash functions (signatures are only comparable
+            with the same seed)
+
+    Returns:
+        uint64 array of shape (len(texts), num_perm); texts without words
+        get a signature matching only other empty texts
+    """
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+    increments = rng.integers(0, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    signatures = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint64)
+    for row, text in enumerate(texts):
+        shingles = np.unique(_shingles(_token_hashes(text), shingle_size))
+        if len(shingles):
+            # (num_perm, shingles) universal hashes; products stay below 2**63
+            hashed = (multipliers * shingles[None, :] + increments) % _MAX_HASH
+            signatures[row] = hashed.min(axis=1)
+    return signatures
+
+
+def similarity_matrix(texts: Sequence[str], num_perm: int = 128, shingle_size: int = 3) -> np.ndarray:
+    """Estimated Jaccard similarity of word shingles between all texts.
+
+    Args:
+        texts: Texts to compare
+        num_perm: MinHash functions (see minhash_signatures)
+        shingle_size: Words per shingle
+
+    Returns:
+        Symmetric float array of shape (len(texts), len(texts)) with ones
+        on the diagonal
+    """
+    signatures = minhash_signatures(texts, num_perm, shingle_size)
+    return (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
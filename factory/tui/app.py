@@ -13,6 +13,9 @@ from rich.panel import Panel
 from rich.text import Text
 
 from factory.core.storage import Session, CostTracker, PreferencesManager
+from factory.core.config.loader import load_settings
+from factory.knowledge.classifier import QueryClassifier
+from factory.knowledge.prefetch import KnowledgePrefetcher
 from factory.knowledge.router import KnowledgeRouter
 from factory.tools import ModelComparisonTool
 from .status_bar import StatusBar
@@ -50,12 +53,19 @@ class WritersFactoryApp:
         # Knowledge router (Task 3)
         notebooklm_enabled = self.preferences.data.notebooklm_enabled if hasattr(self.preferences.data, 'notebooklm_enabled') else False
         notebooklm_id = self.preferences.data.notebooklm_notebook_id if hasattr(self.preferences.data, 'notebooklm_notebook_id') else None
+        router_settings = load_settings().get("knowledge", {}).get("router", {})
         self.knowledge_router = KnowledgeRouter(
             project_path=self.project_path,
             notebooklm_enabled=notebooklm_enabled,
-            notebooklm_notebook_id=notebooklm_id
+            notebooklm_notebook_id=notebooklm_id,
+            classifier=QueryClassifier.from_config(router_settings.get("query_classifier")),
+            persistent_cache=router_settings.get("persistent_cache")
         )
 
+        # Warm knowledge context for whichever scene the writer opens
+        self.prefetcher = KnowledgePrefetcher(self.knowledge_router)
+        self.prefetcher.attach(self.session)
+
         # UI components
         self.status_bar = StatusBar()
         self.navigator = StageNavigator(self.session.data.current_state.stage)
@@ -145,6 +155,8 @@ class WritersFactoryApp:
     async def stop(self):
         """Stop the application."""
         self.running = False
+        self.prefetcher.cancel()
+        self.knowledge_router.close()
         self.session.stop_auto_save()
         
         # Final save
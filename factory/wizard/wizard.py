@@ -5,7 +5,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +69,9 @@ class CreationWizard:
         self.project_path = Path(project_path)
         self.responses: Dict[str, str] = {}
         self.current_phase = WizardPhase.FOUNDATION
-        
+        self.question_index = 0  # Next question within the current phase
+        self.completed = False
+
     def get_phase_questions(self, phase: WizardPhase) -> List[str]:
         """Get questions for a phase.
         
@@ -122,6 +124,86 @@ class CreationWizard:
         self.responses[question] = answer
         logger.info(f"Recorded response for: {question[:50]}...")
     
+    def get_current_phase(self) -> WizardPhase:
+        """Get the phase being answered."""
+        return self.current_phase
+
+    def get_next_question(self) -> Optional[str]:
+        """Get the question to ask next.
+
+        Returns:
+            Question text, or None once every phase is answered
+        """
+        if self.completed:
+            return None
+        questions = self.get_phase_questions(self.current_phase)
+        return questions[self.question_index] if self.question_index < len(questions) else None
+
+    def process_answer(self, answer: str) -> None:
+        """Record the answer to the current question and move on.
+
+        Advances to the next phase after its last question, and marks the
+        wizard complete after the final phase.
+
+        Args:
+            answer: User's answer
+        """
+        question = self.get_next_question()
+        if question is None:
+            return
+        self.record_response(question, answer)
+        self.question_index += 1
+        if self.question_index >= len(self.get_phase_questions(self.current_phase)):
+            self.question_index = 0
+            if not self.advance_phase():
+                self.completed = True
+
+    def is_complete(self) -> bool:
+        """Whether every phase has been answered."""
+        return self.completed
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Progress through the wizard.
+
+        Returns:
+            Phase position, questions answered and percent complete
+        """
+        phases = list(WizardPhase)
+        total = sum(len(self.get_phase_questions(phase)) for phase in phases)
+        if self.completed:
+            answered = total
+        else:
+            current = phases.index(self.current_phase)
+            answered = sum(len(self.get_phase_questions(p)) for p in phases[:current]) + self.question_index
+        return {
+            "phase": self.current_phase.value,
+            "phase_number": phases.index(self.current_phase) + 1,
+            "total_phases": len(phases),
+            "answered": answered,
+            "total_questions": total,
+            "percent": round(100 * answered / total) if total else 100,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert wizard progress to a dictionary for storage."""
+        return {
+            "project_path": str(self.project_path),
+            "responses": dict(self.responses),
+            "current_phase": self.current_phase.value,
+            "question_index": self.question_index,
+            "completed": self.completed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CreationWizard":
+        """Restore a wizard saved with to_dict()."""
+        wizard = cls(Path(data["project_path"]))
+        wizard.responses = dict(data.get("responses", {}))
+        wizard.current_phase = WizardPhase(data.get("current_phase", WizardPhase.FOUNDATION.value))
+        wizard.question_index = data.get("question_index", 0)
+        wizard.completed = data.get("completed", False)
+        return wizard
+
     def advance_phase(self) -> bool:
         """Advance to next phase.
         
@@ -0,0 +1,19 @@
+"""Batch generation of whole chapters and acts.
+
+This module provides:
+- Batch jobs drafting every scene of selected acts/chapters
+- Persistent job progress with cancel/resume
+"""
+
+from .jobs import BatchJob, BatchJobStatus, BatchJobStore, SceneTask, SceneTaskStatus, select_scenes
+from .runner import BatchGenerationRunner
+
+__all__ = [
+    "BatchGenerationRunner",
+    "BatchJob",
+    "BatchJobStatus",
+    "BatchJobStore",
+    "SceneTask",
+    "SceneTaskStatus",
+    "select_scenes",
+]
@@ -0,0 +1,283 @@
+"""Batch generation job models and persistence.
+
+A batch job drafts every scene of a manuscript selection (acts and/or
+chapters). Its progress is one SceneTask per scene, saved as JSON after
+every change so an interrupted or cancelled job can be resumed.
+"""
+
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from factory.core.manuscript import Act, Chapter, Manuscript, Scene
+
+logger = logging.getLogger(__name__)
+
+
+class BatchJobStatus(Enum):
+    """Batch job status."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class SceneTaskStatus(Enum):
+    """Status of one scene within a batch job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # Scene already had content and overwrite was off
+
+
+DONE_STATUSES = (SceneTaskStatus.COMPLETED, SceneTaskStatus.SKIPPED)
+
+
+@dataclass
+class SceneTask:
+    """Generation of one scene.
+
+    Attributes:
+        scene_id: Scene identifier
+        chapter_id: Chapter containing the scene
+        act_id: Act containing the chapter
+        title: Scene title (for progress displays)
+        status: Task status
+        attempts: Generation attempts so far
+        error: Last error message
+        tokens: Tokens used by the successful generation
+        cost: Cost of the successful generation
+        word_count: Words written into the scene
+        completed_at: When the task finished (ISO format)
+    """
+
+    scene_id: str
+    chapter_id: str
+    act_id: str
+    title: str = ""
+    status: SceneTaskStatus = SceneTaskStatus.PENDING
+    attempts: int = 0
+    error: Optional[str] = None
+    tokens: int = 0
+    cost: float = 0.0
+    word_count: int = 0
+    completed_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "scene_id": self.scene_id,
+            "chapter_id": self.chapter_id,
+            "act_id": self.act_id,
+            "title": self.title,
+            "status": self.status.value,
+            "attempts": self.attempts,
+            "error": self.error,
+            "tokens": self.tokens,
+            "cost": self.cost,
+            "word_count": self.word_count,
+            "completed_at": self.completed_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SceneTask":
+        """Create SceneTask from dictionary."""
+        return cls(**{**data, "status": SceneTaskStatus(data.get("status", "pending"))})
+
+
+@dataclass
+class BatchJob:
+    """Batch generation over a manuscript selection.
+
+    Attributes:
+        id: Job identifier
+        agent: Pool agent drafting the scenes
+        act_ids: Selected acts
+        chapter_ids: Selected chapters
+        tasks: One task per selected scene, in manuscript order
+        status: Job status
+        settings: Generation settings (overwrite, voice_guide, max_tokens, continuity)
+        created_at: Creation time (ISO format)
+        updated_at: Last change (ISO format)
+    """
+
+    id: str
+    agent: str
+    act_ids: List[str] = field(default_factory=list)
+    chapter_ids: List[str] = field(default_factory=list)
+    tasks: List[SceneTask] = field(default_factory=list)
+    status: BatchJobStatus = BatchJobStatus.PENDING
+    settings: Dict[str, Any] = field(default_factory=dict)
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @classmethod
+    def create(cls, agent: str, act_ids: List[str], chapter_ids: List[str], **settings) -> "BatchJob":
+        """New pending job with a generated ID."""
+        return cls(
+            id=str(uuid.uuid4()),
+            agent=agent,
+            act_ids=list(act_ids),
+            chapter_ids=list(chapter_ids),
+            settings=settings,
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks per status."""
+        counts = {status.value: 0 for status in SceneTaskStatus}
+        for task in self.tasks:
+            counts[task.status.value] += 1
+        return counts
+
+    @property
+    def progress(self) -> float:
+        """Fraction of tasks completed or skipped."""
+        if not self.tasks:
+            return 1.0
+        return sum(t.status in DONE_STATUSES for t in self.tasks) / len(self.tasks)
+
+    @property
+    def total_cost(self) -> float:
+        """Cost of all completed scenes."""
+        return sum(t.cost for t in self.tasks)
+
+    def summary(self) -> Dict[str, Any]:
+        """Status overview without per-scene detail."""
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "status": self.status.value,
+            "progress": self.progress,
+            "scenes": self.counts(),
+            "total_cost": self.total_cost,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "id": self.id,
+            "agent": self.agent,
+            "act_ids": self.act_ids,
+            "chapter_ids": self.chapter_ids,
+            "tasks": [task.to_dict() for task in self.tasks],
+            "status": self.status.value,
+            "settings": self.settings,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        """Create BatchJob from dictionary."""
+        return cls(
+            id=data["id"],
+            agent=data["agent"],
+            act_ids=data.get("act_ids", []),
+            chapter_ids=data.get("chapter_ids", []),
+            tasks=[SceneTask.from_dict(t) for t in data.get("tasks", [])],
+            status=BatchJobStatus(data.get("status", "pending")),
+            settings=data.get("settings", {}),
+            created_at=data.get("created_at", datetime.now().isoformat()),
+            updated_at=data.get("updated_at", datetime.now().isoformat()),
+        )
+
+
+class BatchJobStore:
+    """Persists batch jobs as one JSON file each (atomic writes)."""
+
+    def __init__(self, jobs_path: Path):
+        """Initialize job store.
+
+        Args:
+            jobs_path: Directory for job files
+        """
+        self.jobs_path = Path(jobs_path)
+
+    def _path(self, job_id: str) -> Path:
+        return self.jobs_path / f"{job_id}.json"
+
+    def save(self, job: BatchJob) -> None:
+        """Write a job (temp file + rename)."""
+        self.jobs_path.mkdir(parents=True, exist_ok=True)
+        job.updated_at = datetime.now().isoformat()
+        temp_path = self.jobs_path / f"{job.id}.json.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f, indent=2, ensure_ascii=False)
+        temp_path.replace(self._path(job.id))
+
+    def load(self, job_id: str) -> Optional[BatchJob]:
+        """Load a job, or None if it doesn't exist."""
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return BatchJob.from_dict(json.load(f))
+
+    def list_jobs(self) -> List[BatchJob]:
+        """All stored jobs, newest first."""
+        if not self.jobs_path.exists():
+            return []
+        jobs = []
+        for path in self.jobs_path.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    jobs.append(BatchJob.from_dict(json.load(f)))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Skipping unreadable job file {path}: {e}")
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def delete(self, job_id: str) -> bool:
+        """Delete a job file."""
+        path = self._path(job_id)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+
+def select_scenes(
+    manuscript: Manuscript,
+    act_ids: Optional[List[str]] = None,
+    chapter_ids: Optional[List[str]] = None
+) -> List[Tuple[Act, Chapter, Scene]]:
+    """Scenes of the selected acts and chapters, in manuscript order.
+
+    Args:
+        manuscript: Manuscript to select from
+        act_ids: Acts whose scenes are all selected
+        chapter_ids: Individual chapters selected
+
+    Returns:
+        (act, chapter, scene) for each selected scene
+
+    Raises:
+        ValueError: If an ID doesn't exist or nothing is selected
+    """
+    act_ids = list(act_ids or [])
+    chapter_ids = list(chapter_ids or [])
+    if not act_ids and not chapter_ids:
+        raise ValueError("Select at least one act or chapter")
+
+    missing = [a for a in act_ids if manuscript.get_act(a) is None]
+    missing += [c for c in chapter_ids if manuscript.get_chapter(c) is None]
+    if missing:
+        raise ValueError(f"Unknown act/chapter ids: {', '.join(missing)}")
+
+    return [
+        (act, chapter, scene)
+        for act in manuscript.acts
+        for chapter in act.chapters
+        if act.id in act_ids or chapter.id in chapter_ids
+        for scene in chapter.scenes
+    ]
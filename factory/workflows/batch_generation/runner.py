@@ -0,0 +1,359 @@
+"""Batch scene generation over manuscript selections.
+
+Drafts every scene of the selected acts/chapters through the AgentPool:
+
+- Scenes run concurrently up to ``max_concurrency``. With continuity on
+  (the default), scenes of one chapter run in order so each can see the
+  ending of the one before it, while different chapters run in parallel.
+- Each finished scene is written into ``Scene.content`` of the stored
+  manuscript right away (reloaded first, so edits made meanwhile are kept),
+  so partial results survive a crash.
+- Job progress is persisted after every change; cancel() stops in-flight
+  generations and resume() picks up the remaining (and failed) scenes.
+"""
+
+import asyncio
+import inspect
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from factory.core.manuscript import Manuscript, ManuscriptStorage
+from factory.core.workflow_engine import WorkflowStatus
+from factory.workflows.scene_operations import SceneGenerationWorkflow
+
+from .jobs import (
+    BatchJob,
+    BatchJobStatus,
+    BatchJobStore,
+    SceneTask,
+    SceneTaskStatus,
+    select_scenes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Called with (job, task) whenever a scene starts or finishes; may be async
+ProgressCallback = Callable[[BatchJob, Optional[SceneTask]], Any]
+
+
+class BatchGenerationRunner:
+    """Creates, runs, cancels and resumes batch generation jobs."""
+
+    def __init__(
+        self,
+        storage: ManuscriptStorage,
+        agent_pool: Any,
+        job_store: Optional[BatchJobStore] = None,
+        knowledge_router: Optional[Any] = None,
+        cost_tracker: Optional[Any] = None,
+        max_concurrency: int = 4,
+        previous_scenes: int = 2
+    ):
+        """Initialize runner.
+
+        Args:
+            storage: Manuscript storage scenes are written back to
+            agent_pool: Agent pool used for generation
+            job_store: Job persistence (default: jobs/ next to the manuscript)
+            knowledge_router: Knowledge router for scene context
+            cost_tracker: Cost tracker for generation costs
+            max_concurrency: Scenes generated at the same time
+            previous_scenes: Earlier scenes of the chapter passed as context
+        """
+        self.storage = storage
+        self.agent_pool = agent_pool
+        self.job_store = job_store or BatchJobStore(Path(storage.storage_path) / "jobs")
+        self.knowledge_router = knowledge_router
+        self.cost_tracker = cost_tracker
+        self.max_concurrency = max_concurrency
+        self.previous_scenes = previous_scenes
+        self._manuscript: Optional[Manuscript] = None
+        self._lanes: Dict[str, List[asyncio.Task]] = {}
+        self._cancelled: Set[str] = set()
+
+    @property
+    def manuscript(self) -> Manuscript:
+        """The manuscript being written (loaded on first use)."""
+        if self._manuscript is None:
+            self._manuscript = self.storage.load()
+            if self._manuscript is None:
+                raise ValueError(f"No manuscript found in {self.storage.storage_path}")
+        return self._manuscript
+
+    def create_job(
+        self,
+        agent: str,
+        act_ids: Optional[List[str]] = None,
+        chapter_ids: Optional[List[str]] = None,
+        overwrite: bool = False,
+        continuity: bool = True,
+        voice_guide: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> BatchJob:
+        """Create and persist a pending job.
+
+        Args:
+            agent: Pool agent to draft with
+            act_ids: Acts to draft in full
+            chapter_ids: Individual chapters to draft
+            overwrite: Regenerate scenes that already have content
+            continuity: Draft each chapter's scenes in order
+            voice_guide: Voice guide passed to every scene
+            max_tokens: Response token budget per scene
+
+        Returns:
+            The new job
+
+        Raises:
+            ValueError: If the agent or selection is invalid
+        """
+        if self.agent_pool.get_agent(agent) is None:
+            raise ValueError(f"Unknown agent '{agent}'")
+
+        selected = select_scenes(self.manuscript, act_ids, chapter_ids)
+        job = BatchJob.create(
+            agent, act_ids or [], chapter_ids or [],
+            overwrite=overwrite, continuity=continuity,
+            voice_guide=voice_guide, max_tokens=max_tokens,
+        )
+        for act, chapter, scene in selected:
+            task = SceneTask(scene.id, chapter.id, act.id, scene.title)
+            if scene.content and not overwrite:
+                task.status = SceneTaskStatus.SKIPPED
+                task.word_count = scene.word_count
+            job.tasks.append(task)
+
+        self.job_store.save(job)
+        logger.info(f"Created batch job {job.id}: {len(job.tasks)} scenes with '{agent}'")
+        return job
+
+    def get_job(self, job_id: str) -> BatchJob:
+        """Load a job.
+
+        Raises:
+            ValueError: If the job doesn't exist
+        """
+        job = self.job_store.load(job_id)
+        if job is None:
+            raise ValueError(f"Unknown batch job '{job_id}'")
+        return job
+
+    def is_running(self, job_id: str) -> bool:
+        """Whether the job is running in this process."""
+        return job_id in self._lanes
+
+    async def run(self, job_id: str, on_progress: Optional[ProgressCallback] = None) -> BatchJob:
+        """Run a job's remaining scenes.
+
+        Scenes left running by an interrupted run and failed scenes are
+        retried; completed and skipped scenes are left alone.
+
+        Args:
+            job_id: Job to run
+            on_progress: Called when scenes start and finish, and at the end
+
+        Returns:
+            The job in its final state
+
+        Raises:
+            ValueError: If the job doesn't exist
+            RuntimeError: If the job is already running
+        """
+        if self.is_running(job_id):
+            raise RuntimeError(f"Batch job '{job_id}' is already running")
+        job = self.get_job(job_id)
+
+        for task in job.tasks:
+            if task.status in (SceneTaskStatus.RUNNING, SceneTaskStatus.FAILED):
+                task.status = SceneTaskStatus.PENDING
+        job.status = BatchJobStatus.RUNNING
+        self.job_store.save(job)
+        await self._notify(on_progress, job, None)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        lanes = [
+            asyncio.create_task(self._run_lane(job, lane, semaphore, on_progress))
+            for lane in self._lanes_for(job)
+        ]
+        self._lanes[job.id] = lanes
+        try:
+            await asyncio.gather(*lanes, return_exceptions=True)
+        except asyncio.CancelledError:
+            # The caller was cancelled: stop our generations and record that
+            for lane in lanes:
+                lane.cancel()
+            await asyncio.gather(*lanes, return_exceptions=True)
+            self._cancelled.add(job.id)
+            self._finish(job)
+            raise
+        finally:
+            self._lanes.pop(job.id, None)
+
+        self._finish(job)
+        await self._notify(on_progress, job, None)
+        return job
+
+    async def resume(self, job_id: str, on_progress: Optional[ProgressCallback] = None) -> BatchJob:
+        """Continue a cancelled, failed or interrupted job (see run)."""
+        return await self.run(job_id, on_progress)
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a job.
+
+        Running generations are cancelled and their scenes return to
+        pending, so resume() regenerates them.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            True if the job was running or pending, False otherwise
+        """
+        lanes = self._lanes.get(job_id)
+        if lanes is not None:
+            self._cancelled.add(job_id)
+            for lane in lanes:
+                lane.cancel()
+            await asyncio.gather(*lanes, return_exceptions=True)
+            return True
+
+        job = self.job_store.load(job_id)
+        if job is None or job.status not in (BatchJobStatus.PENDING, BatchJobStatus.RUNNING):
+            return False
+        # Pending, or left running by a process that went away
+        self._cancelled.add(job_id)
+        self._finish(job)
+        return True
+
+    def _lanes_for(self, job: BatchJob) -> List[List[SceneTask]]:
+        """Group pending tasks into sequential lanes."""
+        pending = [t for t in job.tasks if t.status is SceneTaskStatus.PENDING]
+        if not job.settings.get("continuity", True):
+            return [[task] for task in pending]
+
+        lanes: Dict[str, List[SceneTask]] = {}
+        for task in pending:
+            lanes.setdefault(task.chapter_id, []).append(task)
+        return list(lanes.values())
+
+    async def _run_lane(
+        self,
+        job: BatchJob,
+        tasks: List[SceneTask],
+        semaphore: asyncio.Semaphore,
+        on_progress: Optional[ProgressCallback]
+    ) -> None:
+        for task in tasks:
+            async with semaphore:
+                await self._generate(job, task, on_progress)
+
+    async def _generate(
+        self,
+        job: BatchJob,
+        task: SceneTask,
+        on_progress: Optional[ProgressCallback]
+    ) -> None:
+        """Generate one scene and write it into the manuscript."""
+        chapter = self.manuscript.get_chapter(task.chapter_id)
+        scene = chapter.get_scene(task.scene_id) if chapter else None
+        if scene is None:
+            task.status = SceneTaskStatus.FAILED
+            task.error = "Scene no longer exists"
+            self.job_store.save(job)
+            await self._notify(on_progress, job, task)
+            return
+
+        task.status = SceneTaskStatus.RUNNING
+        task.attempts += 1
+        task.error = None
+        self.job_store.save(job)
+        await self._notify(on_progress, job, task)
+
+        index = chapter.scenes.index(scene)
+        previous = [s.content for s in chapter.scenes[:index] if s.content]
+        previous = previous[-self.previous_scenes:] if self.previous_scenes else []
+
+        try:
+            workflow = SceneGenerationWorkflow(
+                knowledge_router=self.knowledge_router,
+                agent_pool=self.agent_pool,
+                cost_tracker=self.cost_tracker,
+            )
+            result = await workflow.run(
+                outline=scene.metadata.get("outline") or scene.notes or scene.title,
+                model_name=job.agent,
+                use_knowledge_context=self.knowledge_router is not None,
+                previous_scenes=previous,
+                voice_guide=job.settings.get("voice_guide"),
+                agents=[job.agent],
+                max_tokens=job.settings.get("max_tokens"),
+            )
+            if result.status is not WorkflowStatus.COMPLETED:
+                raise RuntimeError("; ".join(result.errors) or "Scene generation failed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Batch job {job.id}: scene '{scene.title}' failed: {e}")
+            task.status = SceneTaskStatus.FAILED
+            task.error = str(e)
+        else:
+            content = result.outputs["scene"]
+
+            def write(stored) -> None:
+                stored.update_content(content)
+                stored.metadata["generated_by"] = job.agent
+                stored.metadata["batch_job"] = job.id
+
+            saved = await asyncio.to_thread(
+                self.storage.update_scene, task.chapter_id, task.scene_id, write
+            )
+            if saved is None:
+                logger.error(f"Batch job {job.id}: failed to save '{scene.title}' to the manuscript")
+                task.status = SceneTaskStatus.FAILED
+                task.error = "Could not save scene to the manuscript"
+            else:
+                # Later scenes see this one (and other edits) as context
+                self._manuscript = saved
+                write(scene)
+                usage = result.metadata.get("usage", {}).get(job.agent, {})
+                task.status = SceneTaskStatus.COMPLETED
+                task.tokens = usage.get("tokens", 0)
+                task.cost = usage.get("cost", 0.0)
+                task.word_count = scene.word_count
+                task.completed_at = datetime.now().isoformat()
+
+        self.job_store.save(job)
+        await self._notify(on_progress, job, task)
+
+    def _finish(self, job: BatchJob) -> None:
+        """Set the final job status and persist it."""
+        if job.id in self._cancelled:
+            self._cancelled.discard(job.id)
+            for task in job.tasks:
+                if task.status is SceneTaskStatus.RUNNING:
+                    task.status = SceneTaskStatus.PENDING
+            job.status = BatchJobStatus.CANCELLED
+        elif any(t.status is SceneTaskStatus.FAILED for t in job.tasks):
+            job.status = BatchJobStatus.FAILED
+        else:
+            job.status = BatchJobStatus.COMPLETED
+
+        self.job_store.save(job)
+        counts = job.counts()
+        logger.info(
+            f"Batch job {job.id} {job.status.value}: {counts['completed']} completed, "
+            f"{counts['failed']} failed, {counts['pending']} pending"
+        )
+
+    @staticmethod
+    async def _notify(callback: Optional[ProgressCallback], job: BatchJob, task: Optional[SceneTask]) -> None:
+        if callback is None:
+            return
+        try:
+            result = callback(job, task)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Batch progress callback failed: {e}")
@@ -3,15 +3,19 @@
 This module provides workflows for common scene operations:
 - Scene generation with knowledge context
 - Scene enhancement with voice consistency
-- Voice testing across models
+- Voice testing across models, as concurrent tournaments
 """
 
 from .generation import SceneGenerationWorkflow
 from .enhancement import SceneEnhancementWorkflow
+from .tournament import TournamentEntry, TournamentResult, VoiceTournament
 from .voice_testing import VoiceTestingWorkflow
 
 __all__ = [
     "SceneGenerationWorkflow",
     "SceneEnhancementWorkflow",
     "VoiceTestingWorkflow",
+    "VoiceTournament",
+    "TournamentEntry",
+    "TournamentResult",
 ]
@@ -1,9 +1,14 @@
 """Scene enhancement workflow with voice consistency."""
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
+from factory.core.prompt_builder import PromptBuilder
+from factory.core.prompt_cache import get_prefix_registry
+from factory.core.stylometry import VoiceScorer
 from factory.core.workflow_engine import Workflow, WorkflowResult, WorkflowStatus
+from factory.knowledge.prefetch import voice_requirements_query
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -23,6 +28,8 @@ class SceneEnhancementWorkflow(Workflow):
         self,
         knowledge_router: Optional[Any] = None,
         agent_pool: Optional[Any] = None,
+        voice_scorer: Optional[VoiceScorer] = None,
+        pass_threshold: float = 60.0,
         **kwargs
     ):
         """Initialize scene enhancement workflow.
@@ -30,16 +37,24 @@ class SceneEnhancementWorkflow(Workflow):
         Args:
             knowledge_router: Knowledge router for voice requirements
             agent_pool: Agent pool for scene enhancement
+            voice_scorer: Scorer holding character voice profiles
+                (default: an empty in-memory scorer)
+            pass_threshold: Minimum voice score for validation to pass
         """
         super().__init__(name="Scene Enhancement", **kwargs)
         self.knowledge_router = knowledge_router
         self.agent_pool = agent_pool
+        self.voice_scorer = voice_scorer or VoiceScorer()
+        self.pass_threshold = pass_threshold
 
     async def run(
         self,
         scene: str,
         model_name: str = "claude-sonnet-4.5",
-        character: str = "protagonist"
+        character: str = "protagonist",
+        previous_scenes: Optional[List[str]] = None,
+        agents: Optional[List[str]] = None,
+        max_tokens: Optional[int] = None
     ) -> WorkflowResult:
         """Execute scene enhancement workflow.
 
@@ -47,6 +62,9 @@ class SceneEnhancementWorkflow(Workflow):
             scene: Original scene text
             model_name: Model to use for enhancement
             character: Character name for voice consistency
+            previous_scenes: Earlier scenes, oldest first, for continuity
+            agents: Pool agents to enhance with in parallel (default: model_name)
+            max_tokens: Response token budget per agent
 
         Returns:
             WorkflowResult with enhanced scene
@@ -59,7 +77,10 @@ class SceneEnhancementWorkflow(Workflow):
         self.context.update({
             "scene": scene,
             "model_name": model_name,
-            "character": character
+            "character": character,
+            "previous_scenes": previous_scenes or [],
+            "agents": agents or [model_name],
+            "max_tokens": max_tokens
         })
 
         try:
@@ -90,7 +111,7 @@ class SceneEnhancementWorkflow(Workflow):
 
         if self.knowledge_router:
             try:
-                query = f"What are the voice requirements for {character}?"
+                query = voice_requirements_query(character)
                 result = await self.knowledge_router.query(query)
                 return result.answer
             except Exception as e:
@@ -98,33 +119,107 @@ class SceneEnhancementWorkflow(Workflow):
 
         return f"Voice requirements for {character} (default)"
 
-    async def _enhance_scene(self, context: Dict[str, Any]) -> str:
-        """Enhance scene with AI."""
-        scene = context["scene"]
-        analysis = context["analyze_scene"]
-        voice_guide = context["get_voice_requirements"]
-        model_name = context["model_name"]
+    def _build_prompt(self, context: Dict[str, Any]) -> PromptBuilder:
+        """Assemble prompt sections by priority.
 
-        # Build enhancement prompt
-        prompt = f"""Enhance this scene while maintaining voice consistency:
+        The scene itself is never cut; the voice guide outranks prior-scene
+        excerpts, which are the first to go in a small context window. The
+        character's voice requirements come first so providers can cache
+        them as a prefix across the scenes of a session.
 
-Scene:
-{scene}
+        Args:
+            context: Workflow context
 
-Analysis: {analysis['word_count']} words, {analysis['sentence_count']} sentences
-Voice Requirements: {voice_guide}
+        Returns:
+            PromptBuilder with the enhancement's sections
+        """
+        analysis = context["analyze_scene"]
+        builder = PromptBuilder()
+
+        builder.add(
+            "voice_guide", context["get_voice_requirements"], priority=80,
+            header="Voice Requirements: ", min_tokens=50, cacheable=True,
+        )
+        builder.add(
+            "instructions", "Enhance this scene while maintaining voice consistency:", required=True
+        )
+        builder.add("scene", context["scene"], header="Scene:\n", required=True)
+        builder.add(
+            "analysis",
+            f"Analysis: {analysis['word_count']} words, {analysis['sentence_count']} sentences",
+            priority=90,
+        )
+
+        previous = context.get("previous_scenes", [])
+        for index, scene in enumerate(previous):
+            distance = len(previous) - index
+            builder.add(
+                f"previous_scene_{distance}",
+                scene,
+                priority=40 - distance,
+                header=f"Previous Scene (-{distance}), ending:\n",
+                keep="end",
+                min_tokens=100,
+            )
 
-Enhance by:
+        builder.add(
+            "closing",
+            """Enhance by:
 1. Tightening prose
 2. Deepening character voice
 3. Fixing any voice inconsistencies
 4. Improving pacing
 
-Return the enhanced scene."""
+Return the enhanced scene.""",
+            required=True,
+        )
+        return builder
+
+    async def _enhance_scene(self, context: Dict[str, Any]) -> str:
+        """Enhance scene with AI.
+
+        The prompt is packed once per distinct agent budget and sent to each
+        target agent concurrently; the first successful result (in agent
+        order) is returned and all of them are kept in context["drafts"].
+        """
+        scene = context["scene"]
+        model_name = context["model_name"]
+        targets = context.get("agents") or [model_name]
+        max_tokens = context.get("max_tokens")
+
+        builder = self._build_prompt(context)
+
+        if self.agent_pool is not None and all(self.agent_pool.get_agent(n) for n in targets):
+            packs = builder.pack_for_agents(
+                {name: self.agent_pool.get_agent(name) for name in targets}, max_tokens
+            )
+            context["prompt"] = {name: packed.summary() for name, packed in packs.items()}
+            for packed in packs.values():
+                if packed.cache_prefix:
+                    get_prefix_registry().register(
+                        packed.cache_prefix, name=f"voice:{context['character']}"
+                    )
+
+            kwargs = {} if max_tokens is None else {"max_tokens": max_tokens}
+            logger.info(f"Enhancing scene with {', '.join(targets)}")
+            responses = await asyncio.gather(*(
+                self.agent_pool.execute_single(name, packs[name].text, **kwargs)
+                for name in targets
+            ))
+
+            context["drafts"] = {r.agent_name: r.output for r in responses if r.success}
+            for response in responses:
+                if response.success:
+                    return response.output
+            errors = "; ".join(f"{r.agent_name}: {r.error}" for r in responses)
+            raise RuntimeError(f"Scene enhancement failed: {errors}")
+
+        packed = builder.pack_for_model(model_name, max_tokens)
+        context["prompt"] = {model_name: packed.summary()}
 
         logger.info(f"Enhancing scene with {model_name}")
 
-        # Placeholder enhancement
+        # No pool configured: placeholder enhancement
         enhanced = f"""# Enhanced Scene
 
 [Enhanced with {model_name}]
@@ -136,16 +231,43 @@ Return the enhanced scene."""
         return enhanced
 
     async def _validate_voice(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate voice consistency of enhanced scene."""
+        """Validate voice consistency of enhanced scene.
+
+        The enhanced scene is scored against the character's voice profile,
+        or, if the character hasn't been profiled, against the original and
+        previous scenes. Feature groups more than two standard deviations
+        off the reference are reported as issues.
+        """
         enhanced = context["enhance_scene"]
         character = context["character"]
+        scorer = self.voice_scorer
+
+        if scorer.has_profile(character):
+            reference = character
+            scored_against = "profile"
+        else:
+            try:
+                reference = scorer.profile_from_texts([context["scene"], *context.get("previous_scenes", [])])
+            except ValueError:
+                logger.warning("No reference text to validate voice against")
+                return {"passed": False, "score": 0.0, "issues": ["No reference text"], "character": character}
+            scored_against = "original_scene"
+
+        score = round(float(scorer.score(reference, [enhanced])[0]), 1)
+        deviations = scorer.deviations(reference, enhanced)
+        issues = [
+            f"{group.replace('_', ' ')} deviates from {character}'s voice ({deviation:.1f} std devs)"
+            for group, deviation in sorted(deviations.items(), key=lambda item: -item[1])
+            if deviation > 2.0
+        ]
 
-        # Simple validation
         validation = {
-            "passed": True,
-            "score": 85.0,
-            "issues": [],
-            "character": character
+            "passed": score >= self.pass_threshold,
+            "score": score,
+            "issues": issues,
+            "character": character,
+            "scored_against": scored_against,
+            "deviations": {group: round(d, 2) for group, d in deviations.items()}
         }
 
         logger.info(f"Voice validation score: {validation['score']}")
@@ -173,9 +295,13 @@ Return the enhanced scene."""
                 steps_total=len(self.steps),
                 outputs={
                     "enhanced_scene": enhanced_scene,
-                    "validation": validation
+                    "validation": validation,
+                    "drafts": self.context.get("drafts", {})
                 },
-                metadata={"character": self.context.get("character")}
+                metadata={
+                    "character": self.context.get("character"),
+                    "prompt": self.context.get("prompt", {})
+                }
             )
 
         except Exception as e:
@@ -1,10 +1,14 @@
 """Scene generation workflow with knowledge context."""
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+from factory.core.prompt_builder import PromptBuilder
+from factory.core.prompt_cache import get_prefix_registry
 from factory.core.workflow_engine import Workflow, WorkflowResult, WorkflowStatus
+from factory.knowledge.prefetch import DEFAULT_MAX_CONTEXT_QUERIES, scene_context_queries
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -25,6 +29,8 @@ class SceneGenerationWorkflow(Workflow):
         knowledge_router: Optional[Any] = None,
         agent_pool: Optional[Any] = None,
         cost_tracker: Optional[Any] = None,
+        known_characters: Optional[List[str]] = None,
+        max_context_queries: Optional[int] = DEFAULT_MAX_CONTEXT_QUERIES,
         **kwargs
     ):
         """Initialize scene generation workflow.
@@ -33,18 +39,28 @@ class SceneGenerationWorkflow(Workflow):
             knowledge_router: Knowledge router for context queries
             agent_pool: Agent pool for scene generation
             cost_tracker: Cost tracker for logging operations
+            known_characters: Character names to look for in outlines
+                (share with KnowledgePrefetcher so prefetched queries hit)
+            max_context_queries: Cap on auto-generated context queries
+                (None = no cap)
         """
         super().__init__(name="Scene Generation", **kwargs)
         self.knowledge_router = knowledge_router
         self.agent_pool = agent_pool
         self.cost_tracker = cost_tracker
+        self.known_characters = list(known_characters or [])
+        self.max_context_queries = max_context_queries
 
     async def run(
         self,
         outline: str,
         model_name: str = "claude-sonnet-4.5",
         use_knowledge_context: bool = True,
-        context_queries: Optional[List[str]] = None
+        context_queries: Optional[List[str]] = None,
+        previous_scenes: Optional[List[str]] = None,
+        voice_guide: Optional[str] = None,
+        agents: Optional[List[str]] = None,
+        max_tokens: Optional[int] = None
     ) -> WorkflowResult:
         """Execute scene generation workflow.
 
@@ -53,6 +69,11 @@ class SceneGenerationWorkflow(Workflow):
             model_name: Model to use for generation
             use_knowledge_context: Whether to query knowledge base
             context_queries: Optional specific queries for context
+            previous_scenes: Earlier scenes, oldest first; their endings are
+                included as excerpts when the context window allows
+            voice_guide: Voice/style guide for the scene
+            agents: Pool agents to draft with in parallel (default: model_name)
+            max_tokens: Response token budget per agent
 
         Returns:
             WorkflowResult with generated scene
@@ -84,7 +105,11 @@ class SceneGenerationWorkflow(Workflow):
         self.context.update({
             "outline": outline,
             "model_name": model_name,
-            "context_queries": context_queries or []
+            "context_queries": context_queries or [],
+            "previous_scenes": previous_scenes or [],
+            "voice_guide": voice_guide,
+            "agents": agents or [model_name],
+            "max_tokens": max_tokens
         })
 
         # Execute workflow
@@ -131,27 +156,94 @@ class SceneGenerationWorkflow(Workflow):
         queries = context.get("context_queries", [])
 
         if not queries:
-            # Auto-generate query from outline
-            queries = [f"Provide context for: {outline_data['raw_outline'][:100]}"]
+            # Auto-generate queries from the outline; these match what
+            # KnowledgePrefetcher warms for the same outline
+            queries = scene_context_queries(
+                outline_data['raw_outline'], self.known_characters, self.max_context_queries
+            )
 
         context_data = {}
 
-        for query in queries:
-            try:
-                result = await self.knowledge_router.query(query)
-                context_data[query] = result.answer
-            except Exception as e:
-                logger.warning(f"Context query failed: {e}")
+        # Dispatch all lookups together instead of awaiting them one by one
+        results = await self.knowledge_router.query_many(queries, return_exceptions=True)
+
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Context query failed: {result}")
                 context_data[query] = ""
+            else:
+                context_data[query] = result.answer
 
         return {
             "queries": queries,
             "context": context_data
         }
 
+    def _build_prompt(self, context: Dict[str, Any]) -> PromptBuilder:
+        """Assemble prompt sections by priority.
+
+        Outline and instructions are kept whole where possible; voice guide,
+        knowledge answers and prior-scene excerpts (most recent first) give
+        way in that order when the model's context window is tight. The
+        voice guide comes first so providers can cache it as a prefix.
+
+        Args:
+            context: Workflow context
+
+        Returns:
+            PromptBuilder with the scene's sections
+        """
+        outline_data = context["parse_outline"]
+        builder = PromptBuilder()
+
+        # Stable across the session's scenes, so it leads as the cache prefix
+        builder.add(
+            "voice_guide", context.get("voice_guide"), priority=80,
+            header="Voice Guide:\n", min_tokens=50, cacheable=True,
+        )
+        builder.add(
+            "instructions", "Generate a scene based on this outline:", required=True
+        )
+        builder.add("outline", outline_data["raw_outline"], priority=100, min_tokens=50)
+
+        if "get_context" in context:
+            answers = [a for a in context["get_context"]["context"].values() if a]
+            builder.add(
+                "knowledge",
+                "\n".join(f"Context: {answer}" for answer in answers),
+                priority=60,
+                header="Relevant Context:\n",
+                min_tokens=50,
+            )
+
+        # Endings of earlier scenes lead into this one; nearer scenes rank higher
+        previous = context.get("previous_scenes", [])
+        for index, scene in enumerate(previous):
+            distance = len(previous) - index
+            builder.add(
+                f"previous_scene_{distance}",
+                scene,
+                priority=40 - distance,
+                header=f"Previous Scene (-{distance}), ending:\n",
+                keep="end",
+                min_tokens=100,
+            )
+
+        builder.add(
+            "closing",
+            "Generate the complete scene with authentic voice and compressed phrasing.",
+            required=True,
+        )
+        return builder
+
     async def _generate_scene(self, context: Dict[str, Any]) -> str:
         """Generate scene using selected model.
 
+        The prompt is packed once per distinct agent budget and sent to
+        each target agent concurrently; the first successful draft (in
+        agent order) becomes the scene and all drafts are kept in
+        context["drafts"].
+
         Args:
             context: Workflow context
 
@@ -160,25 +252,44 @@ class SceneGenerationWorkflow(Workflow):
         """
         outline_data = context["parse_outline"]
         model_name = context["model_name"]
+        targets = context.get("agents") or [model_name]
+        max_tokens = context.get("max_tokens")
 
-        # Build prompt
-        prompt = f"Generate a scene based on this outline:\n\n{outline_data['raw_outline']}"
+        builder = self._build_prompt(context)
 
-        # Add knowledge context if available
-        if "get_context" in context:
-            kb_context = context["get_context"]
-            context_text = "\n".join(
-                f"Context: {answer}" for answer in kb_context["context"].values() if answer
+        if self.agent_pool is not None and all(self.agent_pool.get_agent(n) for n in targets):
+            packs = builder.pack_for_agents(
+                {name: self.agent_pool.get_agent(name) for name in targets}, max_tokens
             )
-            if context_text:
-                prompt += f"\n\nRelevant Context:\n{context_text}"
-
-        prompt += "\n\nGenerate the complete scene with authentic voice and compressed phrasing."
-
-        # Mock generation for now - in real implementation, use agent_pool
+            context["prompt"] = {name: packed.summary() for name, packed in packs.items()}
+            for packed in packs.values():
+                if packed.cache_prefix:
+                    get_prefix_registry().register(packed.cache_prefix, name="voice_guide")
+
+            kwargs = {} if max_tokens is None else {"max_tokens": max_tokens}
+            logger.info(f"Generating scene with {', '.join(targets)}")
+            responses = await asyncio.gather(*(
+                self.agent_pool.execute_single(name, packs[name].text, **kwargs)
+                for name in targets
+            ))
+
+            context["drafts"] = {r.agent_name: r.output for r in responses if r.success}
+            context["usage"] = {
+                r.agent_name: {"tokens": r.total_tokens, "cost": r.cost} for r in responses if r.success
+            }
+            await self._log_costs(responses)
+            for response in responses:
+                if response.success:
+                    return response.output
+            errors = "; ".join(f"{r.agent_name}: {r.error}" for r in responses)
+            raise RuntimeError(f"Scene generation failed: {errors}")
+
+        packed = builder.pack_for_model(model_name, max_tokens)
+        context["prompt"] = {model_name: packed.summary()}
+
+        # No pool configured: placeholder scene
         logger.info(f"Generating scene with {model_name}")
 
-        # Placeholder scene
         scene = f"""# Generated Scene
 
 [Scene generated from outline with {model_name}]
@@ -190,6 +301,27 @@ class SceneGenerationWorkflow(Workflow):
 
         return scene
 
+    async def _log_costs(self, responses: List[Any]) -> None:
+        """Record successful generations, with prompt-cache savings, in the cost tracker."""
+        if self.cost_tracker is None:
+            return
+        for response in responses:
+            if not response.success:
+                continue
+            cache = response.metadata.get("prompt_cache") or {}
+            if cache.get("source") != "provider":
+                cache = {}  # client-side estimates weren't billed at the cached price
+            await self.cost_tracker.log_operation(
+                operation_type="generation",
+                model_name=response.agent_name,
+                tokens_input=response.tokens_input,
+                tokens_output=response.tokens_output,
+                cost=response.cost,
+                stage="writing",
+                tokens_cached=cache.get("cached_tokens", 0),
+                cache_savings=cache.get("saved_usd", 0.0),
+            )
+
     async def execute(self) -> WorkflowResult:
         """Execute the workflow with all steps.
 
@@ -215,10 +347,12 @@ class SceneGenerationWorkflow(Workflow):
                 completed_at=datetime.now(),
                 steps_completed=len(self.steps),
                 steps_total=len(self.steps),
-                outputs={"scene": final_scene},
+                outputs={"scene": final_scene, "drafts": self.context.get("drafts", {})},
                 metadata={
                     "model": self.context.get("model_name"),
-                    "outline_words": self.context.get("parse_outline", {}).get("word_count", 0)
+                    "outline_words": self.context.get("parse_outline", {}).get("word_count", 0),
+                    "prompt": self.context.get("prompt", {}),
+                    "usage": self.context.get("usage", {})
                 }
             )
 
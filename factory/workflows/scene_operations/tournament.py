@@ -0,0 +1,241 @@
+"""Concurrent voice tournaments across models, prompts and samples.
+
+A tournament plays every (prompt, model, sample) game:
+
+- Games run concurrently, at most max_concurrency at a time, ordered
+  round-robin so every model advances at the same pace
+- Each output is scored as soon as it arrives, while other games are
+  still generating
+- Once models have min_samples scores, any whose upper confidence bound
+  falls below the leader's lower bound is eliminated and its remaining
+  games are skipped
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# (model, prompt, sample index) -> generated text
+GenerateFn = Callable[[str, str, int], Awaitable[str]]
+# text -> score (higher is better)
+ScoreFn = Callable[[str], float]
+
+
+@dataclass
+class TournamentEntry:
+    """One game: a model's output for one prompt sample."""
+
+    model: str
+    prompt_index: int
+    sample: int
+    output: str = ""
+    score: Optional[float] = None
+    error: Optional[str] = None
+    duration_ms: int = 0
+
+    @property
+    def success(self) -> bool:
+        """Whether generation (and scoring, if any) succeeded."""
+        return self.error is None
+
+
+@dataclass
+class ModelStanding:
+    """A model's results so far."""
+
+    model: str
+    entries: List[TournamentEntry] = field(default_factory=list)
+    eliminated: bool = False
+
+    @property
+    def scores(self) -> List[float]:
+        """Scores of successful, scored games."""
+        return [e.score for e in self.entries if e.score is not None]
+
+    @property
+    def errors(self) -> int:
+        """Failed games."""
+        return sum(1 for e in self.entries if not e.success)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean score, or None before any game is scored."""
+        scores = self.scores
+        return sum(scores) / len(scores) if scores else None
+
+    def best(self) -> Optional[TournamentEntry]:
+        """Highest-scoring successful entry (first successful if unscored)."""
+        successful = [e for e in self.entries if e.success]
+        if not successful:
+            return None
+        return max(successful, key=lambda e: e.score if e.score is not None else -math.inf)
+
+
+@dataclass
+class TournamentResult:
+    """Outcome of a tournament."""
+
+    prompts: List[str]
+    standings: Dict[str, ModelStanding]
+    skipped: int = 0
+    duration_ms: int = 0
+
+    @property
+    def entries(self) -> List[TournamentEntry]:
+        """All played games, by model."""
+        return [e for standing in self.standings.values() for e in standing.entries]
+
+    @property
+    def eliminated(self) -> List[str]:
+        """Models stopped early."""
+        return [m for m, s in self.standings.items() if s.eliminated]
+
+    def ranking(self) -> List[ModelStanding]:
+        """Scored models, best mean first."""
+        scored = [s for s in self.standings.values() if s.mean is not None]
+        return sorted(scored, key=lambda s: s.mean, reverse=True)
+
+
+class VoiceTournament:
+    """Schedules, scores and prunes multi-model generation games."""
+
+    def __init__(
+        self,
+        generate: GenerateFn,
+        score: Optional[ScoreFn] = None,
+        max_concurrency: int = 4,
+        early_stop: bool = True,
+        min_samples: int = 3,
+        confidence: float = 2.0,
+        min_spread: float = 2.0
+    ):
+        """Initialize tournament.
+
+        Args:
+            generate: Produces a model's output for a prompt sample; raising
+                records the game as failed
+            score: Scores an output as it arrives (None = leave unscored,
+                which disables early stopping)
+            max_concurrency: Games generating at once
+            early_stop: Eliminate models that can't catch the leader
+            min_samples: Scored games a model needs before it can be
+                eliminated or lead
+            confidence: Standard errors on each side of the means that must
+                separate a model from the leader
+            min_spread: Floor on the per-game score standard deviation, so
+                a few near-identical scores don't look certain
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.generate = generate
+        self.score = score
+        self.max_concurrency = max_concurrency
+        self.early_stop = early_stop and score is not None
+        self.min_samples = min_samples
+        self.confidence = confidence
+        self.min_spread = min_spread
+
+    async def run(
+        self,
+        prompts: Sequence[str],
+        models: Sequence[str],
+        samples: int = 1,
+        on_result: Optional[Callable[[TournamentEntry], None]] = None
+    ) -> TournamentResult:
+        """Play every prompt x model x sample game.
+
+        Args:
+            prompts: Prompts to generate for
+            models: Models competing
+            samples: Games per model per prompt
+            on_result: Called with each entry once scored
+
+        Returns:
+            TournamentResult with per-model standings
+        """
+        started = time.perf_counter()
+        result = TournamentResult(
+            prompts=list(prompts),
+            standings={model: ModelStanding(model) for model in models}
+        )
+        games = deque(
+            (model, p, s)
+            for s in range(samples)
+            for p in range(len(prompts))
+            for model in models
+        )
+
+        async def play() -> None:
+            while games:
+                model, p, s = games.popleft()
+                standing = result.standings[model]
+                if standing.eliminated:
+                    result.skipped += 1
+                    continue
+                entry = await self._play(model, prompts[p], p, s)
+                standing.entries.append(entry)
+                if self.early_stop:
+                    self._prune(result.standings)
+                if on_result:
+                    on_result(entry)
+
+        workers = min(self.max_concurrency, len(games))
+        await asyncio.gather(*(play() for _ in range(workers)))
+
+        result.duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            f"Tournament: {len(result.entries)} games in {result.duration_ms}ms, "
+            f"{result.skipped} skipped, eliminated {result.eliminated or 'none'}"
+        )
+        return result
+
+    async def _play(self, model: str, prompt: str, prompt_index: int, sample: int) -> TournamentEntry:
+        entry = TournamentEntry(model=model, prompt_index=prompt_index, sample=sample)
+        started = time.perf_counter()
+        try:
+            entry.output = await self.generate(model, prompt, sample)
+        except Exception as e:
+            logger.warning(f"Tournament game {model}/{prompt_index}/{sample} failed: {e}")
+            entry.error = str(e) or type(e).__name__
+        entry.duration_ms = int((time.perf_counter() - started) * 1000)
+        if entry.success and self.score is not None:
+            try:
+                entry.score = float(self.score(entry.output))
+            except Exception as e:
+                logger.warning(f"Scoring tournament game {model}/{prompt_index}/{sample} failed: {e}")
+                entry.error = f"Scoring failed: {str(e) or type(e).__name__}"
+        return entry
+
+    def _prune(self, standings: Dict[str, ModelStanding]) -> None:
+        """Eliminate models whose confidence interval lies below the leader's."""
+        contenders = [s for s in standings.values() if not s.eliminated and len(s.scores) >= self.min_samples]
+        for standing in standings.values():
+            if not standing.eliminated and not standing.scores and standing.errors >= self.min_samples:
+                standing.eliminated = True
+                logger.info(f"Tournament: eliminated {standing.model} after {standing.errors} failures")
+        if len(contenders) < 2:
+            return
+
+        bounds = {s.model: self.confidence * self._stderr(s) for s in contenders}
+        leader = max(contenders, key=lambda s: s.mean)
+        floor = leader.mean - bounds[leader.model]
+        for standing in contenders:
+            if standing is not leader and standing.mean + bounds[standing.model] < floor:
+                standing.eliminated = True
+                logger.info(
+                    f"Tournament: eliminated {standing.model} "
+                    f"({standing.mean:.1f} vs leader {leader.model} {leader.mean:.1f})"
+                )
+
+    def _stderr(self, standing: ModelStanding) -> float:
+        scores = standing.scores
+        n = len(scores)
+        mean = sum(scores) / n
+        variance = sum((x - mean) ** 2 for x in scores) / (n - 1) if n > 1 else 0.0
+        return max(math.sqrt(variance), self.min_spread) / math.sqrt(n)
@@ -1,9 +1,11 @@
 """Voice testing workflow across multiple models."""
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 
+from factory.core.stylometry import VoiceScorer
 from factory.core.workflow_engine import Workflow, WorkflowResult, WorkflowStatus
+from .tournament import ScoreFn, VoiceTournament
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -13,7 +15,8 @@ class VoiceTestingWorkflow(Workflow):
     """Test voice consistency across multiple models.
 
     Steps:
-    1. Generate outputs from all models
+    1. Generate outputs from all models (a concurrent tournament, scoring
+       each output as it arrives when a reference voice is known)
     2. Score voice consistency for each
     3. Compare results
     4. Recommend winner
@@ -22,28 +25,42 @@ class VoiceTestingWorkflow(Workflow):
     def __init__(
         self,
         agent_pool: Optional[Any] = None,
+        voice_scorer: Optional[VoiceScorer] = None,
         **kwargs
     ):
         """Initialize voice testing workflow.
 
         Args:
             agent_pool: Agent pool for multi-model generation
+            voice_scorer: Scorer holding character voice profiles
+                (default: an empty in-memory scorer)
         """
         super().__init__(name="Voice Testing", **kwargs)
         self.agent_pool = agent_pool
+        self.voice_scorer = voice_scorer or VoiceScorer()
 
     async def run(
         self,
-        prompt: str,
+        prompt: Union[str, List[str]],
         models: List[str],
-        character: str = "protagonist"
+        character: str = "protagonist",
+        reference_scenes: Optional[List[str]] = None,
+        samples: int = 1,
+        max_concurrency: int = 4,
+        early_stop: bool = True
     ) -> WorkflowResult:
         """Execute voice testing workflow.
 
         Args:
-            prompt: Prompt to test across models
+            prompt: Prompt, or list of prompts, to test across models
             models: List of model names to compare
             character: Character name for voice consistency
+            reference_scenes: Scenes in the character's voice, used when the
+                scorer has no profile for them
+            samples: Generations per model per prompt
+            max_concurrency: Generations in flight at once
+            early_stop: Stop generating for models that can't catch the
+                leader (needs a profile or reference scenes to score against)
 
         Returns:
             WorkflowResult with comparison and winner
@@ -54,9 +71,13 @@ class VoiceTestingWorkflow(Workflow):
         self.add_step("recommend_winner", self._recommend_winner, dependencies=["compare_results"])
 
         self.context.update({
-            "prompt": prompt,
+            "prompts": [prompt] if isinstance(prompt, str) else list(prompt),
             "models": models,
-            "character": character
+            "character": character,
+            "reference_scenes": reference_scenes or [],
+            "samples": samples,
+            "max_concurrency": max_concurrency,
+            "early_stop": early_stop
         })
 
         try:
@@ -68,16 +89,37 @@ class VoiceTestingWorkflow(Workflow):
             raise
 
     async def _generate_all_models(self, context: Dict[str, Any]) -> Dict[str, str]:
-        """Generate outputs from all models."""
-        prompt = context["prompt"]
-        models = context["models"]
+        """Run the tournament and keep each model's best output."""
+        tournament = VoiceTournament(
+            self._generate,
+            score=self._reference_scorer(context),
+            max_concurrency=context.get("max_concurrency", 4),
+            early_stop=context.get("early_stop", True)
+        )
+        result = await tournament.run(context["prompts"], context["models"], context.get("samples", 1))
+        context["tournament"] = result
 
         outputs = {}
+        for model, standing in result.standings.items():
+            best = standing.best()
+            if best is not None:
+                outputs[model] = best.output
+        if not outputs:
+            errors = "; ".join(f"{e.model}: {e.error}" for e in result.entries)
+            raise RuntimeError(f"Every model failed to generate: {errors}")
+        return outputs
+
+    async def _generate(self, model: str, prompt: str, sample: int) -> str:
+        """Generate one output with a pool agent, or a placeholder."""
+        if self.agent_pool is not None and self.agent_pool.is_enabled(model):
+            logger.info(f"Generating with {model} (sample {sample + 1})")
+            response = await self.agent_pool.execute_single(model, prompt)
+            if not response.success:
+                raise RuntimeError(response.error)
+            return response.output
 
-        # Mock generation for each model
-        for model in models:
-            logger.info(f"Generating with {model}")
-            outputs[model] = f"""# Output from {model}
+        # Mock generation
+        return f"""# Output from {model}
 
 [Generated scene based on prompt]
 
@@ -86,44 +128,71 @@ class VoiceTestingWorkflow(Workflow):
 [This is placeholder output from {model}]
 """
 
-        return outputs
+    def _reference_scorer(self, context: Dict[str, Any]) -> Optional[ScoreFn]:
+        """Per-output scorer against the character's voice, if one is known.
 
-    async def _score_all_outputs(self, context: Dict[str, Any]) -> Dict[str, float]:
-        """Score voice consistency for all outputs."""
-        outputs = context["generate_all_models"]
+        Uses the character's profile, else the reference scenes. Returns
+        None when there is neither; outputs are then scored against each
+        other once all have arrived.
+        """
+        scorer = self.voice_scorer
         character = context["character"]
+        if scorer.has_profile(character):
+            context["scored_against"] = "profile"
+            reference = character
+        elif any(scene.strip() for scene in context.get("reference_scenes", [])):
+            context["scored_against"] = "reference_scenes"
+            reference = scorer.profile_from_texts(context["reference_scenes"])
+        else:
+            return None
+        return lambda text: float(scorer.score(reference, [text])[0])
 
-        scores = {}
-
-        # Mock scoring
-        base_scores = {
-            "claude-sonnet-4.5": 92.0,
-            "claude-opus-4": 88.0,
-            "gpt-4o": 85.0,
-            "gemini-2-flash": 82.0
-        }
+    async def _score_all_outputs(self, context: Dict[str, Any]) -> Dict[str, float]:
+        """Score voice consistency for all outputs.
 
-        for model, output in outputs.items():
-            # Simple mock scoring
-            score = base_scores.get(model, 80.0)
-            scores[model] = score
-            logger.info(f"Voice score for {model}: {score}")
+        Tournament games scored against the character's voice are averaged
+        per model. Without a reference voice, each model's output is scored
+        against the consensus voice of the other outputs.
+        """
+        outputs = context["generate_all_models"]
+        tournament = context.get("tournament")
+
+        if tournament is not None and context.get("scored_against"):
+            scores = {s.model: s.mean for s in tournament.ranking()}
+        else:
+            models = list(outputs)
+            texts = [outputs[model] for model in models]
+            scorer = self.voice_scorer
+            consensus = [
+                scorer.score(scorer.profile_from_texts(texts[:i] + texts[i + 1:] or texts), [text])[0]
+                for i, text in enumerate(texts)
+            ]
+            scores = dict(zip(models, consensus))
+            context["scored_against"] = "consensus"
 
-        return scores
+        result = {}
+        for model, score in scores.items():
+            result[model] = round(float(score), 1)
+            logger.info(f"Voice score for {model}: {result[model]}")
+        return result
 
     async def _compare_results(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Compare all results."""
         outputs = context["generate_all_models"]
         scores = context["score_all_outputs"]
+        tournament = context.get("tournament")
 
         comparison = []
 
         for model in outputs.keys():
+            standing = tournament.standings[model] if tournament else None
             comparison.append({
                 "model": model,
                 "output": outputs[model],
                 "score": scores[model],
-                "word_count": len(outputs[model].split())
+                "word_count": len(outputs[model].split()),
+                "games": len(standing.entries) if standing else 1,
+                "eliminated": standing.eliminated if standing else False
             })
 
         # Sort by score descending
@@ -150,6 +219,19 @@ class VoiceTestingWorkflow(Workflow):
         logger.info(f"Winner: {recommendation['winner']} ({recommendation['score']})")
         return recommendation
 
+    def _tournament_summary(self) -> Dict[str, Any]:
+        tournament = self.context.get("tournament")
+        if tournament is None:
+            return {}
+        return {
+            "prompts": len(tournament.prompts),
+            "games": len(tournament.entries),
+            "failed": sum(1 for e in tournament.entries if not e.success),
+            "skipped": tournament.skipped,
+            "eliminated": tournament.eliminated,
+            "duration_ms": tournament.duration_ms
+        }
+
     async def execute_workflow(self) -> WorkflowResult:
         """Execute the workflow."""
         started_at = datetime.now()
@@ -176,7 +258,9 @@ class VoiceTestingWorkflow(Workflow):
                 },
                 metadata={
                     "models_tested": len(self.context.get("models", [])),
-                    "character": self.context.get("character")
+                    "character": self.context.get("character"),
+                    "scored_against": self.context.get("scored_against"),
+                    "tournament": self._tournament_summary()
                 }
             )
 
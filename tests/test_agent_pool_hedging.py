@@ -0,0 +1,218 @@
+"""Tests for first-K-wins parallel execution and hedged requests."""
+
+import asyncio
+import time
+import pytest
+
+from factory.core.agent_pool import AgentPool
+
+
+class DelayAgent:
+    """Agent that answers after a delay, optionally failing."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("provider error")
+        return {"output": f"draft after {self.delay}", "tokens_input": 5, "tokens_output": 5}
+
+
+def make_pool(**agents) -> AgentPool:
+    pool = AgentPool()
+    for name, agent in agents.items():
+        pool.register_agent(name, agent)
+    return pool
+
+
+class TestFirstK:
+    """Test returning after the first K successes."""
+
+    @pytest.mark.asyncio
+    async def test_returns_without_stalled_agent(self):
+        """Test a stalled agent is cancelled instead of awaited."""
+        stalled = DelayAgent(delay=10)
+        pool = make_pool(fast=DelayAgent(), medium=DelayAgent(delay=0.01), stalled=stalled)
+
+        start = time.perf_counter()
+        result = await pool.execute_parallel("prompt", first_k=2)
+
+        assert time.perf_counter() - start < 1
+        assert [r.agent_name for r in result.responses] == ["fast", "medium"]
+        assert result.cancelled_agents == ["stalled"]
+        assert stalled.cancelled == 1
+        assert pool.get_stats("stalled")["in_flight"] == 0
+        assert pool.get_stats("stalled")["total_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_count(self):
+        """Test failed responses don't satisfy first_k."""
+        pool = make_pool(broken=DelayAgent(fail=True), ok=DelayAgent(delay=0.01))
+
+        result = await pool.execute_parallel("prompt", first_k=1)
+
+        assert len(result.successful_responses) == 1
+        assert result.successful_responses[0].agent_name == "ok"
+        assert len(result.failed_responses) == 1
+        assert result.cancelled_agents == []
+
+    @pytest.mark.asyncio
+    async def test_default_waits_for_all(self):
+        """Test behaviour without first_k is unchanged."""
+        pool = make_pool(a=DelayAgent(), b=DelayAgent(delay=0.01))
+        result = await pool.execute_parallel("prompt")
+        assert len(result.responses) == 2
+        assert result.cancelled_agents == []
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_partial_results(self):
+        """Test agents past the deadline are cancelled and finished ones reported as they land."""
+        stalled = DelayAgent(delay=10)
+        pool = make_pool(slow=DelayAgent(delay=0.02), stalled=stalled, fast=DelayAgent())
+        seen = []
+
+        result = await pool.execute_parallel(
+            "prompt", agents=["slow", "stalled", "fast"], timeout=0.1, on_response=seen.append
+        )
+
+        assert [r.agent_name for r in seen] == ["fast", "slow"]
+        assert [r.agent_name for r in result.responses] == ["slow", "fast"]  # agent order
+        assert result.cancelled_agents == ["stalled"]
+        assert stalled.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_k(self):
+        """Test first_k must be positive."""
+        pool = make_pool(a=DelayAgent())
+        with pytest.raises(ValueError):
+            await pool.execute_parallel("prompt", first_k=0)
+
+
+class TestHedged:
+    """Test hedged single requests."""
+
+    @pytest.mark.asyncio
+    async def test_backup_wins_when_primary_stalls(self):
+        """Test the backup fires after the primary's p95 and wins."""
+        primary, backup = DelayAgent(delay=0.01), DelayAgent(delay=0.01)
+        pool = make_pool(primary=primary, backup=backup)
+        # Build latency history: primary faster so it is routed first
+        for _ in range(3):
+            await pool.execute_single("primary", "warmup")
+        backup.delay = 0.02
+        await pool.execute_single("backup", "warmup")
+
+        primary.delay = 10
+        start = time.perf_counter()
+        response = await pool.execute_hedged("prompt", agents=["primary", "backup"])
+
+        assert time.perf_counter() - start < 1
+        assert response.agent_name == "backup"
+        assert primary.cancelled == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_when_primary_is_quick(self):
+        """Test a timely primary answer doesn't start a backup."""
+        backup = DelayAgent(delay=0.05)
+        pool = make_pool(primary=DelayAgent(), backup=backup)
+        await pool.execute_single("primary", "warmup")
+        await pool.execute_single("backup", "warmup")
+
+        response = await pool.execute_hedged("prompt", agents=["primary", "backup"])
+
+        assert response.agent_name == "primary"
+        assert backup.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_failure_hedges_immediately(self):
+        """Test a failed primary is replaced at once."""
+        pool = make_pool(primary=DelayAgent(fail=True), backup=DelayAgent())
+
+        response = await pool.execute_hedged(
+            "prompt", agents=["primary", "backup"], hedge_after_ms=5000
+        )
+
+        assert response.success
+        assert response.agent_name == "backup"
+
+    @pytest.mark.asyncio
+    async def test_hedge_after_ms_without_history(self):
+        """Test the explicit delay is used before any latency data exists."""
+        pool = make_pool(a=DelayAgent(delay=10), b=DelayAgent())
+
+        response = await pool.execute_hedged("prompt", agents=["a", "b"], hedge_after_ms=10)
+
+        assert response.agent_name == "b"
+
+    @pytest.mark.asyncio
+    async def test_all_fail_returns_last_error(self):
+        """Test a failure response is returned when every agent fails."""
+        pool = make_pool(a=DelayAgent(fail=True), b=DelayAgent(fail=True))
+
+        response = await pool.execute_hedged("prompt", agents=["a", "b"], hedge_after_ms=1)
+
+        assert not response.success
+
+
+class TestQuickDraftEndpoint:
+    """Test the web API exposure."""
+
+    def test_first_k_mode(self):
+        """Test /api/draft/quick returns the first draft and lists cancelled agents."""
+        from fastapi.testclient import TestClient
+        from webapp.backend import app as webapp
+
+        pool = make_pool(fast=DelayAgent(), stalled=DelayAgent(delay=10))
+        original, webapp.agent_pool = webapp.agent_pool, pool
+        try:
+            client = TestClient(webapp.app)
+            data = client.post("/api/draft/quick", json={"prompt": "p", "mode": "first_k"}).json()
+            bad = client.post("/api/draft/quick", json={"prompt": "p", "mode": "nope"})
+        finally:
+            webapp.agent_pool = original
+
+        assert data["success"]
+        assert [d["agent"] for d in data["drafts"]] == ["fast"]
+        assert data["cancelled"] == ["stalled"]
+        assert bad.status_code == 400
+
+    def test_uses_agents_registered_at_startup(self, monkeypatch, tmp_path):
+        """Test the endpoint drafts with the agents.yaml agents the app registers."""
+        from fastapi.testclient import TestClient
+        from factory.agents import registry
+        from factory.agents.base_agent import BaseAgent
+        from webapp.backend import app as webapp
+
+        class EchoAgent(BaseAgent):
+            async def generate(self, prompt, **kwargs):
+                return {"output": f"{self.config.model}: {prompt}", "tokens_input": 1, "tokens_output": 3}
+
+        monkeypatch.setattr(registry, "get_enabled_agents", lambda: {
+            "echo-a": {"provider": "echo", "model": "a"},
+            "echo-b": {"provider": "echo", "model": "b"},
+            "claude": {"provider": "anthropic", "model": "claude"},
+        })
+        monkeypatch.setattr(registry, "_agent_classes", lambda: {"echo": EchoAgent})
+        monkeypatch.setattr(registry, "get_api_key", lambda provider: "key")
+        monkeypatch.setattr(webapp, "project_path", tmp_path)
+        monkeypatch.setattr(webapp, "agent_pool", AgentPool())
+        monkeypatch.setattr(webapp, "unavailable_agents", {})
+
+        with TestClient(webapp.app) as client:
+            data = client.post("/api/draft/quick", json={"prompt": "p", "mode": "first_k", "first_k": 2}).json()
+            stats = client.get("/api/agents/stats").json()
+
+        assert data["success"]
+        assert sorted(d["output"] for d in data["drafts"]) == ["a: p", "b: p"]
+        assert sorted(stats["agents"]) == ["echo-a", "echo-b"]
+        assert list(stats["unavailable"]) == ["claude"]
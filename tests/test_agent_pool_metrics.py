@@ -0,0 +1,197 @@
+"""Tests for latency histograms and AgentPool percentile stats."""
+
+import asyncio
+import random
+import pytest
+
+from factory.core.agent_pool import AgentPool
+from factory.core.histogram import LogHistogram, WindowedHistogram
+
+
+class SleepAgent:
+    """Agent that sleeps for a fixed time."""
+
+    def __init__(self, delay: float = 0.0, tokens: int = 100, ttft_ms=None):
+        self.delay = delay
+        self.tokens = tokens
+        self.ttft_ms = ttft_ms
+        self.active = 0
+        self.max_active = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        metadata = {"ttft_ms": self.ttft_ms} if self.ttft_ms is not None else {}
+        return {"output": "x", "tokens_input": 10, "tokens_output": self.tokens, "metadata": metadata}
+
+
+class FailingAgent:
+    """Agent that always fails."""
+
+    async def generate(self, prompt, **kwargs):
+        raise RuntimeError("down")
+
+
+class TestLogHistogram:
+    """Test log-bucketed histogram."""
+
+    def test_percentiles_within_relative_error(self):
+        """Test percentiles of a known distribution."""
+        rng = random.Random(0)
+        values = [rng.lognormvariate(5, 1) for _ in range(20000)]
+        histogram = LogHistogram()
+        for v in values:
+            histogram.record(v)
+
+        values.sort()
+        for q in (50, 95, 99):
+            exact = values[int(q / 100 * len(values)) - 1]
+            assert histogram.percentile(q) == pytest.approx(exact, rel=0.06)
+
+        assert histogram.count == 20000
+        assert histogram.mean == pytest.approx(sum(values) / len(values))
+        assert histogram.min == values[0]
+        assert histogram.max == values[-1]
+
+    def test_empty_summary(self):
+        """Test empty histograms summarize to zeros."""
+        summary = LogHistogram().summary()
+        assert summary["count"] == 0
+        assert summary["p99"] == 0.0
+        assert summary["max"] == 0.0
+
+    def test_merge(self):
+        """Test merging adds counts."""
+        a, b = LogHistogram(), LogHistogram()
+        a.record(10)
+        b.record(1000)
+        a.merge(b)
+
+        assert a.count == 2
+        assert a.percentile(100) == pytest.approx(1000, rel=0.05)
+
+        with pytest.raises(ValueError):
+            a.merge(LogHistogram(growth=1.5))
+
+
+class TestWindowedHistogram:
+    """Test sliding window views."""
+
+    def test_old_slices_fall_out(self):
+        """Test values older than the window are excluded."""
+        histogram = WindowedHistogram(window_seconds=120, slice_seconds=60)
+        histogram.record(1000, now=0)
+        histogram.record(10, now=130)
+
+        assert histogram.window(now=130).count == 1
+        assert histogram.window(now=130).max == 10
+        assert histogram.lifetime.count == 2
+
+    def test_shorter_window(self):
+        """Test querying a sub-window."""
+        histogram = WindowedHistogram(window_seconds=300, slice_seconds=60)
+        histogram.record(1, now=10)
+        histogram.record(2, now=250)
+
+        assert histogram.window(60, now=250).count == 1
+        assert histogram.window(now=250).count == 2
+
+
+class TestAgentPoolStats:
+    """Test percentile stats exposed by the pool."""
+
+    @pytest.mark.asyncio
+    async def test_latency_and_throughput(self):
+        """Test latency and tokens/sec histograms are populated."""
+        pool = AgentPool()
+        pool.register_agent("slow", SleepAgent(delay=0.02, tokens=100, ttft_ms=5))
+
+        for _ in range(5):
+            await pool.execute_single("slow", "prompt")
+
+        stats = pool.get_stats("slow")
+        assert stats["successful_requests"] == 5
+        assert stats["latency_ms"]["count"] == 5
+        assert stats["latency_ms"]["p50"] >= 15
+        assert 0 < stats["tokens_per_sec"]["p50"] <= 100 / 0.015
+        assert stats["ttft_ms"]["p99"] == pytest.approx(5, rel=0.05)
+        assert stats["window"]["latency_ms"]["count"] == 5
+
+    @pytest.mark.asyncio
+    async def test_failures_not_in_latency(self):
+        """Test failed requests only count as failures."""
+        pool = AgentPool()
+        pool.register_agent("bad", FailingAgent())
+
+        await pool.execute_single("bad", "prompt")
+
+        stats = pool.get_stats("bad")
+        assert stats["failed_requests"] == 1
+        assert stats["latency_ms"]["count"] == 0
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_with_concurrency_limit(self):
+        """Test limited agents queue and record wait time."""
+        agent = SleepAgent(delay=0.02)
+        pool = AgentPool()
+        pool.register_agent("limited", agent, max_concurrency=1)
+
+        await asyncio.gather(*[pool.execute_single("limited", "p") for _ in range(3)])
+
+        stats = pool.get_stats("limited")
+        assert agent.max_active == 1
+        assert stats["queue_wait_ms"]["max"] >= 30
+        assert stats["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_summary_merges_agents(self):
+        """Test summary percentiles cover all agents."""
+        pool = AgentPool()
+        pool.register_agent("a", SleepAgent())
+        pool.register_agent("b", SleepAgent())
+
+        await pool.execute_parallel("prompt")
+
+        summary = pool.get_summary()
+        assert summary["latency_ms"]["count"] == 2
+        assert summary["window"]["latency_ms"]["count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_reset(self):
+        """Test reset clears histograms."""
+        pool = AgentPool()
+        pool.register_agent("a", SleepAgent())
+        await pool.execute_single("a", "prompt")
+
+        pool.reset_stats("a")
+
+        assert pool.get_stats("a")["latency_ms"]["count"] == 0
+
+
+class TestStatsEndpoint:
+    """Test the web API exposure."""
+
+    def test_agent_stats_endpoint(self):
+        """Test /api/agents/stats returns pool stats."""
+        from fastapi.testclient import TestClient
+        from webapp.backend import app as webapp
+
+        pool = AgentPool()
+        pool.register_agent("a", SleepAgent())
+        asyncio.run(pool.execute_single("a", "prompt"))
+        original, webapp.agent_pool = webapp.agent_pool, pool
+        try:
+            client = TestClient(webapp.app)
+            data = client.get("/api/agents/stats", params={"window_minutes": 1}).json()
+            missing = client.get("/api/agents/stats", params={"agent": "nope"})
+        finally:
+            webapp.agent_pool = original
+
+        assert data["agents"]["a"]["latency_ms"]["count"] == 1
+        assert data["summary"]["window"]["seconds"] == 60
+        assert missing.status_code == 404
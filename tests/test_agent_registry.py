@@ -0,0 +1,96 @@
+"""Tests for creating agents from agents.yaml entries."""
+
+import pytest
+
+from factory.agents import registry
+from factory.agents.chinese.deepseek import DeepSeekAgent
+from factory.agents.ollama_agent import OllamaAgent
+from factory.agents.registry import create_agent, create_configured_agents
+from factory.core.agent_pool import AgentPool
+
+
+ENTRIES = {
+    "deepseek-v3": {
+        "provider": "deepseek",
+        "model": "deepseek-chat",
+        "cost_per_1k_input": 0.00027,
+        "cost_per_1k_cached_input": 0.00007,
+    },
+    "ollama-llama3": {"provider": "ollama", "model": "llama3", "endpoint": "http://ollama:11434"},
+    "claude-sonnet": {"provider": "anthropic", "model": "claude-sonnet"},
+}
+
+
+def keys(provider):
+    return "sk-test" if provider == "deepseek" else None
+
+
+class TestCreateAgent:
+    """Test single-entry creation."""
+
+    def test_provider_agent(self):
+        """Test a keyed provider gets its agent class and entry fields."""
+        agent = create_agent("deepseek-v3", ENTRIES["deepseek-v3"], keys)
+
+        assert isinstance(agent, DeepSeekAgent)
+        assert agent.config.api_key == "sk-test"
+        assert agent.config.cost_per_1k_cached_input == 0.00007
+        assert agent.config.metadata["provider"] == "deepseek"
+
+    def test_ollama_needs_no_key(self):
+        """Test Ollama entries are created without a key lookup."""
+        agent = create_agent("ollama-llama3", ENTRIES["ollama-llama3"], keys)
+        assert isinstance(agent, OllamaAgent)
+
+    def test_missing_key(self):
+        """Test a provider without a configured key is rejected."""
+        with pytest.raises(ValueError, match="API key"):
+            create_agent("qwen", {"provider": "qwen", "model": "qwen-max"}, keys)
+
+    def test_unknown_provider(self):
+        """Test providers without an implementation are rejected."""
+        with pytest.raises(ValueError, match="anthropic"):
+            create_agent("claude-sonnet", ENTRIES["claude-sonnet"], keys)
+
+
+class TestConfiguredAgents:
+    """Test bulk creation and pool registration."""
+
+    def test_create_configured_agents(self):
+        """Test creatable entries are returned and the rest reported."""
+        agents, skipped = create_configured_agents(ENTRIES, keys)
+
+        assert sorted(agents) == ["deepseek-v3", "ollama-llama3"]
+        assert list(skipped) == ["claude-sonnet"]
+
+    def test_defaults_to_enabled_agents(self, monkeypatch):
+        """Test agents.yaml is read when no entries are given."""
+        monkeypatch.setattr(registry, "get_enabled_agents", lambda: ENTRIES)
+        agents, _ = create_configured_agents(api_key_lookup=keys)
+        assert "deepseek-v3" in agents
+
+    def test_pool_registration_keeps_existing(self):
+        """Test registering configured agents doesn't replace registered ones."""
+        pool = AgentPool()
+        existing = create_agent("ollama-llama3", {"provider": "ollama", "model": "mistral"})
+        pool.register_agent("ollama-llama3", existing)
+
+        skipped = pool.register_configured_agents(ENTRIES, api_key_lookup=keys)
+
+        assert sorted(pool.list_agents()) == ["deepseek-v3", "ollama-llama3"]
+        assert pool.get_agent("ollama-llama3") is existing
+        assert "claude-sonnet" in skipped
+
+    def test_agents_yaml_cached_prices(self):
+        """Test the caching providers in agents.yaml carry cached-input prices."""
+        entries = {
+            name: entry for name, entry in registry.get_enabled_agents().items()
+            if entry["provider"] in ("deepseek", "qwen", "kimi", "doubao")
+        }
+        agents, skipped = create_configured_agents(entries, api_key_lookup=lambda provider: "k")
+
+        assert {entry["provider"] for entry in entries.values()} == {"deepseek", "qwen", "kimi", "doubao"}
+        assert not skipped
+        for agent in agents.values():
+            assert 0 < agent.config.cost_per_1k_cached_input < agent.config.cost_per_1k_input
+        assert agents["doubao-pro"].context_cache_ttl == 3600
@@ -0,0 +1,207 @@
+"""Tests for latency-aware routing in AgentPool."""
+
+import asyncio
+import random
+import pytest
+
+from factory.agents.base_agent import AgentConfig
+from factory.core.agent_pool import AgentPool
+from factory.core.routing import RouteCandidate, RoutingPolicy, choose_agent
+
+
+class TimedAgent:
+    """Agent with fixed latency and cost."""
+
+    def __init__(self, delay: float = 0.0, cost: float = 0.0, fail: bool = False, config=None):
+        self.delay = delay
+        self.cost = cost
+        self.fail = fail
+        self.calls = 0
+        if config is not None:
+            self.config = config
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return {"output": prompt, "tokens_input": 500, "tokens_output": 500, "cost": self.cost}
+
+
+class TestChooseAgent:
+    """Test routing policies on static candidates."""
+
+    def test_fastest(self):
+        """Test lowest expected latency wins."""
+        candidates = [
+            RouteCandidate("slow", latency_ms=900),
+            RouteCandidate("fast", latency_ms=100),
+        ]
+        assert choose_agent(candidates).name == "fast"
+
+    def test_queue_depth_inflates_latency(self):
+        """Test a saturated fast agent loses to an idle slower one."""
+        candidates = [
+            RouteCandidate("busy", latency_ms=100, in_flight=1, queued=4, max_concurrency=1),
+            RouteCandidate("idle", latency_ms=300),
+        ]
+        assert choose_agent(candidates).name == "idle"
+
+    def test_unhealthy_skipped(self):
+        """Test agents above the error threshold are skipped while others exist."""
+        candidates = [
+            RouteCandidate("flaky", latency_ms=50, error_rate=0.8),
+            RouteCandidate("steady", latency_ms=500, error_rate=0.0),
+        ]
+        assert choose_agent(candidates).name == "steady"
+
+        only_flaky = [RouteCandidate("flaky", latency_ms=50, error_rate=0.8)]
+        assert choose_agent(only_flaky).name == "flaky"
+
+    def test_untried_agent_is_explored(self):
+        """Test an agent without latency data wins a tie with the median agent."""
+        candidates = [
+            RouteCandidate("known", latency_ms=100),
+            RouteCandidate("new"),
+        ]
+        assert choose_agent(candidates).name == "new"
+
+    def test_untried_agent_assumed_median(self):
+        """Test agents without successes are not treated as instant."""
+        candidates = [
+            RouteCandidate("fast", latency_ms=100, cost_per_1k=0.01),
+            RouteCandidate("slow", latency_ms=900, cost_per_1k=0.01),
+            RouteCandidate("new", cost_per_1k=0.001),
+        ]
+        policy = RoutingPolicy.CHEAPEST_UNDER_SLA
+
+        assert choose_agent(candidates).name == "fast"
+        assert choose_agent(candidates, policy, sla_ms=200).name == "fast"
+        assert choose_agent(candidates, policy, sla_ms=600).name == "new"
+
+    def test_default_latency_without_data(self):
+        """Test the configured default applies when no candidate has data."""
+        candidates = [RouteCandidate("a", cost_per_1k=0.01), RouteCandidate("b", cost_per_1k=0.001)]
+        policy = RoutingPolicy.CHEAPEST_UNDER_SLA
+
+        assert choose_agent(candidates, policy, sla_ms=1000).name == "b"
+        flaky = [RouteCandidate("a", cost_per_1k=0.001, error_rate=0.5), RouteCandidate("b", cost_per_1k=0.01)]
+        # 800ms doubled by the error rate misses the SLA
+        assert choose_agent(flaky, policy, sla_ms=1000, max_error_rate=0.6, default_latency_ms=800).name == "b"
+
+    def test_cheapest_under_sla(self):
+        """Test cheapest agent that meets the SLA, else fastest."""
+        candidates = [
+            RouteCandidate("premium", latency_ms=200, cost_per_1k=0.045),
+            RouteCandidate("budget", latency_ms=800, cost_per_1k=0.002),
+            RouteCandidate("glacial", latency_ms=5000, cost_per_1k=0.0),
+        ]
+        policy = RoutingPolicy.CHEAPEST_UNDER_SLA
+
+        assert choose_agent(candidates, policy, sla_ms=1000).name == "budget"
+        assert choose_agent(candidates, policy, sla_ms=100).name == "premium"
+        with pytest.raises(ValueError):
+            choose_agent(candidates, policy)
+
+    def test_power_of_two_spreads_load(self):
+        """Test power-of-two never picks the worst and uses more than one agent."""
+        candidates = [
+            RouteCandidate("a", latency_ms=100),
+            RouteCandidate("b", latency_ms=110),
+            RouteCandidate("c", latency_ms=5000),
+        ]
+        rng = random.Random(1)
+        picks = {
+            choose_agent(candidates, RoutingPolicy.POWER_OF_TWO, rng=rng).name
+            for _ in range(50)
+        }
+        assert picks == {"a", "b"}
+
+
+class TestExecuteRouted:
+    """Test routing through the pool."""
+
+    @pytest.mark.asyncio
+    async def test_routes_to_fastest_after_warmup(self):
+        """Test live EWMA latency steers traffic to the faster agent."""
+        slow, fast = TimedAgent(delay=0.03), TimedAgent(delay=0.0)
+        pool = AgentPool(agent_groups={"draft": ["slow", "fast"]})
+        pool.register_agent("slow", slow)
+        pool.register_agent("fast", fast)
+
+        # Both are untried; the first two requests explore them
+        await pool.execute_routed("p", group="draft")
+        await pool.execute_routed("p", group="draft")
+        for _ in range(5):
+            response = await pool.execute_routed("p", group="draft")
+            assert response.agent_name == "fast"
+
+        assert slow.calls == 1
+        assert pool.get_stats("fast")["ewma_latency_ms"] < pool.get_stats("slow")["ewma_latency_ms"]
+
+    @pytest.mark.asyncio
+    async def test_failing_agent_avoided(self):
+        """Test errors push an agent out of rotation."""
+        pool = AgentPool(agent_groups={"draft": ["broken", "ok"]})
+        pool.register_agent("broken", TimedAgent(fail=True))
+        pool.register_agent("ok", TimedAgent(delay=0.01))
+
+        await pool.execute_single("broken", "p")
+        await pool.execute_single("broken", "p")
+        await pool.execute_single("broken", "p")
+        await pool.execute_single("broken", "p")
+
+        assert pool.get_metrics("broken").ewma_error_rate > pool.max_error_rate
+        assert (await pool.execute_routed("p", group="draft")).agent_name == "ok"
+
+    @pytest.mark.asyncio
+    async def test_error_rate_decays_without_traffic(self):
+        """Test an agent that failed is routed to again once it has been idle."""
+        pool = AgentPool(agent_groups={"draft": ["recovered", "ok"]})
+        pool.register_agent("recovered", TimedAgent())
+        pool.register_agent("ok", TimedAgent(delay=0.01))
+        await pool.execute_single("recovered", "p")
+        await pool.execute_single("ok", "p")
+        metrics = pool.get_metrics("recovered")
+        for _ in range(4):
+            metrics.record_failure()
+        assert metrics.ewma_error_rate > pool.max_error_rate
+        assert pool.route(group="draft") == "ok"
+
+        # Five half-lives later the failures have faded
+        metrics._error_rate_at -= 5 * metrics.ERROR_HALF_LIFE_SECONDS
+        assert metrics.ewma_error_rate < 0.05
+        assert pool.route(group="draft") == "recovered"
+
+    @pytest.mark.asyncio
+    async def test_cheapest_uses_config_cost_before_data(self):
+        """Test config prices rank agents that have not run yet."""
+        pool = AgentPool()
+        pool.register_agent("opus", TimedAgent(config=AgentConfig(
+            name="opus", model="m", cost_per_1k_input=0.015, cost_per_1k_output=0.075
+        )))
+        pool.register_agent("haiku", TimedAgent(config=AgentConfig(
+            name="haiku", model="m", cost_per_1k_input=0.0008, cost_per_1k_output=0.004
+        )))
+
+        response = await pool.execute_routed(
+            "p", agents=["opus", "haiku"], policy="cheapest_under_sla", sla_ms=1000
+        )
+
+        assert response.agent_name == "haiku"
+
+    def test_group_from_agents_yaml(self):
+        """Test unknown pool groups come from agents.yaml, filtered to enabled agents."""
+        pool = AgentPool()
+        pool.register_agent("ollama-mistral", TimedAgent())
+        pool.register_agent("ollama-llama3", TimedAgent(), enabled=False)
+
+        assert pool.get_group_members("economy_draft") == ["ollama-mistral"]
+        with pytest.raises(ValueError):
+            pool.get_group_members("no-such-group")
+
+    def test_empty_group(self):
+        """Test routing to a group without enabled agents fails clearly."""
+        pool = AgentPool(agent_groups={"empty": ["ghost"]})
+        with pytest.raises(ValueError, match="empty"):
+            pool.route(group="empty")
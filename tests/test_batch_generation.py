@@ -0,0 +1,272 @@
+"""Tests for batch scene generation jobs."""
+
+import asyncio
+
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.manuscript import Manuscript, ManuscriptStorage
+from factory.workflows.batch_generation import (
+    BatchGenerationRunner,
+    BatchJobStatus,
+    BatchJobStore,
+    SceneTaskStatus,
+    select_scenes,
+)
+
+
+class SceneAgent(BaseAgent):
+    """Agent that writes "draft of <outline line>" and tracks concurrency."""
+
+    def __init__(self, delay: float = 0.0, fail_on: str = None):
+        super().__init__(AgentConfig(name="writer", model="gpt-4", cost_per_1k_input=0.01))
+        self.delay = delay
+        self.fail_on = fail_on
+        self.prompts = []
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("provider error")
+        outline = prompt.split("outline:\n\n", 1)[-1].split("\n", 1)[0]
+        return {"output": f"draft of {outline}", "tokens_input": 10, "tokens_output": 5, "cost": 0.01}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Two acts; act 1 has two chapters of two scenes, act 2 one written scene."""
+    manuscript = Manuscript(title="Test Novel")
+    act1 = manuscript.add_act("Act 1", act_id="act-1")
+    act2 = manuscript.add_act("Act 2", act_id="act-2")
+    for c in (1, 2):
+        chapter = manuscript.add_chapter(act1.id, f"Chapter {c}", chapter_id=f"ch-{c}")
+        for s in (1, 2):
+            scene = manuscript.add_scene(chapter.id, f"Scene {c}.{s}", scene_id=f"sc-{c}-{s}")
+            scene.notes = f"Outline {c}.{s}"
+    manuscript.add_chapter(act2.id, "Chapter 3", chapter_id="ch-3")
+    manuscript.add_scene("ch-3", "Scene 3.1", content="Already written.", scene_id="sc-3-1")
+
+    storage = ManuscriptStorage(tmp_path)
+    storage.save(manuscript)
+    return storage
+
+
+def make_runner(storage, agent, **kwargs):
+    pool = AgentPool()
+    pool.register_agent("writer", agent)
+    return BatchGenerationRunner(storage, pool, **kwargs)
+
+
+class TestSelection:
+    """Test manuscript selections."""
+
+    def test_acts_and_chapters_in_order(self, storage):
+        """Test selected scenes come back in manuscript order without duplicates."""
+        manuscript = storage.load()
+
+        selected = select_scenes(manuscript, act_ids=["act-2"], chapter_ids=["ch-2", "ch-1"])
+
+        assert [s.id for _, _, s in selected] == ["sc-1-1", "sc-1-2", "sc-2-1", "sc-2-2", "sc-3-1"]
+
+    def test_invalid_selection(self, storage):
+        """Test empty selections and unknown ids are rejected."""
+        manuscript = storage.load()
+
+        with pytest.raises(ValueError):
+            select_scenes(manuscript)
+        with pytest.raises(ValueError, match="ch-9"):
+            select_scenes(manuscript, chapter_ids=["ch-9"])
+
+
+class TestBatchRun:
+    """Test running batch jobs."""
+
+    @pytest.mark.asyncio
+    async def test_generates_and_writes_back(self, storage):
+        """Test every scene is drafted and saved into the manuscript."""
+        runner = make_runner(storage, SceneAgent())
+        job = runner.create_job("writer", act_ids=["act-1", "act-2"])
+
+        job = await runner.run(job.id)
+
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.progress == 1.0
+        assert job.counts()["completed"] == 4
+        assert job.counts()["skipped"] == 1
+        assert job.total_cost == pytest.approx(0.04)
+
+        saved = storage.load()
+        scene = saved.get_scene("sc-1-2")
+        assert scene.content == "draft of Outline 1.2"
+        assert scene.word_count == 4
+        assert scene.metadata["batch_job"] == job.id
+        assert saved.get_scene("sc-3-1").content == "Already written."
+
+    @pytest.mark.asyncio
+    async def test_keeps_edits_made_during_run(self, storage):
+        """Test saving a drafted scene doesn't overwrite edits made meanwhile."""
+        runner = make_runner(storage, SceneAgent(delay=0.02))
+        job = runner.create_job("writer", chapter_ids=["ch-1"])
+        run = asyncio.create_task(runner.run(job.id))
+        await asyncio.sleep(0.01)
+
+        # The writer edits another scene while the batch is drafting
+        edited = storage.load()
+        edited.get_scene("sc-3-1").update_content("Rewritten by hand.")
+        storage.save(edited)
+        await run
+
+        saved = storage.load()
+        assert saved.get_scene("sc-3-1").content == "Rewritten by hand."
+        assert saved.get_scene("sc-1-1").content == "draft of Outline 1.1"
+        assert saved.get_scene("sc-1-2").content == "draft of Outline 1.2"
+
+    @pytest.mark.asyncio
+    async def test_scene_deleted_during_run(self, storage):
+        """Test a scene removed from the stored manuscript fails instead of being re-added."""
+        runner = make_runner(storage, SceneAgent(delay=0.02))
+        job = runner.create_job("writer", chapter_ids=["ch-2"], continuity=False)
+        run = asyncio.create_task(runner.run(job.id))
+        await asyncio.sleep(0.01)
+
+        edited = storage.load()
+        chapter = edited.get_chapter("ch-2")
+        chapter.scenes = [s for s in chapter.scenes if s.id != "sc-2-2"]
+        storage.save(edited)
+        job = await run
+
+        statuses = {t.scene_id: t.status for t in job.tasks}
+        assert statuses == {"sc-2-1": SceneTaskStatus.COMPLETED, "sc-2-2": SceneTaskStatus.FAILED}
+        assert storage.load().get_scene("sc-2-2") is None
+
+    @pytest.mark.asyncio
+    async def test_overwrite(self, storage):
+        """Test overwrite regenerates scenes that have content."""
+        runner = make_runner(storage, SceneAgent())
+        job = runner.create_job("writer", chapter_ids=["ch-3"], overwrite=True)
+
+        await runner.run(job.id)
+
+        assert storage.load().get_scene("sc-3-1").content == "draft of Scene 3.1"
+
+    @pytest.mark.asyncio
+    async def test_chapters_parallel_scenes_sequential(self, storage):
+        """Test chapters run concurrently while a chapter's scenes see their predecessors."""
+        agent = SceneAgent(delay=0.02)
+        runner = make_runner(storage, agent)
+        job = runner.create_job("writer", act_ids=["act-1"])
+
+        await runner.run(job.id)
+
+        assert agent.peak == 2  # one lane per chapter
+        second = next(p for p in agent.prompts if "Outline 1.2" in p)
+        assert "draft of Outline 1.1" in second
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, storage):
+        """Test max_concurrency caps simultaneous generations."""
+        agent = SceneAgent(delay=0.02)
+        runner = make_runner(storage, agent, max_concurrency=3)
+        job = runner.create_job("writer", act_ids=["act-1"], continuity=False)
+
+        await runner.run(job.id)
+
+        assert agent.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_recorded_and_retried(self, storage):
+        """Test failed scenes fail the job and are retried on resume."""
+        agent = SceneAgent(fail_on="Outline 2.1")
+        runner = make_runner(storage, agent)
+        job = runner.create_job("writer", chapter_ids=["ch-2"])
+
+        job = await runner.run(job.id)
+
+        assert job.status == BatchJobStatus.FAILED
+        failed = job.tasks[0]
+        assert failed.status == SceneTaskStatus.FAILED
+        assert "provider error" in failed.error
+        assert job.tasks[1].status == SceneTaskStatus.COMPLETED
+
+        agent.fail_on = None
+        job = await runner.resume(job.id)
+
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.tasks[0].attempts == 2
+        assert job.tasks[1].attempts == 1
+
+    def test_unknown_agent(self, storage):
+        """Test jobs need a pool agent."""
+        runner = make_runner(storage, SceneAgent())
+
+        with pytest.raises(ValueError, match="nobody"):
+            runner.create_job("nobody", act_ids=["act-1"])
+
+
+class TestCancelResume:
+    """Test cancelling and resuming jobs."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_then_resume(self, storage):
+        """Test cancel keeps finished scenes and resume drafts the rest."""
+        agent = SceneAgent(delay=0.05)
+        runner = make_runner(storage, agent, max_concurrency=1)
+        job = runner.create_job("writer", chapter_ids=["ch-1"])
+        finished = asyncio.Event()
+
+        def on_progress(job, task):
+            if task is not None and task.status == SceneTaskStatus.COMPLETED:
+                finished.set()
+
+        running = asyncio.create_task(runner.run(job.id, on_progress))
+        await finished.wait()
+        assert await runner.cancel(job.id)
+        job = await running
+
+        assert job.status == BatchJobStatus.CANCELLED
+        assert [t.status for t in job.tasks] == [SceneTaskStatus.COMPLETED, SceneTaskStatus.PENDING]
+        assert storage.load().get_scene("sc-1-2").content == ""
+
+        # A new runner (e.g. after a restart) resumes from the stored job
+        resumed = make_runner(storage, SceneAgent())
+        job = await resumed.resume(job.id)
+
+        assert job.status == BatchJobStatus.COMPLETED
+        assert storage.load().get_scene("sc-1-2").content == "draft of Outline 1.2"
+        assert job.tasks[0].attempts == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_pending_job(self, storage):
+        """Test jobs that never started can be cancelled; finished ones can't."""
+        runner = make_runner(storage, SceneAgent())
+        pending = runner.create_job("writer", chapter_ids=["ch-1"])
+        done = runner.create_job("writer", chapter_ids=["ch-2"])
+        await runner.run(done.id)
+
+        assert await runner.cancel(pending.id)
+        assert not await runner.cancel(done.id)
+        assert runner.get_job(pending.id).status == BatchJobStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_progress_persisted(self, storage, tmp_path):
+        """Test job state is stored and listed."""
+        store = BatchJobStore(tmp_path / "custom-jobs")
+        runner = make_runner(storage, SceneAgent(), job_store=store)
+        job = runner.create_job("writer", chapter_ids=["ch-1"])
+        await runner.run(job.id)
+
+        stored = store.load(job.id)
+        assert stored.status == BatchJobStatus.COMPLETED
+        assert stored.tasks[0].completed_at is not None
+        assert [j.id for j in store.list_jobs()] == [job.id]
+        assert store.delete(job.id)
+        assert store.load(job.id) is None
@@ -0,0 +1,62 @@
+"""Tests for the benchmark harness."""
+
+import pytest
+
+from benchmarks.harness import Benchmark, compare, run_case
+
+
+def make_document(medians):
+    return {"benchmarks": {key: {"median": value} for key, value in medians.items()}}
+
+
+class TestRunCase:
+    """Test timing of benchmark cases."""
+
+    def test_sync_with_params(self):
+        """Test factory receives params and op runs number * repeat times."""
+        calls = []
+
+        def factory(size):
+            return lambda: calls.append(size)
+
+        result = run_case(Benchmark("demo", factory, number=10, repeat=3), {"size": 4})
+
+        assert calls == [4] * 30
+        assert result.key == "demo[size=4]"
+        assert len(result.samples) == 3
+        assert result.to_dict()["ops_per_sec"] > 0
+
+    def test_async_generator_teardown(self):
+        """Test async ops are awaited and generator factories are torn down."""
+        events = []
+
+        def factory():
+            async def op():
+                events.append("op")
+            yield op
+            events.append("teardown")
+
+        run_case(Benchmark("demo", factory, number=2, repeat=1), {})
+
+        assert events == ["op", "op", "teardown"]
+
+    def test_scale(self):
+        """Test quick runs scale down iterations."""
+        result = run_case(Benchmark("demo", lambda: (lambda: None), number=100, repeat=1), {}, scale=0.1)
+        assert result.number == 10
+
+
+class TestCompare:
+    """Test regression detection."""
+
+    def test_classifies_changes(self):
+        """Test regressions and improvements use the threshold."""
+        baseline = make_document({"a": 1.0, "b": 1.0, "c": 1.0, "gone": 1.0})
+        current = make_document({"a": 1.5, "b": 0.5, "c": 1.05, "new": 1.0})
+
+        report = compare(baseline, current, threshold=0.10)
+
+        assert [c.key for c in report["regressions"]] == ["a"]
+        assert [c.key for c in report["improvements"]] == ["b"]
+        assert [c.key for c in report["unchanged"]] == ["c"]
+        assert report["regressions"][0].ratio == pytest.approx(1.5)
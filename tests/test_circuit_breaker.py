@@ -0,0 +1,208 @@
+"""Tests for per-agent circuit breakers."""
+
+import asyncio
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SwitchAgent:
+    """Agent whose health can be toggled."""
+
+    def __init__(self, healthy: bool = True, delay: float = 0.0):
+        self.healthy = healthy
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if not self.healthy:
+            raise ConnectionError("connection refused")
+        return {"output": "ok", "tokens_input": 1, "tokens_output": 1}
+
+
+class FlakyBaseAgent(BaseAgent):
+    """BaseAgent that always fails."""
+
+    def __init__(self):
+        super().__init__(AgentConfig(name="flaky", model="m", retry_attempts=10, retry_delay=0.0))
+        self.calls = 0
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        self.calls += 1
+        raise ConnectionError("down")
+
+
+def breaker(**kwargs) -> CircuitBreaker:
+    settings = {"min_requests": 4, "window": 10, "open_seconds": 10, "clock": FakeClock()}
+    settings.update(kwargs)
+    return CircuitBreaker("agent", **settings)
+
+
+class TestCircuitBreaker:
+    """Test the state machine."""
+
+    def test_opens_on_error_rate(self):
+        """Test the breaker opens once the window's failure rate crosses the threshold."""
+        cb = breaker()
+        for _ in range(3):
+            cb.record_failure()
+        assert cb.state is CircuitState.CLOSED  # below min_requests
+
+        cb.record_failure()
+
+        assert cb.state is CircuitState.OPEN
+        assert not cb.allow_request()
+        assert cb.rejected == 1
+
+    def test_mixed_outcomes_below_threshold(self):
+        """Test occasional failures don't open the breaker."""
+        cb = breaker()
+        for _ in range(5):
+            cb.record_success()
+            cb.record_success()
+            cb.record_failure()
+        assert cb.state is CircuitState.CLOSED
+
+    def test_half_open_probe_closes(self):
+        """Test one probe is allowed after the cool-down and success closes."""
+        cb = breaker()
+        for _ in range(4):
+            cb.record_failure()
+        cb._clock.now = 10
+
+        assert cb.state is CircuitState.HALF_OPEN
+        assert cb.allow_request()
+        assert not cb.allow_request()  # one probe at a time
+
+        cb.record_success()
+
+        assert cb.state is CircuitState.CLOSED
+        assert cb.failure_rate == 0
+
+    def test_failed_probe_doubles_cooldown(self):
+        """Test a failed probe reopens with a longer cool-down."""
+        cb = breaker(max_open_seconds=15)
+        for _ in range(4):
+            cb.record_failure()
+        cb._clock.now = 10
+        assert cb.allow_request()
+
+        cb.record_failure()
+
+        assert cb.state is CircuitState.OPEN
+        cb._clock.now = 24
+        assert cb.state is CircuitState.OPEN
+        cb._clock.now = 25
+        assert cb.state is CircuitState.HALF_OPEN
+        assert cb.times_opened == 2
+
+    def test_release_returns_probe_slot(self):
+        """Test a cancelled probe frees its slot."""
+        cb = breaker()
+        for _ in range(4):
+            cb.record_failure()
+        cb._clock.now = 10
+        assert cb.allow_request()
+
+        cb.release()
+
+        assert cb.allow_request()
+
+
+class TestPoolIntegration:
+    """Test breakers inside AgentPool."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        """Test requests to an open agent are rejected without calling it."""
+        agent = SwitchAgent(healthy=False)
+        pool = AgentPool(circuit_breaker={"min_requests": 3})
+        pool.register_agent("down", agent)
+
+        for _ in range(3):
+            await pool.execute_single("down", "p")
+        agent.delay = 10  # would stall if called
+
+        response = await pool.execute_single("down", "p")
+
+        assert not response.success
+        assert "Circuit open" in response.error
+        assert agent.calls == 3
+        stats = pool.get_stats("down")
+        assert stats["rejected_requests"] == 1
+        assert stats["circuit"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_routing_skips_open_circuit(self):
+        """Test routed requests avoid agents with open circuits."""
+        pool = AgentPool(circuit_breaker={"min_requests": 2}, max_error_rate=1.0)
+        pool.register_agent("down", SwitchAgent(healthy=False))
+        pool.register_agent("up", SwitchAgent(delay=0.01))
+        await pool.execute_single("up", "p")
+        await pool.execute_single("down", "p")
+        await pool.execute_single("down", "p")
+
+        response = await pool.execute_routed("p", agents=["down", "up"])
+
+        assert response.agent_name == "up"
+
+    @pytest.mark.asyncio
+    async def test_background_probe_recovers(self):
+        """Test open circuits are probed in the background and close on recovery."""
+        agent = SwitchAgent(healthy=False)
+        pool = AgentPool(
+            circuit_breaker={"min_requests": 2, "open_seconds": 0.02},
+            probe_prompt="ping",
+        )
+        pool.register_agent("flapping", agent)
+        await pool.execute_single("flapping", "p")
+        await pool.execute_single("flapping", "p")
+        assert pool.get_circuit("flapping").state is CircuitState.OPEN
+
+        agent.healthy = True
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if pool.get_circuit("flapping").state is CircuitState.CLOSED:
+                break
+
+        assert pool.get_circuit("flapping").state is CircuitState.CLOSED
+        assert (await pool.execute_single("flapping", "p")).success
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Test breakers can be turned off."""
+        pool = AgentPool(circuit_breaker={"enabled": False})
+        pool.register_agent("down", SwitchAgent(healthy=False))
+        for _ in range(10):
+            await pool.execute_single("down", "p")
+
+        assert pool.get_circuit("down") is None
+        assert pool.get_stats("down")["failed_requests"] == 10
+
+    @pytest.mark.asyncio
+    async def test_generate_with_retry_stops_when_open(self):
+        """Test BaseAgent retries stop once the shared breaker opens."""
+        agent = FlakyBaseAgent()
+        pool = AgentPool(circuit_breaker={"min_requests": 3})
+        pool.register_agent("flaky", agent)
+
+        with pytest.raises(CircuitOpenError):
+            await agent.generate_with_retry("p")
+
+        assert agent.calls == 3
+        assert agent.circuit_breaker is pool.get_circuit("flaky")
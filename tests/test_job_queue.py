@@ -0,0 +1,541 @@
+"""Tests for the background job queue."""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.job_queue import Job, JobQueue, JobStatus, JobStore, request_key
+
+
+async def echo(payload, report):
+    report(0.5, "halfway")
+    return {"echo": payload["text"]}
+
+
+async def fail(payload, report):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    yield store
+    store.close()
+
+
+async def started_queue(store, workers=2, reuse_seconds=30.0, **handlers):
+    queue = JobQueue(store, workers=workers, reuse_seconds=reuse_seconds)
+    queue.register("echo", echo)
+    queue.register("fail", fail)
+    for kind, handler in handlers.items():
+        queue.register(kind, handler)
+    await queue.start()
+    return queue
+
+
+class TestJobQueue:
+    """Test submitting and running jobs."""
+
+    @pytest.mark.asyncio
+    async def test_completes_with_result(self, store):
+        """Test jobs run in the background and store their result."""
+        queue = await started_queue(store)
+        try:
+            job = await queue.submit("echo", {"text": "hi"})
+            assert job.status == JobStatus.QUEUED
+
+            done = await queue.wait(job.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert done.status == JobStatus.COMPLETED
+        assert done.result == {"echo": "hi"}
+        assert done.progress == 1.0
+        assert done.message == "halfway"
+        assert store.get(job.id).result == {"echo": "hi"}
+
+    @pytest.mark.asyncio
+    async def test_failure_recorded(self, store):
+        """Test handler exceptions fail the job with the error message."""
+        queue = await started_queue(store)
+        try:
+            job = await queue.submit("fail")
+            done = await queue.wait(job.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert done.status == JobStatus.FAILED
+        assert done.error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_worker_count_limits_concurrency(self, store):
+        """Test no more jobs run at once than there are workers."""
+        active, peak = 0, 0
+
+        async def slow(payload, report):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        queue = await started_queue(store, workers=2, slow=slow)
+        try:
+            jobs = [await queue.submit("slow") for _ in range(5)]
+            for job in jobs:
+                await queue.wait(job.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_and_queued(self, store):
+        """Test running jobs are interrupted and queued jobs never start."""
+        started = asyncio.Event()
+        calls = []
+
+        async def hang(payload, report):
+            calls.append(payload)
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = await started_queue(store, workers=1, hang=hang)
+        try:
+            running = await queue.submit("hang", {"n": 1})
+            queued = await queue.submit("hang", {"n": 2})
+            await started.wait()
+
+            assert await queue.cancel(queued.id)
+            assert await queue.cancel(running.id)
+            assert not await queue.cancel(running.id)  # already finished
+            done = await queue.submit("echo", {"text": "after"})
+            await queue.wait(done.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert store.get(running.id).status == JobStatus.CANCELLED
+        assert store.get(queued.id).status == JobStatus.CANCELLED
+        assert calls == [{"n": 1}]
+
+    @pytest.mark.asyncio
+    async def test_events_published(self, store):
+        """Test subscribers see each status change."""
+        queue = await started_queue(store)
+        events = queue.subscribe()
+        try:
+            job = await queue.submit("echo", {"text": "x"})
+            await queue.wait(job.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        seen = []
+        while not events.empty():
+            seen.append(events.get_nowait())
+        assert [e["status"] for e in seen] == ["queued", "running", "running", "completed"]
+        assert seen[2]["progress"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind(self, store):
+        """Test submitting an unregistered kind is rejected."""
+        queue = await started_queue(store)
+        try:
+            with pytest.raises(ValueError):
+                await queue.submit("nope")
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_requeued_after_restart(self, store):
+        """Test jobs left queued or running by a previous process run on start."""
+        store.save(Job(id="queued", kind="echo", payload={"text": "a"}))
+        store.save(Job(id="running", kind="echo", payload={"text": "b"}, status=JobStatus.RUNNING))
+        store.save(Job(id="orphan", kind="gone"))
+
+        queue = await started_queue(store)
+        try:
+            first = await queue.wait("queued", timeout=1)
+            second = await queue.wait("running", timeout=1)
+        finally:
+            await queue.stop()
+
+        assert first.result == {"echo": "a"}
+        assert second.result == {"echo": "b"}
+        assert store.get("orphan").status == JobStatus.FAILED
+
+    def test_list_filters(self, store):
+        """Test listing by status and kind, newest first."""
+        store.save(Job(id="1", kind="echo", created_at="2025-01-01T00:00:00"))
+        store.save(Job(id="2", kind="echo", created_at="2025-01-02T00:00:00", status=JobStatus.COMPLETED))
+        store.save(Job(id="3", kind="fail", created_at="2025-01-03T00:00:00"))
+
+        assert [j.id for j in store.list()] == ["3", "2", "1"]
+        assert [j.id for j in store.list(statuses=[JobStatus.QUEUED])] == ["3", "1"]
+        assert [j.id for j in store.list(kind="echo", limit=1)] == ["2"]
+
+
+class TestCoalescing:
+    """Test attaching duplicate submissions to one job."""
+
+    def test_request_key_normalization(self):
+        """Test insignificant payload differences share a key."""
+        key = request_key("compare", {"prompt": "Write it.", "models": ["a", "b"], "context": None})
+
+        assert request_key("compare", {"models": ["a", "b"], "prompt": "  Write it.\r\n"}) == key
+        assert request_key("compare", {"prompt": "Write it.", "models": ["b", "a"]}) != key
+        assert request_key("scene.generate", {"prompt": "Write it.", "models": ["a", "b"]}) != key
+
+    @pytest.mark.asyncio
+    async def test_duplicates_share_running_job(self, store):
+        """Test duplicates attach to the in-flight job and get its result."""
+        calls = []
+        release = asyncio.Event()
+
+        async def generate(payload, report):
+            calls.append(payload)
+            await release.wait()
+            return {"scene": "once"}
+
+        queue = await started_queue(store, generate=generate)
+        try:
+            first = await queue.submit("generate", {"prompt": "p"}, coalesce=True)
+            second = await queue.submit("generate", {"prompt": " p "}, coalesce=True)
+            other = await queue.submit("generate", {"prompt": "q"}, coalesce=True)
+            release.set()
+            done = await queue.wait(first.id, timeout=1)
+            await queue.wait(other.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert second.id == first.id
+        assert second.callers == 2
+        assert other.id != first.id
+        assert done.result == {"scene": "once"}
+        assert store.get(first.id).callers == 2  # not reset by the worker's saves
+        assert calls == [{"prompt": "p"}, {"prompt": "q"}]
+
+    @pytest.mark.asyncio
+    async def test_reuse_window(self, store):
+        """Test completed results are reused only within the window, and never failures."""
+        queue = await started_queue(store)
+        try:
+            first = await queue.submit("echo", {"text": "a"}, coalesce=True)
+            await queue.wait(first.id, timeout=1)
+            reused = await queue.submit("echo", {"text": "a"}, coalesce=True)
+            uncoalesced = await queue.submit("echo", {"text": "a"})
+
+            failed = await queue.submit("fail", {}, coalesce=True)
+            await queue.wait(failed.id, timeout=1)
+            retried = await queue.submit("fail", {}, coalesce=True)
+            await queue.wait(uncoalesced.id, timeout=1)
+            await queue.wait(retried.id, timeout=1)
+
+            queue.reuse_seconds = 0
+            expired = await queue.submit("echo", {"text": "a"}, coalesce=True)
+            await queue.wait(expired.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert reused.id == first.id
+        assert reused.status == JobStatus.COMPLETED
+        assert uncoalesced.id != first.id
+        assert retried.id != failed.id
+        assert expired.id != first.id
+
+    @pytest.mark.asyncio
+    async def test_cancel_detaches_callers(self, store):
+        """Test a shared job survives until its last caller cancels."""
+        async def hang(payload, report):
+            await asyncio.sleep(10)
+
+        queue = await started_queue(store, hang=hang)
+        try:
+            job = await queue.submit("hang", {"n": 1}, coalesce=True)
+            await queue.submit("hang", {"n": 1}, coalesce=True)
+
+            assert await queue.cancel(job.id)
+            assert store.get(job.id).status != JobStatus.CANCELLED
+            assert store.get(job.id).callers == 1
+
+            assert await queue.cancel(job.id)
+        finally:
+            await queue.stop()
+
+        assert store.get(job.id).status == JobStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_duplicate_of_cancelled_job_queued_anew(self, store, tmp_path):
+        """Test a duplicate never attaches to a job its last caller cancelled elsewhere."""
+        started = asyncio.Event()
+
+        async def hang(payload, report):
+            started.set()
+            await asyncio.sleep(10)
+
+        other = JobStore(tmp_path / "jobs.db")
+        queue = await started_queue(store, workers=1, hang=hang)
+        try:
+            await queue.submit("hang", {"n": 0})  # keeps the only worker busy
+            await started.wait()
+            job = await queue.submit("hang", {"n": 1}, coalesce=True)
+            assert other.cancel_queued(job.id)  # another process's last caller cancels
+
+            duplicate = await queue.submit("hang", {"n": 1}, coalesce=True)
+        finally:
+            await queue.stop()
+            other.close()
+
+        assert duplicate.id != job.id
+        assert duplicate.status == JobStatus.QUEUED
+        assert store.get(job.id).callers == 1
+        assert store.attach_duplicate(request_key("hang", {"n": 2}), "") is None
+
+    def test_migrates_old_schema(self, tmp_path):
+        """Test stores created before coalescing gain the new columns."""
+        path = tmp_path / "jobs.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+            "payload TEXT NOT NULL, result TEXT, error TEXT, progress REAL NOT NULL DEFAULT 0, "
+            "message TEXT NOT NULL DEFAULT '', created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT)"
+        )
+        conn.execute("INSERT INTO jobs (id, kind, status, payload, created_at) VALUES ('old', 'echo', 'completed', '{}', 'x')")
+        conn.commit()
+        conn.close()
+
+        store = JobStore(path)
+        try:
+            old = store.get("old")
+            store.save(Job(id="new", kind="echo", request_key="k"))
+            new = store.get("new")
+        finally:
+            store.close()
+
+        assert old.callers == 1 and old.request_key is None
+        assert new.request_key == "k"
+
+
+class TestSharedStore:
+    """Test several queues (worker processes) sharing one store."""
+
+    @pytest.fixture
+    def stores(self, tmp_path):
+        stores = [JobStore(tmp_path / "jobs.db"), JobStore(tmp_path / "jobs.db")]
+        yield stores
+        for store in stores:
+            store.close()
+
+    @pytest.mark.asyncio
+    async def test_each_job_runs_once(self, stores):
+        """Test jobs submitted to either queue are claimed by exactly one of them."""
+        runs = []
+
+        async def record(payload, report):
+            runs.append(payload["n"])
+            await asyncio.sleep(0.01)
+
+        queues = [
+            await started_queue(store, workers=2, record=record)
+            for store in stores
+        ]
+        try:
+            jobs = [await queues[n % 2].submit("record", {"n": n}) for n in range(10)]
+            for job in jobs:
+                await queues[0].wait(job.id, timeout=3)
+        finally:
+            for queue in queues:
+                await queue.stop()
+
+        assert sorted(runs) == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_watch_across_queues(self, stores):
+        """Test a job running in one queue is watched and cancelled from another."""
+        started = asyncio.Event()
+
+        async def hang(payload, report):
+            report(0.25, "working")
+            started.set()
+            await asyncio.sleep(10)
+
+        runner = JobQueue(stores[0], workers=1, poll_interval=0.01, heartbeat_interval=0.01)
+        runner.register("hang", hang)
+        other = JobQueue(stores[1], workers=1, poll_interval=0.01)
+        other.register("echo", echo)  # can't run "hang" jobs itself
+        await runner.start()
+        await other.start()
+        try:
+            job = await runner.submit("hang")
+            await started.wait()
+
+            seen = []
+            async for update in other.watch(job.id):
+                seen.append(update)
+                if update.message == "working":
+                    break
+
+            assert await other.cancel(job.id)
+            done = await other.wait(job.id, timeout=1)
+        finally:
+            await runner.stop()
+            await other.stop()
+
+        assert seen[-1].progress == 0.25
+        assert done.status == JobStatus.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_stale_jobs_requeued(self, stores):
+        """Test jobs of a worker that stopped heartbeating are taken over."""
+        stores[0].save(Job(id="j", kind="echo", payload={"text": "x"}))
+        claimed = stores[0].claim(["echo"], owner="dead-worker")
+        assert claimed.status == JobStatus.RUNNING
+
+        queue = JobQueue(stores[1], lease_seconds=0.05, heartbeat_interval=0.01, poll_interval=0.01)
+        queue.register("echo", echo)
+        await queue.start()
+        try:
+            done = await queue.wait("j", timeout=1)
+        finally:
+            await queue.stop()
+
+        assert done.result == {"echo": "x"}
+        # The dead worker's late write doesn't clobber the result
+        claimed.message = "late"
+        assert not stores[0].save(claimed, owner="dead-worker")
+        assert stores[1].get("j").status == JobStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_running_jobs(self, stores):
+        """Test jobs interrupted by a stopping queue go back to the queue."""
+        started = asyncio.Event()
+
+        async def hang(payload, report):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = await started_queue(stores[0], hang=hang)
+        job = await queue.submit("hang")
+        await started.wait()
+        await queue.stop()
+
+        assert stores[1].get(job.id).status == JobStatus.QUEUED
+
+    @pytest.mark.asyncio
+    async def test_locked_store_does_not_block_loop(self, stores, tmp_path):
+        """Test waiting for another process's write lock leaves the event loop free."""
+        queue = await started_queue(stores[0])
+        other = sqlite3.connect(str(tmp_path / "jobs.db"), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            submit = asyncio.create_task(queue.submit("echo", {"text": "hi"}))
+            ticks = 0
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not submit.done()
+        finally:
+            other.execute("COMMIT")
+            other.close()
+        try:
+            job = await submit
+            done = await queue.wait(job.id, timeout=1)
+        finally:
+            await queue.stop()
+
+        assert ticks == 10
+        assert done.result == {"echo": "hi"}
+
+
+class SceneAgent(BaseAgent):
+    """Agent returning a fixed scene."""
+
+    def __init__(self):
+        super().__init__(AgentConfig(name="writer", model="gpt-4"))
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        return {"output": "A generated scene.", "tokens_input": 10, "tokens_output": 5}
+
+
+class TestJobEndpoints:
+    """Test the webapp job API."""
+
+    @pytest.fixture
+    def webapp(self, tmp_path, monkeypatch):
+        from webapp.backend import app as webapp
+
+        pool = AgentPool()
+        pool.register_agent("writer", SceneAgent())
+        monkeypatch.setattr(webapp, "project_path", tmp_path / "project")
+        monkeypatch.setattr(webapp, "agent_pool", pool)
+        return webapp
+
+    def test_scene_generation_job(self, webapp):
+        """Test generation is queued, reported over the websocket and fetched."""
+        from fastapi.testclient import TestClient
+
+        with TestClient(webapp.app) as client:
+            submitted = client.post("/api/scene/generate", json={"prompt": "Sarah meets Tom", "model": "writer"})
+            job_id = submitted.json()["job"]["id"]
+
+            with client.websocket_connect(f"/ws/jobs?job_id={job_id}") as ws:
+                events = []
+                while not events or events[-1]["status"] not in ("completed", "failed"):
+                    events.append(ws.receive_json()["job"])
+
+            result = client.get(f"/api/jobs/{job_id}/result").json()
+            listed = client.get("/api/jobs", params={"kind": "scene.generate"}).json()
+
+        assert submitted.status_code == 202
+        assert events[-1]["status"] == "completed"
+        assert result["success"]
+        assert result["scene"] == "A generated scene."
+        assert [j["id"] for j in listed["jobs"]] == [job_id]
+
+    def test_duplicate_requests_coalesced(self, webapp):
+        """Test a double-submitted comparison runs once."""
+        from fastapi.testclient import TestClient
+
+        calls = []
+
+        async def compare(payload, report):
+            calls.append(payload)
+            await asyncio.sleep(0.05)
+            return {"results": {}}
+
+        with TestClient(webapp.app) as client:
+            webapp.job_queue.register("compare", compare)
+            body = {"prompt": "Opening line", "models": ["a", "b"]}
+            first = client.post("/api/compare", json=body).json()
+            second = client.post("/api/compare", json={**body, "prompt": "Opening line "}).json()
+            client.portal.call(webapp.job_queue.wait, first["job"]["id"], 1)
+
+        assert second["job"]["id"] == first["job"]["id"]
+        assert not first["coalesced"]
+        assert second["coalesced"]
+        assert len(calls) == 1
+
+    def test_status_cancel_and_errors(self, webapp):
+        """Test status lookups, 409 before completion, cancellation and 404s."""
+        from fastapi.testclient import TestClient
+
+        async def hang(payload, report):
+            await asyncio.sleep(10)
+
+        with TestClient(webapp.app) as client:
+            webapp.job_queue.register("hang", hang)
+            job = client.portal.call(webapp.job_queue.submit, "hang")
+
+            pending = client.get(f"/api/jobs/{job.id}/result")
+            cancelled = client.post(f"/api/jobs/{job.id}/cancel").json()
+            status = client.get(f"/api/jobs/{job.id}").json()
+            missing = client.get("/api/jobs/nope")
+            bad_filter = client.get("/api/jobs", params={"status": "bogus"})
+
+        assert pending.status_code == 409
+        assert cancelled["success"]
+        assert status["job"]["status"] == "cancelled"
+        assert missing.status_code == 404
+        assert bad_filter.status_code == 400
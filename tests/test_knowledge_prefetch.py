@@ -0,0 +1,197 @@
+"""Tests for predictive knowledge prefetch."""
+
+import asyncio
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from factory.core.storage import Session
+from factory.knowledge.prefetch import (
+    KnowledgePrefetcher,
+    build_context_queries,
+    extract_scene_entities,
+    scene_context_queries,
+    voice_requirements_query,
+)
+from factory.knowledge.router import KnowledgeRouter
+from factory.workflows.scene_operations import SceneEnhancementWorkflow, SceneGenerationWorkflow
+
+
+OUTLINE = """POV: Sarah
+Location: Harbor cafe
+Scene: Sarah confronts John about the sale of the boat."""
+
+
+class TestEntityExtraction:
+    """Test scene entity extraction."""
+
+    def test_explicit_fields(self):
+        """Test POV and location lines are used."""
+        entities = extract_scene_entities(OUTLINE)
+
+        assert entities.pov == "Sarah"
+        assert entities.location == "Harbor cafe"
+        assert entities.characters[0] == "Sarah"
+        assert "John" in entities.characters
+
+    def test_known_characters(self):
+        """Test known names are matched instead of guessing."""
+        entities = extract_scene_entities(
+            "The old captain watched Mira climb aboard.",
+            known_characters=["Mira", "Tomas"]
+        )
+
+        assert entities.characters == ["Mira"]
+
+    def test_common_words_not_names(self):
+        """Test sentence-initial function words are ignored."""
+        entities = extract_scene_entities("She ran. Then they left. The end.")
+
+        assert entities.characters == []
+
+    def test_build_queries(self):
+        """Test queries cover outline, characters and location."""
+        queries = build_context_queries(extract_scene_entities(OUTLINE), outline=OUTLINE)
+
+        assert queries[0].startswith("Provide context for:")
+        assert voice_requirements_query("Sarah") in queries
+        assert "What is Harbor cafe like?" in queries
+        assert len(queries) == len(set(queries))
+
+    def test_query_cap_keeps_most_useful(self):
+        """Test capped queries keep outline, lead character and location first."""
+        outline = OUTLINE + "\nCharacters: John, Mira, Tomas"
+
+        capped = scene_context_queries(outline, max_queries=4)
+
+        assert len(capped) == 4
+        assert voice_requirements_query("Sarah") in capped
+        assert "What is Harbor cafe like?" in capped
+        assert len(scene_context_queries(outline, max_queries=None)) > 4
+
+
+class TestPrefetcher:
+    """Test background cache warming."""
+
+    @pytest.mark.asyncio
+    async def test_prefetch_warms_cache(self):
+        """Test prefetched queries are served from cache afterwards."""
+        router = KnowledgeRouter()
+        prefetcher = KnowledgePrefetcher(router)
+
+        warmed = await prefetcher.prefetch_scene("scene-1", OUTLINE)
+
+        assert warmed
+        assert all(router.is_cached(q) for q in warmed)
+        hits_before = router.cache.get_stats()["hits"]
+
+        workflow = SceneEnhancementWorkflow(knowledge_router=router)
+        await workflow.run(scene=OUTLINE, character="Sarah")
+
+        assert router.cache.get_stats()["hits"] == hits_before + 1
+
+    @pytest.mark.asyncio
+    async def test_generation_hits_prefetched_queries(self):
+        """Test scene generation finds every context query already cached."""
+        router = KnowledgeRouter()
+        prefetcher = KnowledgePrefetcher(router, known_characters=["Sarah", "John"])
+        await prefetcher.prefetch_scene("scene-1", OUTLINE)
+        stats = router.cache.get_stats()
+
+        workflow = SceneGenerationWorkflow(knowledge_router=router, known_characters=["Sarah", "John"])
+        await workflow.run(outline=OUTLINE)
+
+        queries = workflow.context["get_context"]["queries"]
+        assert router.cache.get_stats()["misses"] == stats["misses"]
+        assert router.cache.get_stats()["hits"] == stats["hits"] + len(queries)
+
+    @pytest.mark.asyncio
+    async def test_switching_scenes_cancels_previous(self):
+        """Test opening another scene cancels the running prefetch."""
+        router = KnowledgeRouter()
+
+        async def slow(source, query, max_results):
+            await asyncio.sleep(10)
+
+        router._execute_query = slow
+        prefetcher = KnowledgePrefetcher(router)
+
+        first = prefetcher.prefetch_scene("scene-1", OUTLINE)
+        await asyncio.sleep(0)
+        prefetcher.prefetch_scene("scene-2", "Tomas walks the docks.")
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert first.cancelled()
+        assert prefetcher.current_scene == "scene-2"
+        prefetcher.cancel()
+
+    @pytest.mark.asyncio
+    async def test_background_yields_to_foreground(self):
+        """Test prefetch waits while foreground queries are running."""
+        router = KnowledgeRouter()
+        order = []
+        release = asyncio.Event()
+        original = router._execute_query
+
+        async def tracked(source, query, max_results):
+            if query == "Foreground question":
+                await release.wait()
+            order.append(query)
+            return await original(source, query, max_results)
+
+        router._execute_query = tracked
+
+        foreground = asyncio.create_task(router.query("Foreground question"))
+        await asyncio.sleep(0)
+        background = KnowledgePrefetcher(router).prefetch_scene("scene-1", OUTLINE)
+        await asyncio.sleep(0.01)
+
+        assert order == []
+        release.set()
+        await foreground
+        await background
+
+        assert order[0] == "Foreground question"
+
+    @pytest.mark.asyncio
+    async def test_session_open_file_triggers_prefetch(self):
+        """Test opening a scene file in the session schedules prefetch."""
+        with TemporaryDirectory() as tmpdir:
+            project = Path(tmpdir)
+            (project / "scene1.md").write_text(OUTLINE)
+
+            session = Session(project)
+            router = KnowledgeRouter()
+            prefetcher = KnowledgePrefetcher(router)
+            prefetcher.attach(session)
+
+            session.add_open_file("scene1.md")
+            assert prefetcher.current_scene == "scene1.md"
+            await prefetcher._task
+
+            assert router.is_cached(voice_requirements_query("Sarah"))
+
+    @pytest.mark.asyncio
+    async def test_reopened_scene_prefetched_again(self):
+        """Test a scene reopened after its prefetch finished is prefetched again."""
+        with TemporaryDirectory() as tmpdir:
+            project = Path(tmpdir)
+            (project / "scene1.md").write_text(OUTLINE)
+
+            session = Session(project)
+            router = KnowledgeRouter()
+            prefetcher = KnowledgePrefetcher(router)
+            prefetcher.attach(session)
+
+            session.add_open_file("scene1.md")
+            await prefetcher._task
+            assert prefetcher.current_scene is None
+
+            (project / "scene1.md").write_text("Tomas walks the docks.")
+            prefetcher._on_file_opened("scene1.md")
+            assert prefetcher.current_scene == "scene1.md"
+            warmed = await prefetcher._task
+
+            assert warmed
+            assert all(router.is_cached(q) for q in warmed)
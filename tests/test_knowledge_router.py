@@ -172,3 +172,77 @@ class TestNotebookLMOptIn:
         result = await router.query("Why does this happen?")
 
         assert result.source == KnowledgeSource.NOTEBOOKLM
+
+
+class TestQueryMany:
+    """Test batched knowledge queries."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self):
+        """Test results line up with the input queries."""
+        router = KnowledgeRouter()
+        queries = ["What is Sarah's age?", "Tell me about the story", "Who is John?"]
+
+        results = await router.query_many(queries)
+
+        assert len(results) == 3
+        assert [r.metadata["query"] for r in results] == queries
+
+    @pytest.mark.asyncio
+    async def test_duplicates_executed_once(self):
+        """Test duplicate queries share one execution."""
+        router = KnowledgeRouter()
+        calls = []
+        original = router._execute_query
+
+        async def counting(source, query, max_results):
+            calls.append(query)
+            return await original(source, query, max_results)
+
+        router._execute_query = counting
+
+        results = await router.query_many(["Who is John?", "Who is John?", "Where is home?"])
+
+        assert len(results) == 3
+        assert results[0] is results[1]
+        assert sorted(calls) == ["Where is home?", "Who is John?"]
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        """Test no more than max_concurrency queries run at once."""
+        import asyncio
+
+        router = KnowledgeRouter()
+        in_flight = 0
+        peak = 0
+
+        async def slow(source, query, max_results):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return await KnowledgeRouter._query_cognee(router, query, max_results)
+
+        router._execute_query = slow
+
+        await router.query_many([f"Who is character {i}?" for i in range(10)], max_concurrency=3)
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_return_exceptions(self):
+        """Test failures are returned in place when requested."""
+        router = KnowledgeRouter()
+
+        async def failing(source, query, max_results):
+            raise RuntimeError("backend down")
+
+        router._execute_query = failing
+        router._query_cognee = failing
+
+        results = await router.query_many(["Who is John?"], return_exceptions=True)
+        assert isinstance(results[0], Exception)
+
+        with pytest.raises(Exception):
+            await router.query_many(["Who is John?"])
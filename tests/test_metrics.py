@@ -0,0 +1,251 @@
+"""Tests for Prometheus-format metrics."""
+
+import json
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from factory.core.agent_pool import AgentPool
+from factory.core.metrics import (
+    MetricsRegistry,
+    agent_pool_collector,
+    get_registry,
+    merge_process_families,
+    query_cache_collector,
+    render_families,
+)
+from factory.core.storage import Session
+from factory.core.workflow_engine import Workflow, WorkflowEngine
+from factory.knowledge.cache import QueryCache
+
+
+class CostlyAgent:
+    """Agent reporting tokens and cost."""
+
+    async def generate(self, prompt, **kwargs):
+        return {"output": "x", "tokens_input": 10, "tokens_output": 20, "cost": 0.25}
+
+
+class FailingAgent:
+    """Agent that always fails."""
+
+    async def generate(self, prompt, **kwargs):
+        raise RuntimeError("down")
+
+
+def sample(text: str, line_start: str) -> float:
+    """Value of the first exposition line starting with line_start."""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"No sample {line_start!r} in:\n{text}")
+
+
+class TestRegistry:
+    """Test metric types and text rendering."""
+
+    def test_counter_and_gauge(self):
+        """Test counter _total suffix and labelled gauges."""
+        registry = MetricsRegistry()
+        registry.counter("jobs", "Jobs run").inc(3)
+        registry.gauge("depth", "Queue depth", ["queue"]).labels("a").set(7)
+
+        text = registry.render()
+
+        assert "# TYPE jobs counter" in text
+        assert sample(text, "jobs_total") == 3
+        assert sample(text, 'depth{queue="a"}') == 7
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("op_seconds", "Op time", buckets=[0.1, 1.0])
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert sample(text, 'op_seconds_bucket{le="0.1"}') == 1
+        assert sample(text, 'op_seconds_bucket{le="1"}') == 2
+        assert sample(text, 'op_seconds_bucket{le="+Inf"}') == 3
+        assert sample(text, "op_seconds_sum") == pytest.approx(5.55)
+        assert sample(text, "op_seconds_count") == 3
+
+    def test_same_name_returns_same_metric(self):
+        """Test get-or-create and type conflicts."""
+        registry = MetricsRegistry()
+        assert registry.counter("c", "x") is registry.counter("c", "x")
+        with pytest.raises(ValueError):
+            registry.gauge("c", "x")
+
+    def test_label_validation_and_escaping(self):
+        """Test wrong label counts fail and values are escaped."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c", "x", ["path"])
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+
+        counter.labels('say "hi"\n').inc()
+
+        assert 'c_total{path="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_failing_collector_is_skipped(self):
+        """Test one broken collector does not break the scrape."""
+        registry = MetricsRegistry()
+        registry.counter("ok", "fine").inc()
+        registry.register_collector(lambda: 1 / 0)
+
+        assert sample(registry.render(), "ok_total") == 1
+
+    def test_collector_registered_once(self):
+        """Test registering the same collector twice renders it once."""
+        registry = MetricsRegistry()
+        collector = lambda: [("up", "gauge", "Up", [("", {}, 1)])]
+        registry.register_collector(collector)
+        registry.register_collector(collector)
+
+        assert registry.render().count("# TYPE up gauge") == 1
+
+    def test_merge_process_families(self):
+        """Test per-process families merge under a worker label."""
+        first, second = MetricsRegistry(), MetricsRegistry()
+        first.counter("jobs", "Jobs").inc(2)
+        second.counter("jobs", "Jobs").inc(3)
+        # Snapshots travel between processes as JSON
+        snapshots = {
+            "101": json.loads(json.dumps(first.collect())),
+            "102": json.loads(json.dumps(second.collect())),
+        }
+
+        text = render_families(merge_process_families(snapshots))
+
+        assert text.count("# TYPE jobs counter") == 1
+        assert sample(text, 'jobs_total{worker="101"}') == 2
+        assert sample(text, 'jobs_total{worker="102"}') == 3
+
+
+class TestCollectors:
+    """Test collectors over existing component stats."""
+
+    @pytest.mark.asyncio
+    async def test_agent_pool(self):
+        """Test request, failure, cost and latency samples per agent."""
+        pool = AgentPool()
+        pool.register_agent("good", CostlyAgent())
+        pool.register_agent("bad", FailingAgent())
+        await pool.execute_parallel("prompt")
+        await pool.execute_single("good", "prompt")
+
+        registry = MetricsRegistry()
+        registry.register_collector(agent_pool_collector(pool))
+        text = registry.render()
+
+        assert sample(text, 'factory_agent_requests_total{agent="good"}') == 2
+        assert sample(text, 'factory_agent_failures_total{agent="bad"}') == 1
+        assert sample(text, 'factory_agent_cost_usd_total{agent="good"}') == 0.5
+        assert sample(text, 'factory_agent_tokens_total{agent="good"}') == 60
+        assert sample(text, 'factory_agent_latency_seconds_count{agent="good"}') == 2
+        assert 'factory_agent_latency_seconds{agent="good",quantile="0.95"}' in text
+
+    def test_query_cache(self):
+        """Test hit/miss counters and hit ratio."""
+        cache = QueryCache()
+        cache.set("q", "answer")
+        cache.get("q")
+        cache.get("other")
+
+        registry = MetricsRegistry()
+        registry.register_collector(query_cache_collector(lambda: cache))
+        text = registry.render()
+
+        assert sample(text, "factory_knowledge_cache_hits_total") == 1
+        assert sample(text, "factory_knowledge_cache_misses_total") == 1
+        assert sample(text, "factory_knowledge_cache_hit_ratio") == 0.5
+
+    def test_query_cache_absent(self):
+        """Test no samples before a cache exists."""
+        registry = MetricsRegistry()
+        registry.register_collector(query_cache_collector(lambda: None))
+        assert registry.render() == "\n"
+
+
+class TestInstrumentation:
+    """Test metrics recorded by instrumented components."""
+
+    @pytest.mark.asyncio
+    async def test_workflow_step_durations(self):
+        """Test each step observes its duration with its final status."""
+        workflow = Workflow("metrics-demo")
+        workflow.add_step("metrics_step_ok", lambda ctx: 1)
+
+        await WorkflowEngine().run_workflow(workflow)
+
+        text = get_registry().render()
+        assert sample(
+            text,
+            'factory_workflow_step_duration_seconds_count{step="metrics_step_ok",status="completed"}'
+        ) >= 1
+
+    @pytest.mark.asyncio
+    async def test_session_save_durations(self):
+        """Test saves are timed by trigger."""
+        histogram = get_registry().histogram(
+            "factory_session_save_duration_seconds", "", ["trigger", "result"]
+        )
+        before = histogram.labels("auto", "ok").count
+
+        with TemporaryDirectory() as tmpdir:
+            session = Session(Path(tmpdir), auto_save_interval=1)
+            session.set_stage("draft")
+            await session.save(trigger="auto")
+
+        assert histogram.labels("auto", "ok").count == before + 1
+
+    def test_metrics_endpoint(self, monkeypatch, tmp_path):
+        """Test /metrics serves request latency by route template."""
+        from fastapi.testclient import TestClient
+        from webapp.backend import app as webapp
+
+        monkeypatch.setattr(webapp, "project_path", tmp_path)
+        # Restarting must not register the collectors again
+        with TestClient(webapp.app):
+            pass
+        with TestClient(webapp.app) as client:
+            client.get("/api/health")
+            client.get("/no/such/path")
+            response = client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert sample(
+            text,
+            'factory_http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}'
+        ) >= 1
+        assert 'route="unmatched",status="404"' in text
+        assert "/no/such/path" not in text
+        assert "# TYPE factory_agent_requests counter" in text
+        assert text.count("# TYPE factory_agent_requests counter") == 1
+
+    def test_metrics_endpoint_merges_workers(self, monkeypatch, tmp_path):
+        """Test any worker serves all live workers' metrics, labelled by PID."""
+        from fastapi.testclient import TestClient
+        from webapp.backend import app as webapp
+
+        monkeypatch.setattr(webapp, "project_path", tmp_path)
+        monkeypatch.setattr(webapp, "WEB_WORKERS", 2)
+        other = MetricsRegistry()
+        other.counter("factory_http_requests", "Requests").inc(7)
+
+        with TestClient(webapp.app) as client:
+            store = webapp.state_store
+            store.set("metrics", "other", {"time": time.time(), "families": other.collect()})
+            store.set("metrics", "exited", {"time": time.time() - 3600, "families": other.collect()})
+            text = client.get("/metrics").text
+            remaining = store.keys("metrics")
+
+        assert sample(text, 'factory_http_requests_total{worker="other"}') == 7
+        assert f'worker="{webapp.WORKER_ID}"' in text
+        assert 'worker="exited"' not in text
+        assert "exited" not in remaining
+        assert text.count("# TYPE factory_agent_requests counter") == 1
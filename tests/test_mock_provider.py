@@ -0,0 +1,259 @@
+"""Tests for the offline mock LLM provider server."""
+
+import asyncio
+import json
+import time
+import httpx
+import pytest
+
+from factory.agents.base_agent import AgentConfig
+from factory.agents.chinese.deepseek import DeepSeekAgent
+from factory.agents.chinese.doubao import DoubaoAgent
+from factory.agents.chinese.qwen import QwenAgent
+from factory.agents.ollama_agent import OllamaAgent
+from factory.tools.mock_provider import (
+    LatencyDistribution,
+    MockProviderConfig,
+    MockProviderServer,
+    ProviderProfile,
+    create_mock_provider_app,
+)
+
+
+def instant(**overrides) -> MockProviderConfig:
+    """Config with no simulated delays."""
+    return MockProviderConfig(default=ProviderProfile(**overrides), time_scale=0.0, seed=1)
+
+
+def client_for(config: MockProviderConfig) -> httpx.AsyncClient:
+    """In-process client for the mock app."""
+    app = create_mock_provider_app(config)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mock")
+
+
+OPENAI_REQUEST = {
+    "model": "deepseek-chat",
+    "messages": [{"role": "user", "content": "Write a scene"}],
+    "max_tokens": 12,
+}
+
+
+class TestConfig:
+    """Test configuration parsing and sampling."""
+
+    def test_from_dict(self):
+        """Test nested profile configuration."""
+        config = MockProviderConfig.from_dict({
+            "time_scale": 0.5,
+            "default": {"latency": {"kind": "lognormal", "mean": 0.3, "spread": 0.4}},
+            "models": {"qwen-max": {"error_rate": 0.1, "requests_per_second": 2}},
+        })
+
+        assert config.time_scale == 0.5
+        assert config.default.latency.kind == "lognormal"
+        assert config.profile_for("qwen-max").error_rate == 0.1
+        assert config.profile_for("other") is config.default
+
+    def test_unknown_setting_rejected(self):
+        """Test typos in profiles are reported."""
+        with pytest.raises(ValueError):
+            ProviderProfile.from_dict({"tokens_per_sec": 10})
+
+    @pytest.mark.parametrize("kind", ["constant", "uniform", "normal", "lognormal", "exponential"])
+    def test_latency_samples_non_negative(self, kind):
+        """Test every distribution yields clipped values."""
+        import random
+
+        dist = LatencyDistribution(kind=kind, mean=0.2, spread=0.5, max_seconds=1.0)
+        rng = random.Random(0)
+        samples = [dist.sample(rng) for _ in range(200)]
+
+        assert all(0.0 <= s <= 1.0 for s in samples)
+
+
+class TestEndpoints:
+    """Test provider response shapes."""
+
+    @pytest.mark.asyncio
+    async def test_openai_completion(self):
+        """Test OpenAI-compatible non-streaming response."""
+        async with client_for(instant()) as client:
+            response = await client.post("/v1/chat/completions", json=OPENAI_REQUEST)
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["choices"][0]["message"]["content"]
+        assert data["usage"]["completion_tokens"] == 12
+        assert data["choices"][0]["finish_reason"] == "length"
+
+    @pytest.mark.asyncio
+    async def test_openai_streaming(self):
+        """Test SSE chunks end with [DONE] and reassemble to the full text."""
+        async with client_for(instant(stream_chunk_tokens=5)) as client:
+            response = await client.post("/v1/chat/completions", json={**OPENAI_REQUEST, "stream": True})
+
+        events = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(e) for e in events[:-1]]
+        text = "".join(c["choices"][0]["delta"].get("content", "") for c in chunks)
+        assert len(text.split()) == 12
+        assert chunks[-1]["usage"]["completion_tokens"] == 12
+
+    @pytest.mark.asyncio
+    async def test_dashscope_shape(self):
+        """Test DashScope output/usage fields."""
+        payload = {
+            "model": "qwen-max",
+            "input": {"messages": [{"role": "user", "content": "Hi"}]},
+            "parameters": {"max_tokens": 8},
+        }
+        async with client_for(instant()) as client:
+            response = await client.post("/api/v1/services/aigc/text-generation/generation", json=payload)
+            streamed = await client.post(
+                "/api/v1/services/aigc/text-generation/generation",
+                json=payload,
+                headers={"X-DashScope-SSE": "enable"}
+            )
+
+        data = response.json()
+        assert data["output"]["text"]
+        assert data["usage"]["output_tokens"] == 8
+        assert "code" not in data
+
+        events = [json.loads(line[5:]) for line in streamed.text.splitlines() if line.startswith("data:")]
+        assert events[-1]["output"]["finish_reason"] == "stop"
+        assert events[-1]["output"]["text"] == data["output"]["text"]
+
+    @pytest.mark.asyncio
+    async def test_ollama_native_streams_by_default(self):
+        """Test /api/chat streams NDJSON with a final done message."""
+        payload = {"model": "llama3.2:3b", "messages": [{"role": "user", "content": "Hi"}], "options": {"num_predict": 6}}
+        async with client_for(instant()) as client:
+            response = await client.post("/api/chat", json=payload)
+            generated = await client.post("/api/generate", json={"model": "llama3.2:3b", "prompt": "Hi", "stream": False})
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[-1]["done"] is True
+        assert lines[-1]["eval_count"] == 6
+        assert all(not line["done"] for line in lines[:-1])
+        assert generated.json()["response"]
+
+    @pytest.mark.asyncio
+    async def test_error_rate(self):
+        """Test injected server errors use the provider error shape."""
+        async with client_for(instant(error_rate=1.0)) as client:
+            response = await client.post("/v1/chat/completions", json=OPENAI_REQUEST)
+
+        assert response.status_code == 500
+        assert response.json()["error"]["type"] == "server_error"
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_returns_429(self):
+        """Test token bucket answers 429 with Retry-After."""
+        async with client_for(instant(requests_per_second=0.001, burst=2, retry_after=3)) as client:
+            statuses = [
+                (await client.post("/v1/chat/completions", json=OPENAI_REQUEST)).status_code
+                for _ in range(4)
+            ]
+            limited = await client.post("/v1/chat/completions", json=OPENAI_REQUEST)
+            stats = (await client.get("/mock/stats")).json()
+
+        assert statuses == [200, 200, 429, 429]
+        assert limited.headers["Retry-After"] == "3"
+        assert stats["rate_limited"] == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap(self):
+        """Test requests beyond max_concurrency are rejected."""
+        config = MockProviderConfig(
+            default=ProviderProfile(
+                latency=LatencyDistribution(mean=0.05),
+                tokens_per_second=0,
+                max_concurrency=2
+            )
+        )
+        async with client_for(config) as client:
+            responses = await asyncio.gather(*[
+                client.post("/v1/chat/completions", json=OPENAI_REQUEST) for _ in range(4)
+            ])
+            stats = (await client.get("/mock/stats")).json()
+
+        assert sorted(r.status_code for r in responses) == [200, 200, 429, 429]
+        assert stats["max_in_flight"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_dropped_before_body_frees_slot(self):
+        """Test a stream whose body never starts (client gone) doesn't hold a concurrency slot."""
+        from starlette.requests import Request
+
+        app = create_mock_provider_app(instant(max_concurrency=1))
+        endpoint = next(r.endpoint for r in app.routes if getattr(r, "path", None) == "/v1/chat/completions")
+        body = json.dumps({**OPENAI_REQUEST, "stream": True}).encode()
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        request = Request({"type": "http", "method": "POST", "path": "/v1/chat/completions", "headers": []}, receive)
+        dropped = await endpoint(request)
+        del dropped
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mock") as client:
+            response = await client.post("/v1/chat/completions", json=OPENAI_REQUEST)
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_latency_and_token_rate(self):
+        """Test generation time follows latency plus tokens / rate."""
+        config = MockProviderConfig(
+            default=ProviderProfile(latency=LatencyDistribution(mean=0.05), tokens_per_second=200)
+        )
+        async with client_for(config) as client:
+            start = time.perf_counter()
+            await client.post("/v1/chat/completions", json={**OPENAI_REQUEST, "max_tokens": 20})
+            elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.05 + 20 / 200
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Mock provider running on a local port."""
+    with MockProviderServer(instant(max_output_tokens=16)) as server:
+        yield server
+
+
+class TestAgentsAgainstServer:
+    """Test real agents against a running mock server."""
+
+    def config(self, server, path: str, model: str) -> AgentConfig:
+        return AgentConfig(name=model, model=model, api_key="offline", base_url=server.url(path), timeout=10)
+
+    @pytest.mark.asyncio
+    async def test_qwen(self, server):
+        """Test QwenAgent parses the DashScope response."""
+        agent = QwenAgent(self.config(server, "/api/v1/services/aigc/text-generation/generation", "qwen-max"))
+        result = await agent.generate("Hello", max_tokens=10)
+
+        assert result["output"]
+        assert result["tokens_output"] == 10
+        assert result["metadata"]["request_id"]
+
+    @pytest.mark.asyncio
+    async def test_openai_compatible(self, server):
+        """Test DeepSeek and Doubao agents parse chat completions."""
+        deepseek = DeepSeekAgent(self.config(server, "/v1/chat/completions", "deepseek-chat"))
+        doubao = DoubaoAgent(self.config(server, "/api/v3/chat/completions", "doubao-pro"))
+
+        results = await asyncio.gather(deepseek.generate("Hello"), doubao.generate("Hello"))
+
+        assert all(r["output"] for r in results)
+        assert results[0]["model_version"] == "deepseek-chat"
+
+    @pytest.mark.asyncio
+    async def test_ollama(self, server):
+        """Test OllamaAgent streams from the native chat API."""
+        agent = OllamaAgent("llama3.2:3b", endpoint=server.url())
+        result = await agent.generate("Hello", max_tokens=5)
+        assert result["output"]
+        assert result["tokens_output"] == 5
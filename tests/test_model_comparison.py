@@ -1,7 +1,14 @@
 """Tests for model comparison tool."""
 
+import asyncio
+import threading
+import time
+
 import pytest
 
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.storage.database import Database
 from factory.tools import ModelComparisonTool, ComparisonResult
 
 
@@ -244,3 +251,156 @@ class TestComparisonHistory:
         result = tool.comparison_history[0]
         assert result.prompt == "First prompt"
         assert result.models_compared == ["model-a", "model-b"]
+
+
+class TestProseDiffs:
+    """Test word-level diffs and similarity in comparison results."""
+
+    @pytest.mark.asyncio
+    async def test_word_level_diffs_and_similarity(self):
+        """Test results carry lazy word diffs and a similarity matrix."""
+        tool = ModelComparisonTool()
+
+        result = await tool.compare_models("Same prompt", ["claude-sonnet-4.5", "gpt-4o", "model-x"])
+        lines = result.diffs[("claude-sonnet-4.5", "gpt-4o")]
+
+        assert "-Claude's" in lines
+        assert "+GPT's" in lines
+        assert result.similarity.shape == (3, 3)
+        assert result.similarity_between("gpt-4o", "gpt-4o") == 1.0
+        assert 0 <= result.similarity_between("claude-sonnet-4.5", "model-x") < 1
+        assert tool.render_comparison(result) is not None
+        assert result.demo
+
+
+class SlowAgent(BaseAgent):
+    """Agent answering after a delay (or failing)."""
+
+    def __init__(self, name, delay, fail=False):
+        super().__init__(AgentConfig(name=name, model=name))
+        self.delay = delay
+        self.fail = fail
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return {"output": f"{self.config.name} wrote: {prompt}", "tokens_input": 10, "tokens_output": 20, "cost": 0.01}
+
+
+@pytest.fixture
+def pool():
+    pool = AgentPool()
+    pool.register_agent("fast", SlowAgent("fast", 0.01))
+    pool.register_agent("medium", SlowAgent("medium", 0.2))
+    pool.register_agent("slow", SlowAgent("slow", 0.2))
+    pool.register_agent("broken", SlowAgent("broken", 0.0, fail=True))
+    pool.register_agent("stuck", SlowAgent("stuck", 10))
+    return pool
+
+
+class TestPoolGeneration:
+    """Test comparisons running real agents through the pool."""
+
+    @pytest.mark.asyncio
+    async def test_models_run_in_parallel(self, pool):
+        """Test wall time tracks the slowest model and progress arrives per model."""
+        tool = ModelComparisonTool(agent_pool=pool)
+        finished = []
+
+        started = time.perf_counter()
+        result = await tool.compare_models(
+            "Open on a storm", ["slow", "fast", "medium"], context="Noir", on_progress=finished.append
+        )
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.35  # not 0.41 (the sum)
+        assert result.models_compared == ["slow", "fast", "medium"]
+        assert [o.model_name for o in finished][0] == "fast"
+        assert result.outputs[0].text == "slow wrote: Noir\n\nOpen on a storm"
+        assert result.total_cost == pytest.approx(0.03)
+        assert result.duration_ms >= 200
+        assert not result.demo
+
+    @pytest.mark.asyncio
+    async def test_partial_results(self, pool):
+        """Test failed, timed-out and unknown models are reported without sinking the comparison."""
+        tool = ModelComparisonTool(agent_pool=pool, timeout=0.3)
+
+        result = await tool.compare_models("Prompt", ["fast", "broken", "stuck", "missing"])
+
+        assert result.failed_models == ["broken", "stuck", "missing"]
+        assert "provider down" in result.outputs[1].error
+        assert "Timed out" in result.outputs[2].error
+        assert "not available" in result.outputs[3].error
+        assert len(result.diffs) == 0  # only one successful output
+
+    @pytest.mark.asyncio
+    async def test_similarity_excludes_failures(self, pool):
+        """Test failed models have no similarity instead of matching each other's empty text."""
+        tool = ModelComparisonTool(agent_pool=pool)
+
+        result = await tool.compare_models("Prompt", ["fast", "broken", "medium", "missing"])
+
+        assert result.similarity_between("broken", "missing") is None
+        assert result.similarity_between("fast", "broken") is None
+        assert result.similarity_between("missing", "missing") is None
+        assert result.similarity_between("fast", "fast") == 1.0
+        assert 0 <= result.similarity_between("fast", "medium") < 1
+        assert tool.render_comparison(result) is not None
+
+    @pytest.mark.asyncio
+    async def test_comparison_job_reports_demo_and_failures(self, pool, monkeypatch):
+        """Test the webapp job result flags demo outputs and nulls failed similarities."""
+        from webapp.backend import app as webapp
+
+        monkeypatch.setattr(webapp, "model_comparison", ModelComparisonTool(agent_pool=pool))
+        real = await webapp.run_comparison({"prompt": "P", "models": ["fast", "broken"]}, lambda *a: None)
+        monkeypatch.setattr(webapp, "model_comparison", ModelComparisonTool(agent_pool=AgentPool()))
+        demo = await webapp.run_comparison({"prompt": "P", "models": ["a", "b"]}, lambda *a: None)
+
+        assert not real["metadata"]["demo"]
+        assert real["metadata"]["similarity"] == [[1.0, None], [None, None]]
+        assert demo["metadata"]["demo"]
+
+    @pytest.mark.asyncio
+    async def test_recorded_in_database(self, pool, tmp_path):
+        """Test timing, cost and the winner are stored in the analytics database."""
+        database = Database(str(tmp_path / "analytics.db"))
+        tool = ModelComparisonTool(agent_pool=pool, database=database)
+
+        result = await tool.compare_models("Prompt", ["fast", "medium"])
+        await tool.save_preference(result, "medium", "Tighter")
+
+        session = database.get_session(result.comparison_id)
+        rows = database.get_session_results(result.comparison_id)
+        win_rates = {r["agent_name"]: r["wins"] for r in database.get_agent_win_rates()}
+        database.close()
+
+        assert session["workflow_name"] == "model_comparison"
+        assert session["completed_at"] is not None
+        assert sorted(r["agent_name"] for r in rows) == ["fast", "medium"]
+        assert sum(r["cost"] for r in rows) == pytest.approx(0.02)
+        assert win_rates["medium"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recorded_off_event_loop(self, pool, tmp_path):
+        """Test analytics writes run in a worker thread, not on the event loop."""
+        database = Database(str(tmp_path / "analytics.db"))
+        tool = ModelComparisonTool(agent_pool=pool, database=database)
+        threads = []
+        for name in ("insert_session", "insert_winner"):
+            write = getattr(database, name)
+
+            def recording(*args, write=write, **kwargs):
+                threads.append(threading.get_ident())
+                return write(*args, **kwargs)
+
+            setattr(database, name, recording)
+
+        result = await tool.compare_models("Prompt", ["fast", "medium"])
+        await tool.save_preference(result, "medium")
+        database.close()
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
@@ -0,0 +1,151 @@
+"""Tests for the async Ollama agent."""
+
+import json
+import httpx
+import pytest
+
+from factory.agents.base_agent import AgentConfig
+from factory.agents.ollama_agent import OllamaAgent, _shared_client, close_shared_clients
+from factory.core.agent_pool import AgentPool
+from factory.tools.mock_provider import MockProviderConfig, MockProviderServer, ProviderProfile
+
+
+def ndjson_transport(requests_seen: list, chunks=("Once ", "upon ", "a time")) -> httpx.MockTransport:
+    """Transport answering /api/chat with a short NDJSON stream."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(json.loads(request.content))
+        if request.url.path == "/api/generate":
+            return httpx.Response(200, json={"done": True})
+        lines = [{"message": {"role": "assistant", "content": c}, "done": False} for c in chunks]
+        lines.append({
+            "model": "llama3.2:3b", "message": {"role": "assistant", "content": ""},
+            "done": True, "done_reason": "stop", "prompt_eval_count": 7, "eval_count": 3,
+            "eval_duration": 300_000_000, "load_duration": 2_000_000,
+        })
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines) + "\n")
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Mock provider streaming Ollama responses with a small first-token delay."""
+    profile = ProviderProfile(max_output_tokens=8)
+    with MockProviderServer(MockProviderConfig(default=profile, time_scale=0.05, seed=3)) as server:
+        yield server
+
+
+class TestOllamaAgent:
+    """Test request building and response parsing."""
+
+    @pytest.mark.asyncio
+    async def test_generate_parses_stream(self):
+        """Test chunks are joined and Ollama's counts and timings are used."""
+        seen = []
+        client = httpx.AsyncClient(transport=ndjson_transport(seen))
+        agent = OllamaAgent("llama3.2:3b", client=client)
+        tokens = []
+
+        result = await agent.generate("Tell me a story", max_tokens=50, on_token=tokens.append, top_p=0.9)
+
+        assert result["output"] == "Once upon a time"
+        assert tokens == ["Once ", "upon ", "a time"]
+        assert result["tokens_input"] == 7
+        assert result["tokens_output"] == 3
+        assert result["cost"] == 0.0
+        assert result["metadata"]["tokens_per_sec"] == pytest.approx(10)
+        assert result["metadata"]["load_ms"] == pytest.approx(2)
+        assert result["metadata"]["ttft_ms"] >= 0
+
+        payload = seen[0]
+        assert payload["stream"] is True
+        assert payload["keep_alive"] == "30m"
+        assert payload["options"] == {"temperature": 0.7, "num_predict": 50, "top_p": 0.9}
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_keep_alive_settings(self):
+        """Test keep_alive from config, per call, and preload/unload."""
+        seen = []
+        client = httpx.AsyncClient(transport=ndjson_transport(seen))
+        config = AgentConfig(name="local", model="mistral:7b", metadata={"keep_alive": -1})
+        agent = OllamaAgent(config, client=client)
+
+        await agent.generate("a")
+        await agent.generate("b", keep_alive="5m")
+        await agent.preload()
+        await agent.unload()
+
+        assert [p["keep_alive"] for p in seen] == [-1, "5m", -1, 0]
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream(self):
+        """Test the async iterator yields chunks."""
+        client = httpx.AsyncClient(transport=ndjson_transport([]))
+        agent = OllamaAgent("llama3.2:3b", client=client)
+
+        chunks = [c async for c in agent.stream("story")]
+
+        assert chunks == ["Once ", "upon ", "a time"]
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_errors(self):
+        """Test HTTP and connection errors become RuntimeErrors."""
+        failing = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(404, json={"error": "model not found"})
+        ))
+        with pytest.raises(RuntimeError, match="404"):
+            await OllamaAgent("missing", client=failing).generate("x")
+        await failing.aclose()
+
+        with pytest.raises(RuntimeError, match="not running"):
+            await OllamaAgent("x", endpoint="http://127.0.0.1:9").generate("x")
+        await close_shared_clients()
+
+    def test_from_agent_config(self):
+        """Test construction from an agents.yaml entry."""
+        agent = OllamaAgent.from_agent_config("ollama-mistral", {
+            "provider": "ollama", "model": "mistral:7b",
+            "context_window": 32768, "endpoint": "http://gpu-box:11434/",
+        })
+        assert agent.name == "ollama-mistral"
+        assert agent.model_name == "mistral:7b"
+        assert agent.endpoint == "http://gpu-box:11434"
+        assert agent.config.context_window == 32768
+
+
+class TestPooling:
+    """Test the shared client and pool integration."""
+
+    @pytest.mark.asyncio
+    async def test_shared_client_per_endpoint(self):
+        """Test agents on one endpoint share a client."""
+        a = OllamaAgent("a", endpoint="http://host-a:11434")
+        b = OllamaAgent("b", endpoint="http://host-a:11434")
+        c = OllamaAgent("c", endpoint="http://host-b:11434")
+
+        assert a.client is b.client
+        assert a.client is not c.client
+        assert a.client is _shared_client("http://host-a:11434", 120)
+
+        first = a.client
+        await close_shared_clients()
+        assert first.is_closed
+        assert not a.client.is_closed
+        await close_shared_clients()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_in_agent_pool(self, server):
+        """Test concurrent pool requests don't block each other and report TTFT."""
+        pool = AgentPool()
+        for i in range(4):
+            pool.register_agent(f"local-{i}", OllamaAgent("llama3.2:3b", endpoint=server.url()))
+
+        result = await pool.execute_parallel("Write a scene", max_tokens=8)
+
+        assert len(result.successful_responses) == 4
+        stats = pool.get_stats("local-0")
+        assert stats["ttft_ms"]["count"] == 1
+        assert stats["ttft_ms"]["max"] <= stats["latency_ms"]["max"]
+        await close_shared_clients()
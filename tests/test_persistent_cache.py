@@ -0,0 +1,204 @@
+"""Tests for the persistent knowledge query cache."""
+
+import time
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from factory.knowledge.cache import QueryCache
+from factory.knowledge.persistent_cache import PersistentCacheStore, hash_documents
+from factory.knowledge.router import KnowledgeRouter, KnowledgeSource, QueryResult
+
+
+SETTINGS = {"enabled": True, "ttl": 3600, "max_entries": 100}
+
+
+@pytest.fixture
+def project():
+    """Project directory with a story bible."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir)
+        (path / "story_bible.md").write_text("Sarah is a sailor.", encoding="utf-8")
+        yield path
+
+
+class TestPersistentCacheStore:
+    """Test the SQLite store."""
+
+    def test_round_trip(self, project):
+        """Test entries written behind are loaded by a new store."""
+        store = PersistentCacheStore.for_project(project, flush_interval=0)
+        store.put("k1", {"answer": 1}, documents=["a.md"])
+        store.close()
+
+        assert (project / ".factory" / "knowledge" / "query_cache.db").exists()
+
+        reopened = PersistentCacheStore.for_project(project)
+        loaded = reopened.load(limit=10)
+        reopened.close()
+
+        assert loaded[0][0] == "k1"
+        assert loaded[0][1] == {"answer": 1}
+        assert loaded[0][3] == ("a.md",)
+
+    def test_ttl_purges_on_load(self, project):
+        """Test expired entries are not loaded."""
+        store = PersistentCacheStore.for_project(project, ttl=1, flush_interval=0)
+        store._queue.put(("put", "old", {}, (), time.time() - 10))
+        store.put("new", {})
+        store.flush()
+
+        keys = [entry[0] for entry in store.load(limit=10)]
+        store.close()
+
+        assert keys == ["new"]
+
+    def test_entry_cap(self, project):
+        """Test oldest entries are evicted over the entry cap."""
+        store = PersistentCacheStore.for_project(project, max_entries=3, flush_interval=0)
+        for i in range(5):
+            store.put(f"k{i}", i)
+
+        assert store.count() == 3
+        keys = {entry[0] for entry in store.load(limit=10)}
+        store.close()
+        assert keys == {"k2", "k3", "k4"}
+
+    def test_byte_cap(self, project):
+        """Test entries are evicted over the byte cap."""
+        store = PersistentCacheStore.for_project(project, max_bytes=250, flush_interval=0)
+        for i in range(5):
+            store.put(f"k{i}", "x" * 100)
+
+        assert store.count() == 2
+        store.close()
+
+    def test_sync_documents_invalidates_changed(self, project):
+        """Test entries are dropped when a referenced document changes."""
+        store = PersistentCacheStore.for_project(project, flush_interval=0)
+        store.sync_documents({"a.md": "h1", "b.md": "h1"})
+        store.put("uses_a", 1, documents=["a.md"])
+        store.put("uses_b", 2, documents=["b.md"])
+        store.flush()
+
+        changed = store.sync_documents({"a.md": "h2", "b.md": "h1"})
+        keys = [entry[0] for entry in store.load(limit=10)]
+        store.close()
+
+        assert changed == ["a.md"]
+        assert keys == ["uses_b"]
+
+    def test_hash_documents_skips_hidden(self, project):
+        """Test document hashing ignores the cache directory."""
+        (project / ".factory").mkdir()
+        (project / ".factory" / "notes.md").write_text("internal")
+
+        assert list(hash_documents(project)) == ["story_bible.md"]
+
+
+class TestQueryCacheTier:
+    """Test QueryCache with a persistent store."""
+
+    def test_warm_from_store(self, project):
+        """Test a new cache is warmed from disk."""
+        cache = QueryCache(store=PersistentCacheStore.for_project(project, flush_interval=0))
+        cache.set("query", {"answer": 1}, {"max_results": 5})
+        cache.close()
+
+        warmed = QueryCache(store=PersistentCacheStore.for_project(project))
+        assert warmed.get("query", {"max_results": 5}) == {"answer": 1}
+        assert warmed.get_stats()["persistent"] is True
+        warmed.close()
+
+    def test_warm_uses_store_ttl(self, project):
+        """Test entries older than the memory TTL but within the store TTL are warmed."""
+        store = PersistentCacheStore.for_project(project, ttl=7 * 24 * 3600, flush_interval=0)
+        store._queue.put(("put", "old", {"answer": 1}, (), time.time() - 2 * 3600))
+        store.flush()
+        store.close()
+
+        warmed = QueryCache(ttl=3600, store=PersistentCacheStore.for_project(project))
+
+        assert warmed._cache["old"] == {"answer": 1}
+        assert time.time() - warmed._access_times["old"] < 60
+        warmed.close()
+
+    def test_invalidate_documents(self):
+        """Test memory entries are evicted by document ID."""
+        cache = QueryCache()
+        cache.set("q1", 1, documents=["a.md"])
+        cache.set("q2", 2, documents=["b.md"])
+
+        assert cache.invalidate_documents(["a.md"]) == 1
+        assert cache.get("q1") is None
+        assert cache.get("q2") == 2
+
+    def test_overwrite_at_capacity_keeps_other_entries(self):
+        """Test replacing an existing key does not evict another entry."""
+        cache = QueryCache(max_size=2)
+        cache.set("q1", 1)
+        cache.set("q2", 2)
+        cache.set("q2", 3)
+
+        assert cache.get("q1") == 1
+        assert cache.get("q2") == 3
+
+
+class TestRouterPersistence:
+    """Test router integration."""
+
+    def test_query_result_round_trip(self):
+        """Test QueryResult serialization."""
+        result = QueryResult(
+            source=KnowledgeSource.COGNEE,
+            answer="Sarah",
+            confidence=0.9,
+            references=["story_bible.md"],
+            metadata={"k": "v"}
+        )
+        assert QueryResult.from_dict(result.to_dict()) == result
+
+    @pytest.mark.asyncio
+    async def test_results_survive_restart(self, project):
+        """Test cached results are reused by a new router."""
+        router = KnowledgeRouter(project_path=project, persistent_cache=SETTINGS)
+        first = await router.query("Who is Sarah?")
+        router.close()
+
+        restarted = KnowledgeRouter(project_path=project, persistent_cache=SETTINGS)
+        assert restarted.is_cached("Who is Sarah?")
+        second = await restarted.query("Who is Sarah?")
+        restarted.close()
+
+        assert second == first
+        assert restarted.cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_document_invalidates_on_restart(self, project):
+        """Test editing a referenced document drops its cached results."""
+        router = KnowledgeRouter(project_path=project, persistent_cache=SETTINGS)
+        await router.query("Who is Sarah?")
+        router.close()
+
+        (project / "story_bible.md").write_text("Sarah is a pilot.", encoding="utf-8")
+
+        restarted = KnowledgeRouter(project_path=project, persistent_cache=SETTINGS)
+        assert not restarted.is_cached("Who is Sarah?")
+        restarted.close()
+
+    @pytest.mark.asyncio
+    async def test_sync_documents_while_running(self, project):
+        """Test sync_documents invalidates memory entries in a live router."""
+        router = KnowledgeRouter(project_path=project, persistent_cache=SETTINGS)
+        await router.query("Who is Sarah?")
+
+        (project / "story_bible.md").write_text("Sarah is a pilot.", encoding="utf-8")
+
+        assert router.sync_documents() == ["story_bible.md"]
+        assert not router.is_cached("Who is Sarah?")
+        router.close()
+
+    def test_memory_only_without_project(self):
+        """Test persistence requires a project path."""
+        router = KnowledgeRouter(persistent_cache=SETTINGS)
+        assert router.cache.store is None
@@ -0,0 +1,169 @@
+"""Tests for context-window-aware prompt packing."""
+
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.prompt_builder import PromptBuilder, TokenBudget
+from factory.core.tokenizers import HeuristicTokenizer
+from factory.core.workflow_engine import WorkflowStatus
+from factory.workflows.scene_operations import SceneEnhancementWorkflow, SceneGenerationWorkflow
+
+# One token per 4 characters, so sizes are easy to reason about
+TOKENIZER = HeuristicTokenizer("test", chars_per_token=4.0)
+
+
+class RecordingAgent(BaseAgent):
+    """Agent that records the prompts it receives."""
+
+    def __init__(self, name: str, context_window: int, model: str = "gpt-4"):
+        super().__init__(AgentConfig(name=name, model=model, context_window=context_window, max_output=100))
+        self.prompts = []
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        self.prompts.append(prompt)
+        return {"output": f"scene by {self.name}", "tokens_input": 1, "tokens_output": 1}
+
+
+def words(n: int, word: str = "word") -> str:
+    """n words of 4 characters plus a space (5 chars each)."""
+    return " ".join([word] * n)
+
+
+class TestPacking:
+    """Test budget packing."""
+
+    def test_fits_unchanged(self):
+        """Test prompts within budget are just joined."""
+        builder = PromptBuilder().add("a", "first").add("b", "second")
+
+        packed = builder.pack(100, TOKENIZER)
+
+        assert packed.text == "first\n\nsecond"
+        assert packed.fits
+        assert packed.truncated == packed.dropped == []
+
+    def test_lowest_priority_truncated_first(self):
+        """Test overflow is taken from the lowest-priority section."""
+        builder = PromptBuilder()
+        builder.add("task", "Write it.", required=True)
+        builder.add("outline", words(40), priority=90)
+        builder.add("excerpt", words(40, "past"), priority=10, keep="end")
+
+        packed = builder.pack(80, TOKENIZER)
+
+        assert packed.fits
+        assert packed.truncated == ["excerpt"]
+        assert words(40) in packed.text
+        assert packed.text.endswith("past")  # kept the ending
+        assert packed.tokens > 70  # the budget is used, not just the essentials
+
+    def test_drop_below_min_tokens(self):
+        """Test sections that would shrink below min_tokens are dropped whole."""
+        builder = PromptBuilder()
+        builder.add("outline", words(40), priority=90)
+        builder.add("excerpt", words(40, "past"), priority=10, min_tokens=30)
+        builder.add("voice", words(10, "tone"), priority=50)
+
+        packed = builder.pack(70, TOKENIZER)
+
+        assert packed.dropped == ["excerpt"]
+        assert "past" not in packed.text
+        assert "tone" in packed.text
+
+    def test_required_overflow_reported(self):
+        """Test required sections are never cut, even over budget."""
+        builder = PromptBuilder().add("scene", words(100), required=True).add("extra", words(10), priority=1)
+
+        packed = builder.pack(50, TOKENIZER)
+
+        assert not packed.fits
+        assert packed.dropped == ["extra"]
+        assert packed.text == words(100)
+
+    def test_invalid_keep(self):
+        """Test keep must name an end."""
+        with pytest.raises(ValueError):
+            PromptBuilder().add("a", "text", keep="middle")
+
+    def test_fan_out_packs_once_per_budget(self):
+        """Test agents with the same tokenizer and budget share a pack."""
+        builder = PromptBuilder().add("outline", words(500), priority=90)
+        agents = {
+            "a": RecordingAgent("a", context_window=300),
+            "b": RecordingAgent("b", context_window=300),
+            "long": RecordingAgent("long", context_window=200000),
+        }
+
+        packs = builder.pack_for_agents(agents)
+
+        assert packs["a"] is packs["b"]
+        assert packs["a"].truncated == ["outline"]
+        assert packs["long"].truncated == []
+        budget = TokenBudget.create(300, 100)
+        assert packs["a"].budget == budget.input_tokens == 300 - 100 - 32
+
+
+class TestSceneWorkflows:
+    """Test prompt packing in the scene workflows."""
+
+    @pytest.mark.asyncio
+    async def test_generation_fans_out_with_per_agent_budgets(self):
+        """Test each agent gets a prompt sized to its context window."""
+        small = RecordingAgent("small", context_window=700)
+        large = RecordingAgent("large", context_window=200000)
+        pool = AgentPool()
+        pool.register_agent("small", small)
+        pool.register_agent("large", large)
+        previous = [words(300, "old"), words(300, "recent")]
+
+        result = await SceneGenerationWorkflow(agent_pool=pool).run(
+            outline="POV: Sarah\nScene: Sarah meets her ex.",
+            use_knowledge_context=False,
+            previous_scenes=previous,
+            voice_guide="Short sentences. Dry humor.",
+            agents=["small", "large"],
+        )
+
+        assert result.status == WorkflowStatus.COMPLETED
+        assert result.outputs["scene"] == "scene by small"
+        assert set(result.outputs["drafts"]) == {"small", "large"}
+
+        small_prompt, large_prompt = small.prompts[0], large.prompts[0]
+        assert "Sarah meets her ex." in small_prompt
+        assert "Dry humor." in small_prompt
+        assert "recent" in small_prompt and "old" not in small_prompt
+        assert large_prompt.count("old") == 300
+        assert large_prompt.index("old") < large_prompt.index("recent") < large_prompt.index("Generate the complete")
+
+        prompt = result.metadata["prompt"]
+        assert prompt["small"]["dropped"] == ["previous_scene_2"]
+        assert prompt["small"]["tokens"] <= prompt["small"]["budget"]
+        assert prompt["large"]["dropped"] == []
+
+    @pytest.mark.asyncio
+    async def test_enhancement_keeps_scene(self):
+        """Test the scene survives packing while excerpts give way."""
+        agent = RecordingAgent("small", context_window=600)
+        pool = AgentPool()
+        pool.register_agent("small", agent)
+        scene = words(200, "text")
+
+        result = await SceneEnhancementWorkflow(agent_pool=pool).run(
+            scene=scene, model_name="small", previous_scenes=[words(400, "past")]
+        )
+
+        assert result.outputs["enhanced_scene"] == "scene by small"
+        assert scene in agent.prompts[0]
+        assert result.metadata["prompt"]["small"]["truncated"] == ["previous_scene_1"]
+
+    @pytest.mark.asyncio
+    async def test_placeholder_uses_configured_window(self):
+        """Test the no-pool path packs against agents.yaml."""
+        result = await SceneGenerationWorkflow().run(
+            outline="A tense meeting", model_name="claude-sonnet-4.5", use_knowledge_context=False
+        )
+
+        prompt = result.metadata["prompt"]["claude-sonnet-4.5"]
+        assert prompt["tokenizer"] == "claude"
+        assert prompt["budget"] > 190000
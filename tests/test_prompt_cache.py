@@ -0,0 +1,318 @@
+"""Tests for prompt-prefix caching support."""
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import httpx
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.agents.chinese import deepseek, doubao
+from factory.agents.chinese.deepseek import DeepSeekAgent
+from factory.agents.chinese.doubao import DoubaoAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.prompt_builder import PromptBuilder
+from factory.core.prompt_cache import PrefixRegistry, cached_tokens_from_usage, get_prefix_registry
+from factory.core.storage.cost_tracker import CostTracker
+from factory.core.tokenizers import HeuristicTokenizer
+
+BIBLE = "Story bible: Sarah is a barista in Portland. " * 20
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PlainAgent(BaseAgent):
+    """Agent whose provider doesn't report cached tokens."""
+
+    def __init__(self, cached_price=None, reported=None):
+        super().__init__(AgentConfig(
+            name="plain", model="gpt-4", cost_per_1k_input=0.01, cost_per_1k_cached_input=cached_price
+        ))
+        self.reported = reported
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        metadata = {} if self.reported is None else {"cached_tokens": self.reported}
+        tokens = self.count_tokens(prompt)
+        return {"output": "ok", "tokens_input": tokens, "tokens_output": 1,
+                "cost": self.calculate_cost(tokens, 1, self.reported or 0), "metadata": metadata}
+
+
+def patch_transport(monkeypatch, module, handler):
+    """Route the module's httpx clients through a mock transport."""
+    real = httpx.AsyncClient
+    monkeypatch.setattr(
+        module.httpx, "AsyncClient",
+        lambda **kwargs: real(transport=httpx.MockTransport(handler), **kwargs)
+    )
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    get_prefix_registry().clear()
+    yield
+    get_prefix_registry().clear()
+
+
+class TestUsageParsing:
+    """Test provider usage formats."""
+
+    @pytest.mark.parametrize("usage", [
+        {"prompt_cache_hit_tokens": 120, "prompt_cache_miss_tokens": 30},
+        {"prompt_tokens_details": {"cached_tokens": 120}},
+        {"cached_tokens": 120},
+        {"cache_read_input_tokens": 120},
+    ])
+    def test_formats(self, usage):
+        """Test DeepSeek, OpenAI-compatible, Kimi and Anthropic usage blocks."""
+        assert cached_tokens_from_usage(usage) == 120
+
+    def test_not_reported(self):
+        """Test missing fields mean no cache hits."""
+        assert cached_tokens_from_usage({}) == 0
+        assert cached_tokens_from_usage({"prompt_tokens_details": None}) == 0
+
+
+class TestPrefixRegistry:
+    """Test prefix matching, warmth and cache handles."""
+
+    def test_longest_match_and_split(self):
+        """Test the longest registered prefix wins."""
+        registry = PrefixRegistry()
+        short = registry.register("Voice guide.", name="voice")
+        long = registry.register("Voice guide. Story bible.", name="bible")
+
+        prefix, rest = registry.split("Voice guide. Story bible. Write scene 3.")
+
+        assert prefix is long
+        assert rest == " Write scene 3."
+        assert registry.match("Voice guide. Other.") is short
+        assert registry.match("Unrelated") is None
+        assert registry.register("Voice guide.") is short  # idempotent
+
+    def test_warmth_expires(self):
+        """Test a prefix counts as cached only within the TTL."""
+        clock = FakeClock()
+        registry = PrefixRegistry(ttl_seconds=60, clock=clock)
+        prefix = registry.register(BIBLE)
+
+        assert not registry.is_warm("a", prefix)
+        registry.mark_sent("a", prefix)
+        assert registry.is_warm("a", prefix)
+        assert not registry.is_warm("b", prefix)
+        clock.now = 61
+        assert not registry.is_warm("a", prefix)
+
+    def test_handles_expire_and_eviction(self):
+        """Test provider cache IDs expire and evicted prefixes lose them."""
+        clock = FakeClock()
+        registry = PrefixRegistry(max_prefixes=1, clock=clock)
+        prefix = registry.register("one")
+        registry.set_handle("a", prefix, "ctx-1", ttl_seconds=10)
+
+        assert registry.get_handle("a", prefix) == "ctx-1"
+        clock.now = 10
+        assert registry.get_handle("a", prefix) is None
+
+        registry.set_handle("a", prefix, "ctx-2", ttl_seconds=10)
+        clock.now = 11
+        registry.register("two")  # evicts "one"
+        assert registry.match("one and more") is None
+        assert registry.get_handle("a", prefix) is None
+
+
+class TestPoolReporting:
+    """Test AgentPool cache reporting."""
+
+    @pytest.mark.asyncio
+    async def test_client_side_estimate(self):
+        """Test repeated prefixes are reported as cached for non-reporting providers."""
+        registry = PrefixRegistry()
+        registry.register(BIBLE, name="bible")
+        agent = PlainAgent(cached_price=0.001)
+        pool = AgentPool(prefix_registry=registry)
+        pool.register_agent("plain", agent)
+
+        first = await pool.execute_single("plain", BIBLE + "Scene 1")
+        second = await pool.execute_single("plain", BIBLE + "Scene 2")
+
+        assert "prompt_cache" not in first.metadata
+        cache = second.metadata["prompt_cache"]
+        assert cache["source"] == "client"
+        assert cache["prefix"] == "bible"
+        assert cache["cached_tokens"] == agent.count_tokens(BIBLE)
+        assert cache["saved_usd"] == pytest.approx(cache["cached_tokens"] * 0.009 / 1000)
+
+        # Estimates are kept apart from provider-reported hits
+        stats = pool.get_stats("plain")
+        assert stats["estimated_cached_tokens"] == cache["cached_tokens"]
+        assert stats["cached_tokens"] == 0
+        summary = pool.get_summary()
+        assert summary["estimated_cache_savings_usd"] == pytest.approx(cache["saved_usd"])
+        assert summary["cache_savings_usd"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_provider_reported(self):
+        """Test provider-reported cached tokens are used as-is."""
+        agent = PlainAgent(cached_price=0.001, reported=50)
+        pool = AgentPool(prefix_registry=PrefixRegistry())
+        pool.register_agent("plain", agent)
+
+        response = await pool.execute_single("plain", "any prompt")
+
+        assert response.metadata["prompt_cache"]["source"] == "provider"
+        assert response.metadata["prompt_cache"]["cached_tokens"] == 50
+        assert response.metadata["prompt_cache"]["saved_usd"] == pytest.approx(50 * 0.009 / 1000)
+        assert response.cost == pytest.approx(agent.calculate_cost(response.tokens_input, 1) - 50 * 0.009 / 1000)
+        assert pool.get_stats("plain")["cached_tokens"] == 50
+        assert pool.get_stats("plain")["estimated_cached_tokens"] == 0
+
+    @pytest.mark.asyncio
+    async def test_no_discount_configured(self):
+        """Test reuse is reported without savings when no cached price is known."""
+        registry = PrefixRegistry()
+        registry.register(BIBLE)
+        pool = AgentPool(prefix_registry=registry)
+        pool.register_agent("plain", PlainAgent())
+
+        await pool.execute_single("plain", BIBLE + "a")
+        response = await pool.execute_single("plain", BIBLE + "b")
+
+        assert response.metadata["prompt_cache"]["cached_tokens"] > 0
+        assert response.metadata["prompt_cache"]["saved_usd"] == 0.0
+
+
+class TestProviders:
+    """Test provider-side caching in the agents."""
+
+    @pytest.mark.asyncio
+    async def test_deepseek_cache_hits_priced(self, monkeypatch):
+        """Test DeepSeek cache hits are reported and billed at the cached price."""
+        def handler(request):
+            return httpx.Response(200, json={
+                "choices": [{"message": {"content": "scene"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 100,
+                          "prompt_cache_hit_tokens": 800, "prompt_cache_miss_tokens": 200},
+            })
+        patch_transport(monkeypatch, deepseek, handler)
+        agent = DeepSeekAgent(AgentConfig(
+            name="ds", model="deepseek-chat", api_key="k",
+            cost_per_1k_input=0.001, cost_per_1k_output=0.002, cost_per_1k_cached_input=0.0001,
+        ))
+
+        result = await agent.generate("prompt")
+
+        assert result["metadata"]["cached_tokens"] == 800
+        assert result["cost"] == pytest.approx(0.2 * 0.001 + 0.8 * 0.0001 + 0.1 * 0.002)
+
+    @pytest.mark.asyncio
+    async def test_doubao_context_cache(self, monkeypatch):
+        """Test Doubao creates one context per prefix and sends only the remainder."""
+        calls = []
+
+        def handler(request):
+            body = json.loads(request.content)
+            calls.append((request.url.path, body))
+            if request.url.path.endswith("/context/create"):
+                return httpx.Response(200, json={"id": "ctx-42"})
+            return httpx.Response(200, json={
+                "choices": [{"message": {"content": "scene"}}],
+                "usage": {"prompt_tokens": 500, "completion_tokens": 10,
+                          "prompt_tokens_details": {"cached_tokens": 450}},
+            })
+        patch_transport(monkeypatch, doubao, handler)
+        get_prefix_registry().register(BIBLE, name="bible")
+        agent = DoubaoAgent(AgentConfig(
+            name="db", model="doubao-pro", api_key="k", metadata={"context_cache_ttl": 3600}
+        ))
+
+        first = await agent.generate(BIBLE + "Scene 1")
+        await agent.generate(BIBLE + "Scene 2")
+        await agent.generate("No prefix here")
+
+        paths = [path for path, _ in calls]
+        assert paths == [
+            "/api/v3/context/create",
+            "/api/v3/context/chat/completions",
+            "/api/v3/context/chat/completions",
+            "/api/v3/chat/completions",
+        ]
+        assert calls[0][1]["messages"][0]["content"] == BIBLE
+        assert calls[2][1]["context_id"] == "ctx-42"
+        assert calls[2][1]["messages"] == [{"role": "user", "content": "Scene 2"}]
+        assert first["metadata"]["cached_tokens"] == 450
+        assert first["metadata"]["context_id"] == "ctx-42"
+
+    @pytest.mark.asyncio
+    async def test_doubao_expired_context_falls_back(self, monkeypatch):
+        """Test a context the provider dropped is forgotten and the full prompt sent."""
+        calls = []
+
+        def handler(request):
+            calls.append((request.url.path, json.loads(request.content)))
+            if request.url.path.endswith("/context/create"):
+                return httpx.Response(200, json={"id": f"ctx-{len(calls)}"})
+            if request.url.path.endswith("/context/chat/completions"):
+                return httpx.Response(404, json={"error": "context not found"})
+            return httpx.Response(200, json={
+                "choices": [{"message": {"content": "scene"}}],
+                "usage": {"prompt_tokens": 500, "completion_tokens": 10},
+            })
+        patch_transport(monkeypatch, doubao, handler)
+        prefix = get_prefix_registry().register(BIBLE, name="bible")
+        agent = DoubaoAgent(AgentConfig(
+            name="db-expiring", model="doubao-pro", api_key="k", metadata={"context_cache_ttl": 3600}
+        ))
+
+        result = await agent.generate(BIBLE + "Scene 1")
+
+        assert [path for path, _ in calls] == [
+            "/api/v3/context/create",
+            "/api/v3/context/chat/completions",
+            "/api/v3/chat/completions",
+        ]
+        assert "context_id" not in calls[2][1]
+        assert calls[2][1]["messages"] == [{"role": "user", "content": BIBLE + "Scene 1"}]
+        assert result["output"] == "scene"
+        assert result["metadata"]["context_id"] is None
+        assert get_prefix_registry().get_handle("db-expiring", prefix) is None
+
+
+class TestReporting:
+    """Test cache prefixes from prompts and savings in the cost tracker."""
+
+    def test_builder_cache_prefix(self):
+        """Test leading cacheable sections form the cache prefix."""
+        builder = PromptBuilder()
+        builder.add("voice", "Voice guide.", cacheable=True)
+        builder.add("task", "Write the scene.", required=True)
+
+        packed = builder.pack(1000, HeuristicTokenizer("t"))
+
+        assert packed.cache_prefix == "Voice guide.\n\n"
+        assert packed.text.startswith(packed.cache_prefix)
+        assert builder.pack(5, HeuristicTokenizer("t")).cache_prefix == ""  # truncated away
+
+    @pytest.mark.asyncio
+    async def test_cost_tracker_savings(self):
+        """Test cached tokens and savings accumulate in the cost tracker."""
+        with TemporaryDirectory() as tmpdir:
+            tracker = CostTracker(Path(tmpdir))
+
+            await tracker.log_operation(
+                operation_type="generation", model_name="deepseek-chat",
+                tokens_input=1000, tokens_output=100, cost=0.01, stage="writing",
+                tokens_cached=800, cache_savings=0.0072,
+            )
+
+            assert tracker.get_cache_savings() == {"cached_tokens": 800, "saved_usd": 0.0072}
+            assert tracker.get_budget_status()["session"]["cache_savings"] == 0.0072
+            assert CostTracker(Path(tmpdir)).data.session_cached_tokens == 800
@@ -0,0 +1,138 @@
+"""Tests for the precompiled query classifier."""
+
+import pytest
+
+from factory.knowledge.classifier import (
+    ClassificationRule,
+    DEFAULT_RULES,
+    QueryClassifier,
+)
+from factory.knowledge.router import KnowledgeRouter, QueryType
+
+
+def legacy_classify(query: str) -> QueryType:
+    """Original keyword-scan implementation."""
+    query_lower = query.lower()
+    if any(word in query_lower for word in ["why ", "analyze", "compare", "explain why"]):
+        return QueryType.ANALYTICAL
+    if any(word in query_lower for word in ["what is", "who is", "when", "where"]):
+        return QueryType.FACTUAL
+    if any(word in query_lower for word in ["relationship", "connect", "related"]):
+        return QueryType.CONCEPTUAL
+    return QueryType.GENERAL
+
+
+class TestDefaultRules:
+    """Test default rules match the original classifier."""
+
+    @pytest.mark.parametrize("query", [
+        "What is the relationship between Sarah and John?",
+        "Where are they connected, and why does it matter?",
+        "Whenever she compares herself to him",
+        "Analyze what is related to the theme",
+        "Tell me about the story",
+        "",
+        "WHO IS the narrator?",
+        "somewhere related",
+    ])
+    def test_matches_legacy(self, query):
+        """Test precedence is identical to the keyword scans."""
+        assert QueryClassifier().classify(query) == legacy_classify(query)
+
+    def test_router_uses_classifier(self):
+        """Test router delegates to its classifier."""
+        classifier = QueryClassifier(rules=[], default=QueryType.FACTUAL)
+        router = KnowledgeRouter(classifier=classifier)
+
+        assert router.classify_query("Why?") == QueryType.FACTUAL
+
+
+class TestWeightedRules:
+    """Test custom weighted rules."""
+
+    def test_higher_weight_wins_regardless_of_position(self):
+        """Test a later, heavier rule beats an earlier, lighter one."""
+        classifier = QueryClassifier([
+            ClassificationRule("related", QueryType.CONCEPTUAL, 1.0),
+            ClassificationRule("motive", QueryType.ANALYTICAL, 5.0),
+        ])
+
+        assert classifier.classify("related to her motive") == QueryType.ANALYTICAL
+
+    def test_overlapping_keywords(self):
+        """Test overlapping keywords are both considered."""
+        classifier = QueryClassifier([
+            ClassificationRule("sunset", QueryType.FACTUAL, 1.0),
+            ClassificationRule("setting", QueryType.CONCEPTUAL, 2.0),
+        ])
+
+        assert classifier.classify("sunsetting") == QueryType.CONCEPTUAL
+
+    def test_regex_rule(self):
+        """Test regex rules participate in the combined pattern."""
+        classifier = QueryClassifier([
+            ClassificationRule(r"chapter \d+", QueryType.FACTUAL, 2.0, regex=True),
+        ])
+
+        assert classifier.classify("Summarize Chapter 12") == QueryType.FACTUAL
+        assert classifier.classify("Summarize the chapter") == QueryType.GENERAL
+
+    def test_regex_lookaround_and_groups(self):
+        """Test rules with lookarounds or their own groups map back to their type."""
+        classifier = QueryClassifier([
+            ClassificationRule(r"(?<=the )motive", QueryType.ANALYTICAL, 3.0, regex=True),
+            ClassificationRule(r"(act|part) (\d+)", QueryType.FACTUAL, 2.0, regex=True),
+        ])
+
+        assert classifier.classify("What is the motive here") == QueryType.ANALYTICAL
+        assert classifier.classify("A motive") == QueryType.GENERAL
+        assert classifier.classify("Summarize act 2") == QueryType.FACTUAL
+
+    def test_equal_weight_rules_of_different_types(self):
+        """Test rules sharing a weight resolve to the type of the rule that matched first."""
+        classifier = QueryClassifier([
+            ClassificationRule(r"(act|part) (\d+)", QueryType.FACTUAL, 2.0, regex=True),
+            ClassificationRule("theme", QueryType.CONCEPTUAL, 2.0),
+            ClassificationRule("related", QueryType.ANALYTICAL, 1.0),
+        ])
+
+        assert classifier.classify("related theme in act 2") == QueryType.CONCEPTUAL
+        assert classifier.classify("related to part 3's theme") == QueryType.FACTUAL
+        assert classifier.classify("related") == QueryType.ANALYTICAL
+
+    def test_add_rule_recompiles(self):
+        """Test rules can be added after construction."""
+        classifier = QueryClassifier()
+        classifier.add_rule(ClassificationRule("summary", QueryType.ANALYTICAL, 3.0))
+
+        assert classifier.classify("Summary please") == QueryType.ANALYTICAL
+
+
+class TestFromConfig:
+    """Test building classifiers from settings."""
+
+    def test_defaults_included(self):
+        """Test empty config keeps default rules."""
+        classifier = QueryClassifier.from_config(None)
+
+        assert classifier.rules == list(DEFAULT_RULES)
+
+    def test_extra_rules(self):
+        """Test config rules extend the defaults."""
+        classifier = QueryClassifier.from_config({
+            "rules": [{"pattern": "motivation", "type": "analytical", "weight": 3.0}],
+        })
+
+        assert classifier.classify("Her motivation") == QueryType.ANALYTICAL
+        assert classifier.classify("Who is she?") == QueryType.FACTUAL
+
+    def test_replace_defaults(self):
+        """Test defaults can be dropped."""
+        classifier = QueryClassifier.from_config({"include_defaults": False, "default": "conceptual"})
+
+        assert classifier.classify("Why?") == QueryType.CONCEPTUAL
+
+    def test_unknown_type_rejected(self):
+        """Test unknown query types raise."""
+        with pytest.raises(ValueError):
+            QueryClassifier.from_config({"rules": [{"pattern": "x", "type": "bogus"}]})
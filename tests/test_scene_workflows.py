@@ -208,3 +208,25 @@ class TestWorkflowIntegration:
 
         assert result.status == WorkflowStatus.COMPLETED
         assert result.metadata.get("models_tested") == 1
+
+
+class TestSceneGenerationContext:
+    """Test knowledge context lookups during scene generation."""
+
+    @pytest.mark.asyncio
+    async def test_context_queries_batched(self):
+        """Test all context queries are answered through query_many."""
+        from factory.knowledge.router import KnowledgeRouter
+
+        workflow = SceneGenerationWorkflow(knowledge_router=KnowledgeRouter())
+        queries = ["Who is Sarah?", "Where is the coffee shop?", "Who is Sarah?"]
+
+        result = await workflow.run(
+            outline="Sarah meets her ex.",
+            context_queries=queries
+        )
+
+        assert result.status == WorkflowStatus.COMPLETED
+        context = workflow.context["get_context"]["context"]
+        assert set(context) == {"Who is Sarah?", "Where is the coffee shop?"}
+        assert all(context.values())
@@ -0,0 +1,80 @@
+"""Tests for the shared state store."""
+
+import threading
+
+import pytest
+
+from factory.core.storage import StateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(tmp_path / "state.db")
+    yield store
+    store.close()
+
+
+class TestStateStore:
+    """Test storing and updating shared values."""
+
+    def test_get_set_delete(self, store):
+        """Test values round-trip as JSON per namespace."""
+        store.set("wizard", "alice", {"answers": ["a"]})
+        store.set("prefs", "alice", 3)
+
+        assert store.get("wizard", "alice") == {"answers": ["a"]}
+        assert store.get("prefs", "alice") == 3
+        assert store.get("wizard", "bob", default={}) == {}
+        assert store.keys("wizard") == ["alice"]
+        assert store.delete("wizard", "alice")
+        assert not store.delete("wizard", "alice")
+        assert store.get("wizard", "alice") is None
+
+    def test_update(self, store):
+        """Test update applies fn to the current value, and None deletes."""
+        assert store.update("counters", "hits", lambda n: n + 1, default=0) == 1
+        assert store.update("counters", "hits", lambda n: n + 1, default=0) == 2
+        store.update("counters", "hits", lambda n: None)
+
+        assert store.get("counters", "hits") is None
+
+    def test_failed_update_keeps_value(self, store):
+        """Test an exception in fn rolls the update back."""
+        store.set("wizard", "alice", {"step": 1})
+
+        def broken(value):
+            raise ValueError("bad answer")
+
+        with pytest.raises(ValueError):
+            store.update("wizard", "alice", broken)
+
+        assert store.get("wizard", "alice") == {"step": 1}
+        store.set("wizard", "alice", {"step": 2})  # no transaction left open
+        assert store.get("wizard", "alice") == {"step": 2}
+
+    def test_concurrent_updates_across_connections(self, tmp_path):
+        """Test updates from separate connections (processes) are never lost."""
+        stores = [StateStore(tmp_path / "state.db") for _ in range(4)]
+
+        def bump(store):
+            for _ in range(25):
+                store.update("counters", "hits", lambda n: n + 1, default=0)
+
+        threads = [threading.Thread(target=bump, args=(s,)) for s in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            assert stores[0].get("counters", "hits") == 100
+        finally:
+            for store in stores:
+                store.close()
+
+    def test_for_project(self, tmp_path):
+        """Test the project store lives under .factory/."""
+        store = StateStore.for_project(tmp_path)
+        store.close()
+
+        assert (tmp_path / ".factory" / "state.db").exists()
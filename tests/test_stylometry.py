@@ -0,0 +1,200 @@
+"""Tests for stylometric voice profiles and scoring."""
+
+import random
+
+import numpy as np
+import pytest
+
+from factory.core.manuscript import Manuscript
+from factory.core.stylometry import (
+    FEATURE_COUNT,
+    GROUP_SLICES,
+    VoiceScorer,
+    chunk_words,
+    extract_batch,
+    extract_features,
+)
+from factory.workflows.scene_operations import SceneEnhancementWorkflow, VoiceTestingWorkflow
+
+TERSE_WORDS = "door gun cold rain street car light dark night smoke he it the was".split()
+ORNATE_WORDS = (
+    "which the of and whereupon her magnificent garden, that she had cultivated "
+    "with considerable patience; remembering"
+).split()
+
+
+def prose(words, sentence_lengths, sentences, seed):
+    """Deterministic prose with a given vocabulary and sentence-length range."""
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(*sentence_lengths))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def terse(sentences=60, seed=0):
+    return prose(TERSE_WORDS, (3, 7), sentences, seed)
+
+
+def ornate(sentences=10, seed=0):
+    return prose(ORNATE_WORDS, (25, 40), sentences, seed)
+
+
+class TestFeatures:
+    """Test feature extraction."""
+
+    def test_vector_shape_and_empty_text(self):
+        """Test every text maps to a fixed-length vector."""
+        assert extract_features(terse()).shape == (FEATURE_COUNT,)
+        assert not extract_features("").any()
+        assert extract_batch([terse(), ornate(), ""]).shape == (3, FEATURE_COUNT)
+
+    def test_features_capture_style(self):
+        """Test sentence length and punctuation groups reflect the prose."""
+        short, long_ = extract_features(terse()), extract_features(ornate())
+        lengths = GROUP_SLICES["sentence_length"]
+
+        # Mean sentence length is the second-to-last value of the group
+        assert short[lengths][-2] < long_[lengths][-2]
+        assert extract_features("Wait; what? No!")[GROUP_SLICES["punctuation"]].sum() > 0
+
+    def test_chunking_merges_short_tail(self):
+        """Test chunks hold about chunk_size words and no stub is left over."""
+        text = " ".join(["word"] * 560)
+
+        chunks = chunk_words(text, 250)
+
+        assert [len(c.split()) for c in chunks] == [250, 310]
+        assert chunk_words("", 250) == []
+
+
+class TestVoiceScorer:
+    """Test profiles and scoring."""
+
+    @pytest.fixture
+    def scorer(self):
+        scorer = VoiceScorer()
+        scorer.build_profile("Sam", {f"scene-{i}": terse(seed=i) for i in range(4)})
+        return scorer
+
+    def test_matching_voice_scores_higher(self, scorer):
+        """Test text in the profiled voice outscores a different voice."""
+        scores = scorer.score("Sam", [terse(seed=99), ornate(seed=99)])
+
+        assert scores.shape == (2,)
+        assert scores[0] > 60 > scores[1] > 0
+
+    def test_deviations_point_at_sentence_length(self, scorer):
+        """Test the off-voice text's sentence length is flagged as deviating."""
+        matching = scorer.deviations("Sam", terse(seed=99))
+        off = scorer.deviations("Sam", ornate(seed=99))
+
+        assert off["sentence_length"] > 2.0 > matching["sentence_length"]
+
+    def test_unknown_character(self, scorer):
+        """Test scoring an unprofiled character raises."""
+        assert not scorer.has_profile("Nobody")
+        with pytest.raises(KeyError):
+            scorer.score("Nobody", ["text"])
+
+    def test_incremental_update(self, scorer):
+        """Test only new or edited scenes are re-extracted and removed ones drop out."""
+        references = {f"scene-{i}": terse(seed=i) for i in range(4)}
+        assert scorer.build_profile("Sam", references) == 0
+        references["scene-0"] = terse(sentences=120, seed=50)
+        del references["scene-3"]
+        assert scorer.build_profile("Sam", references) == 1
+        assert set(scorer.profiles["Sam"].sources) == {"scene-0", "scene-1", "scene-2"}
+        assert scorer.profiles["Sam"].count == sum(len(chunk_words(t)) for t in references.values())
+
+    def test_incremental_matches_full_rebuild(self, scorer):
+        """Test an updated profile has the same statistics as a fresh one."""
+        scorer.add_reference("Sam", "scene-1", terse(seed=7))
+        fresh = VoiceScorer()
+        fresh.build_profile("Sam", {
+            "scene-0": terse(seed=0), "scene-1": terse(seed=7),
+            "scene-2": terse(seed=2), "scene-3": terse(seed=3),
+        })
+
+        for updated, rebuilt in zip(scorer.profiles["Sam"].stats(), fresh.profiles["Sam"].stats()):
+            assert np.allclose(updated, rebuilt)
+
+    def test_cache_round_trip(self, tmp_path):
+        """Test profiles persist and cached scenes aren't re-extracted."""
+        scorer = VoiceScorer.for_project(tmp_path)
+        scorer.build_profile("Sam", {"a": terse(seed=1)})
+        expected = scorer.score("Sam", [ornate()])
+
+        reloaded = VoiceScorer.for_project(tmp_path)
+
+        assert (tmp_path / ".factory" / "voice_profiles.json").exists()
+        assert np.allclose(reloaded.score("Sam", [ornate()]), expected)
+        assert reloaded.build_profile("Sam", {"a": terse(seed=1)}) == 0
+
+    def test_corrupt_cache_ignored(self, tmp_path):
+        """Test an unreadable cache starts empty instead of failing."""
+        path = tmp_path / "profiles.json"
+        path.write_text("{not json")
+
+        assert VoiceScorer(path).profiles == {}
+
+    def test_build_from_manuscript(self):
+        """Test tagged POV scenes are preferred over scenes mentioning the name."""
+        manuscript = Manuscript(title="Novel")
+        chapter = manuscript.add_act("Act 1").add_chapter("Chapter 1")
+        pov = chapter.add_scene("Sam's scene", "Sam waited. " + terse(seed=1))
+        pov.metadata["pov"] = "Sam"
+        chapter.add_scene("Other", "Sam was mentioned. " + ornate())
+        scorer = VoiceScorer()
+
+        assert scorer.build_from_manuscript(manuscript, "Sam") == 1
+        assert set(scorer.profiles["Sam"].sources) == {pov.id}
+
+        del pov.metadata["pov"]
+        scorer.build_from_manuscript(manuscript, "Sam")
+        assert len(scorer.profiles["Sam"].sources) == 2
+
+
+class TestWorkflowScoring:
+    """Test the scene workflows use the scorer."""
+
+    @pytest.mark.asyncio
+    async def test_enhancement_validation_against_profile(self):
+        """Test an off-voice enhancement fails validation with issues."""
+        scorer = VoiceScorer()
+        scorer.build_profile("Sam", {"s": terse(seed=1)})
+        workflow = SceneEnhancementWorkflow(voice_scorer=scorer)
+        context = {"character": "Sam", "scene": terse(seed=2), "enhance_scene": ornate()}
+
+        validation = await workflow._validate_voice(context)
+
+        assert validation["scored_against"] == "profile"
+        assert not validation["passed"]
+        assert any("sentence length" in issue for issue in validation["issues"])
+
+    @pytest.mark.asyncio
+    async def test_enhancement_falls_back_to_original_scene(self):
+        """Test an unprofiled character is validated against the original scene."""
+        workflow = SceneEnhancementWorkflow()
+        context = {"character": "Sam", "scene": terse(seed=1), "enhance_scene": terse(seed=2)}
+
+        validation = await workflow._validate_voice(context)
+
+        assert validation["scored_against"] == "original_scene"
+        assert validation["passed"]
+
+    @pytest.mark.asyncio
+    async def test_voice_testing_consensus(self):
+        """Test without references the outlier output scores lowest."""
+        workflow = VoiceTestingWorkflow()
+        context = {
+            "character": "Sam",
+            "generate_all_models": {
+                "a": terse(seed=1), "b": terse(seed=2), "c": terse(seed=3), "outlier": ornate(),
+            },
+        }
+
+        scores = await workflow._score_all_outputs(context)
+
+        assert min(scores, key=scores.get) == "outlier"
+        assert context["scored_against"] == "consensus"
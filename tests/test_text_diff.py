@@ -0,0 +1,150 @@
+"""Tests for word/sentence diffing and output similarity."""
+
+import difflib
+import random
+
+import numpy as np
+import pytest
+
+from factory.tools.text_diff import (
+    PairwiseDiffs,
+    diff_sequences,
+    diff_texts,
+    minhash_signatures,
+    similarity_matrix,
+    tokenize,
+)
+
+
+def apply_ops(a, b, ops):
+    """Rebuild b from a and the opcodes, checking they're consistent."""
+    rebuilt, i, j = [], 0, 0
+    for op in ops:
+        assert (op.a_start, op.b_start) == (i, j)
+        if op.tag == "equal":
+            assert list(a[op.a_start:op.a_end]) == list(b[op.b_start:op.b_end])
+        rebuilt += b[op.b_start:op.b_end]
+        i, j = op.a_end, op.b_end
+    assert (i, j) == (len(a), len(b))
+    return rebuilt
+
+
+def matched(ops):
+    return sum(op.a_end - op.a_start for op in ops if op.tag == "equal")
+
+
+class TestTokenize:
+    """Test splitting text into diff tokens."""
+
+    def test_words_and_sentences(self):
+        """Test tokens keep their whitespace and sentences end at punctuation."""
+        text = "She ran.  He stayed?! \"Fine.\" The end"
+
+        assert "".join(tokenize(text)) == text
+        assert tokenize(text, "sentence") == ["She ran.  ", "He stayed?! ", "\"Fine.\" ", "The end"]
+        with pytest.raises(ValueError):
+            tokenize(text, "paragraph")
+
+
+class TestDiffSequences:
+    """Test the Myers and patience diff algorithms."""
+
+    @pytest.mark.parametrize("algorithm", ["myers", "patience"])
+    def test_random_sequences(self, algorithm):
+        """Test opcodes always rebuild the target; Myers finds a longest common subsequence."""
+        rng = random.Random(7)
+        for _ in range(300):
+            a = [rng.choice("abcd") for _ in range(rng.randint(0, 25))]
+            b = [rng.choice("abcd") for _ in range(rng.randint(0, 25))]
+
+            ops = diff_sequences(a, b, algorithm)
+
+            assert apply_ops(a, b, ops) == b
+            if algorithm == "myers":
+                lcs = sum(m.size for m in difflib.SequenceMatcher(None, a, b, autojunk=False).get_matching_blocks())
+                assert matched(ops) >= lcs
+
+    def test_edit_budget(self):
+        """Test regions needing more edits than the budget become one replacement."""
+        a, b = list("abcdefgh"), list("hgfedcba")
+
+        ops = diff_sequences(a, b, "myers", max_edits=2)
+
+        assert [op.tag for op in ops] == ["replace"]
+        assert apply_ops(a, b, ops) == b
+
+    def test_patience_anchors_on_unique_words(self):
+        """Test moved common words don't hide an edit between unique anchors."""
+        a = "the cat sat on the mat".split()
+        b = "the dog sat on the mat".split()
+
+        ops = diff_sequences(a, b)
+
+        assert [(op.tag, a[op.a_start:op.a_end], b[op.b_start:op.b_end]) for op in ops if op.tag != "equal"] == [
+            ("replace", ["cat"], ["dog"])
+        ]
+
+
+class TestTextDiff:
+    """Test prose diffs."""
+
+    def test_word_changes_in_one_long_line(self):
+        """Test one changed word in a long paragraph is reported as just that word."""
+        words = [f"word{i}" for i in range(3000)]
+        a = " ".join(words)
+        words[1500] = "changed"
+        b = " ".join(words)
+
+        diff = diff_texts(a, b)
+        lines = diff.lines("model-a", "model-b", context=2)
+
+        assert diff.changes == 1
+        assert lines[:3] == ["--- model-a", "+++ model-b", "@@ -1501,1 +1501,1 @@"]
+        assert lines[3:] == [" word1498 word1499", "-word1500", "+changed", " word1501 word1502"]
+
+    def test_whitespace_ignored(self):
+        """Test reflowed text has no changes."""
+        assert diff_texts("One two.\nThree", "One  two. Three").changes == 0
+
+    def test_pairwise_diffs_are_lazy(self):
+        """Test every pair is a key but only looked-up pairs are diffed."""
+        diffs = PairwiseDiffs({"a": "x y z", "b": "x q z", "c": "x y"})
+
+        assert list(diffs) == [("a", "b"), ("a", "c"), ("b", "c")]
+        assert ("b", "a") not in diffs
+        assert diffs._diffs == {}
+        assert "-y" in diffs[("a", "b")]
+        assert list(diffs._diffs) == [("a", "b")]
+        assert diffs.get(("b", "a")) is None
+
+
+class TestSimilarity:
+    """Test MinHash similarity."""
+
+    def test_matrix(self):
+        """Test identical, edited and unrelated texts rank as expected."""
+        rng = random.Random(3)
+        vocab = [f"w{i}" for i in range(500)]
+        base = [rng.choice(vocab) for _ in range(2000)]
+        edited = list(base)
+        for _ in range(100):
+            edited[rng.randrange(len(edited))] = rng.choice(vocab)
+        other = [rng.choice(vocab) for _ in range(2000)]
+        texts = [" ".join(base), " ".join(edited), " ".join(other), " ".join(base)]
+
+        matrix = similarity_matrix(texts)
+
+        assert matrix.shape == (4, 4)
+        assert np.allclose(matrix, matrix.T)
+        assert np.allclose(np.diag(matrix), 1.0)
+        assert matrix[0, 3] == 1.0
+        assert matrix[0, 1] > 0.6
+        assert matrix[0, 2] < 0.1
+
+    def test_short_and_empty_texts(self):
+        """Test texts shorter than a shingle, and empty texts, still compare."""
+        signatures = minhash_signatures(["hi", "hi", "", ""], num_perm=16)
+
+        assert (signatures[0] == signatures[1]).all()
+        assert (signatures[2] == signatures[3]).all()
+        assert not (signatures[0] == signatures[2]).any()
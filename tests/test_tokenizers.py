@@ -0,0 +1,177 @@
+"""Tests for the tokenizer registry."""
+
+import base64
+
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.tokenizers import (
+    BPETokenizer,
+    CachedTokenizer,
+    HeuristicTokenizer,
+    TokenizerRegistry,
+)
+
+CHINESE = "林晓站在窗前，望着远处的山。雨已经停了，空气里弥漫着泥土的气息。"
+ENGLISH = "Sarah stood by the window, watching the distant hills."
+
+
+def write_vocab(path, merges=("th", "the", "he", "in", "ing")):
+    """Write a tiny tiktoken-format vocabulary: all bytes plus a few merges."""
+    tokens = [bytes([b]) for b in range(256)] + [m.encode() for m in merges]
+    path.write_text("\n".join(f"{base64.b64encode(t).decode()} {i}" for i, t in enumerate(tokens)))
+    return path
+
+
+class CountingTokenizer(BPETokenizer):
+    """BPE tokenizer that records how many texts it counted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counted = 0
+
+    def count(self, text):
+        self.counted += 1
+        return super().count(text)
+
+
+class EchoAgent(BaseAgent):
+    """Agent that never calls a provider."""
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        return {"output": prompt}
+
+
+class TestHeuristic:
+    """Test calibrated fallbacks."""
+
+    def test_chinese_models_count_cjk_densely(self):
+        """Test Chinese-first models count fewer tokens than one per character."""
+        registry = TokenizerRegistry(vocab_dirs=[])
+        qwen = registry.get("qwen-max").count(CHINESE)
+        claude = registry.get("claude-sonnet-4-20250514").count(CHINESE)
+
+        assert qwen < len(CHINESE) < claude
+        # The old len // 4 estimate was off by a factor of 2-5
+        assert qwen > len(CHINESE) // 4 * 2
+
+    def test_english_near_four_chars_per_token(self):
+        """Test English prose stays close to the usual ratio."""
+        registry = TokenizerRegistry(vocab_dirs=[])
+        assert registry.get("gpt-4").count(ENGLISH) == pytest.approx(len(ENGLISH) / 4, abs=1)
+        assert registry.get("gpt-4").count("") == 0
+
+    def test_profile_resolution(self):
+        """Test models and providers map to the right profiles."""
+        registry = TokenizerRegistry(vocab_dirs=[])
+        assert registry.get("deepseek-chat").name == "deepseek"
+        assert registry.get("moonshot-v1-8k").name == "kimi"
+        assert registry.get("llama3.2:3b").name == "llama3"
+        assert registry.get("custom-model", provider="anthropic").name == "claude"
+        assert registry.get("something-else").name == "default"
+        assert registry.get("qwen-max") is registry.get("qwen-max")
+
+    def test_truncate(self):
+        """Test truncation keeps the requested end within budget."""
+        tokenizer = HeuristicTokenizer("t", chars_per_token=4.0, cjk_tokens_per_char=1.0)
+        text = "abcd" * 10
+
+        head = tokenizer.truncate(text, 3)
+        tail = tokenizer.truncate(CHINESE, 5, keep="end")
+
+        assert head == "abcd" * 3
+        assert tail == CHINESE[-5:]
+        assert tokenizer.truncate(text, 100) == text
+
+
+class TestBPE:
+    """Test offline vocabularies."""
+
+    def test_encode_decode(self, tmp_path):
+        """Test merges apply by rank and decoding round-trips."""
+        tokenizer = BPETokenizer.from_tiktoken_file(write_vocab(tmp_path / "tiny.tiktoken"))
+
+        ids = tokenizer.encode("the thing")
+
+        # "the" merges fully; " thing" -> " ", "th", "ing"
+        assert len(ids) == 4
+        assert tokenizer.decode(ids) == "the thing"
+        assert tokenizer.count("the thing") == 4
+        assert tokenizer.count(CHINESE) == len(CHINESE.encode("utf-8"))  # no CJK merges
+
+    def test_truncate_by_tokens(self, tmp_path):
+        """Test exact truncation cuts on token boundaries."""
+        tokenizer = BPETokenizer.from_tiktoken_file(write_vocab(tmp_path / "tiny.tiktoken"))
+
+        assert tokenizer.truncate("the thing", 2) == "the "
+        assert tokenizer.truncate("the thing", 2, keep="end") == "thing"
+
+    def test_registry_loads_vocab_file(self, tmp_path):
+        """Test a vocab file in a tokenizer dir replaces the heuristic."""
+        write_vocab(tmp_path / "qwen.tiktoken")
+        registry = TokenizerRegistry(vocab_dirs=[tmp_path])
+
+        tokenizer = registry.get("qwen-turbo")
+
+        assert tokenizer.exact
+        assert isinstance(tokenizer, CachedTokenizer)
+        assert registry.get("qwen-max") is tokenizer  # one load per vocabulary
+        assert not registry.get("deepseek-chat").exact
+
+
+class TestCache:
+    """Test the LRU count cache."""
+
+    def test_repeated_prefix_counted_once(self, tmp_path):
+        """Test repeated texts hit the cache."""
+        inner = CountingTokenizer.from_tiktoken_file(write_vocab(tmp_path / "tiny.tiktoken"))
+        cached = CachedTokenizer(inner, max_entries=2)
+
+        assert cached.count("the thing") == cached.count("the thing") == 4
+        assert inner.counted == 1
+        assert (cached.hits, cached.misses) == (1, 1)
+
+        cached.count("a")
+        cached.count("b")  # evicts "the thing"
+        cached.count("the thing")
+        assert inner.counted == 4
+
+    def test_count_many_dedupes(self, tmp_path):
+        """Test batch counting counts each distinct miss once."""
+        inner = CountingTokenizer.from_tiktoken_file(write_vocab(tmp_path / "tiny.tiktoken"))
+        cached = CachedTokenizer(inner)
+        cached.count("the")
+
+        counts = cached.count_many(["the", "thing", "thing", "in"])
+
+        assert counts == [1, 2, 2, 1]
+        assert inner.counted == 3
+
+    def test_custom_registration(self):
+        """Test registered tokenizers take precedence and exact ones get cached."""
+        registry = TokenizerRegistry(vocab_dirs=[])
+        ranks = {bytes([b]): b for b in range(256)}
+        registry.register(r"house-model", lambda: BPETokenizer("house", ranks))
+
+        tokenizer = registry.get("house-model-v2")
+
+        assert isinstance(tokenizer, CachedTokenizer)
+        assert tokenizer.count("abc") == 3
+
+
+class TestBaseAgentIntegration:
+    """Test agents use the registry."""
+
+    def test_count_and_estimate(self):
+        """Test counts follow the model and feed pre-flight cost estimates."""
+        agent = EchoAgent(AgentConfig(
+            name="q", model="qwen-max", max_output=1000,
+            cost_per_1k_input=0.002, cost_per_1k_output=0.006,
+        ))
+
+        tokens = agent.count_tokens(CHINESE)
+
+        assert tokens < len(CHINESE)
+        assert agent.count_tokens_many([CHINESE, ENGLISH])[0] == tokens
+        assert agent.estimate_cost(CHINESE) == pytest.approx(tokens * 0.002 / 1000 + 0.006)
+        assert agent.estimate_cost(CHINESE, max_tokens=0) == pytest.approx(tokens * 0.002 / 1000)
@@ -0,0 +1,219 @@
+"""Tests for in-process tracing."""
+
+import asyncio
+import json
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.tracing import (
+    ChromeTraceExporter,
+    InMemoryExporter,
+    JsonlExporter,
+    NOOP_SPAN,
+    Tracer,
+    configure_tracing,
+    current_span,
+    get_tracer,
+    traced,
+)
+from factory.core.workflow_engine import Workflow, WorkflowEngine
+from factory.knowledge.router import KnowledgeRouter
+
+
+class EchoAgent(BaseAgent):
+    """Agent returning the prompt."""
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        return {"output": prompt, "tokens_input": 3, "tokens_output": 4, "cost": 0.0}
+
+
+@pytest.fixture
+def spans():
+    """Enable tracing into memory for one test."""
+    exporter = InMemoryExporter()
+    configure_tracing(exporters=[exporter])
+    yield exporter
+    get_tracer().shutdown()
+
+
+class TestTracer:
+    """Test span creation and nesting."""
+
+    def test_disabled_returns_noop(self):
+        """Test disabled tracer hands out the shared no-op span."""
+        tracer = Tracer()
+        with tracer.span("anything") as span:
+            span.set_attribute("ignored", 1)
+        assert tracer.span("x") is NOOP_SPAN
+
+    def test_nesting_and_attributes(self):
+        """Test parent/child links, timing and attributes."""
+        exporter = InMemoryExporter()
+        tracer = Tracer([exporter])
+
+        with tracer.span("outer", a=1) as outer:
+            with tracer.span("inner") as inner:
+                inner.set_attribute("b", 2)
+                assert current_span() is inner
+            assert current_span() is outer
+
+        inner_span, outer_span = exporter.spans
+        assert inner_span.parent_id == outer_span.span_id
+        assert inner_span.trace_id == outer_span.trace_id
+        assert outer_span.parent_id is None
+        assert outer_span.attributes == {"a": 1}
+        assert inner_span.attributes == {"b": 2}
+        assert outer_span.duration_ms >= inner_span.duration_ms >= 0
+
+    def test_error_recorded(self):
+        """Test exceptions are recorded and re-raised."""
+        exporter = InMemoryExporter()
+        tracer = Tracer([exporter])
+
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("boom")
+
+        assert exporter.spans[0].error == "ValueError: boom"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_get_own_parents(self):
+        """Test spans in gathered tasks parent to the span that spawned them."""
+        exporter = InMemoryExporter()
+        tracer = Tracer([exporter])
+
+        async def child(i):
+            with tracer.span("child", i=i):
+                await asyncio.sleep(0)
+
+        with tracer.span("root") as root:
+            await asyncio.gather(child(0), child(1))
+
+        children = [s for s in exporter.spans if s.name == "child"]
+        assert len(children) == 2
+        assert all(c.parent_id == root.span_id for c in children)
+
+    @pytest.mark.asyncio
+    async def test_traced_decorator(self, spans):
+        """Test decorator on sync and async functions."""
+        @traced("sync_op")
+        def sync_op():
+            return 1
+
+        @traced()
+        async def async_op():
+            return 2
+
+        assert sync_op() == 1
+        assert await async_op() == 2
+        assert [s.name for s in spans.spans] == ["sync_op", f"{__name__}.{async_op.__qualname__}"]
+
+
+class TestExporters:
+    """Test file exporters."""
+
+    def test_jsonl(self):
+        """Test one JSON object per span."""
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.jsonl"
+            tracer = Tracer([JsonlExporter(path)])
+            with tracer.span("a", k="v"):
+                with tracer.span("b"):
+                    pass
+            tracer.shutdown()
+
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+
+        assert [line["name"] for line in lines] == ["b", "a"]
+        assert lines[0]["parent_id"] == lines[1]["span_id"]
+        assert lines[1]["attributes"] == {"k": "v"}
+
+    def test_chrome_trace(self):
+        """Test trace-viewer complete events."""
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.json"
+            tracer = Tracer([ChromeTraceExporter(path)])
+            with tracer.span("workflow.run", workflow="demo"):
+                pass
+            tracer.flush()
+
+            events = json.loads(path.read_text())["traceEvents"]
+
+        assert events[0]["ph"] == "X"
+        assert events[0]["cat"] == "workflow"
+        assert events[0]["args"]["workflow"] == "demo"
+        assert events[0]["dur"] >= 0
+
+    def test_chrome_trace_bounded(self):
+        """Test only the most recent events are kept in a long-running process."""
+        with TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "trace.json"
+            tracer = Tracer([ChromeTraceExporter(path, max_events=3)])
+            for i in range(5):
+                with tracer.span(f"op.{i}"):
+                    pass
+            tracer.flush()
+
+            document = json.loads(path.read_text())
+
+        assert [e["name"] for e in document["traceEvents"]] == ["op.2", "op.3", "op.4"]
+        assert document["otherData"] == {"dropped_events": 2}
+
+
+class TestInstrumentation:
+    """Test spans emitted by instrumented components."""
+
+    @pytest.mark.asyncio
+    async def test_pool_and_agent_spans(self, spans):
+        """Test execute_single wraps agent.generate."""
+        pool = AgentPool()
+        pool.register_agent("echo", EchoAgent(AgentConfig(name="echo", model="echo-1")))
+
+        await pool.execute_single("echo", "hello")
+
+        generate = spans.by_name("agent.generate")[0]
+        execute = spans.by_name("agent_pool.execute_single")[0]
+        assert generate.parent_id == execute.span_id
+        assert generate.attributes["tokens_output"] == 4
+        assert execute.attributes["success"] is True
+
+    @pytest.mark.asyncio
+    async def test_workflow_spans(self, spans):
+        """Test workflow run and step spans."""
+        workflow = Workflow("demo")
+        workflow.add_step("first", lambda ctx: 1)
+        workflow.add_step("second", lambda ctx: 2, dependencies=["first"])
+
+        await WorkflowEngine().run_workflow(workflow)
+
+        run = spans.by_name("workflow.run")[0]
+        steps = spans.by_name("workflow.step")
+        assert [s.attributes["step"] for s in steps] == ["first", "second"]
+        assert all(s.parent_id == run.span_id for s in steps)
+        assert steps[0].attributes["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_knowledge_query_span(self, spans):
+        """Test router queries record source and cache status."""
+        router = KnowledgeRouter()
+        await router.query("Who is Sarah?")
+        await router.query("Who is Sarah?")
+
+        queries = spans.by_name("knowledge.query")
+        assert [q.attributes["cached"] for q in queries] == [False, True]
+        assert queries[0].attributes["source"] == "cognee"
+
+    def test_http_request_span(self, spans):
+        """Test the webapp middleware records the matched route."""
+        from fastapi.testclient import TestClient
+        from webapp.backend.app import app
+
+        # No lifespan: startup would create a project directory in the cwd
+        TestClient(app).get("/api/health")
+
+        request = spans.by_name("http.request")[-1]
+        assert request.attributes["route"] == "/api/health"
+        assert request.attributes["status"] == 200
@@ -0,0 +1,198 @@
+"""Tests for local vector index."""
+
+import pytest
+import numpy as np
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from factory.knowledge.router import KnowledgeRouter, KnowledgeSource
+from factory.knowledge.vector_index import (
+    HashingEmbedder,
+    VectorIndex,
+    chunk_text,
+)
+
+
+DOCS = {
+    "characters/sarah.md": "Sarah is a marine biologist who distrusts her brother John.",
+    "characters/john.md": "John runs the family fishing business and resents Sarah leaving.",
+    "setting/harbor.md": "The harbor town is foggy, cold and full of rusting trawlers.",
+}
+
+
+def build_index() -> VectorIndex:
+    index = VectorIndex(chunk_size=50, chunk_overlap=10)
+    for doc_id, text in DOCS.items():
+        index.add_document(doc_id, text)
+    return index
+
+
+class TestChunking:
+    """Test document chunking."""
+
+    def test_short_text_single_chunk(self):
+        """Test text shorter than chunk size."""
+        assert chunk_text("one two three", chunk_size=10, overlap=2) == ["one two three"]
+
+    def test_overlapping_chunks(self):
+        """Test chunk windows overlap."""
+        words = " ".join(str(i) for i in range(25))
+        chunks = chunk_text(words, chunk_size=10, overlap=5)
+
+        assert chunks[0].split()[-5:] == chunks[1].split()[:5]
+        assert chunks[-1].split()[-1] == "24"
+
+    def test_invalid_overlap(self):
+        """Test overlap must be smaller than chunk size."""
+        with pytest.raises(ValueError):
+            chunk_text("text", chunk_size=5, overlap=5)
+
+
+class TestHashingEmbedder:
+    """Test hashing embedder."""
+
+    def test_deterministic_and_normalized(self):
+        """Test vectors are stable and unit length."""
+        embedder = HashingEmbedder(dim=64)
+        a = embedder.embed(["the foggy harbor"])
+        b = embedder.embed(["the foggy harbor"])
+
+        assert a.dtype == np.float32
+        assert np.array_equal(a, b)
+        assert np.linalg.norm(a[0]) == pytest.approx(1.0, abs=1e-5)
+
+    def test_empty_text_is_zero_vector(self):
+        """Test empty input embeds to zeros."""
+        vectors = HashingEmbedder(dim=16).embed([""])
+        assert not vectors.any()
+
+
+class TestVectorIndex:
+    """Test vector index operations."""
+
+    def test_search_ranks_relevant_document_first(self):
+        """Test top hit matches the query topic."""
+        index = build_index()
+
+        hits = index.search("foggy harbor trawlers", top_k=2)
+
+        assert hits[0].doc_id == "setting/harbor.md"
+        assert hits[0].score >= hits[1].score
+
+    def test_search_many_matches_single_search(self):
+        """Test batched search returns the same hits as single queries."""
+        index = build_index()
+        queries = ["Sarah marine biologist", "family fishing business"]
+
+        batched = index.search_many(queries, top_k=3)
+
+        for query, hits in zip(queries, batched):
+            assert [h.doc_id for h in hits] == [h.doc_id for h in index.search(query, top_k=3)]
+
+    def test_unchanged_document_skipped(self):
+        """Test re-adding identical content does not duplicate chunks."""
+        index = build_index()
+        size = len(index)
+
+        assert index.add_document("setting/harbor.md", DOCS["setting/harbor.md"]) == 0
+        assert len(index) == size
+
+    def test_remove_document(self):
+        """Test removal compacts the index."""
+        index = build_index()
+
+        assert index.remove_document("setting/harbor.md")
+        assert "setting/harbor.md" not in index.documents
+        assert all(h.doc_id != "setting/harbor.md" for h in index.search("harbor", top_k=5))
+        assert not index.remove_document("setting/harbor.md")
+
+    def test_save_and_load_mmap(self):
+        """Test persisted index round-trips and stays writable after load."""
+        index = build_index()
+
+        with TemporaryDirectory() as tmpdir:
+            index.save(Path(tmpdir))
+            loaded = VectorIndex.load(Path(tmpdir))
+
+            assert len(loaded) == len(index)
+            assert loaded.search("foggy harbor")[0].doc_id == "setting/harbor.md"
+
+            loaded.add_document("notes.md", "A new note about the lighthouse keeper.")
+            assert "notes.md" in loaded.documents
+
+    def test_resave_over_mapped_file(self):
+        """Test saving an mmap-loaded index back to its own directory."""
+        with TemporaryDirectory() as tmpdir:
+            build_index().save(Path(tmpdir))
+            loaded = VectorIndex.load(Path(tmpdir))
+
+            loaded.save(Path(tmpdir))
+            reloaded = VectorIndex.load(Path(tmpdir))
+
+            assert len(reloaded) == len(loaded)
+            assert np.allclose(reloaded.vectors, build_index().vectors)
+            assert reloaded.search("foggy harbor")[0].doc_id == "setting/harbor.md"
+
+    def test_index_directory_prunes_deleted_files(self):
+        """Test directory indexing adds files and prunes missing ones."""
+        with TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "a.md").write_text("alpha document about dragons")
+            (root / "b.txt").write_text("beta document about castles")
+
+            index = VectorIndex()
+            index.index_directory(root)
+            assert index.documents == ["a.md", "b.txt"]
+
+            (root / "b.txt").unlink()
+            index.index_directory(root)
+            assert index.documents == ["a.md"]
+
+
+class TestRouterIntegration:
+    """Test knowledge router uses the vector index."""
+
+    @pytest.mark.asyncio
+    async def test_conceptual_query_uses_vector_index(self):
+        """Test conceptual queries populate references from the index."""
+        router = KnowledgeRouter(vector_index=build_index())
+
+        result = await router.query("How is Sarah related to John?")
+
+        assert result.source == KnowledgeSource.COGNEE
+        assert result.metadata["search_type"] == "vector_index"
+        assert set(result.references) <= set(DOCS)
+        assert result.references
+
+    @pytest.mark.asyncio
+    async def test_factual_query_bypasses_vector_index(self):
+        """Test non-conceptual queries keep the default path."""
+        router = KnowledgeRouter(vector_index=build_index())
+
+        result = await router.query("Who is the protagonist?")
+
+        assert result.metadata["search_type"] == "semantic_graph"
+
+    @pytest.mark.asyncio
+    async def test_query_many_batches_conceptual_queries(self):
+        """Test conceptual queries share one batched vector search."""
+        index = build_index()
+        calls = []
+        original = index.search_many
+
+        def counting(queries, top_k=5):
+            calls.append(list(queries))
+            return original(queries, top_k)
+
+        index.search_many = counting
+        router = KnowledgeRouter(vector_index=index)
+
+        results = await router.query_many([
+            "How is Sarah related to John?",
+            "Who is the protagonist?",
+            "What connects the harbor to John?",
+        ])
+
+        assert len(calls) == 1 and len(calls[0]) == 2
+        assert results[0].metadata["search_type"] == "vector_index"
+        assert results[1].metadata["search_type"] == "semantic_graph"
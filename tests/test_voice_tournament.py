@@ -0,0 +1,222 @@
+"""Tests for concurrent voice tournaments."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from factory.agents.base_agent import AgentConfig, BaseAgent
+from factory.core.agent_pool import AgentPool
+from factory.core.stylometry import VoiceScorer
+from factory.workflows.scene_operations import VoiceTestingWorkflow
+from factory.workflows.scene_operations.tournament import VoiceTournament
+
+
+def terse(seed=0):
+    """Short plain sentences."""
+    rng = random.Random(seed)
+    words = "door gun cold rain street car light dark night smoke he it the was".split()
+    return " ".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(3, 7))).capitalize() + "."
+        for _ in range(60)
+    )
+
+
+def ornate(seed=0):
+    """Long clause-heavy sentences."""
+    rng = random.Random(seed)
+    words = "which the of and whereupon her magnificent garden, that she had cultivated; remembering".split()
+    return " ".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(25, 40))).capitalize() + "."
+        for _ in range(10)
+    )
+
+
+class ProseAgent(BaseAgent):
+    """Agent writing fixed-style prose after a delay."""
+
+    def __init__(self, name, write, delay=0.05):
+        super().__init__(AgentConfig(name=name, model=name))
+        self.write = write
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt, temperature=0.8, max_tokens=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"output": self.write(seed=self.calls), "tokens_input": 10, "tokens_output": 200, "cost": 0.0}
+
+
+def scripted(scores, delay=0.0, fail=()):
+    """Generate/score pair where model m's nth game scores scores[m][n]."""
+    async def generate(model, prompt, sample):
+        await asyncio.sleep(delay)
+        if model in fail:
+            raise RuntimeError("provider down")
+        return f"{model}:{prompt}:{sample}"
+
+    def score(text):
+        model, prompt, sample = text.split(":")
+        return scores[model][int(sample)]
+
+    return generate, score
+
+
+class TestVoiceTournament:
+    """Test scheduling, scoring and early stopping."""
+
+    @pytest.mark.asyncio
+    async def test_plays_full_matrix_concurrently(self):
+        """Test every prompt x model x sample game runs, bounded by max_concurrency."""
+        in_flight, peak = 0, 0
+
+        async def generate(model, prompt, sample):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return f"{model} {prompt} {sample}"
+
+        tournament = VoiceTournament(generate, score=len, max_concurrency=4)
+        started = time.perf_counter()
+        result = await tournament.run(["p1", "p2"], ["a", "b", "c"], samples=2)
+        elapsed = time.perf_counter() - started
+
+        assert len(result.entries) == 12
+        assert peak == 4
+        assert elapsed < 12 * 0.05 / 2
+        assert {(e.prompt_index, e.sample) for e in result.standings["a"].entries} == {
+            (0, 0), (0, 1), (1, 0), (1, 1)
+        }
+
+    @pytest.mark.asyncio
+    async def test_outputs_scored_as_they_arrive(self):
+        """Test each entry is scored before later games finish."""
+        finished = []
+
+        async def generate(model, prompt, sample):
+            await asyncio.sleep({"fast": 0.01, "slow": 0.2}[model])
+            return model
+
+        tournament = VoiceTournament(generate, score=lambda text: 50.0)
+        await tournament.run(["p"], ["slow", "fast"], on_result=lambda e: finished.append((e.model, e.score)))
+
+        assert finished == [("fast", 50.0), ("slow", 50.0)]
+
+    @pytest.mark.asyncio
+    async def test_early_stop_skips_hopeless_model(self):
+        """Test a model far behind the leader stops getting games."""
+        generate, score = scripted({"good": [90, 91, 89] * 4, "bad": [40, 42, 41] * 4})
+        tournament = VoiceTournament(generate, score, max_concurrency=2, min_samples=3)
+
+        result = await tournament.run(["p"], ["good", "bad"], samples=12)
+
+        assert result.eliminated == ["bad"]
+        assert len(result.standings["good"].entries) == 12
+        assert len(result.standings["bad"].entries) < 12
+        assert result.skipped == 12 - len(result.standings["bad"].entries)
+        assert [s.model for s in result.ranking()] == ["good", "bad"]
+
+    @pytest.mark.asyncio
+    async def test_close_models_not_stopped(self):
+        """Test noisy, overlapping scores keep both models in contention."""
+        generate, score = scripted({"a": [80, 70, 85, 75] * 2, "b": [78, 72, 80, 70] * 2})
+
+        result = await VoiceTournament(generate, score, min_samples=3).run(["p"], ["a", "b"], samples=8)
+
+        assert result.eliminated == []
+        assert result.skipped == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_recorded(self):
+        """Test failed games are kept with their error and a failing model is dropped."""
+        generate, score = scripted({"ok": [80] * 6}, fail={"down"})
+
+        result = await VoiceTournament(generate, score, min_samples=3).run(["p"], ["ok", "down"], samples=6)
+
+        down = result.standings["down"]
+        assert down.errors >= 3 and down.eliminated
+        assert down.best() is None and down.mean is None
+        assert all(e.error == "provider down" for e in down.entries)
+        assert result.standings["ok"].mean == 80
+
+    @pytest.mark.asyncio
+    async def test_scoring_failures_recorded(self):
+        """Test a scorer raising on one output fails that game, not the tournament."""
+        generate, score = scripted({"ok": [80] * 4})
+
+        def picky(text):
+            if text.startswith("garbled"):
+                raise ValueError("unparseable output")
+            return score(text)
+
+        result = await VoiceTournament(generate, picky).run(["p"], ["ok", "garbled"], samples=4)
+
+        garbled = result.standings["garbled"]
+        assert len(result.entries) == 8
+        assert garbled.errors == 4 and garbled.mean is None
+        assert all(e.error == "Scoring failed: unparseable output" for e in garbled.entries)
+        assert result.standings["ok"].mean == 80
+
+    @pytest.mark.asyncio
+    async def test_unscored_tournament_never_stops(self):
+        """Test without a scorer all games play and entries stay unscored."""
+        generate, _ = scripted({})
+
+        result = await VoiceTournament(generate).run(["p"], ["a", "b"], samples=4)
+
+        assert len(result.entries) == 8
+        assert all(e.score is None for e in result.entries)
+        assert result.ranking() == []
+
+
+class TestVoiceTestingTournament:
+    """Test VoiceTestingWorkflow running its models as a tournament."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = AgentPool()
+        pool.register_agent("terse-model", ProseAgent("terse-model", terse))
+        pool.register_agent("ornate-model", ProseAgent("ornate-model", ornate))
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_profiled_voice_wins(self, pool):
+        """Test the model writing in the profiled voice wins and the other is pruned."""
+        scorer = VoiceScorer()
+        scorer.build_profile("Sam", {"s": terse(seed=0)})
+        workflow = VoiceTestingWorkflow(agent_pool=pool, voice_scorer=scorer)
+
+        result = await workflow.run(
+            prompt=["Open on rain", "The confession"],
+            models=["ornate-model", "terse-model"],
+            character="Sam",
+            samples=3
+        )
+
+        tournament = result.metadata["tournament"]
+        assert result.outputs["recommendation"]["winner"] == "terse-model"
+        assert result.metadata["scored_against"] == "profile"
+        assert tournament["prompts"] == 2
+        assert tournament["eliminated"] == ["ornate-model"]
+        assert tournament["games"] + tournament["skipped"] == 12
+        assert pool.get_agent("terse-model").calls == 6
+
+    @pytest.mark.asyncio
+    async def test_reference_scenes(self, pool):
+        """Test reference scenes stand in for a missing profile."""
+        workflow = VoiceTestingWorkflow(agent_pool=pool)
+
+        result = await workflow.run(
+            prompt="Open on rain",
+            models=["terse-model", "ornate-model"],
+            character="Sam",
+            reference_scenes=[ornate(seed=5)]
+        )
+
+        comparison = result.outputs["comparison"]
+        assert result.metadata["scored_against"] == "reference_scenes"
+        assert comparison[0]["model"] == "ornate-model"
+        assert comparison[0]["games"] == 1
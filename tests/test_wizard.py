@@ -1,5 +1,8 @@
 """Tests for creation wizard."""
 
+import asyncio
+import sqlite3
+
 import pytest
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -132,3 +135,111 @@ class TestWizardPhases:
             
             assert result.word_count > 100
             assert len(result.responses) > 0
+
+
+class TestConversationalWizard:
+    """Test question-by-question answering and persistence."""
+
+    def test_answers_advance_through_phases(self):
+        """Test each answer moves to the next question, then the next phase."""
+        with TemporaryDirectory() as tmpdir:
+            wizard = CreationWizard(Path(tmpdir))
+            first = wizard.get_next_question()
+            foundation = wizard.get_phase_questions(WizardPhase.FOUNDATION)
+
+            for _ in foundation:
+                wizard.process_answer("answer")
+
+            assert wizard.responses[first] == "answer"
+            assert wizard.get_current_phase() == WizardPhase.CHARACTER
+            assert wizard.get_progress()["answered"] == len(foundation)
+
+            while not wizard.is_complete():
+                wizard.process_answer("more")
+
+            assert wizard.get_next_question() is None
+            assert wizard.get_progress()["percent"] == 100
+
+    def test_round_trip(self):
+        """Test progress survives to_dict/from_dict."""
+        with TemporaryDirectory() as tmpdir:
+            wizard = CreationWizard(Path(tmpdir))
+            wizard.process_answer("Because I must")
+            wizard.process_answer("Literary fiction")
+
+            restored = CreationWizard.from_dict(wizard.to_dict())
+
+            assert restored.responses == wizard.responses
+            assert restored.get_next_question() == wizard.get_next_question()
+            assert restored.project_path == Path(tmpdir)
+
+
+class TestWizardEndpoints:
+    """Test the webapp wizard API keeps progress per client."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from webapp.backend import app as webapp
+
+        monkeypatch.setattr(webapp, "project_path", tmp_path / "project")
+        with TestClient(webapp.app) as client:
+            yield client
+
+    def test_clients_isolated(self, client):
+        """Test two clients answer independently and progress is stored, not global."""
+        alice = {"X-Client-Id": "alice"}
+        bob = {"X-Client-Id": "bob"}
+
+        started = client.post("/api/wizard/start", json={"project_name": "a"}, headers=alice).json()
+        client.post("/api/wizard/start", json={"project_name": "b"}, headers=bob)
+        answered = client.post("/api/wizard/answer", json={"answer": "Because"}, headers=alice).json()
+
+        assert started["question"] != answered["question"]
+        assert client.get("/api/wizard/progress", headers=alice).json()["progress"]["answered"] == 1
+        assert client.get("/api/wizard/progress", headers=bob).json()["progress"]["answered"] == 0
+        assert not client.get("/api/wizard/progress").json()["active"]
+
+    def test_completion_writes_story_bible(self, client, tmp_path):
+        """Test the last answer returns and saves the story bible."""
+        client.post("/api/wizard/start", json={"project_name": "novel"})
+        missing = client.post("/api/wizard/answer", json={"answer": "x"}, headers={"X-Client-Id": "nobody"})
+
+        response = {"complete": False}
+        while not response["complete"]:
+            response = client.post("/api/wizard/answer", json={"answer": "An answer"}).json()
+
+        assert missing.status_code == 400
+        assert "An answer" in response["story_bible"]
+        assert (tmp_path / "project" / "novel" / "story_bible.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_locked_state_store_does_not_block_loop(self, tmp_path, monkeypatch):
+        """Test an answer waiting for another worker's write lock leaves the event loop free."""
+        from factory.core.storage.state_store import StateStore
+        from webapp.backend import app as webapp
+
+        store = StateStore.for_project(tmp_path)
+        monkeypatch.setattr(webapp, "state_store", store)
+        monkeypatch.setattr(webapp, "project_path", tmp_path / "project")
+        await webapp.wizard_start(webapp.WizardStartRequest(project_name="novel"), client_id="alice")
+
+        other = sqlite3.connect(str(store.db_path), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            answer = asyncio.create_task(
+                webapp.wizard_answer(webapp.WizardAnswerRequest(answer="Because"), client_id="alice")
+            )
+            ticks = 0
+            for _ in range(10):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert not answer.done()
+        finally:
+            other.execute("COMMIT")
+            other.close()
+        response = await answer
+        store.close()
+
+        assert ticks == 10
+        assert response["progress"]["answered"] == 1
@@ -5,15 +5,25 @@ Provides REST API and WebSocket endpoints for browser-based access to:
 - Model Comparison (tournament system)
 - Scene Workflows (generation, enhancement, voice testing)
 - Knowledge Router (ask questions)
+- Background jobs (long-running operations, progress over WebSocket)
+
+The app can run as several worker processes (FACTORY_WEB_WORKERS). State
+that outlives a request lives on disk, not in module globals: jobs in
+.factory/jobs.db, wizard progress per client in .factory/state.db, and the
+session in .session/. The remaining globals are per-process helpers.
 """
 
-from fastapi import FastAPI, WebSocket, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Request, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from pathlib import Path
 import asyncio
 import json
+import logging
+import math
+import os
+import time
 from typing import Optional, List, Dict
 from pydantic import BaseModel
 import sys
@@ -21,16 +31,31 @@ import sys
 # Add factory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from factory.core.agent_pool import AgentPool
+from factory.core.job_queue import JobQueue, JobStatus, JobStore
+from factory.core.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    agent_pool_collector,
+    get_registry,
+    merge_process_families,
+    query_cache_collector,
+    render_families,
+)
+from factory.core.tracing import get_tracer
+from factory.core.workflow_engine import WorkflowStatus
 from factory.wizard.wizard import CreationWizard, WizardPhase
 from factory.tools.model_comparison import ModelComparisonTool
-from factory.core.storage import Session, PreferencesManager, CostTracker
+from factory.core.storage import Session, PreferencesManager, CostTracker, StateStore
 from factory.knowledge.router import KnowledgeRouter, KnowledgeSource
+from factory.storage.database import Database
 from factory.workflows.scene_operations import (
     SceneGenerationWorkflow,
     SceneEnhancementWorkflow,
     VoiceTestingWorkflow
 )
 
+logger = logging.getLogger(__name__)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Writers Factory",
@@ -47,12 +72,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global state
+
+def route_template(request: Request) -> str:
+    """Matched route path (e.g. "/api/scene/generate"), or the raw path."""
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+
+REQUEST_DURATION = get_registry().histogram(
+    "factory_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+
+
+# Metrics and tracing: one span per HTTP request, parent of all spans in the handler
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Time each request and wrap it in an "http.request" span."""
+    start = time.perf_counter()
+    tracer = get_tracer()
+    if not tracer.enabled:
+        response = await call_next(request)
+    else:
+        with tracer.span("http.request", method=request.method) as span:
+            response = await call_next(request)
+            span.set_attributes(route=route_template(request), status=response.status_code)
+
+    # Unmatched paths share one label so scanners can't blow up cardinality
+    route = route_template(request) if request.scope.get("route") else "unmatched"
+    REQUEST_DURATION.labels(request.method, route, response.status_code).observe(
+        time.perf_counter() - start
+    )
+    return response
+
+
+# Per-process state (shared state lives in job_queue.store and state_store)
 project_path = Path.cwd() / "project"
-session: Optional[Session] = None
-wizard: Optional[CreationWizard] = None
 model_comparison: Optional[ModelComparisonTool] = None
 knowledge_router: Optional[KnowledgeRouter] = None
+agent_pool = AgentPool()
+# agents.yaml entries that couldn't be registered (no implementation or API key)
+unavailable_agents: Dict[str, str] = {}
+job_queue: Optional[JobQueue] = None
+state_store: Optional[StateStore] = None
+WEB_WORKERS = int(os.environ.get("FACTORY_WEB_WORKERS", "1"))
+JOB_WORKERS = int(os.environ.get("FACTORY_JOB_WORKERS", "2"))
+# Identical generation requests within this many seconds of completion reuse the result
+JOB_REUSE_SECONDS = float(os.environ.get("FACTORY_JOB_REUSE_SECONDS", "30"))
+
+# Pool and cache stats are read at scrape time from the current globals.
+# Registered on startup, not at import: spawned worker processes import this
+# module twice (as __mp_main__ and as webapp.backend.app).
+METRIC_COLLECTORS = (
+    lambda: agent_pool_collector(agent_pool)(),
+    query_cache_collector(lambda: knowledge_router.cache if knowledge_router else None),
+)
+# With several workers, each publishes its metrics to state_store and
+# /metrics merges them, labelling every sample with the worker's PID
+METRICS_NAMESPACE = "metrics"
+METRICS_PUBLISH_SECONDS = float(os.environ.get("FACTORY_METRICS_PUBLISH_SECONDS", "5"))
+WORKER_ID = str(os.getpid())
+metrics_task: Optional[asyncio.Task] = None
 
 
 # Request/Response Models
@@ -86,37 +167,87 @@ class SceneEnhancementRequest(BaseModel):
     model: str = "claude-sonnet-4.5"
 
 
+class QuickDraftRequest(BaseModel):
+    prompt: str
+    group: Optional[str] = None
+    agents: Optional[List[str]] = None
+    mode: str = "hedged"  # "hedged" or "first_k"
+    first_k: int = 1
+    hedge_after_ms: Optional[float] = None
+
+
 # Startup/Shutdown
 @app.on_event("startup")
 async def startup_event():
     """Initialize Writers Factory components."""
-    global session, wizard, model_comparison, knowledge_router
+    global model_comparison, knowledge_router, job_queue, state_store, metrics_task
 
     # Create project directory if it doesn't exist
     project_path.mkdir(parents=True, exist_ok=True)
 
+    for collector in METRIC_COLLECTORS:
+        get_registry().register_collector(collector)
+
+    # Fill the pool from agents.yaml (credentials from config/credentials.json)
+    unavailable_agents.update(agent_pool.register_configured_agents())
+
     # Initialize preferences manager (lightweight, doesn't need Session)
     preferences = PreferencesManager(project_path / ".session")
 
     # Initialize model comparison tool
     model_comparison = ModelComparisonTool(
+        agent_pool=agent_pool,
         preferences_manager=preferences,
-        console=None  # Web interface doesn't need Rich console
+        console=None,  # Web interface doesn't need Rich console
+        database=Database(str(project_path / ".factory" / "analytics.db"))
+    )
+
+    # Shared with the other worker processes
+    state_store = StateStore.for_project(project_path)
+    if WEB_WORKERS > 1:
+        metrics_task = asyncio.create_task(publish_metrics_periodically())
+
+    # Background jobs: generation and comparison run here, not in the request.
+    # Every worker process runs a queue on the same store and claims jobs from it.
+    job_queue = JobQueue(
+        JobStore.for_project(project_path), workers=JOB_WORKERS, reuse_seconds=JOB_REUSE_SECONDS
     )
+    job_queue.register("scene.generate", run_scene_generation)
+    job_queue.register("scene.enhance", run_scene_enhancement)
+    job_queue.register("compare", run_comparison)
+    await job_queue.start()
 
-    # Note: Session, wizard, and knowledge_router are initialized on-demand
-    # when endpoints are called, to avoid startup errors
+    # Note: knowledge_router is initialized on-demand when endpoints are
+    # called, to avoid startup errors
 
     print("✅ Writers Factory web server started")
     print(f"📁 Project path: {project_path}")
+    print(f"🤖 Agents: {', '.join(agent_pool.list_agents()) or 'none'} "
+          f"({len(unavailable_agents)} configured agents unavailable)")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean shutdown."""
-    global session
-    if session:
-        await session.save()
+    global job_queue, state_store, metrics_task
+    for collector in METRIC_COLLECTORS:
+        get_registry().unregister_collector(collector)
+    if metrics_task:
+        metrics_task.cancel()
+        metrics_task = None
+    if model_comparison and model_comparison.database:
+        model_comparison.database.close()
+    if job_queue:
+        # Interrupted jobs go back to the queue for another worker (or the next start)
+        await job_queue.stop()
+        job_queue.store.close()
+        job_queue = None
+    if state_store:
+        if WEB_WORKERS > 1:
+            await asyncio.to_thread(state_store.delete, METRICS_NAMESPACE, WORKER_ID)
+        state_store.close()
+        state_store = None
+    get_tracer().flush()
     print("👋 Writers Factory web server stopped")
 
 
@@ -131,66 +262,145 @@ async def health_check():
     }
 
 
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def metrics():
+    """Metrics in Prometheus text exposition format.
+
+    With several worker processes, whichever worker answers serves every
+    worker's metrics, each sample labelled worker="<pid>".
+    """
+    if WEB_WORKERS > 1 and state_store:
+        text = await asyncio.to_thread(gather_worker_metrics)
+    else:
+        text = get_registry().render()
+    return Response(text, media_type=METRICS_CONTENT_TYPE)
+
+
+def publish_metrics() -> None:
+    """Store this worker's metrics where the other workers can read them."""
+    state_store.set(
+        METRICS_NAMESPACE, WORKER_ID, {"time": time.time(), "families": get_registry().collect()}
+    )
+
+
+def gather_worker_metrics() -> str:
+    """Render the metrics of all live workers.
+
+    Snapshots not refreshed for three publish intervals belong to workers
+    that exited without cleaning up and are dropped.
+    """
+    publish_metrics()
+    cutoff = time.time() - 3 * METRICS_PUBLISH_SECONDS
+    snapshots = {}
+    for worker in state_store.keys(METRICS_NAMESPACE):
+        snapshot = state_store.get(METRICS_NAMESPACE, worker)
+        if snapshot is None:
+            continue
+        if snapshot["time"] < cutoff:
+            state_store.delete(METRICS_NAMESPACE, worker)
+            continue
+        snapshots[worker] = snapshot["families"]
+    return render_families(merge_process_families(snapshots))
+
+
+async def publish_metrics_periodically() -> None:
+    """Keep this worker's published metrics fresh for other workers' scrapes."""
+    while True:
+        try:
+            await asyncio.to_thread(publish_metrics)
+        except Exception as e:
+            logger.warning(f"Publishing worker metrics failed: {e}")
+        await asyncio.sleep(METRICS_PUBLISH_SECONDS)
+
+
 # Wizard Endpoints
+WIZARD_NAMESPACE = "wizard"
+
+
+def get_client_id(x_client_id: Optional[str] = Header(None)) -> str:
+    """Client whose wizard progress a request belongs to.
+
+    Browsers send a random X-Client-Id they keep in localStorage, so
+    several people (or tabs on different projects) can use the wizard at
+    once whichever worker process serves them.
+    """
+    return x_client_id or "default"
+
+
+def get_state_store() -> StateStore:
+    """State store shared by the worker processes."""
+    if not state_store:
+        raise HTTPException(status_code=503, detail="State store not available")
+    return state_store
+
+
+def wizard_state(wizard: CreationWizard) -> Dict:
+    """Response fields describing where a wizard is."""
+    return {
+        "current_phase": wizard.get_current_phase().value,
+        "question": wizard.get_next_question(),
+        "progress": wizard.get_progress(),
+    }
+
+
 @app.post("/api/wizard/start")
-async def wizard_start(request: WizardStartRequest):
+async def wizard_start(request: WizardStartRequest, client_id: str = Depends(get_client_id)):
     """Start a new creation wizard session."""
-    global wizard
-
     wizard_project_path = project_path / request.project_name
     wizard_project_path.mkdir(parents=True, exist_ok=True)
 
     wizard = CreationWizard(wizard_project_path)
-    current_phase = wizard.get_current_phase()
-    question = wizard.get_next_question()
+    await asyncio.to_thread(get_state_store().set, WIZARD_NAMESPACE, client_id, wizard.to_dict())
 
     return {
         "success": True,
         "project_name": request.project_name,
-        "current_phase": current_phase.value,
-        "question": question,
-        "progress": wizard.get_progress()
+        **wizard_state(wizard)
     }
 
 
 @app.post("/api/wizard/answer")
-async def wizard_answer(request: WizardAnswerRequest):
+async def wizard_answer(request: WizardAnswerRequest, client_id: str = Depends(get_client_id)):
     """Submit an answer to the wizard."""
-    global wizard
-
-    if not wizard:
-        raise HTTPException(status_code=400, detail="No wizard session active")
-
-    # Process answer
-    wizard.process_answer(request.answer)
+    def answer(data: Optional[Dict]) -> Optional[Dict]:
+        if data is None:
+            raise HTTPException(status_code=400, detail="No wizard session active")
+        wizard = CreationWizard.from_dict(data)
+        wizard.process_answer(request.answer)
+        return wizard.to_dict()
+
+    # Atomic, so two requests from the same client can't both answer one question.
+    # Runs in a thread (waiting for another worker's write lock must not stall
+    # the event loop); the HTTPException raised by answer() propagates here.
+    data = await asyncio.to_thread(get_state_store().update, WIZARD_NAMESPACE, client_id, answer)
+    wizard = CreationWizard.from_dict(data)
 
     # Get next question or finish
     if wizard.is_complete():
-        story_bible = await wizard.generate_story_bible()
+        result = wizard.generate_story_bible()
+        wizard.save_story_bible(result)
         return {
             "success": True,
             "complete": True,
-            "story_bible": story_bible
+            "story_bible": result.story_bible
         }
     else:
-        next_question = wizard.get_next_question()
         return {
             "success": True,
             "complete": False,
-            "question": next_question,
-            "current_phase": wizard.get_current_phase().value,
-            "progress": wizard.get_progress()
+            **wizard_state(wizard)
         }
 
 
 @app.get("/api/wizard/progress")
-async def wizard_progress():
+async def wizard_progress(client_id: str = Depends(get_client_id)):
     """Get current wizard progress."""
-    global wizard
-
-    if not wizard:
+    data = await asyncio.to_thread(get_state_store().get, WIZARD_NAMESPACE, client_id)
+    if data is None:
         return {"active": False}
 
+    wizard = CreationWizard.from_dict(data)
     return {
         "active": True,
         "current_phase": wizard.get_current_phase().value,
@@ -200,27 +410,18 @@ async def wizard_progress():
 
 
 # Model Comparison Endpoints
-@app.post("/api/compare")
+@app.post("/api/compare", status_code=202)
 async def compare_models(request: ModelComparisonRequest):
-    """Compare multiple models on the same prompt."""
+    """Queue a comparison of multiple models on the same prompt.
+
+    Returns the job; fetch /api/jobs/{id}/result when it completes.
+    """
     global model_comparison
 
     if not model_comparison:
         raise HTTPException(status_code=500, detail="Model comparison not initialized")
 
-    try:
-        result = await model_comparison.compare_models(
-            prompt=request.prompt,
-            models=request.models
-        )
-        return {
-            "success": True,
-            "results": result["results"],
-            "costs": result.get("costs", {}),
-            "metadata": result.get("metadata", {})
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await submit_job("compare", request.model_dump())
 
 
 @app.get("/api/models/available")
@@ -239,7 +440,8 @@ async def get_available_models():
                 "description": agent_config.get("description"),
                 "cost_input": agent_config.get("cost_per_1k_input"),
                 "cost_output": agent_config.get("cost_per_1k_output"),
-                "strengths": agent_config.get("strengths", [])
+                "strengths": agent_config.get("strengths", []),
+                "registered": agent_pool.get_agent(agent_name) is not None
             })
 
     return {"models": models}
@@ -256,6 +458,75 @@ async def get_model_groups():
     return {"groups": groups}
 
 
+@app.get("/api/agents/stats")
+async def get_agent_stats(agent: Optional[str] = None, window_minutes: Optional[float] = None):
+    """Get agent pool counters and latency/throughput percentiles.
+
+    Query params:
+        agent: Limit to one agent
+        window_minutes: Window for the "window" percentiles (default 5)
+    """
+    window_seconds = window_minutes * 60 if window_minutes else None
+    try:
+        stats = agent_pool.get_stats(agent, window_seconds=window_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return {
+        "summary": agent_pool.get_summary(window_seconds=window_seconds),
+        "agents": {agent: stats} if agent else stats,
+        "unavailable": unavailable_agents,
+    }
+
+
+# Quick draft: never wait on a stalled provider
+@app.post("/api/draft/quick")
+async def quick_draft(request: QuickDraftRequest):
+    """Generate a draft from whichever pool agent answers first.
+
+    "hedged" runs the fastest agent and fires a backup if it exceeds its
+    p95 latency; "first_k" runs all candidates and returns after first_k
+    successes, cancelling the rest.
+    """
+    try:
+        if request.mode == "hedged":
+            responses = [await agent_pool.execute_hedged(
+                request.prompt,
+                group=request.group,
+                agents=request.agents,
+                hedge_after_ms=request.hedge_after_ms,
+            )]
+            cancelled = []
+        elif request.mode == "first_k":
+            agents = request.agents
+            if agents is None and request.group:
+                agents = agent_pool.get_group_members(request.group)
+            result = await agent_pool.execute_parallel(
+                request.prompt, agents=agents, first_k=request.first_k
+            )
+            responses, cancelled = result.responses, result.cancelled_agents
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown mode '{request.mode}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    drafts = [
+        {
+            "agent": r.agent_name,
+            "output": r.output,
+            "response_time_ms": r.response_time_ms,
+            "cost": r.cost,
+        }
+        for r in responses if r.success
+    ]
+    return {
+        "success": bool(drafts),
+        "drafts": drafts,
+        "errors": {r.agent_name: r.error for r in responses if not r.success},
+        "cancelled": cancelled,
+    }
+
+
 # Knowledge Router Endpoints
 @app.post("/api/knowledge/query")
 async def knowledge_query(request: KnowledgeQueryRequest):
@@ -281,83 +552,206 @@ async def knowledge_query(request: KnowledgeQueryRequest):
 
 
 # Scene Operations Endpoints
-@app.post("/api/scene/generate")
+@app.post("/api/scene/generate", status_code=202)
 async def generate_scene(request: SceneGenerationRequest):
-    """Generate a new scene."""
-    try:
-        workflow = SceneGenerationWorkflow(
-            project_path=project_path,
-            preferences=PreferencesManager(project_path / ".session")
-        )
+    """Queue generation of a new scene.
 
-        result = await workflow.run(
-            prompt=request.prompt,
-            context=request.context,
-            model=request.model
-        )
+    Returns the job; fetch /api/jobs/{id}/result when it completes.
+    """
+    return await submit_job("scene.generate", request.model_dump())
 
-        return {
-            "success": True,
-            "scene": result.get("scene"),
-            "metadata": result.get("metadata", {})
+
+@app.post("/api/scene/enhance", status_code=202)
+async def enhance_scene(request: SceneEnhancementRequest):
+    """Queue enhancement of an existing scene.
+
+    Returns the job; fetch /api/jobs/{id}/result when it completes.
+    """
+    return await submit_job("scene.enhance", request.model_dump())
+
+
+# Background Job Handlers (run by job_queue workers)
+async def run_scene_generation(payload: Dict, report) -> Dict:
+    """Generate a scene from a SceneGenerationRequest payload."""
+    outline = payload["prompt"]
+    if payload.get("context"):
+        outline += f"\n\nContext:\n{payload['context']}"
+
+    report(0.1, f"Generating scene with {payload['model']}")
+    workflow = SceneGenerationWorkflow(knowledge_router=knowledge_router, agent_pool=agent_pool)
+    result = await workflow.run(
+        outline=outline,
+        model_name=payload["model"],
+        use_knowledge_context=knowledge_router is not None
+    )
+    if result.status is not WorkflowStatus.COMPLETED:
+        raise RuntimeError("; ".join(result.errors) or "Scene generation failed")
+
+    return {"scene": result.outputs["scene"], "metadata": result.metadata}
+
+
+async def run_scene_enhancement(payload: Dict, report) -> Dict:
+    """Enhance a scene from a SceneEnhancementRequest payload."""
+    report(0.1, f"Enhancing scene with {payload['model']}")
+    workflow = SceneEnhancementWorkflow(agent_pool=agent_pool)
+    result = await workflow.run(scene=payload["scene_text"], model_name=payload["model"])
+    if result.status is not WorkflowStatus.COMPLETED:
+        raise RuntimeError("; ".join(result.errors) or "Scene enhancement failed")
+
+    validation = result.outputs.get("validation", {})
+    return {
+        "enhanced_scene": result.outputs["enhanced_scene"],
+        "changes": validation.get("issues", []),
+        "metadata": {**result.metadata, "focus": payload["focus"], "voice_score": validation.get("score")}
+    }
+
+
+async def run_comparison(payload: Dict, report) -> Dict:
+    """Compare models from a ModelComparisonRequest payload."""
+    if not model_comparison:
+        raise RuntimeError("Model comparison not initialized")
+
+    models = payload["models"]
+    finished = []
+
+    def model_done(output) -> None:
+        finished.append(output.model_name)
+        status = "failed" if output.error else "done"
+        report(len(finished) / (len(models) + 1), f"{output.model_name} {status} ({len(finished)}/{len(models)})")
+
+    report(0.0, f"Comparing {len(models)} models")
+    result = await model_comparison.compare_models(
+        prompt=payload["prompt"], models=models, on_progress=model_done
+    )
+    return {
+        "results": {o.model_name: o.text for o in result.outputs},
+        "errors": {o.model_name: o.error for o in result.outputs if o.error},
+        "costs": {o.model_name: o.cost for o in result.outputs},
+        "metadata": {
+            "total_cost": result.total_cost,
+            "duration_ms": result.duration_ms,
+            "comparison_id": result.comparison_id,
+            "models": result.models_compared,
+            # Row/column order follows "models"; null where a model failed
+            "similarity": [
+                [None if math.isnan(v) else round(float(v), 3) for v in row]
+                for row in result.similarity
+            ],
+            # Canned outputs because no agents are registered
+            "demo": result.demo,
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    }
 
 
-@app.post("/api/scene/enhance")
-async def enhance_scene(request: SceneEnhancementRequest):
-    """Enhance an existing scene."""
+# Background Job Endpoints
+def get_job_queue() -> JobQueue:
+    """The running job queue (503 before startup)."""
+    if not job_queue or not job_queue.started:
+        raise HTTPException(status_code=503, detail="Job queue not running")
+    return job_queue
+
+
+async def submit_job(kind: str, payload: Dict) -> Dict:
+    """Queue a job and return it.
+
+    Duplicates of a queued, running or just-completed request (double
+    clicks, retries, a second tab) attach to the existing job instead of
+    paying for another generation; "coalesced" tells the caller.
+    """
+    job = await get_job_queue().submit(kind, payload, coalesce=True)
+    return {"success": True, "job": job.to_dict(), "coalesced": job.callers > 1}
+
+
+async def find_job(job_id: str):
+    """Look up a job (404 if unknown)."""
+    job = await get_job_queue().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50):
+    """List jobs, newest first.
+
+    Query params:
+        status: Only jobs in this state (queued, running, completed, failed, cancelled)
+        kind: Only jobs of this kind (scene.generate, scene.enhance, compare)
+        limit: Maximum jobs returned
+    """
     try:
-        workflow = SceneEnhancementWorkflow(
-            project_path=project_path,
-            preferences=PreferencesManager(project_path / ".session")
-        )
+        statuses = [JobStatus(status)] if status else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown status '{status}'")
 
-        result = await workflow.run(
-            scene_text=request.scene_text,
-            focus=request.focus,
-            model=request.model
-        )
+    jobs = await get_job_queue().list(statuses=statuses, kind=kind, limit=limit)
+    return {"jobs": [job.to_dict() for job in jobs]}
 
-        return {
-            "success": True,
-            "enhanced_scene": result.get("enhanced_scene"),
-            "changes": result.get("changes", []),
-            "metadata": result.get("metadata", {})
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Get job status and progress."""
+    return {"job": (await find_job(job_id)).to_dict()}
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Get the result of a finished job (409 while it is still queued or running)."""
+    job = await find_job(job_id)
+    if not job.status.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+
+    response = {"success": job.status is JobStatus.COMPLETED, "job": job.to_dict()}
+    response.update(job.result or {})
+    return response
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job.
+
+    A job shared by coalesced callers keeps running until the last of
+    them cancels.
+    """
+    await find_job(job_id)
+    cancelled = await get_job_queue().cancel(job_id)
+    return {"success": cancelled, "job": (await find_job(job_id)).to_dict()}
 
 
 # Session Management Endpoints
+def load_session() -> Optional[Session]:
+    """Project session from disk, or None if none has been saved.
+
+    Sessions are read per request rather than held in a global, so every
+    worker process sees the latest saved state.
+    """
+    if not (project_path / ".session" / "current.json").exists():
+        return None
+    return Session(project_path)
+
+
 @app.get("/api/session/status")
 async def session_status():
     """Get current session status."""
-    global session
-
+    session = load_session()
     if not session:
         return {"active": False}
 
     return {
         "active": True,
-        "session_id": str(session.session_id),
-        "total_cost": session.get_total_cost(),
-        "stage": session.get_current_stage(),
-        "last_save": session.last_save_time
+        "session_id": session.data.session_id,
+        "stage": session.data.current_state.stage,
+        "last_save": session.data.last_save_time.isoformat() if session.data.last_save_time else None,
+        "save_status": session.get_save_status()
     }
 
 
 @app.post("/api/session/save")
 async def session_save():
-    """Manually save session."""
-    global session
-
-    if not session:
-        raise HTTPException(status_code=400, detail="No active session")
-
+    """Manually save session (starting one if none exists)."""
+    session = load_session() or Session(project_path)
     success = await session.save()
-    return {"success": success}
+    return {"success": success, "session_id": session.data.session_id}
 
 
 # WebSocket for real-time streaming
@@ -395,6 +789,39 @@ async def websocket_stream(websocket: WebSocket):
         await websocket.close()
 
 
+# WebSocket for job progress
+@app.websocket("/ws/jobs")
+async def websocket_jobs(websocket: WebSocket, job_id: Optional[str] = None):
+    """Push job status/progress events.
+
+    With ?job_id=..., sends that job's current state and its updates, and
+    closes once it finishes. Without, streams events for all jobs.
+    """
+    await websocket.accept()
+    if not job_queue or not job_queue.started:
+        await websocket.send_json({"type": "error", "message": "Job queue not running"})
+        await websocket.close()
+        return
+
+    try:
+        # Follows the store, so jobs running in other worker processes are seen too
+        async for job in job_queue.watch(job_id):
+            await websocket.send_json({"type": "job", "job": job.to_dict()})
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass  # Already closed by the client
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if WEB_WORKERS > 1:
+        # Worker processes import the app themselves, so pass it by name
+        uvicorn.run("webapp.backend.app:app", host="127.0.0.1", port=8000, workers=WEB_WORKERS)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -4,11 +4,16 @@
  */
 
 const API_BASE = 'http://127.0.0.1:8000/api';
+const WS_BASE = 'ws://127.0.0.1:8000/ws';
 
 // Global state
 let selectedModels = [];
 let availableModels = [];
 
+// Identifies this browser's wizard progress to whichever server worker answers
+const CLIENT_ID = localStorage.getItem('factoryClientId') || crypto.randomUUID();
+localStorage.setItem('factoryClientId', CLIENT_ID);
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', async () => {
     await loadModels();
@@ -65,7 +70,7 @@ async function startWizard() {
     try {
         const response = await fetch(`${API_BASE}/wizard/start`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'X-Client-Id': CLIENT_ID },
             body: JSON.stringify({ project_name: projectName })
         });
 
@@ -94,7 +99,7 @@ async function submitAnswer() {
     try {
         const response = await fetch(`${API_BASE}/wizard/answer`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
+            headers: { 'Content-Type': 'application/json', 'X-Client-Id': CLIENT_ID },
             body: JSON.stringify({ answer })
         });
 
@@ -229,17 +234,11 @@ async function runComparison() {
     document.getElementById('comparison-results').innerHTML = '';
 
     try {
-        const response = await fetch(`${API_BASE}/compare`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                prompt,
-                models: selectedModels
-            })
+        const data = await runJob('/compare', {
+            prompt,
+            models: selectedModels
         });
 
-        const data = await response.json();
-
         if (data.success) {
             displayComparisonResults(data.results);
         }
@@ -271,6 +270,51 @@ function updateModelCount() {
         `${availableModels.length} Models Available`;
 }
 
+// ============================================================================
+// BACKGROUND JOBS
+// ============================================================================
+
+// Submit a long-running operation and resolve with its result once the job
+// finishes. Progress arrives over the /ws/jobs WebSocket.
+async function runJob(path, body, onProgress) {
+    const response = await fetch(`${API_BASE}${path}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body)
+    });
+    const submitted = await response.json();
+    if (!submitted.success) {
+        throw new Error(submitted.detail || 'Failed to submit job');
+    }
+
+    const jobId = submitted.job.id;
+    await new Promise((resolve) => {
+        const socket = new WebSocket(`${WS_BASE}/jobs?job_id=${jobId}`);
+        socket.onmessage = (message) => {
+            const event = JSON.parse(message.data);
+            if (event.type === 'job' && onProgress) {
+                onProgress(event.job);
+            }
+        };
+        // The server closes the socket when the job finishes
+        socket.onclose = resolve;
+        socket.onerror = resolve;
+    });
+
+    return waitForJobResult(jobId);
+}
+
+// Fetch a job's result, polling in case the socket closed before it finished
+async function waitForJobResult(jobId) {
+    while (true) {
+        const result = await fetch(`${API_BASE}/jobs/${jobId}/result`);
+        if (result.status !== 409) {
+            return result.json();
+        }
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+}
+
 // ============================================================================
 // SCENE TOOLS
 // ============================================================================
@@ -296,18 +340,12 @@ async function generateScene() {
     }
 
     try {
-        const response = await fetch(`${API_BASE}/scene/generate`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                prompt,
-                context: context || null,
-                model
-            })
+        const data = await runJob('/scene/generate', {
+            prompt,
+            context: context || null,
+            model
         });
 
-        const data = await response.json();
-
         if (data.success) {
             document.getElementById('scene-output').style.display = 'block';
             document.getElementById('generated-scene').value = data.scene;
@@ -328,18 +366,12 @@ async function enhanceScene() {
     }
 
     try {
-        const response = await fetch(`${API_BASE}/scene/enhance`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                scene_text: sceneText,
-                focus,
-                model: 'claude-sonnet-4.5'
-            })
+        const data = await runJob('/scene/enhance', {
+            scene_text: sceneText,
+            focus,
+            model: 'claude-sonnet-4.5'
         });
 
-        const data = await response.json();
-
         if (data.success) {
             document.getElementById('enhance-output').style.display = 'block';
             document.getElementById('enhanced-scene').value = data.enhanced_scene;